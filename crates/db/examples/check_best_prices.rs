@@ -0,0 +1,57 @@
+//! Best-price consistency checker
+//!
+//! Compares product_price_ranks / product_price_summary with the live
+//! window-function computation (v_best_prices_live).
+//!
+//! Run with: cargo run --example check_best_prices [-- --repair]
+
+use price_scout_db::Database;
+
+#[tokio::main]
+async fn main() -> anyhow::Result<()> {
+    // Initialize tracing
+    tracing_subscriber::fmt()
+        .with_max_level(tracing::Level::INFO)
+        .init();
+
+    // Load .env file
+    dotenv::dotenv().ok();
+
+    let repair = std::env::args().any(|arg| arg == "--repair");
+
+    // Get database URL from environment
+    let database_url = std::env::var("DATABASE_URL")
+        .unwrap_or_else(|_| "postgresql://postgres@192.168.0.10:5432/price_scout".to_string());
+
+    println!("==================================================");
+    println!("Price Scout - Best Price Consistency Check");
+    println!("==================================================");
+    println!();
+
+    let db = Database::connect(&database_url).await?;
+
+    let mismatches = db.check_best_prices_consistency().await?;
+    if mismatches == 0 {
+        println!("[+] Best price tables are consistent");
+    } else {
+        println!("[!] {} inconsistent rows", mismatches);
+        println!("    Details: SELECT * FROM check_best_prices();");
+
+        if repair {
+            println!();
+            println!("[*] Rebuilding best price tables...");
+            let products = db.rebuild_best_prices().await?;
+            let remaining = db.check_best_prices_consistency().await?;
+            println!("[+] Rebuilt {} products, {} inconsistent rows left", products, remaining);
+        }
+    }
+    println!();
+
+    db.close().await;
+
+    if mismatches > 0 && !repair {
+        std::process::exit(1);
+    }
+
+    Ok(())
+}
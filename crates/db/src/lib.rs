@@ -4,8 +4,12 @@
 
 use anyhow::{Context, Result};
 use price_scout_models::*;
-use sqlx::postgres::{PgPool, PgPoolOptions};
-use tracing::info;
+use sqlx::postgres::{PgListener, PgPool, PgPoolOptions};
+use std::collections::HashMap;
+use std::future::Future;
+use std::sync::RwLock;
+use std::time::Duration;
+use tracing::{debug, info, warn};
 
 // ============================================================================
 // DATABASE CONNECTION
@@ -110,6 +114,9 @@ impl Database {
 
 impl Database {
     /// Create new product
+    ///
+    /// When another product already has the same spec fingerprint
+    /// (migration 007), its id is returned instead of a unique violation.
     pub async fn create_product(
         &self,
         name: &str,
@@ -119,9 +126,17 @@ impl Database {
     ) -> Result<i64> {
         let id = sqlx::query_scalar::<_, i64>(
             r#"
-            INSERT INTO products (name, category, specs, search_query)
-            VALUES ($1, $2, $3, $4)
-            RETURNING id
+            WITH inserted AS (
+                INSERT INTO products (name, category, specs, search_query)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (spec_fingerprint) WHERE spec_fingerprint IS NOT NULL DO NOTHING
+                RETURNING id
+            )
+            SELECT id FROM inserted
+            UNION ALL
+            SELECT id FROM products
+            WHERE spec_fingerprint = spec_fingerprint($3, $2)
+            LIMIT 1
             "#,
         )
         .bind(name)
@@ -147,11 +162,20 @@ impl Database {
     }
 
     /// Search products by name
+    ///
+    /// Ranked by trigram word similarity and full-text match on the
+    /// normalized name (migration 006), so "MacBook Pro 16.2\"" and
+    /// "macbook pro 16" find the same products.
     pub async fn search_products(&self, query: &str) -> Result<Vec<Product>> {
         let products = sqlx::query_as::<_, Product>(
-            "SELECT * FROM products WHERE name ILIKE $1 ORDER BY updated_at DESC LIMIT 50",
+            r#"
+            SELECT p.*
+            FROM search_products_ranked($1, 50) r
+            JOIN products p ON p.id = r.product_id
+            ORDER BY r.score DESC, p.updated_at DESC
+            "#,
         )
-        .bind(format!("%{}%", query))
+        .bind(query)
         .fetch_all(&self.pool)
         .await
         .context("Failed to search products")?;
@@ -160,6 +184,190 @@ impl Database {
     }
 }
 
+// ============================================================================
+// PRODUCT RESOLVER
+// ============================================================================
+
+/// Default number of fingerprints kept in the resolver cache
+const DEFAULT_RESOLVER_CACHE_CAPACITY: usize = 100_000;
+
+/// Maps scraped listings to product ids by spec fingerprint
+///
+/// One query per batch of cache misses: existing products are looked up
+/// through the unique `products.spec_fingerprint` index and missing ones
+/// are created in bulk. Resolved fingerprints are cached in-process, so a
+/// steady-state scrape costs no database round trips at all.
+///
+/// # Example
+/// ```no_run
+/// use price_scout_db::{Database, ProductResolver};
+/// use price_scout_models::ScrapedListing;
+///
+/// # async fn example(db: Database, listings: Vec<ScrapedListing>) -> anyhow::Result<()> {
+/// let resolver = ProductResolver::new(db);
+/// let ids = resolver.resolve(&listings).await?;
+/// # Ok(())
+/// # }
+/// ```
+pub struct ProductResolver {
+    db: Database,
+    cache: RwLock<HashMap<String, i64>>,
+    capacity: usize,
+}
+
+impl ProductResolver {
+    pub fn new(db: Database) -> Self {
+        Self::with_capacity(db, DEFAULT_RESOLVER_CACHE_CAPACITY)
+    }
+
+    pub fn with_capacity(db: Database, capacity: usize) -> Self {
+        Self {
+            db,
+            cache: RwLock::new(HashMap::new()),
+            capacity,
+        }
+    }
+
+    /// Number of cached fingerprints
+    pub fn cached(&self) -> usize {
+        self.cache.read().map(|cache| cache.len()).unwrap_or(0)
+    }
+
+    /// Resolve listings to product ids (same order as input)
+    ///
+    /// Listings without identifying specs (cpu + ram + ssd, or article)
+    /// resolve to None.
+    pub async fn resolve(&self, listings: &[ScrapedListing]) -> Result<Vec<Option<i64>>> {
+        let fingerprints: Vec<Option<String>> = listings
+            .iter()
+            .map(|listing| listing.specs.fingerprint(listing.category.as_deref()))
+            .collect();
+        let mut resolved = vec![None; listings.len()];
+
+        // Cache hits; one representative listing per missing fingerprint
+        let mut missing: HashMap<&str, usize> = HashMap::new();
+        {
+            let cache = self.cache.read().expect("resolver cache poisoned");
+            for (i, fingerprint) in fingerprints.iter().enumerate() {
+                if let Some(fingerprint) = fingerprint {
+                    match cache.get(fingerprint) {
+                        Some(id) => resolved[i] = Some(*id),
+                        None => {
+                            missing.entry(fingerprint.as_str()).or_insert(i);
+                        }
+                    }
+                }
+            }
+        }
+
+        if missing.is_empty() {
+            return Ok(resolved);
+        }
+
+        let mut pending: Vec<usize> = missing.values().copied().collect();
+        let mut found: HashMap<String, i64> = HashMap::with_capacity(pending.len());
+
+        // A concurrent resolver may win the insert race; its row becomes
+        // visible to the second attempt
+        for _ in 0..2 {
+            if pending.is_empty() {
+                break;
+            }
+            let rows = self.lookup_or_create(listings, &pending).await?;
+
+            let mut unresolved = Vec::new();
+            for (ord, id) in rows {
+                let i = pending[(ord - 1) as usize];
+                match id {
+                    Some(id) => {
+                        found.insert(fingerprints[i].clone().unwrap_or_default(), id);
+                    }
+                    None => unresolved.push(i),
+                }
+            }
+            pending = unresolved;
+        }
+
+        if !pending.is_empty() {
+            anyhow::bail!("Failed to resolve {} listings to products", pending.len());
+        }
+
+        for (i, fingerprint) in fingerprints.iter().enumerate() {
+            if let Some(fingerprint) = fingerprint {
+                if resolved[i].is_none() {
+                    resolved[i] = found.get(fingerprint).copied();
+                }
+            }
+        }
+
+        let mut cache = self.cache.write().expect("resolver cache poisoned");
+        if cache.len() + found.len() > self.capacity {
+            cache.clear();
+        }
+        cache.extend(found);
+
+        Ok(resolved)
+    }
+
+    /// One round trip: look up fingerprints, insert missing products
+    ///
+    /// Returns (1-based position in `indices`, product id); id is None when
+    /// a concurrent transaction inserted the same fingerprint first.
+    async fn lookup_or_create(
+        &self,
+        listings: &[ScrapedListing],
+        indices: &[usize],
+    ) -> Result<Vec<(i64, Option<i64>)>> {
+        let names: Vec<&str> = indices.iter().map(|&i| listings[i].name.as_str()).collect();
+        let categories: Vec<Option<&str>> = indices
+            .iter()
+            .map(|&i| listings[i].category.as_deref())
+            .collect();
+        let specs: Vec<serde_json::Value> = indices.iter().map(|&i| listings[i].specs.to_json()).collect();
+
+        let rows = sqlx::query_as::<_, (i64, Option<i64>)>(
+            r#"
+            WITH input AS (
+                SELECT ord, name, category, specs, spec_fingerprint(specs, category) AS fingerprint
+                FROM UNNEST($1::text[], $2::text[], $3::jsonb[])
+                    WITH ORDINALITY AS i(name, category, specs, ord)
+            ),
+            inserted AS (
+                INSERT INTO products (name, category, specs)
+                SELECT DISTINCT ON (input.fingerprint) input.name, input.category, input.specs
+                FROM input
+                WHERE input.fingerprint IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM products p WHERE p.spec_fingerprint = input.fingerprint
+                  )
+                ORDER BY input.fingerprint, input.ord
+                ON CONFLICT (spec_fingerprint) WHERE spec_fingerprint IS NOT NULL DO NOTHING
+                RETURNING id, spec_fingerprint
+            )
+            SELECT input.ord, COALESCE(p.id, ins.id)
+            FROM input
+            LEFT JOIN products p ON p.spec_fingerprint = input.fingerprint
+            LEFT JOIN inserted ins ON ins.spec_fingerprint = input.fingerprint
+            WHERE input.fingerprint IS NOT NULL
+            "#,
+        )
+        .bind(&names)
+        .bind(&categories)
+        .bind(&specs)
+        .fetch_all(self.db.pool())
+        .await
+        .context("Failed to resolve products by fingerprint")?;
+
+        debug!(
+            "Resolved {} fingerprints ({} without product yet)",
+            rows.len(),
+            rows.iter().filter(|(_, id)| id.is_none()).count()
+        );
+
+        Ok(rows)
+    }
+}
+
 // ============================================================================
 // PRICE OPERATIONS
 // ============================================================================
@@ -194,12 +402,23 @@ impl Database {
     }
 
     /// Get best prices for product
+    ///
+    /// Served from `product_price_ranks` (migration 004): a primary-key
+    /// range scan instead of sorting all offers on every read.
     pub async fn get_best_prices(&self, product_id: i64, limit: i32) -> Result<Vec<StorePrice>> {
         let prices = sqlx::query_as::<_, StorePrice>(
             r#"
-            SELECT * FROM store_prices
-            WHERE product_id = $1 AND available = true
-            ORDER BY price ASC
+            SELECT
+                store_price_id AS id,
+                product_id,
+                store_id,
+                price,
+                url,
+                true AS available,
+                scraped_at
+            FROM product_price_ranks
+            WHERE product_id = $1
+            ORDER BY price_rank
             LIMIT $2
             "#,
         )
@@ -212,6 +431,19 @@ impl Database {
         Ok(prices)
     }
 
+    /// Get min/max/spread of current prices for product
+    pub async fn get_price_summary(&self, product_id: i64) -> Result<Option<PriceSummary>> {
+        let summary = sqlx::query_as::<_, PriceSummary>(
+            "SELECT * FROM product_price_summary WHERE product_id = $1",
+        )
+        .bind(product_id)
+        .fetch_optional(&self.pool)
+        .await
+        .context("Failed to fetch price summary")?;
+
+        Ok(summary)
+    }
+
     /// Get prices for product by store ID
     pub async fn get_product_price_by_store(
         &self,
@@ -328,12 +560,70 @@ impl Database {
     }
 }
 
+// ============================================================================
+// ALERT OPERATIONS
+// ============================================================================
+
+impl Database {
+    /// Evaluate trackings against prices recorded since the last run
+    ///
+    /// Call after each ingestion batch. One set-based query over the new
+    /// price_history rows (migration 005); returns
+    /// (price changes seen, notifications queued or improved).
+    pub async fn evaluate_tracking_alerts(&self) -> Result<(i64, i64)> {
+        let (changes, queued) =
+            sqlx::query_as::<_, (i64, i64)>("SELECT * FROM evaluate_tracking_alerts()")
+                .fetch_one(&self.pool)
+                .await
+                .context("Failed to evaluate tracking alerts")?;
+
+        if queued > 0 {
+            info!("Alerts: {} price changes, {} notifications queued", changes, queued);
+        }
+
+        Ok((changes, queued))
+    }
+
+    /// Get pending notifications (oldest first)
+    pub async fn get_pending_notifications(&self, limit: i32) -> Result<Vec<AlertNotification>> {
+        let notifications = sqlx::query_as::<_, AlertNotification>(
+            r#"
+            SELECT * FROM alert_notifications
+            WHERE sent_at IS NULL
+            ORDER BY created_at ASC
+            LIMIT $1
+            "#,
+        )
+        .bind(limit)
+        .fetch_all(&self.pool)
+        .await
+        .context("Failed to fetch pending notifications")?;
+
+        Ok(notifications)
+    }
+
+    /// Mark notifications as delivered
+    pub async fn mark_notifications_sent(&self, ids: &[i64]) -> Result<u64> {
+        let result = sqlx::query(
+            "UPDATE alert_notifications SET sent_at = NOW() WHERE id = ANY($1) AND sent_at IS NULL",
+        )
+        .bind(ids)
+        .execute(&self.pool)
+        .await
+        .context("Failed to mark notifications sent")?;
+
+        Ok(result.rows_affected())
+    }
+}
+
 // ============================================================================
 // SCRAPING JOB OPERATIONS
 // ============================================================================
 
 impl Database {
     /// Enqueue scraping job
+    ///
+    /// Listening workers are woken on commit (trigger from migration 008).
     pub async fn enqueue_scraping_job(
         &self,
         product_id: i64,
@@ -375,6 +665,86 @@ impl Database {
         Ok(jobs)
     }
 
+    /// Claim due pending jobs for this worker (status -> running)
+    ///
+    /// `FOR UPDATE SKIP LOCKED`: concurrent workers never claim the same job.
+    pub async fn claim_pending_jobs(&self, limit: i32) -> Result<Vec<ScrapingJob>> {
+        let jobs = sqlx::query_as::<_, ScrapingJob>(
+            r#"
+            WITH claimed AS (
+                UPDATE scraping_jobs
+                SET status = 'running',
+                    started_at = NOW()
+                WHERE id IN (
+                    SELECT id FROM scraping_jobs
+                    WHERE status = 'pending'
+                      AND scheduled_at <= NOW()
+                    ORDER BY priority DESC, scheduled_at ASC
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING *
+            )
+            SELECT * FROM claimed
+            ORDER BY priority DESC, scheduled_at ASC
+            "#,
+        )
+        .bind(limit)
+        .fetch_all(&self.pool)
+        .await
+        .context("Failed to claim pending jobs")?;
+
+        Ok(jobs)
+    }
+
+    /// Run a job worker loop (returns only on database error)
+    ///
+    /// Claims and handles jobs until the queue is empty, then blocks on
+    /// `LISTEN scraping_jobs` (migration 008). An idle worker issues one
+    /// query per `poll_fallback`; the fallback also picks up jobs whose
+    /// `scheduled_at` was in the future and notifications lost while the
+    /// listener reconnected.
+    pub async fn run_job_worker<F, Fut>(
+        &self,
+        batch_size: i32,
+        poll_fallback: Duration,
+        mut handler: F,
+    ) -> Result<()>
+    where
+        F: FnMut(ScrapingJob) -> Fut,
+        Fut: Future<Output = Result<serde_json::Value>>,
+    {
+        // LISTEN before the first claim: jobs enqueued while draining are
+        // buffered on the listener connection, not missed
+        let mut listener = JobListener::connect(self, poll_fallback).await?;
+
+        loop {
+            loop {
+                let jobs = self.claim_pending_jobs(batch_size).await?;
+                if jobs.is_empty() {
+                    break;
+                }
+
+                for job in jobs {
+                    let job_id = job.id;
+                    match handler(job).await {
+                        Ok(result) => {
+                            self.update_job_status(job_id, "completed", None, Some(&result))
+                                .await?
+                        }
+                        Err(e) => {
+                            warn!("Scraping job {} failed: {:#}", job_id, e);
+                            self.update_job_status(job_id, "failed", Some(&format!("{:#}", e)), None)
+                                .await?
+                        }
+                    }
+                }
+            }
+
+            listener.wait().await?;
+        }
+    }
+
     /// Update job status
     pub async fn update_job_status(
         &self,
@@ -404,3 +774,147 @@ impl Database {
         Ok(())
     }
 }
+
+/// Notification channel for new scraping jobs (migration 008)
+pub const SCRAPING_JOBS_CHANNEL: &str = "scraping_jobs";
+
+/// Default poll interval of an idle worker
+pub const DEFAULT_JOB_POLL_FALLBACK: Duration = Duration::from_secs(30);
+
+/// Blocks a worker until new scraping jobs are announced
+///
+/// Holds one dedicated connection in `LISTEN scraping_jobs`.
+pub struct JobListener {
+    listener: PgListener,
+    poll_fallback: Duration,
+}
+
+impl JobListener {
+    pub async fn connect(db: &Database, poll_fallback: Duration) -> Result<Self> {
+        let mut listener = PgListener::connect_with(db.pool())
+            .await
+            .context("Failed to open job listener connection")?;
+
+        listener
+            .listen(SCRAPING_JOBS_CHANNEL)
+            .await
+            .context("Failed to listen for scraping jobs")?;
+
+        Ok(Self {
+            listener,
+            poll_fallback,
+        })
+    }
+
+    /// Wait for a notification or the poll fallback
+    ///
+    /// Returns true when woken by a notification. Notifications already
+    /// buffered are drained, so a burst of enqueues is one wake-up.
+    pub async fn wait(&mut self) -> Result<bool> {
+        let notified = match tokio::time::timeout(self.poll_fallback, self.listener.try_recv()).await {
+            Ok(Ok(Some(_))) => true,
+            Ok(Ok(None)) => {
+                // Reconnects (and re-LISTENs) on the next call; notifications
+                // sent meanwhile are lost, so let the caller poll now
+                warn!("Job listener connection lost, reconnecting");
+                false
+            }
+            Ok(Err(e)) => return Err(e).context("Failed to receive job notification"),
+            Err(_) => false,
+        };
+
+        let mut coalesced = 0;
+        while self.listener.next_buffered().is_some() {
+            coalesced += 1;
+        }
+
+        if coalesced > 0 {
+            debug!("Coalesced {} job notifications", coalesced);
+        }
+
+        Ok(notified)
+    }
+}
+
+// ============================================================================
+// MAINTENANCE OPERATIONS
+// ============================================================================
+
+impl Database {
+    /// Create upcoming price_history partitions and drop expired ones
+    ///
+    /// Wraps `price_history_maintenance()` from migration 003. Returns
+    /// (partitions created, partitions dropped).
+    pub async fn run_price_history_maintenance(
+        &self,
+        months_ahead: i32,
+        keep_months: i32,
+    ) -> Result<(i32, i32)> {
+        let (created, dropped) = sqlx::query_as::<_, (i32, i32)>(
+            "SELECT * FROM price_history_maintenance($1, $2)",
+        )
+        .bind(months_ahead)
+        .bind(keep_months)
+        .fetch_one(&self.pool)
+        .await
+        .context("Failed to run price_history maintenance")?;
+
+        if created > 0 || dropped > 0 {
+            info!(
+                "price_history partitions: {} created, {} dropped",
+                created, dropped
+            );
+        }
+
+        Ok((created, dropped))
+    }
+
+    /// Recompute learned price bounds touched by new price_history rows
+    ///
+    /// Wraps `refresh_price_bounds()` from migration 009. Returns the number
+    /// of bounds rows written; scrapers pick them up via
+    /// `scripts/price_bounds.py refresh`.
+    pub async fn refresh_price_bounds(&self) -> Result<i32> {
+        let updated = sqlx::query_scalar::<_, i32>("SELECT refresh_price_bounds()")
+            .fetch_one(&self.pool)
+            .await
+            .context("Failed to refresh price bounds")?;
+
+        if updated > 0 {
+            info!("Price bounds updated: {}", updated);
+        }
+
+        Ok(updated)
+    }
+
+    /// Compare best-price tables with the live computation
+    ///
+    /// Returns the number of inconsistent rows (0 = consistent). Details are
+    /// available via `SELECT * FROM check_best_prices()`.
+    pub async fn check_best_prices_consistency(&self) -> Result<i64> {
+        let mismatches = sqlx::query_scalar::<_, i64>("SELECT COUNT(*) FROM check_best_prices()")
+            .fetch_one(&self.pool)
+            .await
+            .context("Failed to check best prices")?;
+
+        if mismatches > 0 {
+            warn!("Best price tables inconsistent: {} rows", mismatches);
+        }
+
+        Ok(mismatches)
+    }
+
+    /// Rebuild best-price tables from store_prices
+    ///
+    /// Returns the number of products refreshed.
+    pub async fn rebuild_best_prices(&self) -> Result<i32> {
+        let products = sqlx::query_scalar::<_, i32>("SELECT rebuild_best_prices()")
+            .fetch_one(&self.pool)
+            .await
+            .context("Failed to rebuild best prices")?;
+
+        info!("Best prices rebuilt for {} products", products);
+
+        Ok(products)
+    }
+}
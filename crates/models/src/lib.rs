@@ -95,6 +95,12 @@ pub struct ProductSpecs {
     pub warranty: Option<String>,
     #[serde(skip_serializing_if = "Option::is_none")]
     pub year: Option<i32>,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    pub brand: Option<String>,
+    /// Model line ("MacBook Air", "MacBook Pro"): same cpu/ram/ssd/screen
+    /// exist in several lines
+    #[serde(skip_serializing_if = "Option::is_none")]
+    pub model: Option<String>,
 }
 
 impl ProductSpecs {
@@ -105,6 +111,113 @@ impl ProductSpecs {
     pub fn from_json(value: &serde_json::Value) -> Option<Self> {
         serde_json::from_value(value.clone()).ok()
     }
+
+    /// Canonical spec fingerprint used to match listings to catalog products
+    ///
+    /// Format: `cpu=m1pro;ram=32;ssd=512;screen=16;model=macbookpro[;color=..][;cond=..][;brand=..][;cat=..][;art=Z14V0008D]`.
+    /// Must stay in sync with `spec_fingerprint(jsonb, text)` (migration 007).
+    /// Returns None unless model, cpu, ram and ssd are all known, or an article is.
+    pub fn fingerprint(&self, category: Option<&str>) -> Option<String> {
+        let cpu = self
+            .cpu
+            .as_deref()
+            .map(|cpu| {
+                cpu.to_lowercase()
+                    .replace("apple", "")
+                    .chars()
+                    .filter(|c| c.is_ascii_lowercase() || c.is_ascii_digit())
+                    .collect::<String>()
+            })
+            .unwrap_or_default();
+        let ram = self.ram.map(|ram| ram.to_string()).unwrap_or_default();
+        let ssd = self
+            .ssd
+            .map(|ssd| {
+                // 1024 GB and 1000 GB are the same "1 TB" drive
+                if ssd >= 1024 && ssd % 1024 == 0 {
+                    (ssd / 1024 * 1000).to_string()
+                } else {
+                    ssd.to_string()
+                }
+            })
+            .unwrap_or_default();
+        // "16.2" and "16" are the same screen class
+        let screen = self
+            .screen
+            .as_deref()
+            .map(|screen| screen.chars().take_while(|c| c.is_ascii_digit()).collect::<String>())
+            .unwrap_or_default();
+        // "Apple MacBook Air" -> macbookair
+        let model = self
+            .model
+            .as_deref()
+            .map(|model| {
+                model
+                    .to_lowercase()
+                    .replace("apple", "")
+                    .chars()
+                    .filter(|c| c.is_alphanumeric())
+                    .collect::<String>()
+            })
+            .unwrap_or_default();
+        let article = self
+            .article
+            .as_deref()
+            .map(|article| {
+                article
+                    .chars()
+                    .filter(|c| c.is_ascii_alphanumeric())
+                    .collect::<String>()
+                    .to_uppercase()
+            })
+            .unwrap_or_default();
+
+        // Screen alone (or cpu without ram/ssd/model line) does not identify a product
+        if article.is_empty()
+            && (cpu.is_empty() || ram.is_empty() || ssd.is_empty() || model.is_empty())
+        {
+            return None;
+        }
+
+        let mut fingerprint = format!(
+            "cpu={};ram={};ssd={};screen={};model={}",
+            cpu, ram, ssd, screen, model
+        );
+        let optional = [
+            ("color", normalize_label(self.color.as_deref())),
+            ("cond", normalize_label(self.condition.as_deref())),
+            ("brand", normalize_label(self.brand.as_deref())),
+            ("cat", normalize_label(category)),
+            ("art", article),
+        ];
+        for (key, value) in optional {
+            if !value.is_empty() {
+                fingerprint.push_str(&format!(";{}={}", key, value));
+            }
+        }
+        Some(fingerprint)
+    }
+}
+
+/// Lower-case alphanumerics of a free-text spec ("Space Gray" -> spacegray)
+fn normalize_label(value: Option<&str>) -> String {
+    value
+        .map(|value| {
+            value
+                .to_lowercase()
+                .chars()
+                .filter(|c| c.is_alphanumeric())
+                .collect::<String>()
+        })
+        .unwrap_or_default()
+}
+
+/// Scraped listing to be matched to a catalog product
+#[derive(Debug, Clone, Serialize, Deserialize)]
+pub struct ScrapedListing {
+    pub name: String,
+    pub category: Option<String>,
+    pub specs: ProductSpecs,
 }
 
 // ============================================================================
@@ -134,6 +247,18 @@ impl StorePrice {
     }
 }
 
+/// Current price range of a product across stores (available offers only)
+#[derive(Debug, Clone, FromRow, Serialize, Deserialize)]
+pub struct PriceSummary {
+    pub product_id: i64,
+    pub min_price: i32, // kopecks
+    pub max_price: i32, // kopecks
+    pub price_spread: i32,
+    pub available_stores: i32,
+    pub best_store_id: i32,
+    pub updated_at: DateTime<Utc>,
+}
+
 #[derive(Debug, Clone, FromRow, Serialize, Deserialize)]
 pub struct PriceHistory {
     pub id: i64,
@@ -157,6 +282,21 @@ pub struct Tracking {
     pub created_at: DateTime<Utc>,
 }
 
+/// Queued price alert (pending while `sent_at` is None)
+#[derive(Debug, Clone, FromRow, Serialize, Deserialize)]
+pub struct AlertNotification {
+    pub id: i64,
+    pub tracking_id: i64,
+    pub user_id: i64,
+    pub product_id: i64,
+    pub store_id: i32,
+    pub price: i32,        // kopecks
+    pub target_price: i32, // kopecks
+    pub history_id: i64,
+    pub created_at: DateTime<Utc>,
+    pub sent_at: Option<DateTime<Utc>>,
+}
+
 // ============================================================================
 // SCRAPING JOB MODELS
 // ============================================================================
@@ -253,6 +393,8 @@ mod tests {
             condition: None,
             warranty: None,
             year: None,
+            brand: None,
+            model: None,
         };
 
         let json = specs.to_json();
@@ -262,6 +404,115 @@ mod tests {
         assert_eq!(restored.ram, Some(32));
     }
 
+    #[test]
+    fn test_spec_fingerprint() {
+        let specs = ProductSpecs {
+            screen: Some("16.2".to_string()),
+            cpu: Some("Apple M1 Pro".to_string()),
+            ram: Some(32),
+            ssd: Some(1024),
+            article: None,
+            color: None,
+            condition: None,
+            warranty: None,
+            year: None,
+            brand: None,
+            model: Some("MacBook Pro".to_string()),
+        };
+        assert_eq!(
+            specs.fingerprint(None),
+            Some("cpu=m1pro;ram=32;ssd=1000;screen=16;model=macbookpro".to_string())
+        );
+
+        // Same configuration from another store naming
+        let other = ProductSpecs {
+            screen: Some("16".to_string()),
+            cpu: Some("M1 PRO".to_string()),
+            ssd: Some(1000),
+            model: Some("Apple MacBook Pro".to_string()),
+            ..specs.clone()
+        };
+        assert_eq!(specs.fingerprint(None), other.fingerprint(None));
+
+        // Same configuration in another model line is another product
+        let air = ProductSpecs {
+            model: Some("MacBook Air".to_string()),
+            ..specs.clone()
+        };
+        assert_ne!(
+            air.fingerprint(Some("laptops")),
+            specs.fingerprint(Some("laptops"))
+        );
+
+        // Without the model line the configuration is ambiguous
+        let no_model = ProductSpecs {
+            model: None,
+            ..specs.clone()
+        };
+        assert_eq!(no_model.fingerprint(Some("laptops")), None);
+
+        let with_article = ProductSpecs {
+            article: Some("z14v-0008d".to_string()),
+            ..specs.clone()
+        };
+        assert_eq!(
+            with_article.fingerprint(None),
+            Some("cpu=m1pro;ram=32;ssd=1000;screen=16;model=macbookpro;art=Z14V0008D".to_string())
+        );
+
+        // Color, condition, brand and category separate otherwise equal specs
+        let used = ProductSpecs {
+            color: Some("Space Gray".to_string()),
+            condition: Some("Used".to_string()),
+            brand: Some("Apple".to_string()),
+            ..specs.clone()
+        };
+        assert_eq!(
+            used.fingerprint(Some("laptops")),
+            Some(
+                "cpu=m1pro;ram=32;ssd=1000;screen=16;model=macbookpro;color=spacegray;cond=used;brand=apple;cat=laptops"
+                    .to_string()
+            )
+        );
+        assert_ne!(used.fingerprint(None), specs.fingerprint(None));
+
+        // Screen + cpu alone are not enough to identify a product
+        let partial = ProductSpecs {
+            ram: None,
+            ..specs.clone()
+        };
+        assert_eq!(partial.fingerprint(Some("laptops")), None);
+
+        let article_only = ProductSpecs {
+            screen: None,
+            cpu: None,
+            ram: None,
+            ssd: None,
+            article: Some("MK193".to_string()),
+            model: None,
+            ..specs.clone()
+        };
+        assert_eq!(
+            article_only.fingerprint(None),
+            Some("cpu=;ram=;ssd=;screen=;model=;art=MK193".to_string())
+        );
+
+        let empty = ProductSpecs {
+            screen: None,
+            cpu: None,
+            ram: None,
+            ssd: None,
+            article: None,
+            color: Some("Silver".to_string()),
+            condition: None,
+            warranty: None,
+            year: None,
+            brand: None,
+            model: None,
+        };
+        assert_eq!(empty.fingerprint(None), None);
+    }
+
     #[test]
     fn test_job_status() {
         assert_eq!(JobStatus::Pending.as_str(), "pending");
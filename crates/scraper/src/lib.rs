@@ -1,8 +1,11 @@
 //! Price Scout Scraper Orchestration
 //!
 //! Manages Python scrapers and job queue.
-//! Python bridge to be implemented in PS-23.
+//! Python bridge (PS-23) runs single stores; the orchestrator fans a product
+//! out to many stores concurrently.
 
+pub mod orchestrator;
 pub mod python_bridge;
 
+pub use orchestrator::*;
 pub use python_bridge::*;
@@ -0,0 +1,309 @@
+//! Scraper Orchestrator
+//!
+//! Concurrent fan-out of Python bridge calls across stores.
+//!
+//! One product is scraped in several stores at once: every store runs in its
+//! own subprocess, the number of live subprocesses is bounded by a semaphore,
+//! and each store has its own deadline. Results are delivered as soon as a
+//! store finishes, so callers can show fast stores while slow Firefox-based
+//! ones are still running. Timed-out or cancelled stores have their
+//! subprocess group killed and reaped.
+
+use crate::python_bridge::{
+    get_scraper_script_path, parse_response, run_bridge_process, scraper_command, wait_cancelled,
+    BridgeError, PYTHON_BIN,
+};
+use anyhow::Result;
+use price_scout_models::ScraperResponse;
+use std::collections::HashMap;
+use std::path::PathBuf;
+use std::sync::Arc;
+use std::time::{Duration, Instant};
+use tokio::sync::{mpsc, watch, Semaphore};
+use tracing::{debug, info, warn};
+
+/// Default number of concurrently running scraper subprocesses
+const DEFAULT_MAX_CONCURRENCY: usize = 3;
+
+/// Default per-store deadline
+const DEFAULT_STORE_TIMEOUT_SECS: u64 = 120; // 2 minutes
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+/// Orchestrator configuration
+#[derive(Debug, Clone)]
+pub struct OrchestratorConfig {
+    /// Maximum number of scraper subprocesses running at the same time
+    pub max_concurrency: usize,
+    /// Deadline for stores without an explicit override
+    pub default_timeout: Duration,
+    /// Per-store deadline overrides (e.g. longer for Firefox-based stores)
+    pub store_timeouts: HashMap<String, Duration>,
+    /// Python interpreter
+    pub python: String,
+    /// Scraper script (None = locate scripts/test_scrapers.py)
+    pub script: Option<PathBuf>,
+    /// Extra environment variables for every scraper subprocess
+    pub env: Vec<(String, String)>,
+}
+
+impl Default for OrchestratorConfig {
+    fn default() -> Self {
+        Self {
+            max_concurrency: DEFAULT_MAX_CONCURRENCY,
+            default_timeout: Duration::from_secs(DEFAULT_STORE_TIMEOUT_SECS),
+            store_timeouts: HashMap::new(),
+            python: PYTHON_BIN.to_string(),
+            script: None,
+            env: Vec::new(),
+        }
+    }
+}
+
+impl OrchestratorConfig {
+    /// Set deadline for one store
+    pub fn with_store_timeout(mut self, store: &str, timeout: Duration) -> Self {
+        self.store_timeouts.insert(store.to_string(), timeout);
+        self
+    }
+
+    /// Set an environment variable for scraper subprocesses only
+    ///
+    /// Unlike `std::env::set_var`, this does not touch the parent process,
+    /// so concurrent fan-outs can use different values.
+    pub fn with_env(mut self, key: &str, value: impl Into<String>) -> Self {
+        self.env.push((key.to_string(), value.into()));
+        self
+    }
+
+    /// Deadline for a store
+    pub fn timeout_for(&self, store: &str) -> Duration {
+        self.store_timeouts
+            .get(store)
+            .copied()
+            .unwrap_or(self.default_timeout)
+    }
+}
+
+// ============================================================================
+// RESULTS
+// ============================================================================
+
+/// Result of one store in a fan-out
+#[derive(Debug)]
+pub struct StoreOutcome {
+    pub store: String,
+    pub elapsed: Duration,
+    pub result: std::result::Result<ScraperResponse, BridgeError>,
+}
+
+impl StoreOutcome {
+    /// True if the store produced a response (PASS or FAIL reported by Python)
+    pub fn is_ok(&self) -> bool {
+        self.result.is_ok()
+    }
+}
+
+/// Handle to a running fan-out
+///
+/// Outcomes arrive in completion order. Dropping the handle cancels all
+/// stores that are still queued or running.
+pub struct FanOut {
+    rx: mpsc::Receiver<StoreOutcome>,
+    cancel: watch::Sender<bool>,
+    pending: usize,
+}
+
+impl FanOut {
+    /// Next finished store (None when all stores have reported)
+    pub async fn next(&mut self) -> Option<StoreOutcome> {
+        let outcome = self.rx.recv().await;
+        if outcome.is_some() {
+            self.pending -= 1;
+        }
+        outcome
+    }
+
+    /// Number of stores that have not reported yet
+    pub fn pending(&self) -> usize {
+        self.pending
+    }
+
+    /// Cancel all queued and running stores
+    ///
+    /// Running subprocesses are killed; every store still reports an outcome
+    /// (`BridgeError::Cancelled`), so `next()` keeps working until the end.
+    pub fn cancel(&self) {
+        self.cancel.send_replace(true);
+    }
+
+    /// Wait for all stores and return outcomes in completion order
+    pub async fn collect(mut self) -> Vec<StoreOutcome> {
+        let mut outcomes = Vec::with_capacity(self.pending);
+        while let Some(outcome) = self.next().await {
+            outcomes.push(outcome);
+        }
+        outcomes
+    }
+}
+
+// ============================================================================
+// ORCHESTRATOR
+// ============================================================================
+
+/// Runs bridge calls for many stores concurrently
+///
+/// The semaphore is shared by every fan-out started from the same
+/// orchestrator, so `max_concurrency` is a global cap on live browsers.
+///
+/// # Example
+/// ```no_run
+/// use price_scout_scraper::{Orchestrator, OrchestratorConfig};
+/// use std::time::Duration;
+///
+/// #[tokio::main]
+/// async fn main() -> anyhow::Result<()> {
+///     let config = OrchestratorConfig::default()
+///         .with_store_timeout("dns", Duration::from_secs(180));
+///     let orchestrator = Orchestrator::new(config);
+///
+///     let stores = ["i-ray", "kns", "nix", "dns"];
+///     let mut fan_out = orchestrator.fan_out("MacBook Pro 16", &stores)?;
+///
+///     while let Some(outcome) = fan_out.next().await {
+///         match outcome.result {
+///             Ok(response) => println!("{}: {:?}", outcome.store, response.price),
+///             Err(e) => println!("{}: {}", outcome.store, e),
+///         }
+///     }
+///     Ok(())
+/// }
+/// ```
+#[derive(Clone)]
+pub struct Orchestrator {
+    config: Arc<OrchestratorConfig>,
+    semaphore: Arc<Semaphore>,
+}
+
+impl Orchestrator {
+    pub fn new(config: OrchestratorConfig) -> Self {
+        let permits = config.max_concurrency.max(1);
+        Self {
+            config: Arc::new(config),
+            semaphore: Arc::new(Semaphore::new(permits)),
+        }
+    }
+
+    /// Start scraping `query` in every store
+    ///
+    /// Each store subprocess gets `--store=<name> --query=<query>`; an empty
+    /// query keeps test_scrapers.py's default search.
+    pub fn fan_out<S: AsRef<str>>(&self, query: &str, stores: &[S]) -> Result<FanOut> {
+        let script = match &self.config.script {
+            Some(script) => script.clone(),
+            None => get_scraper_script_path()?,
+        };
+
+        info!(
+            "Fan-out: query={:?}, stores={}, max_concurrency={}",
+            query,
+            stores.len(),
+            self.config.max_concurrency
+        );
+
+        // Capacity = number of stores, so workers never block on send
+        let (tx, rx) = mpsc::channel(stores.len().max(1));
+        let (cancel_tx, cancel_rx) = watch::channel(false);
+        let query: Arc<str> = Arc::from(query);
+
+        for store in stores {
+            let store = store.as_ref().to_string();
+            let task = StoreTask {
+                config: Arc::clone(&self.config),
+                semaphore: Arc::clone(&self.semaphore),
+                script: script.clone(),
+                query: Arc::clone(&query),
+                cancel: cancel_rx.clone(),
+            };
+            let tx = tx.clone();
+
+            tokio::spawn(async move {
+                let outcome = task.run(store).await;
+                let _ = tx.send(outcome).await;
+            });
+        }
+
+        Ok(FanOut {
+            rx,
+            cancel: cancel_tx,
+            pending: stores.len(),
+        })
+    }
+}
+
+/// Everything a worker needs to run one store
+struct StoreTask {
+    config: Arc<OrchestratorConfig>,
+    semaphore: Arc<Semaphore>,
+    script: PathBuf,
+    query: Arc<str>,
+    cancel: watch::Receiver<bool>,
+}
+
+impl StoreTask {
+    async fn run(self, store: String) -> StoreOutcome {
+        let started = Instant::now();
+        let result = self.scrape(&store).await;
+        let elapsed = started.elapsed();
+
+        match &result {
+            Ok(response) => debug!(
+                "Store {} finished: status={}, price={:?} ({:.1}s)",
+                store,
+                response.status,
+                response.price,
+                elapsed.as_secs_f64()
+            ),
+            Err(e) => warn!("Store {} failed: {} ({:.1}s)", store, e, elapsed.as_secs_f64()),
+        }
+
+        StoreOutcome {
+            store,
+            elapsed,
+            result,
+        }
+    }
+
+    async fn scrape(&self, store: &str) -> std::result::Result<ScraperResponse, BridgeError> {
+        // Queue for a slot; cancellation also applies while waiting
+        let _permit = tokio::select! {
+            permit = Arc::clone(&self.semaphore).acquire_owned() => {
+                permit.map_err(|_| BridgeError::Cancelled)?
+            }
+            _ = wait_cancelled(Some(self.cancel.clone())) => {
+                return Err(BridgeError::Cancelled);
+            }
+        };
+
+        // The deadline covers the subprocess only, not time spent queued
+        let deadline = self.config.timeout_for(store);
+        let mut cmd = scraper_command(&self.config.python, &self.script, store, &self.query);
+        cmd.envs(self.config.env.iter().cloned());
+
+        let output = run_bridge_process(cmd, deadline, Some(self.cancel.clone())).await?;
+
+        // test_scrapers.py exits 1 when a store FAILs but still prints its
+        // JSON, so stdout is authoritative whenever it parses
+        match parse_response(&output.stdout) {
+            Ok(response) => Ok(response),
+            Err(e) => Err(BridgeError::Failed(format!(
+                "Python scraper exited with code {:?}: {:#} {}",
+                output.status.code(),
+                e,
+                output.stderr
+            ))),
+        }
+    }
+}
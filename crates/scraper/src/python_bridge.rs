@@ -5,23 +5,40 @@
 //! This module provides the bridge between Rust and Python scrapers.
 //! Python scrapers are called via subprocess with --json flag, and results
 //! are parsed from stdout.
+//!
+//! Multi-store runs can use --stream mode instead: Python prints one JSON
+//! line per store as soon as it is ready, and the bridge forwards each line
+//! through a bounded channel (see `run_python_scraper_stream`).
 
 use anyhow::{Context, Result};
 use price_scout_models::{ScraperRequest, ScraperResponse};
 use serde_json;
-use std::path::PathBuf;
+use std::path::{Path, PathBuf};
 use std::process::Stdio;
 use std::time::Duration;
-use tokio::io::AsyncReadExt;
-use tokio::process::Command;
+use tokio::io::{AsyncBufRead, AsyncBufReadExt, AsyncRead, AsyncReadExt, BufReader};
+use tokio::process::{Child, Command};
+use tokio::sync::{mpsc, watch};
 use tokio::time::timeout;
 use tracing::{debug, info, warn};
 
 /// Default timeout for scraper subprocess
 const DEFAULT_TIMEOUT_SECS: u64 = 120; // 2 minutes
 
+/// Default timeout for a streamed multi-store run (Firefox stores take ~90s each)
+const DEFAULT_STREAM_TIMEOUT_SECS: u64 = 900; // 15 minutes
+
+/// Number of parsed results buffered before the reader stops draining stdout
+const STREAM_CHANNEL_CAPACITY: usize = 16;
+
+/// Maximum accepted size of one NDJSON line
+const MAX_STREAM_LINE_BYTES: usize = 64 * 1024;
+
+/// Maximum stderr tail kept for error messages
+const MAX_STDERR_BYTES: usize = 4 * 1024;
+
 /// Get path to test_scrapers.py script
-fn get_scraper_script_path() -> Result<PathBuf> {
+pub(crate) fn get_scraper_script_path() -> Result<PathBuf> {
     // Try to find test_scrapers.py in project structure
     let current_dir = std::env::current_dir()?;
 
@@ -81,108 +98,548 @@ fn get_scraper_script_path() -> Result<PathBuf> {
 /// }
 /// ```
 pub async fn run_python_scraper(request: ScraperRequest) -> Result<ScraperResponse> {
+    run_python_scraper_with_timeout(request, DEFAULT_TIMEOUT_SECS).await
+}
+
+/// Run Python scraper with custom timeout
+///
+/// When the timeout expires the subprocess (and its process group) is
+/// killed and reaped before the error is returned.
+pub async fn run_python_scraper_with_timeout(
+    request: ScraperRequest,
+    timeout_secs: u64,
+) -> Result<ScraperResponse> {
     info!(
-        "Running Python scraper: store={}, method={}",
-        request.store, request.method
+        "Running Python scraper: store={}, query={:?}, method={}",
+        request.store, request.query, request.method
     );
 
     // Get script path
     let script_path = get_scraper_script_path()?;
 
     // Build command
-    let mut cmd = Command::new("python3");
-    cmd.arg(&script_path)
-        .arg("--json")
-        .arg(format!("--store={}", request.store))
-        .stdout(Stdio::piped())
-        .stderr(Stdio::piped());
+    let cmd = scraper_command(PYTHON_BIN, &script_path, &request.store, &request.query);
 
     debug!("Executing command: {:?}", cmd);
 
-    // Spawn subprocess
-    let mut child = cmd
-        .spawn()
-        .context("Failed to spawn Python subprocess")?;
+    let output = run_bridge_process(cmd, Duration::from_secs(timeout_secs), None).await?;
 
-    // Wait for completion with timeout
-    let timeout_duration = Duration::from_secs(DEFAULT_TIMEOUT_SECS);
+    if !output.status.success() {
+        warn!("Python scraper failed: {}", output.stderr);
 
-    let result = timeout(timeout_duration, async {
-        let status = child
-            .wait()
-            .await
-            .context("Failed to wait for subprocess")?;
-
-        if !status.success() {
-            // Read stderr for error details
-            let mut stderr = Vec::new();
-            if let Some(mut stderr_handle) = child.stderr.take() {
-                stderr_handle
-                    .read_to_end(&mut stderr)
-                    .await
-                    .context("Failed to read stderr")?;
-            }
+        anyhow::bail!(
+            "Python scraper exited with code {:?}: {}",
+            output.status.code(),
+            output.stderr
+        );
+    }
 
-            let error_msg = String::from_utf8_lossy(&stderr);
-            warn!("Python scraper failed: {}", error_msg);
+    let response = parse_response(&output.stdout)?;
 
-            anyhow::bail!(
-                "Python scraper exited with code {:?}: {}",
-                status.code(),
-                error_msg
-            );
+    info!(
+        "Python scraper completed: status={}, price={:?}",
+        response.status, response.price
+    );
+
+    Ok(response)
+}
+
+// ============================================================================
+// SUBPROCESS HANDLING
+// ============================================================================
+
+/// Python interpreter used for the bridge
+pub(crate) const PYTHON_BIN: &str = "python3";
+
+/// Maximum stdout accepted from a single-store run
+const MAX_OUTPUT_BYTES: u64 = 1024 * 1024;
+
+/// Grace period for pipe readers after the child has exited
+const PIPE_DRAIN_GRACE: Duration = Duration::from_secs(5);
+
+/// Bridge subprocess errors
+#[derive(Debug, thiserror::Error)]
+pub enum BridgeError {
+    #[error("Failed to run Python subprocess: {0}")]
+    Io(#[from] std::io::Error),
+
+    #[error("Python scraper timeout after {0:?}")]
+    Timeout(Duration),
+
+    #[error("Python scraper cancelled")]
+    Cancelled,
+
+    #[error("{0}")]
+    Failed(String),
+}
+
+/// Collected output of a finished bridge subprocess
+#[derive(Debug)]
+pub(crate) struct ProcessOutput {
+    pub status: std::process::ExitStatus,
+    pub stdout: Vec<u8>,
+    pub stderr: String,
+}
+
+/// Build `python3 test_scrapers.py --json --store=<store> [--query=<query>]`
+///
+/// An empty query keeps the script's default search.
+pub(crate) fn scraper_command(
+    python: &str,
+    script_path: &Path,
+    store: &str,
+    query: &str,
+) -> Command {
+    let mut cmd = Command::new(python);
+    cmd.arg(script_path)
+        .arg("--json")
+        .arg(format!("--store={}", store));
+    if !query.is_empty() {
+        cmd.arg(format!("--query={}", query));
+    }
+    cmd
+}
+
+/// Run a bridge subprocess to completion, deadline or cancellation
+///
+/// stdout and stderr are drained concurrently with `wait()`, so a large
+/// output can never deadlock on a full pipe. On timeout or cancellation the
+/// whole process group is killed and the child is reaped before returning.
+pub(crate) async fn run_bridge_process(
+    mut cmd: Command,
+    deadline: Duration,
+    cancel: Option<watch::Receiver<bool>>,
+) -> std::result::Result<ProcessOutput, BridgeError> {
+    cmd.stdin(Stdio::null())
+        .stdout(Stdio::piped())
+        .stderr(Stdio::piped())
+        .kill_on_drop(true);
+
+    // Own process group, so Firefox/xvfb helpers die together with Python
+    #[cfg(unix)]
+    cmd.process_group(0);
+
+    let mut child = cmd.spawn()?;
+
+    let stdout = child.stdout.take();
+    let stderr = child.stderr.take();
+
+    let stdout_task = tokio::spawn(async move {
+        let mut buf = Vec::new();
+        if let Some(handle) = stdout {
+            let _ = handle.take(MAX_OUTPUT_BYTES).read_to_end(&mut buf).await;
         }
+        buf
+    });
+    let stderr_task = tokio::spawn(async move {
+        match stderr {
+            Some(handle) => read_tail(handle, MAX_STDERR_BYTES).await,
+            None => String::new(),
+        }
+    });
 
-        // Read stdout
-        let mut stdout = Vec::new();
-        if let Some(mut stdout_handle) = child.stdout.take() {
-            stdout_handle
-                .read_to_end(&mut stdout)
-                .await
-                .context("Failed to read stdout")?;
-        } else {
-            anyhow::bail!("Could not capture stdout from Python subprocess");
+    let exit = tokio::select! {
+        status = child.wait() => Ok(status),
+        _ = tokio::time::sleep(deadline) => Err(BridgeError::Timeout(deadline)),
+        _ = wait_cancelled(cancel) => Err(BridgeError::Cancelled),
+    };
+
+    let status = match exit {
+        Ok(status) => status?,
+        Err(e) => {
+            terminate(&mut child).await;
+            stdout_task.abort();
+            stderr_task.abort();
+            return Err(e);
         }
+    };
 
-        Ok::<Vec<u8>, anyhow::Error>(stdout)
+    let stdout = timeout(PIPE_DRAIN_GRACE, stdout_task)
+        .await
+        .ok()
+        .and_then(|r| r.ok())
+        .unwrap_or_default();
+    let stderr = timeout(PIPE_DRAIN_GRACE, stderr_task)
+        .await
+        .ok()
+        .and_then(|r| r.ok())
+        .unwrap_or_default();
+
+    Ok(ProcessOutput {
+        status,
+        stdout,
+        stderr,
     })
-    .await
-    .context("Python scraper timeout")?;
+}
+
+/// Kill the child's process group and reap the child
+async fn terminate(child: &mut Child) {
+    #[cfg(unix)]
+    if let Some(pid) = child.id() {
+        // Negative pid addresses the whole process group
+        unsafe {
+            libc::kill(-(pid as i32), libc::SIGKILL);
+        }
+    }
+
+    // kill() = SIGKILL + wait(), so no zombie is left behind
+    if let Err(e) = child.kill().await {
+        warn!("Failed to kill Python subprocess: {}", e);
+    }
+}
+
+/// Resolve when cancellation is requested or the cancelling side is gone
+pub(crate) async fn wait_cancelled(cancel: Option<watch::Receiver<bool>>) {
+    let Some(mut cancel) = cancel else {
+        return std::future::pending().await;
+    };
 
-    let stdout = result?;
+    loop {
+        if *cancel.borrow_and_update() {
+            return;
+        }
+        if cancel.changed().await.is_err() {
+            return;
+        }
+    }
+}
+
+/// Parse a single JSON object printed by `--json` mode
+pub(crate) fn parse_response(stdout: &[u8]) -> Result<ScraperResponse> {
     let stdout_str =
-        String::from_utf8(stdout).context("Python output is not valid UTF-8")?;
+        std::str::from_utf8(stdout).context("Python output is not valid UTF-8")?;
 
     debug!("Python scraper output: {}", stdout_str);
 
-    // Parse JSON response
-    let response: ScraperResponse = serde_json::from_str(&stdout_str)
-        .context(format!("Failed to parse JSON response: {}", stdout_str))?;
+    serde_json::from_str(stdout_str)
+        .context(format!("Failed to parse JSON response: {}", stdout_str))
+}
+
+// ============================================================================
+// STREAMING (NDJSON) MODE
+// ============================================================================
+
+/// Options for a streamed multi-store run
+#[derive(Debug, Clone)]
+pub struct StreamOptions {
+    /// Only run this store (None = all stores)
+    pub store: Option<String>,
+    /// Search query (None = the script's default search)
+    pub query: Option<String>,
+    /// Skip Firefox-based stores (--quick)
+    pub quick: bool,
+    /// Skip unstable stores (--skip-unstable)
+    pub skip_unstable: bool,
+    /// Deadline for the whole run; the subprocess is killed when it expires
+    pub timeout: Duration,
+    /// Number of results buffered in the channel
+    pub buffer: usize,
+}
 
+impl Default for StreamOptions {
+    fn default() -> Self {
+        Self {
+            store: None,
+            query: None,
+            quick: false,
+            skip_unstable: false,
+            timeout: Duration::from_secs(DEFAULT_STREAM_TIMEOUT_SECS),
+            buffer: STREAM_CHANNEL_CAPACITY,
+        }
+    }
+}
+
+/// Run Python scraper in --stream mode and receive results as they arrive
+///
+/// Each store result is sent through the returned channel the moment its
+/// NDJSON line is read, so fast stores are available in seconds instead of
+/// after the slowest Firefox-based store. The channel is bounded: when the
+/// consumer falls behind, the reader stops draining stdout and Python blocks
+/// on its next write.
+///
+/// Dropping the receiver kills the subprocess. Malformed or oversized lines
+/// are reported as `Err` items and do not stop the stream.
+///
+/// # Example
+/// ```no_run
+/// use price_scout_scraper::{run_python_scraper_stream, StreamOptions};
+///
+/// #[tokio::main]
+/// async fn main() -> anyhow::Result<()> {
+///     let options = StreamOptions {
+///         quick: true,
+///         ..Default::default()
+///     };
+///
+///     let mut results = run_python_scraper_stream(options).await?;
+///     while let Some(result) = results.recv().await {
+///         let response = result?;
+///         println!("{}: {:?}", response.store, response.price);
+///     }
+///     Ok(())
+/// }
+/// ```
+pub async fn run_python_scraper_stream(
+    options: StreamOptions,
+) -> Result<mpsc::Receiver<Result<ScraperResponse>>> {
     info!(
-        "Python scraper completed: status={}, price={:?}",
-        response.status, response.price
+        "Running Python scraper (stream): store={:?}, quick={}",
+        options.store, options.quick
     );
 
-    Ok(response)
+    let script_path = get_scraper_script_path()?;
+
+    let mut cmd = Command::new(PYTHON_BIN);
+    cmd.arg(&script_path).arg("--stream");
+    if let Some(store) = &options.store {
+        cmd.arg(format!("--store={}", store));
+    }
+    if let Some(query) = options.query.as_deref().filter(|q| !q.is_empty()) {
+        cmd.arg(format!("--query={}", query));
+    }
+    if options.quick {
+        cmd.arg("--quick");
+    }
+    if options.skip_unstable {
+        cmd.arg("--skip-unstable");
+    }
+    cmd.stdout(Stdio::piped())
+        .stderr(Stdio::piped())
+        .kill_on_drop(true);
+
+    #[cfg(unix)]
+    cmd.process_group(0);
+
+    debug!("Executing command: {:?}", cmd);
+
+    let mut child = cmd
+        .spawn()
+        .context("Failed to spawn Python subprocess")?;
+
+    let stdout = child
+        .stdout
+        .take()
+        .context("Could not capture stdout from Python subprocess")?;
+    let stderr = child.stderr.take();
+
+    let (tx, rx) = mpsc::channel(options.buffer.max(1));
+
+    tokio::spawn(async move {
+        // Drain stderr concurrently so a chatty child cannot block on a full pipe
+        let stderr_task = stderr.map(|handle| tokio::spawn(read_tail(handle, MAX_STDERR_BYTES)));
+
+        let reader = BufReader::new(stdout);
+        let forwarded = timeout(
+            options.timeout,
+            forward_ndjson_lines(reader, &tx, MAX_STREAM_LINE_BYTES),
+        )
+        .await;
+
+        match forwarded {
+            Ok(Ok(count)) => {
+                let status = child.wait().await;
+                let stderr_tail = match stderr_task {
+                    Some(task) => task.await.unwrap_or_default(),
+                    None => String::new(),
+                };
+
+                // Non-zero exit is normal when some store failed; it is only
+                // an error if nothing was produced at all
+                match status {
+                    Ok(status) if count == 0 && !status.success() => {
+                        warn!("Python scraper failed: {}", stderr_tail);
+                        let _ = tx
+                            .send(Err(anyhow::anyhow!(
+                                "Python scraper exited with code {:?}: {}",
+                                status.code(),
+                                stderr_tail
+                            )))
+                            .await;
+                    }
+                    Ok(_) => {
+                        info!("Python scraper stream completed: {} results", count);
+                    }
+                    Err(e) => {
+                        let _ = tx
+                            .send(Err(
+                                anyhow::Error::new(e).context("Failed to wait for subprocess")
+                            ))
+                            .await;
+                    }
+                }
+            }
+            Ok(Err(e)) => {
+                // Receiver dropped or stdout broke - nobody needs the child any more
+                debug!("Stopping Python scraper stream: {:#}", e);
+                terminate(&mut child).await;
+            }
+            Err(_) => {
+                warn!("Python scraper stream timeout after {:?}", options.timeout);
+                terminate(&mut child).await;
+                let _ = tx
+                    .send(Err(anyhow::anyhow!(
+                        "Python scraper stream timeout after {:?}",
+                        options.timeout
+                    )))
+                    .await;
+            }
+        }
+    });
+
+    Ok(rx)
 }
 
-/// Run Python scraper with custom timeout
-pub async fn run_python_scraper_with_timeout(
-    request: ScraperRequest,
-    timeout_secs: u64,
-) -> Result<ScraperResponse> {
-    let timeout_duration = Duration::from_secs(timeout_secs);
+/// Read NDJSON lines and forward each parsed response to the channel
+///
+/// Lines are read with a hard size limit, so a runaway line never grows the
+/// buffer beyond `max_line_bytes`. Returns the number of valid responses.
+async fn forward_ndjson_lines<R>(
+    mut reader: R,
+    tx: &mpsc::Sender<Result<ScraperResponse>>,
+    max_line_bytes: usize,
+) -> Result<usize>
+where
+    R: AsyncBufRead + Unpin,
+{
+    let mut forwarded = 0;
+    let mut line = Vec::with_capacity(1024);
 
-    timeout(timeout_duration, run_python_scraper(request))
-        .await
-        .context("Scraper timeout")?
+    loop {
+        line.clear();
+        let read = (&mut reader)
+            .take(max_line_bytes as u64 + 1)
+            .read_until(b'\n', &mut line)
+            .await
+            .context("Failed to read stdout")?;
+
+        if read == 0 {
+            break;
+        }
+
+        let item = if line.len() > max_line_bytes && line.last() != Some(&b'\n') {
+            discard_until_newline(&mut reader).await?;
+            Err(anyhow::anyhow!(
+                "NDJSON line exceeds {} bytes",
+                max_line_bytes
+            ))
+        } else {
+            let text = line.trim_ascii();
+            if text.is_empty() {
+                continue;
+            }
+            serde_json::from_slice::<ScraperResponse>(text).context(format!(
+                "Failed to parse JSON line: {}",
+                String::from_utf8_lossy(text)
+            ))
+        };
+
+        if let Ok(response) = &item {
+            debug!(
+                "Stream result: store={}, status={}",
+                response.store, response.status
+            );
+            forwarded += 1;
+        }
+
+        if tx.send(item).await.is_err() {
+            anyhow::bail!("Stream receiver dropped");
+        }
+    }
+
+    Ok(forwarded)
+}
+
+/// Skip the remainder of the current line without buffering it
+async fn discard_until_newline<R>(reader: &mut R) -> Result<()>
+where
+    R: AsyncBufRead + Unpin,
+{
+    loop {
+        let buf = reader.fill_buf().await.context("Failed to read stdout")?;
+        if buf.is_empty() {
+            return Ok(());
+        }
+
+        match buf.iter().position(|&b| b == b'\n') {
+            Some(pos) => {
+                reader.consume(pos + 1);
+                return Ok(());
+            }
+            None => {
+                let len = buf.len();
+                reader.consume(len);
+            }
+        }
+    }
+}
+
+/// Read a stream to the end, keeping only the last `limit` bytes
+async fn read_tail<R>(mut reader: R, limit: usize) -> String
+where
+    R: AsyncRead + Unpin,
+{
+    let mut tail = Vec::new();
+    let mut chunk = [0u8; 4096];
+
+    while let Ok(n) = reader.read(&mut chunk).await {
+        if n == 0 {
+            break;
+        }
+        tail.extend_from_slice(&chunk[..n]);
+        if tail.len() > limit {
+            tail.drain(..tail.len() - limit);
+        }
+    }
+
+    String::from_utf8_lossy(&tail).into_owned()
 }
 
 #[cfg(test)]
 mod tests {
     use super::*;
 
+    #[tokio::test]
+    async fn test_forward_ndjson_lines() {
+        let input: &[u8] = b"{\"store\":\"kns\",\"status\":\"PASS\",\"price\":156463,\"count\":null,\"time\":3.5,\"error\":null,\"method\":\"playwright_direct\"}\n\
+\n\
+not json\n\
+{\"store\":\"dns\",\"status\":\"SKIP\",\"price\":null,\"count\":null,\"time\":0.0,\"error\":\"Skipped (--quick mode)\",\"method\":\"firefox\"}\n";
+
+        let (tx, mut rx) = mpsc::channel(8);
+        let count = forward_ndjson_lines(input, &tx, MAX_STREAM_LINE_BYTES)
+            .await
+            .unwrap();
+        drop(tx);
+
+        assert_eq!(count, 2);
+
+        let first = rx.recv().await.unwrap().unwrap();
+        assert_eq!(first.store, "kns");
+        assert_eq!(first.price, Some(156463));
+
+        assert!(rx.recv().await.unwrap().is_err(), "Malformed line is reported");
+
+        let last = rx.recv().await.unwrap().unwrap();
+        assert_eq!(last.store, "dns");
+        assert!(rx.recv().await.is_none());
+    }
+
+    #[tokio::test]
+    async fn test_forward_ndjson_oversized_line() {
+        let mut input = vec![b'x'; 200];
+        input.extend_from_slice(
+            b"\n{\"store\":\"nix\",\"status\":\"PASS\",\"price\":1,\"count\":null,\"time\":1.0,\"error\":null,\"method\":null}\n",
+        );
+
+        let (tx, mut rx) = mpsc::channel(8);
+        let count = forward_ndjson_lines(&input[..], &tx, 150).await.unwrap();
+        drop(tx);
+
+        assert_eq!(count, 1);
+        assert!(rx.recv().await.unwrap().is_err(), "Oversized line is rejected");
+        assert_eq!(rx.recv().await.unwrap().unwrap().store, "nix");
+    }
+
     #[tokio::test]
     #[ignore] // Requires Python environment
     async fn test_python_bridge_basic() {
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Fake test_scrapers.py for orchestrator tests.
+
+Behaviour depends on the store name passed as --store=NAME:
+    fast-*     print a PASS result immediately
+    delay-N    sleep N seconds, then print a PASS result
+    fail       print a FAIL result and exit 1 (like a real failed store)
+    crash      write to stderr and exit 2 without JSON
+    hang       sleep forever (used for timeout/cancel tests)
+
+If FAKE_SCRAPER_PID_DIR is set, the PID is written to <dir>/<store>.pid
+and the --query=... argument to <dir>/<store>.query.
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def main():
+    store = ""
+    query = ""
+    for arg in sys.argv[1:]:
+        if arg.startswith("--store="):
+            store = arg.split("=", 1)[1]
+        elif arg.startswith("--query="):
+            query = arg.split("=", 1)[1]
+
+    pid_dir = os.environ.get("FAKE_SCRAPER_PID_DIR")
+    if pid_dir:
+        with open(os.path.join(pid_dir, f"{store}.pid"), "w") as f:
+            f.write(str(os.getpid()))
+        with open(os.path.join(pid_dir, f"{store}.query"), "w", encoding="utf-8") as f:
+            f.write(query)
+
+    response = {
+        "store": store,
+        "status": "PASS",
+        "price": 100000,
+        "count": 1,
+        "time": 0.0,
+        "error": None,
+        "method": "fake",
+    }
+
+    if store.startswith("delay-"):
+        time.sleep(float(store.split("-", 1)[1]))
+    elif store == "fail":
+        response.update(status="FAIL", price=None, error="No price found")
+        print(json.dumps(response))
+        return 1
+    elif store == "crash":
+        print("Traceback: simulated crash", file=sys.stderr)
+        return 2
+    elif store == "hang":
+        while True:
+            time.sleep(1)
+
+    print(json.dumps(response))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+//! Orchestrator tests against a fake Python scraper
+//!
+//! Requires `python3` in PATH (no Playwright or browsers).
+
+use price_scout_scraper::{BridgeError, Orchestrator, OrchestratorConfig};
+use std::path::PathBuf;
+use std::time::{Duration, Instant};
+
+fn fake_script() -> PathBuf {
+    PathBuf::from(env!("CARGO_MANIFEST_DIR")).join("tests/fixtures/fake_scraper.py")
+}
+
+/// Fresh PID/query directory for one test
+///
+/// Passed to the fake scraper through `OrchestratorConfig::with_env`, so
+/// parallel tests never share process-global state.
+fn scratch_dir(name: &str) -> PathBuf {
+    let dir = std::env::temp_dir().join(format!("fake_scraper_{}_{}", std::process::id(), name));
+    let _ = std::fs::remove_dir_all(&dir);
+    std::fs::create_dir_all(&dir).unwrap();
+    dir
+}
+
+fn config(max_concurrency: usize) -> OrchestratorConfig {
+    OrchestratorConfig {
+        max_concurrency,
+        default_timeout: Duration::from_secs(10),
+        script: Some(fake_script()),
+        ..Default::default()
+    }
+}
+
+#[tokio::test]
+async fn test_results_arrive_in_completion_order() {
+    let orchestrator = Orchestrator::new(config(4));
+    let mut fan_out = orchestrator
+        .fan_out("MacBook Pro 16", &["delay-1.5", "fast-a", "fail"])
+        .unwrap();
+
+    let mut order = Vec::new();
+    while let Some(outcome) = fan_out.next().await {
+        order.push(outcome.store.clone());
+
+        if outcome.store == "fail" {
+            // Exit code 1 with valid JSON is a normal FAIL response
+            let response = outcome.result.unwrap();
+            assert_eq!(response.status, "FAIL");
+        } else {
+            assert_eq!(outcome.result.unwrap().price, Some(100000));
+        }
+    }
+
+    assert_eq!(order.len(), 3);
+    assert_eq!(order.last().unwrap(), "delay-1.5", "Slow store reports last");
+}
+
+#[tokio::test]
+async fn test_crash_reports_stderr() {
+    let orchestrator = Orchestrator::new(config(2));
+    let outcomes = orchestrator.fan_out("q", &["crash"]).unwrap().collect().await;
+
+    match &outcomes[0].result {
+        Err(BridgeError::Failed(message)) => assert!(message.contains("simulated crash")),
+        other => panic!("Expected Failed, got {:?}", other),
+    }
+}
+
+#[tokio::test]
+async fn test_semaphore_limits_concurrency() {
+    let orchestrator = Orchestrator::new(config(1));
+    let started = Instant::now();
+
+    let outcomes = orchestrator
+        .fan_out("q", &["delay-0.5", "delay-0.5", "delay-0.5"])
+        .unwrap()
+        .collect()
+        .await;
+
+    assert!(outcomes.iter().all(|o| o.is_ok()));
+    assert!(
+        started.elapsed() >= Duration::from_millis(1500),
+        "One permit should serialize the stores"
+    );
+}
+
+#[tokio::test]
+async fn test_timeout_kills_and_reaps_subprocess() {
+    let pid_dir = scratch_dir("timeout");
+
+    let config = config(2)
+        .with_store_timeout("hang", Duration::from_millis(1500))
+        .with_env("FAKE_SCRAPER_PID_DIR", pid_dir.to_string_lossy());
+    let orchestrator = Orchestrator::new(config);
+
+    let started = Instant::now();
+    let outcomes = orchestrator
+        .fan_out("q", &["hang", "fast-b"])
+        .unwrap()
+        .collect()
+        .await;
+
+    let hang = outcomes.iter().find(|o| o.store == "hang").unwrap();
+    assert!(matches!(hang.result, Err(BridgeError::Timeout(_))));
+    assert!(started.elapsed() < Duration::from_secs(5));
+
+    let fast = outcomes.iter().find(|o| o.store == "fast-b").unwrap();
+    assert!(fast.is_ok(), "Partial results survive a timed-out store");
+
+    #[cfg(target_os = "linux")]
+    {
+        let pid = std::fs::read_to_string(pid_dir.join("hang.pid")).unwrap();
+        assert!(
+            !PathBuf::from(format!("/proc/{}", pid.trim())).exists(),
+            "Timed-out subprocess must be killed and reaped"
+        );
+    }
+
+    let _ = std::fs::remove_dir_all(&pid_dir);
+}
+
+#[tokio::test]
+async fn test_query_reaches_subprocess() {
+    let query_dir = scratch_dir("query");
+    let config = config(2).with_env("FAKE_SCRAPER_PID_DIR", query_dir.to_string_lossy());
+    let orchestrator = Orchestrator::new(config);
+
+    let outcomes = orchestrator
+        .fan_out("iPhone 15 Pro", &["fast-q1", "fast-q2"])
+        .unwrap()
+        .collect()
+        .await;
+    assert!(outcomes.iter().all(|o| o.is_ok()));
+
+    for store in ["fast-q1", "fast-q2"] {
+        let query = std::fs::read_to_string(query_dir.join(format!("{}.query", store))).unwrap();
+        assert_eq!(query, "iPhone 15 Pro", "{} should receive --query", store);
+    }
+
+    let _ = std::fs::remove_dir_all(&query_dir);
+}
+
+#[tokio::test]
+async fn test_cancel_stops_running_and_queued_stores() {
+    let orchestrator = Orchestrator::new(config(1));
+    let mut fan_out = orchestrator.fan_out("q", &["hang", "fast-c"]).unwrap();
+
+    tokio::time::sleep(Duration::from_millis(300)).await;
+    let started = Instant::now();
+    fan_out.cancel();
+
+    let mut outcomes = Vec::new();
+    while let Some(outcome) = fan_out.next().await {
+        outcomes.push(outcome);
+    }
+
+    assert_eq!(outcomes.len(), 2);
+    assert!(outcomes
+        .iter()
+        .all(|o| matches!(o.result, Err(BridgeError::Cancelled))));
+    assert!(started.elapsed() < Duration::from_secs(3));
+}
@@ -0,0 +1,219 @@
+-- Price Scout Database Schema
+-- Version: 003
+-- Description: Monthly range-partitioned price_history with BRIN + retention
+-- Author: Price Scout Team
+-- Created: 2026-10-19
+--
+-- price_history was a single append-only heap with four B-tree indexes.
+-- Every insert (trigger_archive_price_to_history) paid for four index
+-- updates on an ever-growing table. After this migration:
+--   - rows live in monthly partitions price_history_pYYYY_MM
+--   - recorded_at is covered by a BRIN index (rows arrive in time order)
+--   - (product_id, recorded_at) and (store_id, recorded_at) B-trees are
+--     local to each partition, so they stay small and hot
+--   - old months are removed by detaching/dropping a partition, not DELETE
+--
+-- Existing rows are copied into the new layout inside one transaction.
+
+BEGIN;
+
+-- ============================================================================
+-- PARTITIONED PRICE_HISTORY TABLE
+-- ============================================================================
+
+ALTER TABLE price_history RENAME TO price_history_legacy;
+ALTER TABLE price_history_legacy RENAME CONSTRAINT price_history_price_positive TO price_history_legacy_price_positive;
+ALTER INDEX price_history_pkey RENAME TO price_history_legacy_pkey;
+DROP INDEX idx_price_history_product;
+DROP INDEX idx_price_history_store;
+DROP INDEX idx_price_history_recorded_at;
+DROP INDEX idx_price_history_product_time;
+
+-- The partition key must be part of the primary key. ids keep coming from
+-- the original sequence so they stay unique across the migration.
+CREATE TABLE price_history (
+    id BIGINT NOT NULL DEFAULT nextval('price_history_id_seq'),
+    product_id BIGINT NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+    store_id INTEGER NOT NULL REFERENCES stores(id) ON DELETE CASCADE,
+    price INTEGER NOT NULL,
+    available BOOLEAN NOT NULL,
+    recorded_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (id, recorded_at),
+    CONSTRAINT price_history_price_positive CHECK (price > 0)
+) PARTITION BY RANGE (recorded_at);
+
+-- Indexes on the parent are created on every partition (local indexes)
+CREATE INDEX idx_price_history_recorded_at_brin ON price_history USING BRIN (recorded_at) WITH (pages_per_range = 32);
+CREATE INDEX idx_price_history_product_time ON price_history(product_id, recorded_at DESC);
+CREATE INDEX idx_price_history_store_time ON price_history(store_id, recorded_at DESC);
+
+-- Catch-all for rows outside the created months; normally stays empty
+CREATE TABLE price_history_default PARTITION OF price_history DEFAULT;
+
+COMMENT ON TABLE price_history IS 'Historical price data (append-only time series, monthly partitions)';
+COMMENT ON COLUMN price_history.price IS 'Price in kopecks';
+COMMENT ON COLUMN price_history.recorded_at IS 'When this price point was recorded (partition key)';
+
+-- ============================================================================
+-- PARTITION MANAGEMENT
+-- ============================================================================
+
+-- Create the partition for the month containing p_month (no-op if it exists)
+CREATE OR REPLACE FUNCTION create_price_history_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := format('price_history_p%s', to_char(month_start, 'YYYY_MM'));
+    moved INTEGER;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    -- Rows for this month that already landed in the default partition
+    -- would make CREATE ... PARTITION OF fail, so move them out first
+    CREATE TEMP TABLE price_history_spill ON COMMIT DROP AS
+    SELECT * FROM price_history_default
+    WHERE recorded_at >= month_start AND recorded_at < month_end;
+    GET DIAGNOSTICS moved = ROW_COUNT;
+
+    IF moved > 0 THEN
+        DELETE FROM price_history_default
+        WHERE recorded_at >= month_start AND recorded_at < month_end;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF price_history FOR VALUES FROM (%L) TO (%L)',
+        partition_name, month_start, month_end
+    );
+
+    IF moved > 0 THEN
+        INSERT INTO price_history SELECT * FROM price_history_spill;
+        RAISE NOTICE 'Moved % rows from price_history_default to %', moved, partition_name;
+    END IF;
+    DROP TABLE price_history_spill;
+
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Make sure partitions exist from the current month up to months_ahead
+CREATE OR REPLACE FUNCTION ensure_price_history_partitions(months_ahead INTEGER DEFAULT 3)
+RETURNS INTEGER AS $$
+DECLARE
+    i INTEGER;
+    created INTEGER := 0;
+    partition_name TEXT;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        partition_name := format('price_history_p%s',
+            to_char(date_trunc('month', NOW()) + make_interval(months => i), 'YYYY_MM'));
+        IF to_regclass(partition_name) IS NULL THEN
+            PERFORM create_price_history_partition((date_trunc('month', NOW()) + make_interval(months => i))::DATE);
+            created := created + 1;
+        END IF;
+    END LOOP;
+
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Detach and drop whole months older than keep_months
+CREATE OR REPLACE FUNCTION drop_old_price_history_partitions(keep_months INTEGER DEFAULT 24)
+RETURNS INTEGER AS $$
+DECLARE
+    cutoff DATE := (date_trunc('month', NOW()) - make_interval(months => keep_months))::DATE;
+    part RECORD;
+    dropped INTEGER := 0;
+BEGIN
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'price_history'::regclass
+          AND c.relname ~ '^price_history_p\d{4}_\d{2}$'
+          AND to_date(substring(c.relname FROM '\d{4}_\d{2}$'), 'YYYY_MM') < cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE price_history DETACH PARTITION %I', part.relname);
+        EXECUTE format('DROP TABLE %I', part.relname);
+        RAISE NOTICE 'Dropped partition %', part.relname;
+        dropped := dropped + 1;
+    END LOOP;
+
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Periodic job: create upcoming months, enforce retention
+CREATE OR REPLACE FUNCTION price_history_maintenance(
+    months_ahead INTEGER DEFAULT 3,
+    keep_months INTEGER DEFAULT 24
+)
+RETURNS TABLE(partitions_created INTEGER, partitions_dropped INTEGER) AS $$
+BEGIN
+    partitions_created := ensure_price_history_partitions(months_ahead);
+    partitions_dropped := drop_old_price_history_partitions(keep_months);
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION price_history_maintenance(INTEGER, INTEGER) IS 'Create upcoming price_history partitions and drop expired ones';
+
+-- ============================================================================
+-- DATA MIGRATION
+-- ============================================================================
+
+-- Partitions for every month that already has history
+DO $$
+DECLARE
+    m DATE;
+BEGIN
+    FOR m IN
+        SELECT DISTINCT date_trunc('month', recorded_at)::DATE
+        FROM price_history_legacy
+    LOOP
+        PERFORM create_price_history_partition(m);
+    END LOOP;
+END $$;
+
+SELECT ensure_price_history_partitions(3);
+
+INSERT INTO price_history (id, product_id, store_id, price, available, recorded_at)
+SELECT id, product_id, store_id, price, available, recorded_at
+FROM price_history_legacy;
+
+ALTER SEQUENCE price_history_id_seq OWNED BY price_history.id;
+DROP TABLE price_history_legacy;
+
+ANALYZE price_history;
+
+-- ============================================================================
+-- SCHEDULING
+-- ============================================================================
+
+-- With pg_cron installed the job is scheduled here; otherwise run
+-- `SELECT * FROM price_history_maintenance();` daily (see README.md).
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('price_history_maintenance', '15 3 * * *',
+            'SELECT * FROM price_history_maintenance()');
+        RAISE NOTICE 'pg_cron job price_history_maintenance scheduled';
+    END IF;
+END $$;
+
+COMMIT;
+
+-- ============================================================================
+-- VERIFICATION
+-- ============================================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE 'price_history partitioned by month';
+    RAISE NOTICE 'Indexes: BRIN(recorded_at), (product_id, recorded_at), (store_id, recorded_at)';
+    RAISE NOTICE 'Functions: create_price_history_partition, ensure_price_history_partitions, drop_old_price_history_partitions, price_history_maintenance';
+END $$;
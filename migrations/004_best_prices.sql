@@ -0,0 +1,278 @@
+-- Price Scout Database Schema
+-- Version: 004
+-- Description: Incrementally maintained best-price tables (replaces window view)
+-- Author: Price Scout Team
+-- Created: 2026-10-19
+--
+-- v_best_prices ran ROW_NUMBER() over the whole store_prices join on every
+-- read. Reads (bot, API) far outnumber writes (scraper), so the ranking is
+-- now materialized per product and refreshed only for products touched by
+-- a store_prices statement:
+--   - product_price_ranks   - top-K available offers per product, by rank
+--   - product_price_summary - min/max/spread/store count per product
+-- Reads become primary-key lookups. v_best_prices keeps its columns but
+-- reads the ranks table; the original query lives on as v_best_prices_live
+-- and is what check_best_prices() compares against.
+
+BEGIN;
+
+-- ============================================================================
+-- BEST PRICE TABLES
+-- ============================================================================
+
+CREATE TABLE product_price_ranks (
+    product_id BIGINT NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+    price_rank SMALLINT NOT NULL,
+    store_price_id BIGINT NOT NULL,
+    store_id INTEGER NOT NULL REFERENCES stores(id) ON DELETE CASCADE,
+    price INTEGER NOT NULL,
+    url TEXT,
+    scraped_at TIMESTAMPTZ NOT NULL,
+
+    PRIMARY KEY (product_id, price_rank)
+);
+
+COMMENT ON TABLE product_price_ranks IS 'Top-K available offers per product (maintained by trigger on store_prices)';
+COMMENT ON COLUMN product_price_ranks.price_rank IS '1 = cheapest; ties broken by store_id';
+COMMENT ON COLUMN product_price_ranks.price IS 'Price in kopecks';
+
+CREATE TABLE product_price_summary (
+    product_id BIGINT PRIMARY KEY REFERENCES products(id) ON DELETE CASCADE,
+    min_price INTEGER NOT NULL,
+    max_price INTEGER NOT NULL,
+    price_spread INTEGER NOT NULL,
+    available_stores INTEGER NOT NULL,
+    best_store_id INTEGER NOT NULL REFERENCES stores(id) ON DELETE CASCADE,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_product_price_summary_min_price ON product_price_summary(min_price);
+
+COMMENT ON TABLE product_price_summary IS 'Current price range per product over available offers';
+COMMENT ON COLUMN product_price_summary.price_spread IS 'max_price - min_price (kopecks)';
+
+-- ============================================================================
+-- FUNCTIONS
+-- ============================================================================
+
+-- Recompute ranks and summary for the given products.
+-- Cost is proportional to the number of offers of these products (<= stores
+-- per product), independent of the size of store_prices.
+CREATE OR REPLACE FUNCTION refresh_best_prices(p_product_ids BIGINT[], p_top_k INTEGER DEFAULT 10)
+RETURNS VOID AS $$
+DECLARE
+    pid BIGINT;
+BEGIN
+    -- Serialize refreshes of the same product (sorted = no deadlocks)
+    FOR pid IN SELECT DISTINCT unnest(p_product_ids) ORDER BY 1 LOOP
+        PERFORM pg_advisory_xact_lock(pid);
+    END LOOP;
+
+    DELETE FROM product_price_ranks WHERE product_id = ANY(p_product_ids);
+
+    INSERT INTO product_price_ranks (product_id, price_rank, store_price_id, store_id, price, url, scraped_at)
+    SELECT product_id, price_rank, id, store_id, price, url, scraped_at
+    FROM (
+        SELECT
+            sp.*,
+            ROW_NUMBER() OVER (PARTITION BY sp.product_id ORDER BY sp.price, sp.store_id) AS price_rank
+        FROM store_prices sp
+        WHERE sp.product_id = ANY(p_product_ids)
+          AND sp.available = true
+    ) ranked
+    WHERE price_rank <= p_top_k;
+
+    DELETE FROM product_price_summary WHERE product_id = ANY(p_product_ids);
+
+    INSERT INTO product_price_summary (product_id, min_price, max_price, price_spread, available_stores, best_store_id)
+    SELECT
+        sp.product_id,
+        MIN(sp.price),
+        MAX(sp.price),
+        MAX(sp.price) - MIN(sp.price),
+        COUNT(*),
+        (ARRAY_AGG(sp.store_id ORDER BY sp.price, sp.store_id))[1]
+    FROM store_prices sp
+    WHERE sp.product_id = ANY(p_product_ids)
+      AND sp.available = true
+    GROUP BY sp.product_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level trigger: one refresh per statement for all touched products
+CREATE OR REPLACE FUNCTION store_prices_refresh_best_prices()
+RETURNS TRIGGER AS $$
+DECLARE
+    ids BIGINT[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT ARRAY_AGG(DISTINCT product_id) INTO ids FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT ARRAY_AGG(DISTINCT product_id) INTO ids FROM old_rows;
+    ELSE
+        SELECT ARRAY_AGG(DISTINCT product_id) INTO ids
+        FROM (SELECT product_id FROM new_rows UNION SELECT product_id FROM old_rows) changed;
+    END IF;
+
+    IF ids IS NOT NULL THEN
+        PERFORM refresh_best_prices(ids);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_best_prices_insert
+    AFTER INSERT ON store_prices
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION store_prices_refresh_best_prices();
+
+CREATE TRIGGER trigger_best_prices_update
+    AFTER UPDATE ON store_prices
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION store_prices_refresh_best_prices();
+
+CREATE TRIGGER trigger_best_prices_delete
+    AFTER DELETE ON store_prices
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION store_prices_refresh_best_prices();
+
+-- Full rebuild (initial load, or repair after check_best_prices() finds drift)
+CREATE OR REPLACE FUNCTION rebuild_best_prices()
+RETURNS INTEGER AS $$
+DECLARE
+    ids BIGINT[];
+BEGIN
+    LOCK TABLE product_price_ranks, product_price_summary IN EXCLUSIVE MODE;
+    TRUNCATE product_price_ranks, product_price_summary;
+
+    SELECT ARRAY_AGG(DISTINCT product_id) INTO ids FROM store_prices;
+    IF ids IS NOT NULL THEN
+        PERFORM refresh_best_prices(ids);
+    END IF;
+
+    RETURN COALESCE(array_length(ids, 1), 0);
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- VIEWS
+-- ============================================================================
+
+DROP VIEW v_best_prices;
+
+-- Original on-the-fly ranking, kept as the reference for check_best_prices()
+CREATE VIEW v_best_prices_live AS
+SELECT
+    p.id AS product_id,
+    p.name AS product_name,
+    p.category,
+    s.id AS store_id,
+    s.name AS store_name,
+    sp.price,
+    sp.url,
+    sp.scraped_at,
+    ROW_NUMBER() OVER (PARTITION BY sp.product_id ORDER BY sp.price, sp.store_id) AS price_rank
+FROM store_prices sp
+JOIN products p ON sp.product_id = p.id
+JOIN stores s ON sp.store_id = s.id
+WHERE sp.available = true;
+
+COMMENT ON VIEW v_best_prices_live IS 'Best prices computed on the fly (reference for consistency checks)';
+
+-- Same columns as before, served from product_price_ranks
+CREATE VIEW v_best_prices AS
+SELECT
+    p.id AS product_id,
+    p.name AS product_name,
+    p.category,
+    s.id AS store_id,
+    s.name AS store_name,
+    r.price,
+    r.url,
+    r.scraped_at,
+    r.price_rank::BIGINT AS price_rank
+FROM product_price_ranks r
+JOIN products p ON r.product_id = p.id
+JOIN stores s ON r.store_id = s.id;
+
+COMMENT ON VIEW v_best_prices IS 'Best available prices per product with ranking (top 10, materialized)';
+
+-- ============================================================================
+-- CONSISTENCY CHECK
+-- ============================================================================
+
+-- Rows where the materialized tables disagree with the live computation.
+-- Empty result = consistent.
+CREATE OR REPLACE FUNCTION check_best_prices(p_top_k INTEGER DEFAULT 10)
+RETURNS TABLE(product_id BIGINT, price_rank BIGINT, issue TEXT) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        COALESCE(live.product_id, r.product_id),
+        COALESCE(live.price_rank, r.price_rank::BIGINT),
+        CASE
+            WHEN r.product_id IS NULL THEN 'missing rank'
+            WHEN live.product_id IS NULL THEN 'stale rank'
+            ELSE format('rank differs: store %s/%s, price %s/%s',
+                        r.store_id, live.store_id, r.price, live.price)
+        END
+    FROM (SELECT * FROM v_best_prices_live WHERE v_best_prices_live.price_rank <= p_top_k) live
+    FULL OUTER JOIN product_price_ranks r
+        ON r.product_id = live.product_id AND r.price_rank = live.price_rank
+    WHERE r.product_id IS NULL
+       OR live.product_id IS NULL
+       OR r.store_id <> live.store_id
+       OR r.price <> live.price
+       OR r.url IS DISTINCT FROM live.url
+       OR r.scraped_at <> live.scraped_at;
+
+    RETURN QUERY
+    SELECT
+        COALESCE(agg.product_id, s.product_id),
+        NULL::BIGINT,
+        CASE
+            WHEN s.product_id IS NULL THEN 'missing summary'
+            WHEN agg.product_id IS NULL THEN 'stale summary'
+            ELSE format('summary differs: min %s/%s, max %s/%s, stores %s/%s',
+                        s.min_price, agg.min_price, s.max_price, agg.max_price,
+                        s.available_stores, agg.available_stores)
+        END
+    FROM (
+        SELECT sp.product_id, MIN(sp.price) AS min_price, MAX(sp.price) AS max_price, COUNT(*) AS available_stores
+        FROM store_prices sp
+        WHERE sp.available = true
+        GROUP BY sp.product_id
+    ) agg
+    FULL OUTER JOIN product_price_summary s ON s.product_id = agg.product_id
+    WHERE s.product_id IS NULL
+       OR agg.product_id IS NULL
+       OR s.min_price <> agg.min_price
+       OR s.max_price <> agg.max_price
+       OR s.available_stores <> agg.available_stores;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION check_best_prices(INTEGER) IS 'Compare product_price_ranks/summary with v_best_prices_live';
+
+-- ============================================================================
+-- INITIAL DATA
+-- ============================================================================
+
+SELECT rebuild_best_prices();
+
+COMMIT;
+
+-- ============================================================================
+-- VERIFICATION
+-- ============================================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE 'Tables: product_price_ranks, product_price_summary';
+    RAISE NOTICE 'Views: v_best_prices (materialized ranks), v_best_prices_live';
+    RAISE NOTICE 'Functions: refresh_best_prices, rebuild_best_prices, check_best_prices';
+END $$;
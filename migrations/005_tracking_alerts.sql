@@ -0,0 +1,181 @@
+-- Price Scout Database Schema
+-- Version: 005
+-- Description: Set-based tracking alert evaluation driven by a price_history watermark
+-- Author: Price Scout Team
+-- Created: 2026-10-19
+--
+-- After each ingestion batch evaluate_tracking_alerts() reads only the
+-- price_history rows written since the previous run and joins them with
+-- trackings in one query. Work is proportional to the number of changed
+-- prices, not to the number of users or trackings.
+--
+-- Watermark: every price_history row records the id of the transaction
+-- that wrote it (txid). A run processes [previous xmin, current xmin):
+-- everything below the current snapshot xmin is already committed (or
+-- aborted), so rows from slow concurrent writers are never skipped, even
+-- though price_history ids are not committed in order.
+
+BEGIN;
+
+-- ============================================================================
+-- PRICE HISTORY WATERMARK COLUMN
+-- ============================================================================
+
+-- Existing rows keep NULL (they predate the alert engine; no rewrite)
+ALTER TABLE price_history ADD COLUMN txid xid8;
+ALTER TABLE price_history ALTER COLUMN txid SET DEFAULT pg_current_xact_id();
+
+CREATE INDEX idx_price_history_txid ON price_history(txid);
+
+COMMENT ON COLUMN price_history.txid IS 'Writing transaction id (alert watermark)';
+
+-- Record the first price of a product-store pair too, not only changes,
+-- so a new offer below target also triggers an alert
+CREATE OR REPLACE FUNCTION archive_new_price_to_history()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO price_history (product_id, store_id, price, available, recorded_at)
+    VALUES (NEW.product_id, NEW.store_id, NEW.price, NEW.available, NEW.scraped_at);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_archive_new_price_to_history
+    AFTER INSERT ON store_prices
+    FOR EACH ROW
+    EXECUTE FUNCTION archive_new_price_to_history();
+
+-- ============================================================================
+-- ALERT TABLES
+-- ============================================================================
+
+CREATE TABLE alert_watermarks (
+    name TEXT PRIMARY KEY,
+    last_xmin xid8 NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE alert_watermarks IS 'Progress of watermark-driven evaluators over price_history';
+
+INSERT INTO alert_watermarks (name, last_xmin)
+VALUES ('tracking_alerts', pg_snapshot_xmin(pg_current_snapshot()));
+
+CREATE TABLE alert_notifications (
+    id BIGSERIAL PRIMARY KEY,
+    tracking_id BIGINT NOT NULL REFERENCES trackings(id) ON DELETE CASCADE,
+    user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    product_id BIGINT NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+    store_id INTEGER NOT NULL REFERENCES stores(id) ON DELETE CASCADE,
+    price INTEGER NOT NULL,
+    target_price INTEGER NOT NULL,
+    history_id BIGINT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    sent_at TIMESTAMPTZ
+);
+
+-- At most one pending notification per tracking (dedup key)
+CREATE UNIQUE INDEX idx_alert_notifications_pending ON alert_notifications(tracking_id) WHERE sent_at IS NULL;
+CREATE INDEX idx_alert_notifications_tracking_sent ON alert_notifications(tracking_id, sent_at DESC) WHERE sent_at IS NOT NULL;
+CREATE INDEX idx_alert_notifications_queue ON alert_notifications(created_at) WHERE sent_at IS NULL;
+
+COMMENT ON TABLE alert_notifications IS 'Price alert queue (pending = sent_at IS NULL)';
+COMMENT ON COLUMN alert_notifications.price IS 'Triggering price in kopecks (best seen since queued)';
+COMMENT ON COLUMN alert_notifications.history_id IS 'price_history row that triggered the alert';
+
+-- ============================================================================
+-- FUNCTIONS
+-- ============================================================================
+
+-- Evaluate all trackings against prices written since the last run.
+--   - one pending notification per tracking; a cheaper price updates it
+--   - a price already notified (same or lower) within p_renotify_after is skipped
+-- Concurrent calls are serialized by the watermark row lock.
+CREATE OR REPLACE FUNCTION evaluate_tracking_alerts(p_renotify_after INTERVAL DEFAULT INTERVAL '24 hours')
+RETURNS TABLE(changes_seen BIGINT, alerts_queued BIGINT) AS $$
+DECLARE
+    lo xid8;
+    hi xid8 := pg_snapshot_xmin(pg_current_snapshot());
+BEGIN
+    SELECT w.last_xmin INTO lo
+    FROM alert_watermarks w
+    WHERE w.name = 'tracking_alerts'
+    FOR UPDATE;
+
+    IF hi <= lo THEN
+        changes_seen := 0;
+        alerts_queued := 0;
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    WITH changed AS (
+        SELECT ph.id, ph.product_id, ph.store_id, ph.price, ph.recorded_at
+        FROM price_history ph
+        WHERE ph.txid >= lo
+          AND ph.txid < hi
+          AND ph.available = true
+    ),
+    candidates AS (
+        -- Cheapest qualifying price per tracking within this window
+        SELECT DISTINCT ON (t.id)
+            t.id AS tracking_id,
+            t.user_id,
+            t.product_id,
+            t.target_price,
+            c.store_id,
+            c.price,
+            c.id AS history_id
+        FROM changed c
+        JOIN trackings t ON t.product_id = c.product_id
+        WHERE t.target_price IS NOT NULL
+          AND c.price <= t.target_price
+        ORDER BY t.id, c.price, c.recorded_at DESC
+    ),
+    queued AS (
+        INSERT INTO alert_notifications (tracking_id, user_id, product_id, store_id, price, target_price, history_id)
+        SELECT c.tracking_id, c.user_id, c.product_id, c.store_id, c.price, c.target_price, c.history_id
+        FROM candidates c
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM alert_notifications n
+            WHERE n.tracking_id = c.tracking_id
+              AND n.sent_at IS NOT NULL
+              AND n.sent_at > NOW() - p_renotify_after
+              AND n.price <= c.price
+        )
+        ON CONFLICT (tracking_id) WHERE sent_at IS NULL
+        DO UPDATE SET
+            store_id = EXCLUDED.store_id,
+            price = EXCLUDED.price,
+            target_price = EXCLUDED.target_price,
+            history_id = EXCLUDED.history_id,
+            created_at = NOW()
+        WHERE EXCLUDED.price < alert_notifications.price
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM changed), (SELECT COUNT(*) FROM queued)
+    INTO changes_seen, alerts_queued;
+
+    UPDATE alert_watermarks
+    SET last_xmin = hi, updated_at = NOW()
+    WHERE name = 'tracking_alerts';
+
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION evaluate_tracking_alerts(INTERVAL) IS 'Queue price alerts for price_history rows since the last watermark';
+
+COMMIT;
+
+-- ============================================================================
+-- VERIFICATION
+-- ============================================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE 'Tables: alert_watermarks, alert_notifications';
+    RAISE NOTICE 'Column: price_history.txid (watermark)';
+    RAISE NOTICE 'Functions: evaluate_tracking_alerts';
+    RAISE NOTICE 'Triggers: archive_new_price_to_history';
+END $$;
@@ -0,0 +1,103 @@
+-- Price Scout Database Schema
+-- Version: 006
+-- Description: Trigram + full-text ranked product search
+-- Author: Price Scout Team
+-- Created: 2026-10-19
+--
+-- search_products used name ILIKE '%q%', which no index can serve and
+-- which misses naming variants ("16.2\"" vs "16", "ГБ" vs "GB").
+-- Names are normalized into a stored column with a pg_trgm GIN index
+-- (word similarity, also serves ILIKE) and a russian+english tsvector.
+-- search_products_ranked() combines both into one score.
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ============================================================================
+-- NORMALIZATION
+-- ============================================================================
+
+-- Canonical form of a product name / query:
+--   lower case, ё -> е, 16.2" / 16,2″ / 16 дюймов -> 16,
+--   ГБ/ТБ -> gb/tb, 32GB -> 32 gb, punctuation -> spaces
+CREATE OR REPLACE FUNCTION normalize_product_name(p_name TEXT)
+RETURNS TEXT AS $$
+    SELECT btrim(regexp_replace(
+        regexp_replace(
+        regexp_replace(
+        regexp_replace(
+        regexp_replace(
+        regexp_replace(
+            replace(lower(p_name), 'ё', 'е'),
+            '(\d{2})[.,]\d\s*("|″|''''|дюйм\w*|inch\w*)?', '\1 ', 'g'),
+            '(\d{2})\s*("|″|''''|дюйм\w*|inch\w*)', '\1 ', 'g'),
+            'гб', 'gb', 'g'),
+            'тб', 'tb', 'g'),
+            '(\d)(gb|tb)', '\1 \2', 'g'),
+        '[^[:alnum:]]+', ' ', 'g'))
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+COMMENT ON FUNCTION normalize_product_name(TEXT) IS 'Canonical product name for search (sizes, units, case)';
+
+-- ============================================================================
+-- SEARCH COLUMNS AND INDEXES
+-- ============================================================================
+
+ALTER TABLE products
+    ADD COLUMN search_name TEXT GENERATED ALWAYS AS (normalize_product_name(name)) STORED;
+
+ALTER TABLE products
+    ADD COLUMN search_tsv tsvector GENERATED ALWAYS AS (
+        to_tsvector('russian'::regconfig, normalize_product_name(name)) ||
+        to_tsvector('english'::regconfig, normalize_product_name(name))
+    ) STORED;
+
+CREATE INDEX idx_products_search_name_trgm ON products USING gin(search_name gin_trgm_ops);
+CREATE INDEX idx_products_search_tsv ON products USING gin(search_tsv);
+
+COMMENT ON COLUMN products.search_name IS 'normalize_product_name(name), trigram indexed';
+COMMENT ON COLUMN products.search_tsv IS 'russian + english full-text vector of search_name';
+
+-- ============================================================================
+-- RANKED SEARCH
+-- ============================================================================
+
+-- Candidates: trigram word similarity (<%) or full-text match.
+-- Score: best of word similarity and ts_rank, exact substring boosted.
+CREATE OR REPLACE FUNCTION search_products_ranked(p_query TEXT, p_limit INTEGER DEFAULT 50)
+RETURNS TABLE(product_id BIGINT, score REAL) AS $$
+    WITH q AS (
+        SELECT
+            normalize_product_name(p_query) AS norm,
+            websearch_to_tsquery('russian'::regconfig, normalize_product_name(p_query)) ||
+            websearch_to_tsquery('english'::regconfig, normalize_product_name(p_query)) AS tsq
+    )
+    SELECT
+        p.id,
+        (GREATEST(
+            word_similarity(q.norm, p.search_name),
+            ts_rank(p.search_tsv, q.tsq)
+        ) + CASE WHEN strpos(p.search_name, q.norm) > 0 THEN 1.0 ELSE 0.0 END)::REAL AS score
+    FROM products p, q
+    WHERE q.norm <> ''
+      AND (q.norm <% p.search_name OR p.search_tsv @@ q.tsq)
+    ORDER BY score DESC, p.updated_at DESC
+    LIMIT p_limit
+$$ LANGUAGE sql STABLE PARALLEL SAFE;
+
+COMMENT ON FUNCTION search_products_ranked(TEXT, INTEGER) IS 'Ranked product search (pg_trgm + tsvector)';
+
+COMMIT;
+
+-- ============================================================================
+-- VERIFICATION
+-- ============================================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE 'Extension: pg_trgm';
+    RAISE NOTICE 'Columns: products.search_name, products.search_tsv';
+    RAISE NOTICE 'Indexes: idx_products_search_name_trgm (GIN trgm), idx_products_search_tsv (GIN)';
+    RAISE NOTICE 'Functions: normalize_product_name, search_products_ranked';
+END $$;
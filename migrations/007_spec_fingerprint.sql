@@ -0,0 +1,137 @@
+-- Price Scout Database Schema
+-- Version: 007
+-- Description: Canonical spec fingerprint for matching listings to products
+-- Author: Price Scout Team
+-- Created: 2026-10-19
+--
+-- Scraped listings carry specs (cpu, ram, ssd, screen, article) but were
+-- never mapped to a products row. products.spec_fingerprint is a canonical
+-- key derived from specs and category with a unique index, so a whole batch
+-- of listings resolves to product ids in one indexed query (ProductResolver
+-- in the db crate) and missing products are created with INSERT ... ON CONFLICT.
+--
+-- The key only exists for fully identified configurations (model line +
+-- cpu + ram + ssd, or an article) and includes color, condition, brand and
+-- category, so different products (MacBook Air 13 M2 8/256 vs MacBook Pro
+-- 13 M2 8/256) never collapse into one row. Existing rows that still share
+-- a fingerprint keep it only on the oldest product; an UPDATE that would
+-- produce a fingerprint another product already owns leaves it NULL.
+
+BEGIN;
+
+-- ============================================================================
+-- FINGERPRINT FUNCTION
+-- ============================================================================
+
+-- Format: cpu=m1pro;ram=32;ssd=512;screen=16;model=macbookpro[;color=..][;cond=..][;brand=..][;cat=..][;art=Z14V0008D]
+--   cpu    - lower case, "apple" and non [a-z0-9] removed ("Apple M1 Pro" -> m1pro)
+--   ssd    - GB, 1024-multiples counted as 1000 (1 TB)
+--   screen - integer part ("16.2" -> 16)
+--   model  - specs->>'model', lower case, "apple" and non-alphanumerics removed
+--   color, cond, brand, cat - lower case alphanumerics, only when present
+--   art    - upper case alphanumerics, only when present
+-- NULL unless model, cpu, ram and ssd are all known, or an article is.
+-- Must stay in sync with ProductSpecs::fingerprint() (models crate).
+CREATE OR REPLACE FUNCTION spec_fingerprint(p_specs JSONB, p_category TEXT DEFAULT NULL)
+RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN art = '' AND (cpu = '' OR ram = '' OR ssd = '' OR model = '') THEN NULL
+        ELSE format('cpu=%s;ram=%s;ssd=%s;screen=%s;model=%s', cpu, ram, ssd, screen, model)
+             || CASE WHEN color <> '' THEN ';color=' || color ELSE '' END
+             || CASE WHEN cond <> '' THEN ';cond=' || cond ELSE '' END
+             || CASE WHEN brand <> '' THEN ';brand=' || brand ELSE '' END
+             || CASE WHEN cat <> '' THEN ';cat=' || cat ELSE '' END
+             || CASE WHEN art <> '' THEN ';art=' || art ELSE '' END
+    END
+    FROM (
+        SELECT
+            regexp_replace(replace(lower(COALESCE(p_specs->>'cpu', '')), 'apple', ''), '[^a-z0-9]', '', 'g') AS cpu,
+            CASE WHEN p_specs->>'ram' ~ '^\d+$' THEN p_specs->>'ram' ELSE '' END AS ram,
+            CASE
+                WHEN COALESCE(p_specs->>'ssd', '') !~ '^\d+$' THEN ''
+                WHEN (p_specs->>'ssd')::INTEGER >= 1024 AND (p_specs->>'ssd')::INTEGER % 1024 = 0
+                    THEN ((p_specs->>'ssd')::INTEGER / 1024 * 1000)::TEXT
+                ELSE p_specs->>'ssd'
+            END AS ssd,
+            COALESCE(substring(p_specs->>'screen' FROM '^\d+'), '') AS screen,
+            regexp_replace(replace(lower(COALESCE(p_specs->>'model', '')), 'apple', ''), '[^[:alnum:]]', '', 'g') AS model,
+            regexp_replace(lower(COALESCE(p_specs->>'color', '')), '[^[:alnum:]]', '', 'g') AS color,
+            regexp_replace(lower(COALESCE(p_specs->>'condition', '')), '[^[:alnum:]]', '', 'g') AS cond,
+            regexp_replace(lower(COALESCE(p_specs->>'brand', '')), '[^[:alnum:]]', '', 'g') AS brand,
+            regexp_replace(lower(COALESCE(p_category, '')), '[^[:alnum:]]', '', 'g') AS cat,
+            upper(regexp_replace(COALESCE(p_specs->>'article', ''), '[^A-Za-z0-9]', '', 'g')) AS art
+    ) parts
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+COMMENT ON FUNCTION spec_fingerprint(JSONB, TEXT) IS 'Canonical product key from specs and category';
+
+-- ============================================================================
+-- FINGERPRINT COLUMN
+-- ============================================================================
+
+-- Plain column kept by a trigger (not GENERATED): the backfill must be able
+-- to leave duplicates of older data without a fingerprint
+ALTER TABLE products ADD COLUMN spec_fingerprint TEXT;
+
+-- Backfill: the oldest product keeps a shared fingerprint, later duplicates stay NULL
+WITH ranked AS (
+    SELECT
+        id,
+        spec_fingerprint(specs, category) AS fingerprint,
+        ROW_NUMBER() OVER (PARTITION BY spec_fingerprint(specs, category) ORDER BY created_at, id) AS rank
+    FROM products
+)
+UPDATE products p
+SET spec_fingerprint = ranked.fingerprint
+FROM ranked
+WHERE p.id = ranked.id
+  AND ranked.fingerprint IS NOT NULL
+  AND ranked.rank = 1;
+
+CREATE UNIQUE INDEX idx_products_spec_fingerprint ON products(spec_fingerprint) WHERE spec_fingerprint IS NOT NULL;
+
+COMMENT ON COLUMN products.spec_fingerprint IS 'spec_fingerprint(specs, category), unique when known';
+
+-- INSERT keeps the computed value, so INSERT ... ON CONFLICT (spec_fingerprint)
+-- finds the existing product. UPDATE never takes a fingerprint owned by
+-- another product (e.g. a duplicate the backfill left NULL, or specs edited
+-- to match another row): the row stays without one instead of failing.
+CREATE OR REPLACE FUNCTION update_product_spec_fingerprint()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.spec_fingerprint := spec_fingerprint(NEW.specs, NEW.category);
+
+    IF TG_OP = 'UPDATE' AND NEW.spec_fingerprint IS NOT NULL AND EXISTS (
+        SELECT 1 FROM products p
+        WHERE p.spec_fingerprint = NEW.spec_fingerprint
+          AND p.id <> NEW.id
+    ) THEN
+        NEW.spec_fingerprint := NULL;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION update_product_spec_fingerprint() IS 'Keep products.spec_fingerprint in sync with specs and category (NULL on UPDATE when taken)';
+
+-- BEFORE trigger: ON CONFLICT (spec_fingerprint) sees the computed value
+CREATE TRIGGER trigger_update_product_spec_fingerprint
+    BEFORE INSERT OR UPDATE OF specs, category ON products
+    FOR EACH ROW
+    EXECUTE FUNCTION update_product_spec_fingerprint();
+
+COMMIT;
+
+-- ============================================================================
+-- VERIFICATION
+-- ============================================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE 'Column: products.spec_fingerprint (unique index)';
+    RAISE NOTICE 'Functions: spec_fingerprint(jsonb, text), update_product_spec_fingerprint';
+    RAISE NOTICE 'Triggers: trigger_update_product_spec_fingerprint';
+    RAISE NOTICE 'Example: %', spec_fingerprint('{"model": "MacBook Pro", "cpu": "Apple M1 Pro", "ram": 32, "ssd": 1024, "screen": "16.2"}', 'laptops');
+    RAISE NOTICE 'Products without fingerprint: %', (SELECT count(*) FROM products WHERE spec_fingerprint IS NULL);
+END $$;
@@ -0,0 +1,49 @@
+-- Price Scout Database Schema
+-- Version: 008
+-- Description: LISTEN/NOTIFY wake-up for the scraping job queue
+-- Author: Price Scout Team
+-- Created: 2026-10-19
+--
+-- Workers had to poll scraping_jobs on an interval: either high-priority
+-- bot requests wait for the next poll, or idle workers hammer the database
+-- with empty queries. Every insert into scraping_jobs now publishes a
+-- notification on channel 'scraping_jobs'; workers block on LISTEN and
+-- poll only as a slow fallback (JobListener in the db crate).
+--
+-- NOTIFY is delivered on commit, and identical notifications from one
+-- transaction are folded into one, so a bulk enqueue wakes each worker once.
+
+BEGIN;
+
+-- ============================================================================
+-- NOTIFICATION TRIGGER
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION notify_scraping_jobs()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('scraping_jobs', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION notify_scraping_jobs() IS 'NOTIFY scraping_jobs listeners about new pending jobs';
+
+-- Statement level: one notification per INSERT, however many rows
+CREATE TRIGGER trigger_notify_scraping_jobs
+    AFTER INSERT ON scraping_jobs
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_scraping_jobs();
+
+COMMIT;
+
+-- ============================================================================
+-- VERIFICATION
+-- ============================================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE 'Channel: scraping_jobs (LISTEN scraping_jobs)';
+    RAISE NOTICE 'Functions: notify_scraping_jobs';
+    RAISE NOTICE 'Triggers: trigger_notify_scraping_jobs';
+END $$;
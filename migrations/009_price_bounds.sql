@@ -0,0 +1,207 @@
+-- Price Scout Database Schema
+-- Version: 009
+-- Description: Learned price bounds per article and category
+-- Author: Price Scout Team
+-- Created: 2026-10-19
+--
+-- Extractors filtered candidate prices with hard-coded bands (80K-500K,
+-- 100K-400K, 10K-500K, ...) tuned for MacBook Pro. price_bounds stores a
+-- plausible range learned from price_history: p1..p99 over the last 180
+-- days, widened by a margin, per product article and per category.
+-- Scrapers load it at startup (scripts/price_bounds.py) and reject
+-- candidates outside the range before doing any further work.
+--
+-- refresh_price_bounds() is incremental: it recomputes only articles and
+-- categories with new price_history rows since the previous run, using
+-- the same transaction-id watermark as evaluate_tracking_alerts() (005).
+
+BEGIN;
+
+-- ============================================================================
+-- TABLES
+-- ============================================================================
+
+CREATE TABLE price_bounds (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    lo INTEGER NOT NULL,
+    hi INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (scope, key),
+    CONSTRAINT price_bounds_scope_valid CHECK (scope IN ('article', 'category')),
+    CONSTRAINT price_bounds_range_valid CHECK (lo > 0 AND lo <= hi)
+);
+
+COMMENT ON TABLE price_bounds IS 'Plausible price range per article / category (learned from price_history)';
+COMMENT ON COLUMN price_bounds.key IS 'Upper-case article (specs->>article) or products.category';
+COMMENT ON COLUMN price_bounds.lo IS 'Lower bound in kopecks';
+COMMENT ON COLUMN price_bounds.hi IS 'Upper bound in kopecks';
+
+INSERT INTO alert_watermarks (name, last_xmin)
+VALUES ('price_bounds', pg_snapshot_xmin(pg_current_snapshot()));
+
+-- ============================================================================
+-- FUNCTIONS
+-- ============================================================================
+
+-- Recompute bounds for the given articles / categories (NULL = all).
+--   lo = p01 * (1 - margin), hi = p99 * (1 + margin)
+-- Keys with fewer than p_min_samples recent prices are removed (the
+-- scraper falls back to the category, then to its built-in default).
+CREATE OR REPLACE FUNCTION compute_price_bounds(
+    p_articles TEXT[] DEFAULT NULL,
+    p_categories TEXT[] DEFAULT NULL,
+    p_window INTERVAL DEFAULT INTERVAL '180 days',
+    p_margin REAL DEFAULT 0.3,
+    p_min_samples INTEGER DEFAULT 5
+)
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+    -- Constant cutoff: partitions outside the window are pruned
+    v_since TIMESTAMPTZ := NOW() - p_window;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS tmp_price_bounds (
+        scope TEXT, key TEXT, lo INTEGER, hi INTEGER, samples INTEGER
+    ) ON COMMIT DROP;
+    TRUNCATE tmp_price_bounds;
+
+    -- Products of the requested articles / categories first, then only their
+    -- history inside the window (idx_price_history_product_time), instead of
+    -- joining the whole window and filtering afterwards
+    WITH scoped AS (
+        SELECT id, article, category, in_article, in_category
+        FROM (
+            SELECT
+                p.id,
+                a.article,
+                p.category,
+                a.article <> '' AND (p_articles IS NULL OR a.article = ANY(p_articles)) AS in_article,
+                p.category IS NOT NULL AND (p_categories IS NULL OR p.category = ANY(p_categories)) AS in_category
+            FROM products p
+            CROSS JOIN LATERAL (
+                SELECT upper(regexp_replace(COALESCE(p.specs->>'article', ''), '[^A-Za-z0-9]', '', 'g')) AS article
+            ) a
+        ) candidates
+        WHERE in_article OR in_category
+    ),
+    recent AS (
+        SELECT s.article, s.category, s.in_article, s.in_category, ph.price
+        FROM scoped s
+        JOIN price_history ph
+          ON ph.product_id = s.id
+         AND ph.recorded_at > v_since
+    ),
+    keyed AS (
+        SELECT 'article' AS scope, article AS key, price
+        FROM recent
+        WHERE in_article
+        UNION ALL
+        SELECT 'category', category, price
+        FROM recent
+        WHERE in_category
+    )
+    INSERT INTO tmp_price_bounds (scope, key, lo, hi, samples)
+    SELECT
+        scope,
+        key,
+        GREATEST(1, floor(percentile_cont(0.01) WITHIN GROUP (ORDER BY price) * (1 - p_margin)))::INTEGER,
+        ceil(percentile_cont(0.99) WITHIN GROUP (ORDER BY price) * (1 + p_margin))::INTEGER,
+        COUNT(*)::INTEGER
+    FROM keyed
+    GROUP BY scope, key
+    HAVING COUNT(*) >= p_min_samples;
+
+    -- Keys in scope that no longer have enough samples
+    DELETE FROM price_bounds b
+    WHERE ((b.scope = 'article' AND (p_articles IS NULL OR b.key = ANY(p_articles)))
+        OR (b.scope = 'category' AND (p_categories IS NULL OR b.key = ANY(p_categories))))
+      AND NOT EXISTS (
+          SELECT 1 FROM tmp_price_bounds t WHERE t.scope = b.scope AND t.key = b.key
+      );
+
+    INSERT INTO price_bounds (scope, key, lo, hi, samples, updated_at)
+    SELECT scope, key, lo, hi, samples, NOW()
+    FROM tmp_price_bounds
+    ON CONFLICT (scope, key) DO UPDATE SET
+        lo = EXCLUDED.lo,
+        hi = EXCLUDED.hi,
+        samples = EXCLUDED.samples,
+        updated_at = NOW();
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION compute_price_bounds(TEXT[], TEXT[], INTERVAL, REAL, INTEGER) IS 'Recompute price_bounds for articles / categories (NULL = all)';
+
+-- Recompute bounds touched by price_history rows since the last run.
+-- Returns the number of bounds rows written.
+CREATE OR REPLACE FUNCTION refresh_price_bounds()
+RETURNS INTEGER AS $$
+DECLARE
+    lo xid8;
+    hi xid8 := pg_snapshot_xmin(pg_current_snapshot());
+    v_articles TEXT[];
+    v_categories TEXT[];
+    affected INTEGER := 0;
+BEGIN
+    SELECT w.last_xmin INTO lo
+    FROM alert_watermarks w
+    WHERE w.name = 'price_bounds'
+    FOR UPDATE;
+
+    IF hi <= lo THEN
+        RETURN 0;
+    END IF;
+
+    SELECT
+        array_agg(DISTINCT upper(regexp_replace(p.specs->>'article', '[^A-Za-z0-9]', '', 'g')))
+            FILTER (WHERE COALESCE(p.specs->>'article', '') <> ''),
+        array_agg(DISTINCT p.category) FILTER (WHERE p.category IS NOT NULL)
+    INTO v_articles, v_categories
+    FROM products p
+    WHERE p.id IN (
+        SELECT DISTINCT ph.product_id
+        FROM price_history ph
+        WHERE ph.txid >= lo AND ph.txid < hi
+    );
+
+    IF v_articles IS NOT NULL OR v_categories IS NOT NULL THEN
+        affected := compute_price_bounds(
+            COALESCE(v_articles, ARRAY[]::TEXT[]),
+            COALESCE(v_categories, ARRAY[]::TEXT[])
+        );
+    END IF;
+
+    UPDATE alert_watermarks
+    SET last_xmin = hi, updated_at = NOW()
+    WHERE name = 'price_bounds';
+
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION refresh_price_bounds() IS 'Incrementally refresh price_bounds from new price_history rows';
+
+-- Initial build from existing history
+SELECT compute_price_bounds();
+
+COMMIT;
+
+-- ============================================================================
+-- VERIFICATION
+-- ============================================================================
+
+DO $$
+DECLARE
+    bounds_count INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO bounds_count FROM price_bounds;
+
+    RAISE NOTICE 'Table: price_bounds (% rows)', bounds_count;
+    RAISE NOTICE 'Functions: compute_price_bounds, refresh_price_bounds';
+END $$;
@@ -57,24 +57,23 @@ else
 fi
 echo ""
 
-# Apply migration 001
-echo -e "${YELLOW}[3/5] Applying migration 001_initial_schema.sql...${NC}"
-if psql -U "${DB_USER}" -h "${DB_HOST}" -p "${DB_PORT}" -d "${DB_NAME}" -f "${MIGRATION_DIR}/001_initial_schema.sql" > /dev/null 2>&1; then
-    echo -e "${GREEN}[+] Migration 001 applied successfully${NC}"
-else
-    echo -e "${RED}ERROR: Failed to apply migration 001${NC}"
-    exit 1
-fi
+# Apply numbered migrations in order (001_*.sql, 002_*.sql, ...)
+echo -e "${YELLOW}[3/5] Applying migrations...${NC}"
+for MIGRATION in "${MIGRATION_DIR}"/[0-9][0-9][0-9]_*.sql; do
+    NAME="$(basename "${MIGRATION}")"
+    if psql -U "${DB_USER}" -h "${DB_HOST}" -p "${DB_PORT}" -d "${DB_NAME}" -f "${MIGRATION}" > /dev/null 2>&1; then
+        echo -e "${GREEN}[+] Migration ${NAME} applied successfully${NC}"
+    else
+        echo -e "${RED}ERROR: Failed to apply migration ${NAME}${NC}"
+        exit 1
+    fi
+done
 echo ""
 
-# Apply migration 002
-echo -e "${YELLOW}[4/5] Applying migration 002_seed_stores.sql...${NC}"
-if psql -U "${DB_USER}" -h "${DB_HOST}" -p "${DB_PORT}" -d "${DB_NAME}" -f "${MIGRATION_DIR}/002_seed_stores.sql" > /dev/null 2>&1; then
-    echo -e "${GREEN}[+] Migration 002 applied successfully${NC}"
-else
-    echo -e "${RED}ERROR: Failed to apply migration 002${NC}"
-    exit 1
-fi
+# Partition maintenance (price_history partitions for upcoming months)
+echo -e "${YELLOW}[4/5] Running price_history maintenance...${NC}"
+psql -U "${DB_USER}" -h "${DB_HOST}" -p "${DB_PORT}" -d "${DB_NAME}" -t -c "SELECT * FROM price_history_maintenance();"
+echo -e "${GREEN}[+] Partitions up to date${NC}"
 echo ""
 
 # Verification
@@ -0,0 +1,153 @@
+#!/bin/bash
+# Price Scout price_history Benchmark
+# Compares the flat price_history (001) with the monthly partitioned layout (003)
+# Usage: ./bench_price_history.sh [--rows N] [--products N]
+#
+# Creates two scratch databases on the local PostgreSQL, loads the same
+# synthetic history into both and measures:
+#   - bulk insert time (one INSERT ... SELECT)
+#   - steady-state insert time (small batches, like the archive trigger)
+#   - range queries: one product / last 7 days, all stores / one month
+#   - total table + index size
+# The scratch databases are dropped at the end.
+
+set -e  # Exit on error
+
+# Configuration
+DB_USER="postgres"
+DB_HOST="localhost"
+DB_PORT="5432"
+MIGRATION_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ROWS=2000000
+PRODUCTS=500
+BATCHES=200
+BATCH_SIZE=50
+
+# Colors
+GREEN='\033[0;32m'
+BLUE='\033[0;34m'
+YELLOW='\033[1;33m'
+NC='\033[0m' # No Color
+
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --rows) ROWS="$2"; shift 2 ;;
+        --products) PRODUCTS="$2"; shift 2 ;;
+        *) echo "Unknown option: $1"; exit 1 ;;
+    esac
+done
+
+PSQL="psql -U ${DB_USER} -h ${DB_HOST} -p ${DB_PORT} -v ON_ERROR_STOP=1 -q"
+
+# Milliseconds spent running SQL ($1 = database, $2 = SQL)
+time_sql() {
+    local start end
+    start=$(date +%s%N)
+    ${PSQL} -d "$1" -c "$2" > /dev/null
+    end=$(date +%s%N)
+    echo $(( (end - start) / 1000000 ))
+}
+
+# Execution time reported by EXPLAIN ANALYZE ($1 = database, $2 = query)
+explain_ms() {
+    ${PSQL} -d "$1" -t -A -c "EXPLAIN (ANALYZE, FORMAT JSON) $2" \
+        | python3 -c "import json,sys; print(round(json.load(sys.stdin)[0]['Execution Time'], 2))"
+}
+
+setup_db() {
+    local db="$1"
+    ${PSQL} -d postgres -c "DROP DATABASE IF EXISTS ${db};"
+    ${PSQL} -d postgres -c "CREATE DATABASE ${db};"
+    ${PSQL} -d "${db}" -f "${MIGRATION_DIR}/001_initial_schema.sql" > /dev/null 2>&1
+    ${PSQL} -d "${db}" -f "${MIGRATION_DIR}/002_seed_stores.sql" > /dev/null 2>&1
+    ${PSQL} -d "${db}" -c "
+        INSERT INTO products (name, category)
+        SELECT 'Bench product ' || g, 'laptops' FROM generate_series(1, ${PRODUCTS}) g;"
+}
+
+# Synthetic history: ROWS points spread over the last 12 months, in time order
+LOAD_SQL="
+INSERT INTO price_history (product_id, store_id, price, available, recorded_at)
+SELECT
+    1 + (g % ${PRODUCTS}),
+    1 + (g % 9),
+    100000 + (g % 50000) * 10,
+    (g % 7) <> 0,
+    NOW() - INTERVAL '365 days' + (g * (INTERVAL '365 days' / ${ROWS}))
+FROM generate_series(1, ${ROWS}) g;"
+
+# Trigger-like inserts: many small batches at NOW()
+batch_inserts() {
+    local db="$1" start end
+    start=$(date +%s%N)
+    for _ in $(seq 1 ${BATCHES}); do
+        echo "INSERT INTO price_history (product_id, store_id, price, available)
+              SELECT 1 + (random() * (${PRODUCTS} - 1))::int, 1 + (random() * 8)::int, 150000, true
+              FROM generate_series(1, ${BATCH_SIZE});"
+    done | ${PSQL} -d "${db}" > /dev/null
+    end=$(date +%s%N)
+    echo $(( (end - start) / 1000000 ))
+}
+
+Q_PRODUCT_WEEK="SELECT store_id, price, recorded_at FROM price_history
+    WHERE product_id = 42 AND recorded_at >= NOW() - INTERVAL '7 days'
+    ORDER BY recorded_at DESC"
+Q_MONTH_ALL="SELECT store_id, MIN(price), COUNT(*) FROM price_history
+    WHERE recorded_at >= NOW() - INTERVAL '60 days' AND recorded_at < NOW() - INTERVAL '30 days'
+    GROUP BY store_id"
+
+echo -e "${BLUE}========================================${NC}"
+echo -e "${BLUE}price_history benchmark${NC}"
+echo -e "${BLUE}========================================${NC}"
+echo -e "Rows: ${GREEN}${ROWS}${NC}, products: ${GREEN}${PRODUCTS}${NC}, batches: ${GREEN}${BATCHES}x${BATCH_SIZE}${NC}"
+echo ""
+
+declare -A RESULTS
+
+for layout in flat partitioned; do
+    db="price_scout_bench_${layout}"
+    echo -e "${YELLOW}[${layout}] Preparing ${db}...${NC}"
+    setup_db "${db}"
+
+    if [ "${layout}" == "partitioned" ]; then
+        ${PSQL} -d "${db}" -f "${MIGRATION_DIR}/003_partition_price_history.sql" > /dev/null 2>&1
+        # Partitions for the synthetic year
+        ${PSQL} -d "${db}" -c "
+            SELECT create_price_history_partition((NOW() - make_interval(months => m))::DATE)
+            FROM generate_series(0, 12) m;" > /dev/null
+    fi
+
+    RESULTS[${layout}_bulk]=$(time_sql "${db}" "${LOAD_SQL}")
+    ${PSQL} -d "${db}" -c "VACUUM ANALYZE price_history;"
+    RESULTS[${layout}_batch]=$(batch_inserts "${db}")
+
+    # Warm up, then measure
+    explain_ms "${db}" "${Q_PRODUCT_WEEK}" > /dev/null
+    explain_ms "${db}" "${Q_MONTH_ALL}" > /dev/null
+    RESULTS[${layout}_q_product]=$(explain_ms "${db}" "${Q_PRODUCT_WEEK}")
+    RESULTS[${layout}_q_month]=$(explain_ms "${db}" "${Q_MONTH_ALL}")
+
+    RESULTS[${layout}_size]=$(${PSQL} -d "${db}" -t -A -c "
+        SELECT pg_size_pretty(SUM(pg_total_relation_size(c.oid)))
+        FROM pg_class c
+        WHERE c.relname = 'price_history'
+           OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'price_history'::regclass);")
+    echo -e "${GREEN}[+] ${layout} done${NC}"
+done
+
+echo ""
+echo -e "${BLUE}========================================${NC}"
+echo -e "${BLUE}Results${NC}"
+echo -e "${BLUE}========================================${NC}"
+printf "%-34s %14s %14s\n" "Metric" "flat (001)" "partitioned"
+printf "%-34s %14s %14s\n" "Bulk insert ${ROWS} rows (ms)" "${RESULTS[flat_bulk]}" "${RESULTS[partitioned_bulk]}"
+printf "%-34s %14s %14s\n" "${BATCHES}x${BATCH_SIZE} batch inserts (ms)" "${RESULTS[flat_batch]}" "${RESULTS[partitioned_batch]}"
+printf "%-34s %14s %14s\n" "One product, 7 days (ms)" "${RESULTS[flat_q_product]}" "${RESULTS[partitioned_q_product]}"
+printf "%-34s %14s %14s\n" "All stores, one month (ms)" "${RESULTS[flat_q_month]}" "${RESULTS[partitioned_q_month]}"
+printf "%-34s %14s %14s\n" "Table + indexes size" "${RESULTS[flat_size]}" "${RESULTS[partitioned_size]}"
+echo ""
+
+# Cleanup
+for layout in flat partitioned; do
+    ${PSQL} -d postgres -c "DROP DATABASE IF EXISTS price_scout_bench_${layout};"
+done
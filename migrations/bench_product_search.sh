@@ -0,0 +1,106 @@
+#!/bin/bash
+# Price Scout Product Search Benchmark
+# Compares name ILIKE '%q%' (001) with search_products_ranked() (006)
+# Usage: ./bench_product_search.sh [--products N]
+#
+# Creates a scratch database with N synthetic products (default 1M, mixed
+# russian/english names with size/unit variants), then times each query
+# with EXPLAIN ANALYZE (best of 3) and reports how many rows each approach
+# finds. The scratch database is dropped at the end.
+
+set -e  # Exit on error
+
+# Configuration
+DB_USER="postgres"
+DB_HOST="localhost"
+DB_PORT="5432"
+DB_NAME="price_scout_bench_search"
+MIGRATION_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PRODUCTS=1000000
+
+# Colors
+GREEN='\033[0;32m'
+BLUE='\033[0;34m'
+YELLOW='\033[1;33m'
+NC='\033[0m' # No Color
+
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --products) PRODUCTS="$2"; shift 2 ;;
+        *) echo "Unknown option: $1"; exit 1 ;;
+    esac
+done
+
+PSQL="psql -U ${DB_USER} -h ${DB_HOST} -p ${DB_PORT} -v ON_ERROR_STOP=1 -q"
+
+# Best-of-3 execution time reported by EXPLAIN ANALYZE ($1 = query)
+explain_ms() {
+    for _ in 1 2 3; do
+        ${PSQL} -d "${DB_NAME}" -t -A -c "EXPLAIN (ANALYZE, FORMAT JSON) $1"
+    done | python3 -c "
+import json, sys
+plans = [json.loads(line) for line in sys.stdin if line.strip()]
+print(round(min(p[0]['Execution Time'] for p in plans), 2))"
+}
+
+count_rows() {
+    ${PSQL} -d "${DB_NAME}" -t -A -c "SELECT COUNT(*) FROM ($1) q"
+}
+
+echo -e "${BLUE}========================================${NC}"
+echo -e "${BLUE}Product search benchmark${NC}"
+echo -e "${BLUE}========================================${NC}"
+echo -e "Products: ${GREEN}${PRODUCTS}${NC}"
+echo ""
+
+echo -e "${YELLOW}[1/3] Preparing ${DB_NAME}...${NC}"
+${PSQL} -d postgres -c "DROP DATABASE IF EXISTS ${DB_NAME};"
+${PSQL} -d postgres -c "CREATE DATABASE ${DB_NAME};"
+${PSQL} -d "${DB_NAME}" -f "${MIGRATION_DIR}/001_initial_schema.sql" > /dev/null 2>&1
+
+${PSQL} -d "${DB_NAME}" -c "
+INSERT INTO products (name, category, updated_at)
+SELECT
+    (ARRAY['Ноутбук Apple MacBook Pro', 'Apple MacBook Pro', 'Ноутбук Apple MacBook Air',
+           'Смартфон Apple iPhone', 'Ноутбук ASUS Zenbook', 'Ноутбук Lenovo ThinkPad',
+           'Ноутбук HUAWEI MateBook', 'Планшет Apple iPad Pro'])[1 + g % 8]
+    || ' ' || (ARRAY['13.3\"', '14.2\"', '16.2\"', '16\"', '15.6\"', '14 дюймов'])[1 + (g / 8) % 6]
+    || ' ' || (ARRAY['Apple M1 Pro', 'Apple M2', 'M3 Max', 'M4 Pro', 'Intel Core i7', 'AMD Ryzen 7'])[1 + (g / 48) % 6]
+    || ' ' || (ARRAY['8', '16', '18', '32', '36', '64'])[1 + (g / 288) % 6]
+    || (ARRAY[' ГБ', 'GB', ' GB'])[1 + g % 3]
+    || ' SSD ' || (ARRAY['256 ГБ', '512GB', '1 ТБ', '2TB'])[1 + (g / 1728) % 4]
+    || ' [' || md5(g::text)::varchar(8) || ']',
+    'laptops',
+    NOW() - (g % 10000) * INTERVAL '1 minute'
+FROM generate_series(1, ${PRODUCTS}) g;"
+${PSQL} -d "${DB_NAME}" -c "VACUUM ANALYZE products;"
+echo -e "${GREEN}[+] Loaded ${PRODUCTS} products${NC}"
+
+echo -e "${YELLOW}[2/3] Applying 006_product_search.sql (index build)...${NC}"
+START=$(date +%s%N)
+${PSQL} -d "${DB_NAME}" -f "${MIGRATION_DIR}/006_product_search.sql" > /dev/null
+${PSQL} -d "${DB_NAME}" -c "ANALYZE products;"
+END=$(date +%s%N)
+echo -e "${GREEN}[+] Search columns + indexes built in $(( (END - START) / 1000000 )) ms${NC}"
+
+echo -e "${YELLOW}[3/3] Running queries...${NC}"
+echo ""
+printf "%-28s %12s %8s %12s %8s\n" "Query" "ILIKE ms" "rows" "ranked ms" "rows"
+
+for QUERY in "MacBook Pro 16" "macbook pro 16.2\"" "MacBook Air M2" "iPhone" "ThinkPad 32GB" "макбук"; do
+    SQL_QUERY=${QUERY//\'/\'\'}
+    OLD="SELECT * FROM products WHERE name ILIKE '%${SQL_QUERY}%' ORDER BY updated_at DESC LIMIT 50"
+    NEW="SELECT p.* FROM search_products_ranked('${SQL_QUERY}', 50) r JOIN products p ON p.id = r.product_id ORDER BY r.score DESC, p.updated_at DESC"
+
+    printf "%-28s %12s %8s %12s %8s\n" "${QUERY}" \
+        "$(explain_ms "${OLD}")" "$(count_rows "${OLD}")" \
+        "$(explain_ms "${NEW}")" "$(count_rows "${NEW}")"
+done
+echo ""
+
+${PSQL} -d "${DB_NAME}" -t -A -c "
+SELECT 'Index sizes: trgm ' || pg_size_pretty(pg_relation_size('idx_products_search_name_trgm'))
+    || ', tsv ' || pg_size_pretty(pg_relation_size('idx_products_search_tsv'));"
+
+# Cleanup
+${PSQL} -d postgres -c "DROP DATABASE IF EXISTS ${DB_NAME};"
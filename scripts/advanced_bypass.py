@@ -18,7 +18,9 @@ import re
 from pathlib import Path
 from urllib.parse import urlparse
 from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
+from stealth_bundle import apply_stealth_context
+
+from page_signals import classify
 
 
 # Директория для хранения профилей браузера
@@ -94,7 +96,6 @@ def wait_for_cloudflare(page, timeout=30):
 
     while time.time() - start < timeout:
         url = page.url.lower()
-        content = page.content().lower()
 
         # Признаки CloudFlare challenge
         if "challenge" in url or "cdn-cgi" in url:
@@ -102,8 +103,8 @@ def wait_for_cloudflare(page, timeout=30):
             time.sleep(2)
             continue
 
-        # Проверка на успешное прохождение
-        if "just a moment" in content or "checking your browser" in content:
+        # Проверка на успешное прохождение (контент нужен только здесь)
+        if classify(page.content()).challenge:
             print("    [*] Ждём проверку браузера...")
             time.sleep(2)
             continue
@@ -196,7 +197,7 @@ def check_with_persistent_profile(url: str, profile_name: str = "default"):
             html = page.content()
 
             # Проверка CAPTCHA
-            if "captcha" in html.lower():
+            if classify(html).has("captcha"):
                 print("  [!] Обнаружена CAPTCHA")
 
                 # Попытка решить checkbox
@@ -204,7 +205,7 @@ def check_with_persistent_profile(url: str, profile_name: str = "default"):
                     time.sleep(3)
                     html = page.content()
 
-                    if "captcha" not in html.lower():
+                    if not classify(html).has("captcha"):
                         print("  [+] CAPTCHA пройдена!")
                     else:
                         print("  [X] CAPTCHA требует решения")
@@ -268,14 +269,10 @@ def check_with_headful_browser(url: str):
             timezone_id="Europe/Moscow",
         )
 
-        page = context.new_page()
+        # Stealth патчи (общий init-скрипт на весь контекст, webdriver скрыт)
+        apply_stealth_context(context)
 
-        # Stealth патчи
-        stealth = Stealth(
-            navigator_languages_override=("ru-RU", "ru"),
-            navigator_webdriver=True,  # Скрыть webdriver
-        )
-        stealth.apply_stealth_sync(page)
+        page = context.new_page()
 
         try:
             print("  [1] Загрузка (headful)...")
@@ -298,7 +295,7 @@ def check_with_headful_browser(url: str):
 
             html = page.content()
 
-            if "captcha" in html.lower():
+            if classify(html).has("captcha"):
                 print("  [X] CAPTCHA (даже в headful)")
                 return {"status": "CAPTCHA", "price": None}
 
@@ -28,7 +28,8 @@ from typing import Optional, Dict, List
 
 try:
     from playwright.sync_api import sync_playwright, Page, BrowserContext
-    from playwright_stealth import Stealth
+    import playwright_stealth  # noqa: F401 - stealth_bundle рендерит им init-скрипт
+    from stealth_bundle import apply_stealth_context
 except ImportError:
     print("Установите: pip install playwright playwright-stealth")
     sys.exit(1)
@@ -301,14 +302,10 @@ def scrape_avito(api_key: Optional[str] = None) -> Dict:
         # Пробуем загрузить cookies
         cookies_loaded = load_cookies(context, COOKIES_FILE)
 
-        page = context.new_page()
+        # Stealth patches (init-скрипт на весь контекст)
+        apply_stealth_context(context)
 
-        # Stealth patches
-        stealth = Stealth(
-            navigator_languages_override=("ru-RU", "ru"),
-            navigator_platform_override="Win32",
-        )
-        stealth.apply_stealth_sync(page)
+        page = context.new_page()
 
         try:
             # Начальная задержка
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Stealth Page Setup Benchmark
+
+Сравнивает подготовку страницы:
+  before - Stealth(...).apply_stealth_sync(page) на каждой новой странице
+  after  - stealth_bundle.apply_stealth_context(context) один раз,
+           страницы наследуют init-скрипт
+
+Замеры:
+  1. Сборка скрипта: рендер playwright-stealth vs бандл из памяти / с диска
+  2. new_page() + stealth + goto(about:blank) в браузере (N страниц)
+
+Использование:
+    python bench_stealth_setup.py [--pages=50] [--no-browser]
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import sys
+import time
+import statistics
+from typing import Callable, List
+
+from playwright_stealth import Stealth
+
+import stealth_bundle
+from stealth_bundle import RU_STEALTH, apply_stealth_context, load_bundle, render_bundle
+
+
+def measure(fn: Callable[[], None], repeat: int) -> List[float]:
+    """Время каждого вызова, мс"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(name: str, times: List[float]):
+    print(f"  {name:<34} median {statistics.median(times):8.3f} ms   "
+          f"p90 {sorted(times)[int(len(times) * 0.9) - 1]:8.3f} ms   total {sum(times):9.1f} ms")
+
+
+def bench_script_build(repeat: int):
+    print("[1] Сборка init-скрипта")
+    report("render (playwright-stealth)", measure(lambda: render_bundle(RU_STEALTH), repeat))
+
+    def from_disk():
+        stealth_bundle._bundles.clear()
+        load_bundle(RU_STEALTH)
+
+    load_bundle(RU_STEALTH)  # прогрев дискового кэша
+    report("bundle (disk cache)", measure(from_disk, repeat))
+    report("bundle (memory)", measure(lambda: load_bundle(RU_STEALTH), repeat))
+    print(f"  script size: {len(load_bundle(RU_STEALTH)) / 1024:.1f} KB")
+    print()
+
+
+def bench_page_setup(pages: int):
+    from playwright.sync_api import sync_playwright
+
+    print(f"[2] Подготовка страницы ({pages} страниц, about:blank)")
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=["--no-sandbox", "--disable-setuid-sandbox"])
+
+        # before: stealth на каждой странице
+        context = browser.new_context(locale="ru-RU")
+
+        def per_page():
+            page = context.new_page()
+            Stealth(**RU_STEALTH).apply_stealth_sync(page)
+            page.goto("about:blank")
+            page.close()
+
+        per_page()  # прогрев
+        report("before: apply_stealth_sync(page)", measure(per_page, pages))
+        context.close()
+
+        # after: бандл на контексте
+        context = browser.new_context(locale="ru-RU")
+        apply_stealth_context(context)
+
+        def inherited():
+            page = context.new_page()
+            page.goto("about:blank")
+            page.close()
+
+        inherited()
+        report("after: context bundle", measure(inherited, pages))
+
+        # Проверка: патчи действительно применены
+        page = context.new_page()
+        page.goto("about:blank")
+        print(f"  navigator.webdriver = {page.evaluate('navigator.webdriver')}, "
+              f"languages = {page.evaluate('navigator.languages')}")
+        context.close()
+        browser.close()
+    print()
+
+
+def main():
+    pages = 50
+    browser = True
+    for arg in sys.argv[1:]:
+        if arg.startswith("--pages="):
+            pages = int(arg.split("=")[1])
+        elif arg == "--no-browser":
+            browser = False
+
+    print("=" * 70)
+    print("STEALTH PAGE SETUP BENCHMARK")
+    print("=" * 70)
+
+    bench_script_build(max(pages, 20))
+    if browser:
+        bench_page_setup(pages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Catalog Pagination Crawler
+
+Обходит все страницы каталога/поиска магазина (DNS, Citilink, Ozon), а не
+только первую. Число страниц определяется по ссылкам пагинации, страницы
+2..N загружаются параллельно в рамках rate limit магазина, товары
+объединяются в один поток с дедупликацией по коду товара магазина
+(DNS data-code, Citilink id, Ozon product_id).
+
+Использование:
+    python catalog_crawler.py dns macbook-pro
+    python catalog_crawler.py citilink macbook-pro /tmp/crawler --max-pages=10
+    python catalog_crawler.py ozon https://www.ozon.ru/search/?text=MacBook+Air
+    python catalog_crawler.py dns notebooks --parse-workers=4   # разбор в пуле процессов
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import re
+import sys
+import json
+import gzip
+import time
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+from datetime import datetime
+from http.cookiejar import CookieJar
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from dns_api_scraper import CATALOGS as DNS_CATALOGS, HEADERS, parse_html as parse_dns_html
+from citilink_playwright import CATALOGS as CITILINK_CATALOGS, extract_specs, parse_next_data
+from parse_pool import ParsePool
+
+
+# === Конфигурация ===
+
+MAX_PAGES = 20          # Защита от бесконечной пагинации
+MAX_WORKERS = 4         # Параллельные загрузки на магазин
+REQUEST_TIMEOUT = 30
+
+OZON_CATALOGS = {
+    "macbook-pro-16": "https://www.ozon.ru/search/?text=MacBook+Pro+16&from_global=true",
+    "macbook-air": "https://www.ozon.ru/search/?text=MacBook+Air&from_global=true",
+    "iphone": "https://www.ozon.ru/search/?text=iPhone&from_global=true",
+}
+
+# urllib не умеет brotli - просим только gzip
+CRAWLER_HEADERS = {**HEADERS, "Accept-Encoding": "gzip"}
+
+
+# === Парсеры страниц ===
+
+def parse_dns_page(html: str) -> List[Dict]:
+    """Товары со страницы каталога DNS (ключ: code)"""
+    return parse_dns_html(html)["products"]
+
+
+def parse_citilink_page(html: str) -> List[Dict]:
+    """Товары со страницы поиска Citilink (ключ: id)"""
+    return parse_next_data(html)
+
+
+def parse_ozon_page(html: str) -> List[Dict]:
+    """
+    Товары со страницы поиска Ozon (ключ: product_id).
+
+    Карточка = ссылка /product/<slug>-<id>/, цена - первая "NNN NNN ₽"
+    после ссылки и до следующей карточки.
+    """
+    products = []
+    links = list(re.finditer(r'href="/product/([^/"]+)-(\d+)/', html))
+
+    for i, match in enumerate(links):
+        slug, product_id = match.groups()
+        end = links[i + 1].start() if i + 1 < len(links) else len(html)
+        tile = html[match.end():end]
+
+        price = None
+        price_match = re.search(r'(\d{1,3}(?:[\s\u00a0\u2006]\d{3})+)\s*₽', tile)
+        if price_match:
+            price = int(re.sub(r'\D', '', price_match.group(1)))
+
+        name = slug.replace('-', ' ').title()
+        products.append({
+            "product_id": product_id,
+            "name": name,
+            "price": price,
+            "available": True,
+            "url": f"https://www.ozon.ru/product/{slug}-{product_id}/",
+            "specs": extract_specs(name),
+        })
+
+    return products
+
+
+# === Источники ===
+
+@dataclass
+class CatalogSource:
+    """Правила пагинации и парсинга для магазина"""
+    name: str
+    catalogs: Dict[str, str]
+    parse: Callable[[str], List[Dict]]
+    key: str                 # Поле с кодом товара магазина
+    page_param: str          # Query-параметр номера страницы
+    rate_limit: float        # Минимальный интервал между запросами (сек)
+
+
+SOURCES: Dict[str, CatalogSource] = {
+    "dns": CatalogSource(
+        name="dns",
+        catalogs=DNS_CATALOGS,
+        parse=parse_dns_page,
+        key="code",
+        page_param="p",
+        rate_limit=2.0,
+    ),
+    "citilink": CatalogSource(
+        name="citilink",
+        catalogs=CITILINK_CATALOGS,
+        parse=parse_citilink_page,
+        key="id",
+        page_param="p",
+        rate_limit=5.0,  # Агрессивный rate limiting
+    ),
+    "ozon": CatalogSource(
+        name="ozon",
+        catalogs=OZON_CATALOGS,
+        parse=parse_ozon_page,
+        key="product_id",
+        page_param="page",
+        rate_limit=3.0,
+    ),
+}
+
+
+# === Пагинация ===
+
+def page_url(url: str, param: str, page: int) -> str:
+    """URL страницы N (страница 1 - исходный URL без параметра)"""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != param]
+    if page > 1:
+        query.append((param, str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def find_page_numbers(html: str, param: str) -> Set[int]:
+    """
+    Номера страниц из ссылок пагинации (?p=3, &page=3).
+
+    Магазины показывают "окно" ссылок вокруг текущей страницы, поэтому
+    каждая загруженная страница может открыть новые номера.
+    """
+    pattern = r'[?&](?:amp;)?' + re.escape(param) + r'=(\d+)'
+    return {int(n) for n in re.findall(pattern, html)}
+
+
+def parse_page(parse: Callable[[str], List[Dict]], page_param: str, html: str) -> Tuple[List[Dict], Set[int]]:
+    """Разбор страницы: (товары, номера страниц из пагинации). Выполняется и в ParsePool"""
+    return parse(html), find_page_numbers(html, page_param)
+
+
+# === HTTP ===
+
+class RateLimiter:
+    """
+    Потокобезопасный rate limit: запросы стартуют не чаще min_interval.
+
+    Каждый поток резервирует следующий слот под локом и спит вне лока,
+    поэтому загрузки перекрываются, а частота запросов к магазину - нет.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class HttpSession:
+    """urllib opener с общими cookies для всех страниц каталога"""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None):
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.headers = headers or CRAWLER_HEADERS
+
+    def get(self, url: str, referer: Optional[str] = None) -> str:
+        headers = dict(self.headers)
+        if referer:
+            headers["Referer"] = referer
+            headers["Sec-Fetch-Site"] = "same-origin"
+
+        req = urllib.request.Request(url, headers=headers)
+        with self.opener.open(req, timeout=REQUEST_TIMEOUT) as response:
+            data = response.read()
+            if response.headers.get('Content-Encoding') == 'gzip':
+                data = gzip.decompress(data)
+            return data.decode('utf-8', errors='ignore')
+
+
+# === Краулер ===
+
+class CatalogCrawler:
+    """
+    Параллельный обход пагинации каталога.
+
+    Пример:
+        crawler = CatalogCrawler(SOURCES["dns"], DNS_CATALOGS["macbook-pro"])
+        for product in crawler.crawl():
+            print(product["code"], product["name"])
+    """
+
+    def __init__(
+        self,
+        source: CatalogSource,
+        url: str,
+        max_pages: int = MAX_PAGES,
+        workers: int = MAX_WORKERS,
+        fetch: Optional[Callable[[str, Optional[str]], str]] = None,
+        parse_pool: Optional[ParsePool] = None,
+    ):
+        self.source = source
+        self.url = url
+        self.max_pages = max_pages
+        self.workers = workers
+        self.limiter = RateLimiter(source.rate_limit)
+        self.fetch = fetch or HttpSession().get
+        self.parse_pool = parse_pool
+
+        self.pages_fetched: List[int] = []
+        self.errors: Dict[int, str] = {}
+        self.duplicates = 0
+
+    def _load_page(self, page: int) -> Union[Tuple[List[Dict], Set[int]], Future]:
+        """
+        Загрузка и парсинг одной страницы: (товары, номера страниц из пагинации).
+
+        С parse_pool разбор уходит в процесс-воркер, а поток загрузки сразу
+        возвращает Future и свободен для следующей страницы.
+        """
+        self.limiter.wait()
+        referer = self.url if page > 1 else None
+        html = self.fetch(page_url(self.url, self.source.page_param, page), referer)
+        if self.parse_pool:
+            return self.parse_pool.submit(parse_page, html, self.source.parse, self.source.page_param)
+        return parse_page(self.source.parse, self.source.page_param, html)
+
+    def _product_key(self, product: Dict):
+        key = product.get(self.source.key)
+        if key is not None:
+            return str(key)
+        # Без кода (fallback-парсинг) - по названию и цене
+        return (product.get("name"), product.get("price"))
+
+    def crawl(self) -> Iterator[Dict]:
+        """
+        Поток уникальных товаров по мере загрузки страниц.
+
+        Страница 1 загружается первой (cookies + число страниц), остальные
+        параллельно. Ошибка на странице 1 пробрасывается, на остальных -
+        записывается в self.errors.
+        """
+        seen_keys = set()
+
+        def unique(products: List[Dict], page: int) -> Iterator[Dict]:
+            for product in products:
+                key = self._product_key(product)
+                if key in seen_keys:
+                    self.duplicates += 1
+                    continue
+                seen_keys.add(key)
+                product["page"] = page
+                yield product
+
+        loaded = self._load_page(1)
+        products, pages = loaded.result() if isinstance(loaded, Future) else loaded
+        self.pages_fetched.append(1)
+        yield from unique(products, 1)
+
+        scheduled = {1}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {}
+
+            def schedule(numbers: Set[int]):
+                for n in sorted(numbers):
+                    if n not in scheduled and 1 < n <= self.max_pages:
+                        scheduled.add(n)
+                        futures[pool.submit(self._load_page, n)] = n
+
+            schedule(pages)
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page = futures.pop(future)
+                    try:
+                        loaded = future.result()
+                        if isinstance(loaded, Future):
+                            # Страница загружена, ждём разбор в ParsePool
+                            futures[loaded] = page
+                            continue
+                        products, pages = loaded
+                    except Exception as e:
+                        self.errors[page] = f"{type(e).__name__}: {e}"
+                        print(f"    [!] Page {page}: {self.errors[page]}", file=sys.stderr)
+                        continue
+
+                    self.pages_fetched.append(page)
+                    yield from unique(products, page)
+                    schedule(pages)
+
+
+def crawl_catalog(
+    store: str,
+    catalog: str,
+    max_pages: int = MAX_PAGES,
+    workers: int = MAX_WORKERS,
+    parse_workers: int = 0,
+) -> dict:
+    """
+    Полный обход каталога магазина. Формат результата как у *_scraper JSON.
+
+    parse_workers > 0 - разбор страниц в пуле процессов (ParsePool).
+    """
+    source = SOURCES[store]
+    url = source.catalogs.get(catalog, catalog)
+
+    result = {
+        "source": store,
+        "url": url,
+        "products": [],
+        "pages": [],
+        "timestamp": datetime.now().isoformat(),
+        "status": "error",
+    }
+
+    parse_pool = ParsePool(workers=parse_workers) if parse_workers > 0 else None
+    crawler = CatalogCrawler(source, url, max_pages=max_pages, workers=workers, parse_pool=parse_pool)
+    start_time = time.time()
+
+    try:
+        for product in crawler.crawl():
+            result["products"].append(product)
+    except urllib.error.HTTPError as e:
+        result["error"] = f"http_{e.code}"
+        result["status"] = "http_error"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if parse_pool:
+            parse_pool.close()
+            result["parse_wait"] = round(parse_pool.blocked, 2)
+
+    result["pages"] = sorted(crawler.pages_fetched)
+    result["page_errors"] = {str(k): v for k, v in crawler.errors.items()}
+    result["duplicates"] = crawler.duplicates
+    result["time"] = round(time.time() - start_time, 2)
+
+    if result["products"]:
+        result["status"] = "success"
+    elif result["status"] == "error" and "error" not in result:
+        result["status"] = "no_products"
+
+    return result
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args or args[0] not in SOURCES:
+        print(f"Usage: {sys.argv[0]} <{'|'.join(SOURCES)}> [catalog|url] [output_dir] "
+              f"[--max-pages=N] [--workers=N] [--parse-workers=N]")
+        sys.exit(1)
+
+    store = args[0]
+    catalog = args[1] if len(args) > 1 else next(iter(SOURCES[store].catalogs))
+    output_dir = args[2] if len(args) > 2 else f"/tmp/{store}_crawler"
+
+    max_pages = MAX_PAGES
+    workers = MAX_WORKERS
+    parse_workers = 0
+    for arg in sys.argv[1:]:
+        if arg.startswith("--max-pages="):
+            max_pages = int(arg.split("=")[1])
+        elif arg.startswith("--workers="):
+            workers = int(arg.split("=")[1])
+        elif arg.startswith("--parse-workers="):
+            parse_workers = int(arg.split("=")[1])
+
+    if catalog not in SOURCES[store].catalogs and not catalog.startswith("http"):
+        print(f"[!] Unknown catalog: {catalog}")
+        print(f"Available: {', '.join(SOURCES[store].catalogs.keys())}")
+        sys.exit(1)
+
+    print("=" * 50)
+    print(f"  Catalog Crawler: {store}")
+    print("=" * 50)
+
+    result = crawl_catalog(store, catalog, max_pages=max_pages, workers=workers, parse_workers=parse_workers)
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_name = re.sub(r'[^\w-]', '_', catalog)[:50]
+    json_file = Path(output_dir) / f"{safe_name}_{timestamp}.json"
+    json_file.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(f"  Страниц: {len(result['pages'])} ({result['time']}s)")
+    print(f"  Товаров: {len(result['products'])} (дубликатов: {result['duplicates']})")
+    prices = [p["price"] for p in result["products"] if p.get("price")]
+    if prices:
+        print(f"  Цены: {min(prices):,} - {max(prices):,} RUB")
+    if result.get("error"):
+        print(f"  [!] Error: {result['error']}")
+    print(f"\n[+] JSON: {json_file}")
+
+    sys.exit(0 if result["status"] == "success" else 1)
+
+
+if __name__ == "__main__":
+    main()
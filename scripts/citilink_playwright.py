@@ -13,7 +13,7 @@ from pathlib import Path
 from datetime import datetime
 
 from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
+from stealth_bundle import apply_stealth_context
 
 
 CATALOGS = {
@@ -90,6 +90,44 @@ def human_scroll(page):
         time.sleep(random.uniform(0.3, 0.7))
 
 
+def parse_next_data(html: str) -> list:
+    """Извлечение товаров из __NEXT_DATA__ (Next.js) страницы поиска/каталога"""
+    products = []
+
+    match = re.search(
+        r'<script id="__NEXT_DATA__" type="application/json">(.+?)</script>',
+        html
+    )
+    if not match:
+        return products
+
+    try:
+        data = json.loads(match.group(1))
+    except json.JSONDecodeError as e:
+        print(f"    [!] JSON parse error: {e}")
+        return products
+
+    props = data.get("props", {}).get("pageProps", {}).get("effectorValues", {})
+
+    for key, value in props.items():
+        if isinstance(value, dict) and "products" in value:
+            for item in value["products"]:
+                name = item.get("shortName") or item.get("name", "")
+                products.append({
+                    "id": item.get("id"),
+                    "name": name,
+                    "price": item.get("price", {}).get("price", 0),
+                    "old_price": item.get("price", {}).get("old"),
+                    "available": item.get("isAvailable", False),
+                    "rating": item.get("rating", {}).get("value"),
+                    "reviews": item.get("rating", {}).get("reviewsCount"),
+                    "url": f"https://www.citilink.ru/product/{item.get('slug', '')}/" if item.get("slug") else None,
+                    "specs": extract_specs(name)
+                })
+
+    return products
+
+
 def scrape_citilink(url: str, output_dir: str) -> dict:
     """Скрейпинг Citilink с ожиданием загрузки"""
 
@@ -119,14 +157,10 @@ def scrape_citilink(url: str, output_dir: str) -> dict:
                 timezone_id="Europe/Moscow",
             )
 
-            page = context.new_page()
+            # Stealth patches (init-скрипт на весь контекст)
+            apply_stealth_context(context)
 
-            # Stealth patches
-            stealth = Stealth(
-                navigator_languages_override=("ru-RU", "ru"),
-                navigator_platform_override="Win32",
-            )
-            stealth.apply_stealth_sync(page)
+            page = context.new_page()
 
             print(f"[*] Загрузка: {url}")
 
@@ -171,35 +205,7 @@ def scrape_citilink(url: str, output_dir: str) -> dict:
             print(f"    HTML: {html_file} ({len(html)} bytes)")
 
             # Парсим __NEXT_DATA__
-            import re
-            match = re.search(
-                r'<script id="__NEXT_DATA__" type="application/json">(.+?)</script>',
-                html
-            )
-
-            if match:
-                try:
-                    data = json.loads(match.group(1))
-                    props = data.get("props", {}).get("pageProps", {}).get("effectorValues", {})
-
-                    for key, value in props.items():
-                        if isinstance(value, dict) and "products" in value:
-                            for item in value["products"]:
-                                name = item.get("shortName") or item.get("name", "")
-                                product = {
-                                    "id": item.get("id"),
-                                    "name": name,
-                                    "price": item.get("price", {}).get("price", 0),
-                                    "old_price": item.get("price", {}).get("old"),
-                                    "available": item.get("isAvailable", False),
-                                    "rating": item.get("rating", {}).get("value"),
-                                    "reviews": item.get("rating", {}).get("reviewsCount"),
-                                    "url": f"https://www.citilink.ru/product/{item.get('slug', '')}/" if item.get("slug") else None,
-                                    "specs": extract_specs(name)
-                                }
-                                result["products"].append(product)
-                except json.JSONDecodeError as e:
-                    print(f"    [!] JSON parse error: {e}")
+            result["products"] = parse_next_data(html)
 
             # Fallback: извлекаем через JavaScript evaluate
             if not result["products"]:
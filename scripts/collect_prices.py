@@ -21,7 +21,13 @@ from dataclasses import dataclass, asdict
 from urllib.parse import urlparse, quote_plus
 
 from playwright.sync_api import sync_playwright, Page
-from playwright_stealth import Stealth
+from stealth_bundle import apply_stealth_context
+
+from price_bounds import Bounds, bounds_for, parse_text_price
+from page_signals import classify
+from page_extractors import PageItem, extract_page
+from snapshot_diff import SnapshotLog, print_delta, stream_name
+from result_store import ResultStore
 
 
 # === Конфигурация ===
@@ -61,9 +67,8 @@ USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0",
 ]
 
-# Диапазон цен для MacBook (фильтрация мусора)
-MIN_PRICE = 80000
-MAX_PRICE = 500000
+# Категория для диапазона цен, если для артикула он не выучен (price_bounds.py)
+PRICE_CATEGORY = "laptops"
 
 
 # === Dataclasses ===
@@ -78,6 +83,9 @@ class PriceResult:
     url: str
     status: str  # OK, CAPTCHA, Blocked, Error, No Price
     timestamp: str
+    extract_source: str = ""  # js, html (page_extractors)
+    transfer_bytes: int = 0   # передано из браузера
+    extract_ms: float = 0.0   # время извлечения
 
 
 # === Утилиты ===
@@ -107,60 +115,41 @@ def human_mouse_move(page: Page):
 
 # === Парсинг цен ===
 
-def extract_price(html: str) -> Optional[int]:
+def extract_price(html: str, bounds: Bounds) -> Optional[int]:
     """Извлечь цену из HTML (несколько методов)"""
 
     # Приоритет 1: Schema.org itemprop="price"
     match = re.search(r'itemprop="price"\s+content="(\d+)"', html)
     if match:
         price = int(match.group(1))
-        if MIN_PRICE < price < MAX_PRICE:
+        if price in bounds:
             return price
 
     # Приоритет 2: data-meta-price (Citilink)
     match = re.search(r'data-meta-price="(\d+)"', html)
     if match:
         price = int(match.group(1))
-        if MIN_PRICE < price < MAX_PRICE:
+        if price in bounds:
             return price
 
     # Приоритет 3: JSON-LD "price"
     for match in re.findall(r'"price"[:\s]*(\d+)', html):
         price = int(match)
-        if MIN_PRICE < price < MAX_PRICE:
+        if price in bounds:
             return price
 
-    # Приоритет 4: Текстовые цены (XXX XXX ₽)
-    for match in re.findall(r'(\d{2,3}[\s\u00a0]?\d{3})[\s\u00a0]*(?:₽|руб|RUB)', html):
-        clean = match.replace(" ", "").replace("\u00a0", "")
-        if clean.isdigit():
-            price = int(clean)
-            if MIN_PRICE < price < MAX_PRICE:
-                return price
+    # Приоритет 4: Текстовые цены (XXX XXX ₽) - только числа нужной разрядности
+    for match in bounds.text_pattern().findall(html):
+        price = parse_text_price(match)
+        if price in bounds:
+            return price
 
     return None
 
 
 def extract_availability(html: str) -> Optional[bool]:
-    """Извлечь информацию о наличии"""
-    html_lower = html.lower()
-
-    if 'instock' in html_lower or 'in_stock' in html_lower or '"availability":"instock"' in html_lower:
-        return True
-    elif 'outofstock' in html_lower or 'out_of_stock' in html_lower or 'soldout' in html_lower:
-        return False
-    elif 'isavailable":true' in html_lower or '"available":true' in html_lower:
-        return True
-    elif 'isavailable":false' in html_lower or '"available":false' in html_lower:
-        return False
-
-    # Текстовый поиск
-    if 'в наличии' in html_lower or 'есть в наличии' in html_lower:
-        return True
-    elif 'нет в наличии' in html_lower or 'под заказ' in html_lower:
-        return False
-
-    return None
+    """Извлечь информацию о наличии (общий проход page_signals)"""
+    return classify(html).availability
 
 
 def extract_product_name(html: str, query: str) -> str:
@@ -187,20 +176,8 @@ def extract_product_name(html: str, query: str) -> str:
 
 
 def detect_captcha(html: str, url: str) -> bool:
-    """Проверка на CAPTCHA"""
-    html_lower = html.lower()
-    url_lower = url.lower()
-
-    indicators = [
-        "captcha" in url_lower,
-        "showcaptcha" in url_lower,
-        "recaptcha" in html_lower,
-        "hcaptcha" in html_lower,
-        "cf-browser-verification" in html_lower,
-        "smartcaptcha" in html_lower,
-    ]
-
-    return any(indicators)
+    """Проверка на CAPTCHA (общий проход page_signals)"""
+    return classify(html, url).captcha is not None
 
 
 # === Специализированные парсеры ===
@@ -235,6 +212,22 @@ def parse_citilink_nextjs(html: str, query: str) -> List[Dict]:
     return products
 
 
+def html_items(html: str, query: str, parser: str, bounds: Bounds) -> List[PageItem]:
+    """Разбор page.content() - если JS-экстрактор магазина ничего не нашёл"""
+    if parser == "nextjs":
+        items = [PageItem(p["name"], p["price"], p["available"], p["url"])
+                 for p in parse_citilink_nextjs(html, query)]
+        if not items:
+            # Fallback: data-meta-price
+            items = [PageItem("", int(price), True) for price in re.findall(r'data-meta-price="(\d+)"', html)[:1]]
+        return items
+
+    price = extract_price(html, bounds)
+    if price is None:
+        return []
+    return [PageItem(extract_product_name(html, query), price, extract_availability(html))]
+
+
 # === Основной парсер ===
 
 def scrape_store(store_name: str, query: str, config: dict) -> PriceResult:
@@ -287,15 +280,11 @@ def scrape_store(store_name: str, query: str, config: dict) -> PriceResult:
             timezone_id="Europe/Moscow",
         )
 
-        page = context.new_page()
-
-        # Применяем stealth если нужно
+        # Применяем stealth если нужно (init-скрипт на весь контекст)
         if method == "stealth":
-            stealth = Stealth(
-                navigator_languages_override=("ru-RU", "ru"),
-                navigator_platform_override="Win32",
-            )
-            stealth.apply_stealth_sync(page)
+            apply_stealth_context(context)
+
+        page = context.new_page()
 
         try:
             # Extra delay for stores with rate limiting
@@ -320,42 +309,30 @@ def scrape_store(store_name: str, query: str, config: dict) -> PriceResult:
                 human_scroll(page)
                 random_delay(1, 2)
 
-            html = page.content()
-            current_url = page.url
+            # Извлечение в браузере (page.content() - только fallback)
+            bounds = bounds_for(query, PRICE_CATEGORY)
+            extraction = extract_page(page, store_name, bounds,
+                                      fallback=lambda html: html_items(html, query, parser, bounds))
+            result.extract_source = extraction.source
+            result.transfer_bytes = extraction.bytes
+            result.extract_ms = round(extraction.elapsed * 1000, 1)
+            print(f"  [*] Extract: {extraction.report()}")
 
             # Проверка CAPTCHA
-            if detect_captcha(html, current_url):
+            if extraction.signals.captcha:
                 print("  [X] CAPTCHA detected!")
                 result.status = "CAPTCHA"
                 return result
 
-            # Парсинг
-            if parser == "nextjs":
-                # Citilink: специальный парсер
-                products = parse_citilink_nextjs(html, query)
-                if products:
-                    # Берём минимальную цену
-                    products.sort(key=lambda x: x["price"])
-                    best = products[0]
-                    result.price = best["price"]
-                    result.available = best["available"]
-                    result.product_name = best["name"]
-                    result.url = best["url"]
-                    result.status = "OK"
-                    print(f"  [+] Найдено {len(products)} товаров")
-                else:
-                    # Fallback: data-meta-price
-                    prices = re.findall(r'data-meta-price="(\d+)"', html)
-                    if prices:
-                        result.price = int(prices[0])
-                        result.available = True
-                        result.status = "OK"
-                        print(f"  [+] Цена (fallback): {result.price:,} RUB".replace(",", " "))
-            else:
-                # Общий парсер
-                result.price = extract_price(html)
-                result.available = extract_availability(html)
-                result.product_name = extract_product_name(html, query)
+            # Citilink: минимальная цена выдачи, остальные - первый товар по приоритету
+            item = extraction.cheapest if parser == "nextjs" else extraction.best
+            if item:
+                result.price = item.price
+                result.available = item.available if item.available is not None else extraction.signals.availability
+                result.product_name = item.name or extraction.name or query
+                if parser == "nextjs" and item.url:
+                    result.url = item.url
+                    print(f"  [+] Найдено {len(extraction.items)} товаров")
 
             if result.price:
                 result.status = "OK"
@@ -443,6 +420,13 @@ def main():
     else:
         print("\n[X] Цены не найдены")
 
+    # Извлечение: объём данных из браузера и время по магазинам
+    extracted = [r for r in results if r.extract_source]
+    if extracted:
+        print("\n[*] Извлечение:")
+        for r in extracted:
+            print(f"    {r.store}: {r.extract_source} {r.transfer_bytes / 1024:.1f} KB, {r.extract_ms:.0f} ms")
+
     # Проблемные магазины
     failed = [r for r in results if r.status != "OK"]
     if failed:
@@ -450,29 +434,23 @@ def main():
         for r in failed:
             print(f"    {r.store}: {r.status}")
 
-    # Сохранение JSON
+    # Сохранение (data/results - сегменты с индексом по магазину и времени)
     output_dir = Path(__file__).parent.parent / "data"
     output_dir.mkdir(exist_ok=True)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = output_dir / f"prices_{timestamp}.json"
-
-    output_data = {
-        "query": query,
-        "timestamp": datetime.now().isoformat(),
-        "results": [asdict(r) for r in results],
-        "summary": {
-            "total_stores": len(results),
-            "prices_found": len(ok_results),
-            "min_price": ok_results[0].price if ok_results else None,
-            "max_price": ok_results[-1].price if ok_results else None,
-        }
-    }
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
-
-    print(f"\n[+] Сохранено: {output_file}")
+    store = ResultStore(output_dir / "results")
+    run = store.append_run("prices", [asdict(r) for r in results], query=query)
+
+    print(f"\n[+] Сохранено: {store.root} (run {run})")
+
+    # Изменения с прошлого запуска по этому запросу (в журнал - только разница)
+    delta = SnapshotLog(output_dir, stream_name("prices", query)).record(
+        [{"store": r.store, "price": r.price, "available": r.available,
+          "name": r.product_name, "url": r.url} for r in ok_results],
+        meta={"query": query},
+    )
+    if delta.seq > 1:
+        print_delta(delta)
 
 
 if __name__ == "__main__":
@@ -7,7 +7,6 @@ DNS-Shop API Scraper
 
 import sys
 import json
-import re
 import time
 import random
 from pathlib import Path
@@ -18,6 +17,8 @@ import urllib.error
 import gzip
 from io import BytesIO
 
+from dns_catalog import iter_cards, parse_catalog_info
+
 
 CATALOGS = {
     "macbook-pro": "https://www.dns-shop.ru/catalog/recipe/b70b01357dbede01/apple-macbook-pro/",
@@ -95,45 +96,16 @@ def parse_html(html: str) -> dict:
     }
 
     # Извлекаем JSON.stringify данные (JSON-LD вставленный через JS)
-    match = re.search(r'JSON\.stringify\((\{[^}]+\}[^)]+)\)', html)
-    if match:
-        try:
-            raw = match.group(1).replace('\\/', '/')
-            data = json.loads(raw)
-            result["catalog"] = {
-                "name": data.get("name"),
-                "low_price": data.get("offers", {}).get("lowPrice"),
-                "high_price": data.get("offers", {}).get("highPrice"),
-                "count": data.get("offers", {}).get("offerCount"),
-                "rating": data.get("aggregateRating", {}).get("ratingValue"),
-                "reviews": data.get("aggregateRating", {}).get("reviewCount"),
-            }
-        except json.JSONDecodeError:
-            pass
-
-    # Извлекаем товары
-    product_pattern = re.compile(
-        r'data-product="([^"]+)"[^>]*data-code="(\d+)".*?'
-        r'catalog-product__name[^>]*href="([^"]+)"[^>]*><span>([^<]+)',
-        re.DOTALL
-    )
-
-    for match in product_pattern.finditer(html):
-        uuid, code, url, name = match.groups()
-        short_name = name.split('[')[0].strip()
-
-        specs = re.search(r'\[([^\]]+)\]', name)
-        specs_str = specs.group(1) if specs else ''
-
-        ram = re.search(r'RAM\s*(\d+)\s*ГБ', specs_str)
-        ssd = re.search(r'SSD\s*(\d+)\s*ГБ', specs_str)
+    result["catalog"] = parse_catalog_info(html)
 
+    # Извлекаем товары (линейный проход, см. dns_catalog.py)
+    for card in iter_cards(html):
         result["products"].append({
-            "code": code,
-            "name": short_name,
-            "ram": ram.group(1) if ram else None,
-            "ssd": ssd.group(1) if ssd else None,
-            "url": f"https://www.dns-shop.ru{url}"
+            "code": card.code,
+            "name": card.name,
+            "ram": card.ram,
+            "ssd": card.ssd,
+            "url": card.url
         })
 
     return result
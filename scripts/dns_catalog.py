@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+DNS Catalog - разбор карточек товаров каталога DNS-Shop
+
+Общий парсер для dns_api_scraper.py, extract_dns_prices.py и dns_scraper.sh.
+Раньше все три копировали регулярку
+
+    data-product="..."[^>]*data-code="(\\d+)".*?catalog-product__name...<span>(...)
+
+с re.DOTALL: ленивый .*? на карточке без названия дочитывает страницу до
+конца, и на больших каталогах (или битом HTML) разбор становится квадратичным.
+
+Здесь карточки выделяются сканером по маркерам за один линейный проход:
+    - data-product="UUID" ... data-code="CODE" в одном теге - начало карточки
+    - карточка заканчивается там, где начинается следующая
+    - внутри карточки: тег с catalog-product__name, его href и <span>название</span>
+
+Каждый символ страницы просматривается O(1) раз (str.find только вперёд,
+все поиски ограничены своей карточкой), поэтому время - O(размер HTML)
+на любом входе. Карточка без названия пропускается, а не "забирает"
+название следующей карточки, как делала регулярка.
+
+Использование:
+    from dns_catalog import iter_cards, parse_catalog_info
+
+    for card in iter_cards(html):
+        print(card.code, card.name, card.specs)
+
+    products = cards_batch(html)  # ListingBatch для filter_and_rank
+
+    python dns_catalog.py bench [page.html ...] [--repeat=N]
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import re
+import sys
+import json
+import time
+import random
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from listing_batch import ListingBatch
+
+
+BASE_URL = "https://www.dns-shop.ru"
+
+CARD_MARKER = 'data-product="'
+CODE_ATTR = 'data-code="'
+NAME_MARKER = "catalog-product__name"
+HREF_ATTR = 'href="'
+NAME_OPEN = "><span>"
+
+RAM_PATTERN = re.compile(r'RAM\s*(\d+)\s*ГБ')
+SSD_PATTERN = re.compile(r'SSD\s*(\d+)\s*ГБ')
+CPU_PATTERN = re.compile(r'(?:Apple\s+)?(M\d+(?:\s+(?:Pro|Max|Ultra))?)', re.I)
+SCREEN_PATTERN = re.compile(r'(\d{2})(?:\.\d)?["\s]')
+SPECS_PATTERN = re.compile(r'\[([^\]]+)\]')
+
+
+# === Карточка ===
+
+@dataclass
+class DnsCard:
+    """Карточка товара в каталоге DNS"""
+    uuid: str
+    code: str
+    path: str
+    full_name: str
+
+    @property
+    def url(self) -> str:
+        return f"{BASE_URL}{self.path}"
+
+    @property
+    def name(self) -> str:
+        """Название без характеристик в квадратных скобках"""
+        return self.full_name.split('[')[0].strip()
+
+    @property
+    def specs_text(self) -> str:
+        """Характеристики из названия: '16" ... RAM 16 ГБ, SSD 512 ГБ ...'"""
+        match = SPECS_PATTERN.search(self.full_name)
+        return match.group(1) if match else ''
+
+    @property
+    def ram(self) -> Optional[str]:
+        match = RAM_PATTERN.search(self.specs_text)
+        return match.group(1) if match else None
+
+    @property
+    def ssd(self) -> Optional[str]:
+        match = SSD_PATTERN.search(self.specs_text)
+        return match.group(1) if match else None
+
+    @property
+    def specs(self) -> Dict:
+        """Specs для filter_and_rank (формат dns_scraper.sh)"""
+        cpu = CPU_PATTERN.search(self.name)
+        screen = SCREEN_PATTERN.search(self.name)
+        return {
+            'ram': int(self.ram) if self.ram else None,
+            'ssd': int(self.ssd) if self.ssd else None,
+            'cpu': cpu.group(1).strip() if cpu else None,
+            'screen': screen.group(1) if screen else None,
+            'article': self.code,  # DNS code is the article number
+        }
+
+
+# === Сканер ===
+
+def _card_code(html: str, start: int, tag_end: int) -> Optional[str]:
+    """data-code="digits" в том же теге, что и data-product"""
+    pos = html.find(CODE_ATTR, start, tag_end)
+    if pos < 0:
+        return None
+    pos += len(CODE_ATTR)
+    end = html.find('"', pos, tag_end)
+    code = html[pos:end] if end > pos else ''
+    return code if code.isdigit() else None
+
+
+def _card_name(html: str, start: int, end: int) -> Optional[Tuple[str, str]]:
+    """(href, название) из первого тега catalog-product__name внутри [start, end)"""
+    pos = html.find(NAME_MARKER, start, end)
+    while pos >= 0:
+        tag_end = html.find('>', pos, end)
+        if tag_end < 0:
+            return None
+
+        # Как у регулярки: последний href в теге, сразу за тегом <span>текст
+        href = html.rfind(HREF_ATTR, pos, tag_end)
+        if href >= 0 and html.startswith(NAME_OPEN, tag_end):
+            href += len(HREF_ATTR)
+            href_end = html.find('"', href, tag_end)
+            text = tag_end + len(NAME_OPEN)
+            text_end = html.find('<', text, end)
+            if text_end < 0:
+                text_end = end
+            if href_end > href and text_end > text:
+                return html[href:href_end], html[text:text_end]
+
+        pos = html.find(NAME_MARKER, tag_end, end)
+    return None
+
+
+def iter_cards(html: str) -> Iterator[DnsCard]:
+    """Карточки товаров за один линейный проход по HTML"""
+    length = len(html)
+    pos = html.find(CARD_MARKER)
+
+    while pos >= 0:
+        uuid_start = pos + len(CARD_MARKER)
+
+        # Карточка длится до следующего data-product; все поиски ниже - внутри неё
+        next_card = html.find(CARD_MARKER, uuid_start)
+        card_end = next_card if next_card >= 0 else length
+
+        uuid_end = html.find('"', uuid_start, card_end)
+        tag_end = html.find('>', uuid_end, card_end) if uuid_end >= 0 else -1
+        if tag_end < 0:
+            # Незакрытый атрибут или тег: карточка битая, названия в ней нет
+            pos = next_card
+            continue
+
+        code = _card_code(html, uuid_end, tag_end)
+        if code and uuid_end > uuid_start:
+            found = _card_name(html, tag_end, card_end)
+            if found:
+                path, full_name = found
+                yield DnsCard(html[uuid_start:uuid_end], code, path, full_name)
+
+        pos = next_card
+
+
+def cards_batch(html: str) -> ListingBatch:
+    """Карточки каталога в ListingBatch (цены в карточках нет - только specs)"""
+    products = ListingBatch("dns")
+    for card in iter_cards(html):
+        products.append(card.name, None, url=card.url, product_id=card.code, specs=card.specs)
+    return products
+
+
+def parse_catalog_info(html: str) -> Dict:
+    """Сводка каталога из JSON.stringify (JSON-LD, вставленный через JS)"""
+    match = re.search(r'JSON\.stringify\((\{[^}]+\}[^)]+)\)', html)
+    if match:
+        try:
+            raw = match.group(1).replace('\\/', '/')
+            data = json.loads(raw)
+            return {
+                'name': data.get('name'),
+                'low_price': data.get('offers', {}).get('lowPrice'),
+                'high_price': data.get('offers', {}).get('highPrice'),
+                'count': data.get('offers', {}).get('offerCount'),
+                'rating': data.get('aggregateRating', {}).get('ratingValue'),
+                'reviews': data.get('aggregateRating', {}).get('reviewCount'),
+            }
+        except json.JSONDecodeError:
+            pass
+    return {}
+
+
+# === Бенчмарк ===
+
+LEGACY_PATTERN = re.compile(
+    r'data-product="([^"]+)"[^>]*data-code="(\d+)".*?'
+    r'catalog-product__name[^>]*href="([^"]+)"[^>]*><span>([^<]+)',
+    re.DOTALL
+)
+
+
+def synthetic_catalog(cards: int, broken_every: int = 0) -> str:
+    """Каталог из N карточек; broken_every > 0 - каждая такая карточка без названия"""
+    rng = random.Random(42)
+    card = ('<div class="catalog-product ui-button-widget" data-id="product" data-product="{uuid}" '
+            'data-code="{code}"><div class="catalog-product__image"><img src="/img/{code}.jpg"></div>'
+            '{name}<div class="catalog-product__rating" data-rating="4.8"></div>'
+            '<div class="product-buy__price">{price} ₽</div></div>\n')
+    name = ('<a class="catalog-product__name ui-link ui-link_black" href="/product/{uuid}/noutbuk-apple/">'
+            '<span>16.2" Ноутбук Apple MacBook Pro M{m} Pro серый [3456x2234, Retina, Apple M{m} Pro, '
+            'ядра: 10, RAM {ram} ГБ, SSD {ssd} ГБ, macOS]</span></a>')
+    parts = ['<html><head><title>Apple MacBook Pro - DNS</title></head><body>\n']
+    for i in range(cards):
+        uuid = "%032x" % rng.getrandbits(128)
+        broken = broken_every and i % broken_every == 0
+        parts.append(card.format(
+            uuid=uuid, code=rng.randint(10 ** 6, 10 ** 7), price=rng.randint(150, 400) * 1000,
+            name='' if broken else name.format(uuid=uuid, m=rng.randint(1, 4), ram=rng.choice([16, 32]),
+                                               ssd=rng.choice([512, 1024])),
+        ))
+    parts.append('</body></html>')
+    return "".join(parts)
+
+
+def bench(pages: List[Tuple[str, str]], repeat: int):
+    print("=" * 70)
+    print("DNS CATALOG PARSER BENCHMARK")
+    print("=" * 70)
+
+    for name, html in pages:
+        size = len(html.encode()) / 1_000_000
+        print(f"[*] {name}: {size:.2f} MB")
+
+        counts = {}
+        for label, fn in (("legacy DOTALL regex", lambda: sum(1 for _ in LEGACY_PATTERN.finditer(html))),
+                          ("iter_cards() scanner", lambda: sum(1 for _ in iter_cards(html)))):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                counts[label] = fn()
+            elapsed = (time.perf_counter() - start) / repeat
+            print(f"  {label:<26} {elapsed * 1000:8.1f} ms   {size / elapsed:7.1f} MB/s   cards={counts[label]}")
+        print()
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args or args[0] != "bench":
+        print(f"Usage: {sys.argv[0]} bench [page.html ...] [--repeat=N]")
+        sys.exit(1)
+
+    repeat = 5
+    for arg in sys.argv[1:]:
+        if arg.startswith("--repeat="):
+            repeat = int(arg.split("=")[1])
+
+    if len(args) > 1:
+        pages = [(p, Path(p).read_text(encoding="utf-8", errors="ignore")) for p in args[1:]]
+    else:
+        pages = [(f"synthetic {n} cards", synthetic_catalog(n)) for n in (100, 1000, 10000)]
+        # Разметка названия сменилась: регулярка дочитывает страницу до конца на каждой карточке
+        pages += [(f"synthetic {n} cards without names", synthetic_catalog(n, broken_every=1))
+                  for n in (1000, 4000)]
+
+    bench(pages, repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,8 @@ DNS-Shop RPA Parser с OCR
 import subprocess
 import time
 import sys
-import re
 from pathlib import Path
+from typing import Optional, Union
 
 # Отключаем MouseInfo до импорта pyautogui (не требует tkinter)
 import os
@@ -21,14 +21,23 @@ sys.modules['mouseinfo'] = MagicMock()
 
 import pyautogui
 
-from PIL import Image
+# Кадры-массивы приходят только из screen_capture (mss + numpy)
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from price_bounds import Bounds
+from ocr_pipeline import HAS_OCR, ocr_frame
 
-# Попытка импорта pytesseract
 try:
-    import pytesseract
-    HAS_OCR = True
+    from screen_capture import FrameStream, open_capture, to_image
+    HAS_CAPTURE = True
 except ImportError:
-    HAS_OCR = False
+    HAS_CAPTURE = False
+
+if not HAS_OCR:
     print("[!] pytesseract не установлен")
     print("[!] Для OCR: pip install pytesseract")
     print("[!] И установите tesseract-ocr: sudo apt install tesseract-ocr tesseract-ocr-rus")
@@ -36,6 +45,11 @@ except ImportError:
 SCREENSHOT_DIR = Path("/tmp/dns_screenshots")
 SCREENSHOT_DIR.mkdir(exist_ok=True)
 
+# Опрос экрана вместо фиксированных sleep (OCR сам ограничивает частоту)
+CAPTURE_FPS = 4
+PAGE_TIMEOUT = 15
+RESULTS_TIMEOUT = 15
+
 pyautogui.FAILSAFE = True
 pyautogui.PAUSE = 0.3
 
@@ -95,67 +109,70 @@ def take_screenshot(name: str) -> Path:
     return path
 
 
-def extract_prices_ocr(image_path: Path) -> list:
-    """Извлечение цен через OCR"""
-    if not HAS_OCR:
-        print("[!] OCR недоступен")
-        return []
-
+def open_screen():
+    """Захват экрана в память (Xvfb -fbdir / XShm) или None -> скриншоты в PNG"""
+    if not HAS_CAPTURE:
+        return None
     try:
-        img = Image.open(image_path)
+        capture = open_capture()
+        print(f"[+] Захват экрана: {capture.name} {capture.size[0]}x{capture.size[1]}")
+        return capture
+    except Exception as e:
+        print(f"[!] Захват экрана недоступен ({e}), используем скриншоты")
+        return None
 
-        # OCR с русским языком
-        text = pytesseract.image_to_string(img, lang='rus+eng')
 
-        # Ищем паттерны цен:
-        # "123 456 ₽", "123456 руб", "123 456" рядом с "₽"
-        prices = []
+def wait_for_screen(capture, name: str, check, timeout: float, fallback_sleep: float):
+    """Кадр, на котором check(ocr) истинно (или последний по таймауту)"""
+    if capture is None:
+        time.sleep(fallback_sleep)
+        return take_screenshot(name)
 
-        # Паттерн 1: числа с пробелами + символ рубля
-        pattern1 = re.findall(r'(\d{1,3}[\s\xa0]?\d{3}[\s\xa0]?\d{0,3})\s*[₽руб\.]', text)
-        prices.extend(pattern1)
+    state = {}
 
-        # Паттерн 2: просто большие числа (вероятно цены)
-        pattern2 = re.findall(r'(\d{2,3}[\s\xa0]\d{3})', text)
-        prices.extend(pattern2)
+    def ready(frame):
+        # Массив захвата живой - копия до OCR, чтобы проверенный и
+        # возвращённый кадр были одним и тем же
+        state["frame"] = frame.copy()
+        return check(ocr_frame(state["frame"]))
 
-        # Очищаем и конвертируем
-        clean_prices = []
-        for p in prices:
-            # Убираем пробелы
-            clean = re.sub(r'[\s\xa0]', '', str(p))
-            if clean.isdigit():
-                num = int(clean)
-                # Фильтруем разумные цены (10к - 500к)
-                if 10000 <= num <= 500000:
-                    clean_prices.append(num)
+    if not FrameStream(capture, CAPTURE_FPS).wait_until(ready, timeout):
+        print(f"[*] {name}: таймаут {timeout}s")
+    return state["frame"]
 
-        return sorted(set(clean_prices))
 
+def save_frame(frame, name: str) -> Path:
+    """Сохранить кадр для отладки (PNG только по необходимости)"""
+    if isinstance(frame, Path):
+        return frame
+    path = SCREENSHOT_DIR / f"{name}.png"
+    to_image(frame).save(path)
+    return path
+
+
+def extract_prices_ocr(image_path: Union[Path, "np.ndarray"], bounds: Optional[Bounds] = None) -> list:
+    """Извлечение цен через OCR (общий проход с detect_captcha_ocr)"""
+    if not HAS_OCR:
+        print("[!] OCR недоступен")
+        return []
+
+    try:
+        return ocr_frame(image_path).prices(bounds)
     except Exception as e:
         print(f"[!] OCR ошибка: {e}")
         return []
 
 
-def detect_captcha_ocr(image_path: Path) -> bool:
-    """Детекция CAPTCHA через OCR"""
+def detect_captcha_ocr(image_path: Union[Path, "np.ndarray"]) -> bool:
+    """Детекция CAPTCHA через OCR (общий проход с extract_prices_ocr)"""
     if not HAS_OCR:
         return False
 
     try:
-        img = Image.open(image_path)
-        text = pytesseract.image_to_string(img, lang='rus+eng').lower()
-
-        captcha_keywords = [
-            'captcha', 'капча', 'я не робот', 'i am not a robot',
-            'проверка', 'verification', 'подтвердите'
-        ]
-
-        for keyword in captcha_keywords:
-            if keyword in text:
-                print(f"[!] Обнаружено: '{keyword}'")
-                return True
-
+        keyword = ocr_frame(image_path).captcha_keyword()
+        if keyword:
+            print(f"[!] Обнаружено: '{keyword}'")
+            return True
         return False
 
     except Exception as e:
@@ -203,19 +220,17 @@ def run_dns_rpa(query: str = "MacBook Pro 16"):
     print("[!] Аварийный выход: мышь в левый верхний угол")
     print()
 
+    capture = open_screen()
+
     try:
-        # 1. Запуск браузера
+        # 1. Запуск браузера, ждём отрисовки страницы
         browser = launch_firefox("https://www.dns-shop.ru/")
-        time.sleep(8)  # Ждём загрузки
-
-        # 2. Скриншот главной
-        screen1 = take_screenshot("01_main")
+        screen1 = wait_for_screen(capture, "01_main", lambda ocr: ocr.words, PAGE_TIMEOUT, 8)
 
-        # 3. Проверка CAPTCHA
+        # 2. Проверка CAPTCHA (тот же OCR-проход, что и ожидание)
         if detect_captcha_ocr(screen1):
             print("\n[!] CAPTCHA обнаружена!")
             input("[*] Решите CAPTCHA вручную и нажмите Enter...")
-            screen1 = take_screenshot("01_after_captcha")
 
         # 4. Клик по поисковой строке
         screen_w, screen_h = pyautogui.size()
@@ -234,14 +249,11 @@ def run_dns_rpa(query: str = "MacBook Pro 16"):
         human_delay(0.3, 0.5)
         pyautogui.press('enter')
 
-        # 6. Ждём результатов
+        # 6. Ждём, пока цены появятся на экране
         print("[*] Ожидание результатов...")
-        time.sleep(5)
-
-        # 7. Скриншот результатов
-        screen2 = take_screenshot("02_results")
+        screen2 = wait_for_screen(capture, "02_results", lambda ocr: ocr.prices(), RESULTS_TIMEOUT, 5)
 
-        # 8. OCR извлечение цен
+        # 7. OCR извлечение цен (результат уже в кэше ocr_pipeline)
         prices = extract_prices_ocr(screen2)
 
         if prices:
@@ -253,7 +265,7 @@ def run_dns_rpa(query: str = "MacBook Pro 16"):
             print(f"  Максимум: {max(prices):,} RUB".replace(",", " "))
         else:
             print("\n[*] Цены не извлечены автоматически")
-            print(f"[*] Проверьте скриншоты: {SCREENSHOT_DIR}")
+            print(f"[*] Проверьте скриншот: {save_frame(screen2, '02_results')}")
 
         return prices
 
@@ -265,6 +277,9 @@ def run_dns_rpa(query: str = "MacBook Pro 16"):
         import traceback
         traceback.print_exc()
         return []
+    finally:
+        if capture is not None:
+            capture.close()
 
 
 if __name__ == "__main__":
@@ -274,6 +289,7 @@ if __name__ == "__main__":
     print("Проверка зависимостей:")
     print(f"  PyAutoGUI: OK")
     print(f"  pytesseract: {'OK' if HAS_OCR else 'НЕТ'}")
+    print(f"  screen_capture: {'OK' if HAS_CAPTURE else 'НЕТ (скриншоты в PNG)'}")
 
     if not HAS_OCR:
         print("\n[!] Для полной функциональности установите:")
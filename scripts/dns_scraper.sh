@@ -11,6 +11,7 @@ CATALOG="${1:-macbook-pro}"
 OUTPUT_DIR="${2:-/tmp/dns_scraper}"
 TIMEOUT_LOAD=25
 TIMEOUT_SAVE=5
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"  # dns_catalog.py - общий парсер карточек
 
 # Каталоги DNS-Shop
 declare -A CATALOGS=(
@@ -86,8 +87,9 @@ fi
 # Подготовка
 mkdir -p "$OUTPUT_DIR"
 TIMESTAMP=$(date +%Y%m%d_%H%M%S)
-OUTPUT_FILE="$OUTPUT_DIR/${CATALOG}_${TIMESTAMP}.html"
-JSON_FILE="$OUTPUT_DIR/${CATALOG}_${TIMESTAMP}.json"
+SAFE_CATALOG=$(echo "$CATALOG" | sed 's#^https\?://##' | tr '/?&= ' '_____' | cut -c1-80)
+OUTPUT_FILE="$OUTPUT_DIR/${SAFE_CATALOG}_${TIMESTAMP}.html"
+JSON_FILE="$OUTPUT_DIR/${SAFE_CATALOG}_${TIMESTAMP}.json"
 
 echo "========================================"
 echo "  DNS-Shop Scraper"
@@ -160,14 +162,16 @@ if [ -f "$OUTPUT_FILE" ] && [ -s "$OUTPUT_FILE" ]; then
 
     # Извлечение JSON-LD данных
     echo "[5] Парсинг данных..."
-    python3 - "$OUTPUT_FILE" "$JSON_FILE" << 'PYTHON_SCRIPT'
+    python3 - "$OUTPUT_FILE" "$JSON_FILE" "$SCRIPT_DIR" << 'PYTHON_SCRIPT'
 import sys
-import re
 import json
 from pathlib import Path
 
 html_file = sys.argv[1]
 json_file = sys.argv[2]
+sys.path.insert(0, sys.argv[3])
+
+from dns_catalog import iter_cards, parse_catalog_info
 
 html = Path(html_file).read_text(encoding='utf-8', errors='ignore')
 
@@ -178,53 +182,15 @@ result = {
 }
 
 # Извлекаем JSON.stringify данные
-match = re.search(r'JSON\.stringify\((\{[^}]+\}[^)]+)\)', html)
-if match:
-    try:
-        raw = match.group(1).replace('\\/', '/')
-        data = json.loads(raw)
-        result['catalog'] = {
-            'name': data.get('name'),
-            'low_price': data.get('offers', {}).get('lowPrice'),
-            'high_price': data.get('offers', {}).get('highPrice'),
-            'count': data.get('offers', {}).get('offerCount'),
-            'rating': data.get('aggregateRating', {}).get('ratingValue'),
-            'reviews': data.get('aggregateRating', {}).get('reviewCount')
-        }
-    except:
-        pass
-
-# Извлекаем товары
-product_pattern = re.compile(
-    r'data-product="([^"]+)"[^>]*data-code="(\d+)".*?'
-    r'catalog-product__name[^>]*href="([^"]+)"[^>]*><span>([^<]+)',
-    re.DOTALL
-)
-
-for match in product_pattern.finditer(html):
-    uuid, code, url, name = match.groups()
-    short_name = name.split('[')[0].strip()
-
-    specs = re.search(r'\[([^\]]+)\]', name)
-    specs_str = specs.group(1) if specs else ''
-
-    # Extract specifications
-    ram = re.search(r'RAM\s*(\d+)\s*ГБ', specs_str)
-    ssd = re.search(r'SSD\s*(\d+)\s*ГБ', specs_str)
-    cpu = re.search(r'(?:Apple\s+)?(M\d+(?:\s+(?:Pro|Max|Ultra))?)', short_name, re.I)
-    screen = re.search(r'(\d{2})(?:\.\d)?["\s]', short_name)
+result['catalog'] = parse_catalog_info(html)
 
+# Извлекаем товары (линейный проход по карточкам)
+for card in iter_cards(html):
     result['products'].append({
-        'code': code,
-        'name': short_name,
-        'specs': {
-            'ram': int(ram.group(1)) if ram else None,
-            'ssd': int(ssd.group(1)) if ssd else None,
-            'cpu': cpu.group(1).strip() if cpu else None,
-            'screen': screen.group(1) if screen else None,
-            'article': code  # DNS code is the article number
-        },
-        'url': f"https://www.dns-shop.ru{url}"
+        'code': card.code,
+        'name': card.name,
+        'specs': card.specs,
+        'url': card.url
     })
 
 from datetime import datetime
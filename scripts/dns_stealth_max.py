@@ -6,13 +6,14 @@ DNS-Shop с максимальным stealth
 import time
 import sys
 import re
+from importlib.util import find_spec
 from playwright.sync_api import sync_playwright
 
-try:
-    from playwright_stealth import Stealth
-    HAS_STEALTH = True
-except ImportError:
-    HAS_STEALTH = False
+from stealth_bundle import apply_stealth_context
+
+# stealth_bundle рендерит init-скрипт через playwright-stealth
+HAS_STEALTH = find_spec("playwright_stealth") is not None
+if not HAS_STEALTH:
     print("[!] playwright-stealth не установлен")
 
 
@@ -40,12 +41,11 @@ def search_dns(query: str):
             has_touch=False,
         )
 
-        page = context.new_page()
-
-        # Применяем stealth если доступен
+        # Применяем stealth если доступен (init-скрипт на весь контекст)
         if HAS_STEALTH:
-            stealth = Stealth()
-            stealth.apply_stealth_sync(page)
+            apply_stealth_context(context)
+
+        page = context.new_page()
 
         # Дополнительные патчи
         page.add_init_script("""
@@ -5,71 +5,26 @@ DNS-Shop Price Extractor
 затем получает цены через веб-поиск
 """
 
-import re
 import sys
 import json
 from pathlib import Path
 
+from dns_catalog import cards_batch, parse_catalog_info
+from listing_batch import ListingBatch
 
-def extract_products_from_html(html_path: str) -> list[dict]:
+
+def extract_products_from_html(html_path: str) -> ListingBatch:
     """Извлекает информацию о товарах из HTML"""
     html = Path(html_path).read_text(encoding='utf-8', errors='ignore')
-    products = []
-
-    # Паттерн для извлечения карточек товаров
-    # data-product="UUID" data-code="CODE"
-    product_pattern = re.compile(
-        r'data-product="([^"]+)"[^>]*data-code="(\d+)".*?'
-        r'catalog-product__name[^>]*href="([^"]+)"[^>]*><span>([^<]+)',
-        re.DOTALL
-    )
-
-    for match in product_pattern.finditer(html):
-        uuid, code, url, name = match.groups()
-        # Извлекаем краткое название
-        short_name = name.split('[')[0].strip()
-
-        # Извлекаем характеристики
-        specs_match = re.search(r'\[([^\]]+)\]', name)
-        specs = specs_match.group(1) if specs_match else ''
-
-        # Извлекаем RAM и SSD
-        ram_match = re.search(r'RAM\s*(\d+)\s*ГБ', specs)
-        ssd_match = re.search(r'SSD\s*(\d+)\s*ГБ', specs)
-
-        products.append({
-            'code': code,
-            'uuid': uuid,
-            'url': f"https://www.dns-shop.ru{url}",
-            'name': short_name,
-            'full_name': name,
-            'ram': ram_match.group(1) if ram_match else None,
-            'ssd': ssd_match.group(1) if ssd_match else None
-        })
-
-    return products
+
+    # Карточки товаров: data-product="UUID" data-code="CODE" (см. dns_catalog.py)
+    return cards_batch(html)
 
 
 def extract_catalog_info(html_path: str) -> dict:
     """Извлекает общую информацию о каталоге из JSON.stringify"""
     html = Path(html_path).read_text(encoding='utf-8', errors='ignore')
-
-    match = re.search(r'JSON\.stringify\((\{[^}]+\}[^)]+)\)', html)
-    if match:
-        try:
-            raw = match.group(1).replace('\\/', '/')
-            data = json.loads(raw)
-            return {
-                'name': data.get('name'),
-                'low_price': data.get('offers', {}).get('lowPrice'),
-                'high_price': data.get('offers', {}).get('highPrice'),
-                'count': data.get('offers', {}).get('offerCount'),
-                'rating': data.get('aggregateRating', {}).get('ratingValue'),
-                'reviews': data.get('aggregateRating', {}).get('reviewCount')
-            }
-        except json.JSONDecodeError:
-            pass
-    return {}
+    return parse_catalog_info(html)
 
 
 def main():
@@ -101,25 +56,22 @@ def main():
     print()
     print("-" * 60)
 
-    # Группируем по модели
+    # Группируем по модели (индексы строк batch)
     models = {}
-    for p in products:
-        model_key = p['name']
-        if model_key not in models:
-            models[model_key] = []
-        models[model_key].append(p)
+    for i, model_key in enumerate(products.names):
+        models.setdefault(model_key, []).append(i)
 
     # Выводим уникальные модели
     print(f"\n{'Код':<10} {'RAM':<6} {'SSD':<8} {'Модель'}")
     print("-" * 60)
 
     for model_name, variants in sorted(models.items(), key=lambda x: x[0]):
-        for p in variants:
-            ram = f"{p['ram']}GB" if p['ram'] else "?"
-            ssd = f"{p['ssd']}GB" if p['ssd'] else "?"
+        for i in variants:
+            ram = f"{products.ram[i]}GB" if products.ram[i] else "?"
+            ssd = f"{products.ssd[i]}GB" if products.ssd[i] else "?"
             # Truncate name for display
             display_name = model_name[:40] if len(model_name) > 40 else model_name
-            print(f"{p['code']:<10} {ram:<6} {ssd:<8} {display_name}")
+            print(f"{products.ids[i]:<10} {ram:<6} {ssd:<8} {display_name}")
 
     # Выводим JSON для дальнейшей обработки
     print("\n" + "=" * 60)
@@ -127,7 +79,7 @@ def main():
 
     output = {
         'catalog': catalog,
-        'products': products
+        'products': products.to_dicts()
     }
 
     with open('/tmp/dns_products.json', 'w', encoding='utf-8') as f:
@@ -18,6 +18,8 @@ from typing import Optional, List
 from duckduckgo_search import DDGS
 from playwright.sync_api import sync_playwright, Page
 
+from page_signals import classify
+
 
 @dataclass
 class Product:
@@ -31,6 +33,10 @@ class Product:
     def get_search_query(self) -> str:
         return f"{self.article} купить цена"
 
+    def verification_words(self) -> tuple:
+        """Все слова верификации - для общего прохода page_signals"""
+        return tuple(w for words in self.get_verification_patterns().values() for w in words)
+
     def get_verification_patterns(self) -> dict:
         """Паттерны для верификации товара (case-insensitive)"""
         return {
@@ -134,39 +140,15 @@ def search_product(product: Product) -> List[dict]:
     return results
 
 
-def is_product_page(html: str, title: str) -> bool:
+def is_product_page(html: str, title: str, extra: tuple = ()) -> bool:
     """Определить, является ли страница страницей товара"""
 
-    # Признаки страницы поиска/каталога
-    search_indicators = [
-        "поиск по товарам",
-        "результаты поиска",
-        "search results",
-        "найдено товаров",
-        "показать ещё",
-    ]
-
-    title_lower = title.lower()
-    html_lower = html.lower()
-
-    for indicator in search_indicators:
-        if indicator in title_lower or indicator in html_lower[:5000]:
-            return False
-
-    # Признаки страницы товара
-    product_indicators = [
-        'itemprop="product"',
-        'itemtype="http://schema.org/Product"',
-        '"@type":"Product"',
-        '"@type": "Product"',
-        'class="product-page"',
-        'class="product-card"',
-        'id="product-',
-    ]
-
-    for indicator in product_indicators:
-        if indicator in html:
-            return True
+    # Признаки поиска/каталога и товара (page_signals: LISTING/PRODUCT_PATTERNS)
+    page_type = classify(html, title=title, extra=extra).page_type
+    if page_type == "listing":
+        return False
+    if page_type == "product":
+        return True
 
     # Проверяем наличие единственной цены (не списка)
     # На странице товара обычно 1-3 цены, на каталоге - много
@@ -181,22 +163,23 @@ def verify_product(html: str, title: str, product: Product) -> VerificationResul
     """Верификация товара на странице (case-insensitive)"""
 
     patterns = product.get_verification_patterns()
-    content = (html + " " + title).lower()  # Case-insensitive
+    extra = product.verification_words()
 
-    # Проверка типа страницы
-    is_product = is_product_page(html, title)
+    # Тип страницы и слова товара - один проход по html + title
+    is_product = is_product_page(html, title, extra)
+    signals = classify(html, title=title, extra=extra)
 
     # Проверка артикула
-    article_found = any(p in content for p in patterns["article"])
+    article_found = signals.has_any(patterns["article"])
 
     # Проверка RAM
-    ram_found = any(p in content for p in patterns["ram"])
+    ram_found = signals.has_any(patterns["ram"])
 
     # Проверка SSD
-    ssd_found = any(p in content for p in patterns["ssd"])
+    ssd_found = signals.has_any(patterns["ssd"])
 
     # Проверка CPU
-    cpu_found = any(p in content for p in patterns["cpu"])
+    cpu_found = signals.has_any(patterns["cpu"])
 
     return VerificationResult(
         is_product_page=is_product,
@@ -236,24 +219,22 @@ def extract_price(html: str, min_price: int = 100000, max_price: int = 400000) -
 
 
 def extract_availability(html: str) -> str:
-    """Извлечь информацию о наличии"""
-    html_lower = html.lower()
+    """Извлечь информацию о наличии (общий проход page_signals)"""
+    signals = classify(html)
 
-    if 'instock' in html_lower or 'in_stock' in html_lower:
+    if signals.availability is True:
         return "В наличии"
-    elif 'soldout' in html_lower or 'outofstock' in html_lower or 'out_of_stock' in html_lower:
+    elif signals.availability is False:
         return "Нет в наличии"
-    elif 'preorder' in html_lower:
+    elif signals.preorder:
         return "Предзаказ"
-    elif 'availability' in html_lower:
-        # Попробуем найти текст наличия
-        match = re.search(r'наличии|в наличии|есть в наличии', html_lower)
-        if match:
-            return "В наличии"
 
     return "Неизвестно"
 
 
+BLOCK_WORDS = ("blocked", "access denied")
+
+
 def check_url(url: str, product: Product, browser) -> PriceResult:
     """Проверить URL и извлечь данные с верификацией"""
 
@@ -283,8 +264,11 @@ def check_url(url: str, product: Product, browser) -> PriceResult:
         html = page.content()
         title = page.title()
 
+        # Один проход по странице: защита, тип, слова товара, наличие
+        signals = classify(html, title=title, extra=product.verification_words() + BLOCK_WORDS)
+
         # Проверка защиты
-        if 'captcha' in html.lower():
+        if signals.has("captcha"):
             return PriceResult(
                 shop=domain, url=url, price=None,
                 availability="",
@@ -292,7 +276,7 @@ def check_url(url: str, product: Product, browser) -> PriceResult:
                 status="CAPTCHA"
             )
 
-        if 'blocked' in html.lower() or 'access denied' in html.lower():
+        if signals.has_any(BLOCK_WORDS):
             return PriceResult(
                 shop=domain, url=url, price=None,
                 availability="",
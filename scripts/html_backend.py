@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+HTML Backend - общий интерфейс DOM-парсеров для разбора сохранённых страниц
+
+Бэкенды (первый доступный по умолчанию):
+    selectolax  - Lexbor (C), самый быстрый разбор и наименьшая память
+    lxml        - libxml2 (C) + CSS через cssselect -> скомпилированный XPath
+    bs4         - BeautifulSoup('html.parser'), чистый Python (прежний путь)
+
+Селекторы компилируются один раз и кэшируются (compiled_selector):
+lxml - CSSSelector (XPath), bs4 - soupsieve.compile, Lexbor разбирает
+селектор в C при вызове.
+
+Частичный разбор: parse(html, stop=(...), after=(...)) отрезает документ
+по первому стоп-маркеру (пагинация, подвал) после начала сетки товаров -
+дерево строится только до конца сетки. Маркеры в <head> (например,
+pagination-widget.css) до начала сетки не считаются.
+
+Использование:
+    from html_backend import parse
+
+    doc = parse(html, stop=("pagination-widget", "<footer"), after=("catalog-products",))
+    for card in doc.select("[data-id]"):
+        print(card.attr("data-product-price"), card.select_one(".catalog-product__name").text())
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+try:
+    from lxml import html as lxml_html
+    from lxml.cssselect import CSSSelector
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from bs4 import BeautifulSoup
+    import soupsieve
+    HAS_BS4 = True
+except ImportError:
+    HAS_BS4 = False
+
+
+BACKENDS = [name for name, ok in (("selectolax", HAS_SELECTOLAX), ("lxml", HAS_LXML), ("bs4", HAS_BS4)) if ok]
+DEFAULT_BACKEND = BACKENDS[0] if BACKENDS else None
+
+
+@lru_cache(maxsize=256)
+def compiled_selector(backend: str, selector: str) -> Any:
+    """Селектор, скомпилированный под бэкенд (кэш на процесс)"""
+    if backend == "lxml":
+        return CSSSelector(selector)
+    if backend == "bs4":
+        return soupsieve.compile(selector)
+    return selector
+
+
+def partial_html(html: str, stop: Sequence[str], after: Sequence[str] = ()) -> str:
+    """
+    HTML до первого стоп-маркера (парсеры сами закрывают незакрытые теги).
+
+    after - маркеры начала нужной части: стоп-маркеры ищутся только после
+    первого из них; если ни один не найден, документ не обрезается.
+    """
+    begin = 0
+    if after:
+        begin = min((pos for pos in (html.find(marker) for marker in after) if pos >= 0), default=-1)
+        if begin < 0:
+            return html
+    cut = min((pos for pos in (html.find(marker, begin) for marker in stop) if pos > begin), default=-1)
+    return html[:cut] if cut > 0 else html
+
+
+# === Узлы ===
+
+class Node:
+    """Элемент документа поверх нативного узла бэкенда"""
+
+    __slots__ = ("backend", "node")
+
+    def __init__(self, backend: str, node: Any):
+        self.backend = backend
+        self.node = node
+
+    def select(self, selector: str) -> List["Node"]:
+        compiled = compiled_selector(self.backend, selector)
+        if self.backend == "selectolax":
+            found = self.node.css(compiled)
+        elif self.backend == "lxml":
+            found = compiled(self.node)
+        else:
+            found = compiled.select(self.node)
+        return [Node(self.backend, n) for n in found]
+
+    def select_one(self, selector: str) -> Optional["Node"]:
+        compiled = compiled_selector(self.backend, selector)
+        if self.backend == "selectolax":
+            found = self.node.css_first(compiled)
+        elif self.backend == "lxml":
+            matches = compiled(self.node)
+            found = matches[0] if matches else None
+        else:
+            found = compiled.select_one(self.node)
+        return Node(self.backend, found) if found is not None else None
+
+    def attr(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        if self.backend == "selectolax":
+            value = self.node.attributes.get(name)
+        else:
+            value = self.node.get(name)
+        return value if value is not None else default
+
+    def text(self, strip: bool = False) -> str:
+        """Текст узла (strip=True - как get_text(strip=True) у bs4)"""
+        if self.backend == "selectolax":
+            return self.node.text(strip=strip)
+        if self.backend == "lxml":
+            parts = self.node.itertext()
+            return "".join(p.strip() for p in parts) if strip else "".join(parts)
+        return self.node.get_text(strip=strip)
+
+
+class Document(Node):
+    """Разобранный документ"""
+
+    __slots__ = ("partial",)
+
+    def __init__(self, backend: str, node: Any, partial: bool):
+        super().__init__(backend, node)
+        self.partial = partial
+
+    def title(self) -> Optional[str]:
+        title = self.select_one("title")
+        return title.text().strip() if title else None
+
+
+def parse(html: str, backend: Optional[str] = None, stop: Sequence[str] = (),
+          after: Sequence[str] = ()) -> Document:
+    """
+    Разбор HTML выбранным бэкендом.
+
+    Args:
+        backend: selectolax / lxml / bs4 (по умолчанию - самый быстрый из установленных)
+        stop: маркеры конца нужной части (разбор до первого из них)
+        after: маркеры начала нужной части (стоп-маркеры ищутся после них)
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"HTML backend unavailable: {backend} (installed: {', '.join(BACKENDS) or 'none'})")
+
+    source = partial_html(html, stop, after) if stop else html
+    partial = len(source) < len(html)
+
+    if backend == "selectolax":
+        root = LexborHTMLParser(source).root
+    elif backend == "lxml":
+        root = lxml_html.document_fromstring(source or "<html></html>")
+    else:
+        root = BeautifulSoup(source, "html.parser")
+    return Document(backend, root, partial)
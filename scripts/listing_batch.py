@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Listing Batch - компактное хранение товаров каталога
+
+Вместо списка вложенных dict на каждый товар
+    {"name", "price", "available", "url", "specs": {...}}
+товары одного разбора лежат в параллельных массивах:
+    - prices / ram / ssd / flags - array (без объекта на значение)
+    - cpu / screen / store - интернированные строки (одна копия на batch)
+    - names / urls / ids - списки строк
+
+specs_filter.filter_and_rank читает массивы напрямую (без ProductSpecs
+на товар), dict появляется только на выходе: batch[i] / row(i) / to_dicts().
+Отбор (within / take / select / filter) возвращает новый ListingBatch.
+
+Использование:
+    batch = ListingBatch("ozon")
+    batch.append("MacBook Pro 16 M1 Pro 32GB 512GB", 156000, available=True)
+    best, score = filter_and_rank(batch, target)[0]
+    cheapest = batch.within(bounds).min_price()
+
+    python listing_batch.py bench [--count=100000]
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import re
+import sys
+import time
+import random
+import tracemalloc
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from price_bounds import parse_text_price
+
+
+# Флаги товара
+AVAILABLE = 1           # в наличии
+AVAILABILITY_KNOWN = 2  # парсер знает наличие (иначе поле не выводится)
+HAS_SPECS = 4           # specs заданы парсером или уже извлечены из названия
+
+NO_PRICE = -1
+
+
+def _intern(value: Any) -> Optional[str]:
+    return sys.intern(str(value)) if value else None
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(value) if value else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_price(value: Any) -> int:
+    """Цена из числа или строки ("156 000 ₽"); нераспознанная строка -> NO_PRICE, не 0"""
+    if value is None or isinstance(value, bool):
+        return NO_PRICE
+    if isinstance(value, (int, float)):
+        return int(value)
+    price = parse_text_price(re.sub(r'(?:₽|руб\.?|RUB)$', '', str(value).strip()))
+    return price if price is not None else NO_PRICE
+
+
+class ListingBatch:
+    """Товары одного разбора в параллельных массивах"""
+
+    __slots__ = ("store", "names", "urls", "ids", "prices", "ram", "ssd", "flags", "cpu", "screen", "article")
+
+    def __init__(self, store: str = ""):
+        self.store = sys.intern(store)
+        self.names: List[str] = []
+        self.urls: List[str] = []
+        self.ids: List[str] = []
+        self.prices = array("q")
+        self.ram = array("H")   # ГБ, 0 - неизвестно
+        self.ssd = array("I")   # ГБ, 0 - неизвестно
+        self.flags = array("B")
+        self.cpu: List[Optional[str]] = []
+        self.screen: List[Optional[str]] = []
+        self.article: List[Optional[str]] = []
+
+    def append(
+        self,
+        name: str,
+        price: Optional[int],
+        available: Optional[bool] = None,
+        url: str = "",
+        product_id: str = "",
+        specs: Optional[Dict] = None,
+    ):
+        flags = 0
+        if available is not None:
+            flags |= AVAILABILITY_KNOWN | (AVAILABLE if available else 0)
+
+        self.names.append(name or "")
+        self.urls.append(url or "")
+        self.ids.append(str(product_id) if product_id else "")
+        self.prices.append(_to_price(price))
+        self.flags.append(flags)
+        self.ram.append(0)
+        self.ssd.append(0)
+        self.cpu.append(None)
+        self.screen.append(None)
+        self.article.append(None)
+
+        if specs:
+            specs = getattr(specs, "__dict__", specs)  # ProductSpecs или dict
+            self.set_specs(len(self.names) - 1, specs.get("cpu"), specs.get("ram"), specs.get("ssd"),
+                           specs.get("screen"), specs.get("article"))
+
+    def set_specs(self, i: int, cpu: Any, ram: Any, ssd: Any, screen: Any, article: Any):
+        self.cpu[i] = _intern(cpu)
+        self.ram[i] = min(_to_int(ram), 0xFFFF)
+        self.ssd[i] = _to_int(ssd)
+        self.screen[i] = _intern(screen)
+        self.article[i] = str(article) if article else None
+        self.flags[i] |= HAS_SPECS
+
+    @classmethod
+    def from_products(cls, products: Iterable[Dict], store: str = "") -> "ListingBatch":
+        """Batch из dict-товаров (JSON-каталоги *_scraper.sh)"""
+        if isinstance(products, cls):
+            return products
+        batch = cls(store)
+        for p in products:
+            batch.append(p.get("name", ""), p.get("price"), p.get("available"),
+                         p.get("url", ""), p.get("product_id") or p.get("id") or p.get("code") or "",
+                         p.get("specs"))
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return (self.row(i) for i in range(len(self)))
+
+    def __getitem__(self, i: int) -> Dict:
+        """Товар как dict (отрицательный индекс - с конца)"""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("ListingBatch index out of range")
+        return self.row(i)
+
+    def select(self, indices: Iterable[int]) -> "ListingBatch":
+        """Новый batch из строк indices (в их порядке), без dict на товар"""
+        batch = ListingBatch(self.store)
+        for i in indices:
+            batch.names.append(self.names[i])
+            batch.urls.append(self.urls[i])
+            batch.ids.append(self.ids[i])
+            batch.prices.append(self.prices[i])
+            batch.ram.append(self.ram[i])
+            batch.ssd.append(self.ssd[i])
+            batch.flags.append(self.flags[i])
+            batch.cpu.append(self.cpu[i])
+            batch.screen.append(self.screen[i])
+            batch.article.append(self.article[i])
+        return batch
+
+    def take(self, n: int) -> "ListingBatch":
+        """Первые n товаров"""
+        return self.select(range(min(max(n, 0), len(self))))
+
+    def within(self, bounds) -> "ListingBatch":
+        """Товары с известной ценой в диапазоне (price_bounds.Bounds или любой контейнер с in)"""
+        return self.select(i for i, price in enumerate(self.prices) if price != NO_PRICE and price in bounds)
+
+    def filter(self, predicate: Callable[[Dict], bool]) -> "ListingBatch":
+        """Товары, для которых predicate(row) истинно (dict строится на каждую проверку)"""
+        return self.select(i for i in range(len(self)) if predicate(self.row(i)))
+
+    def specs(self, i: int) -> Dict:
+        return {
+            "screen": self.screen[i],
+            "cpu": self.cpu[i],
+            "ram": self.ram[i] or None,
+            "ssd": self.ssd[i] or None,
+            "article": self.article[i],
+        }
+
+    def row(self, i: int) -> Dict:
+        """Товар как dict (для JSON и вывода); неизвестные поля не выводятся"""
+        row: Dict[str, Any] = {"name": self.names[i]}
+        if self.prices[i] != NO_PRICE:
+            row["price"] = self.prices[i]
+        if self.flags[i] & AVAILABILITY_KNOWN:
+            row["available"] = bool(self.flags[i] & AVAILABLE)
+        if self.urls[i]:
+            row["url"] = self.urls[i]
+        if self.ids[i]:
+            row["product_id"] = self.ids[i]
+        if self.flags[i] & HAS_SPECS:
+            row["specs"] = self.specs(i)
+        return row
+
+    def to_dicts(self) -> List[Dict]:
+        return [self.row(i) for i in range(len(self))]
+
+    def min_price(self) -> Optional[int]:
+        """Минимальная положительная цена (fallback без фильтра по specs)"""
+        prices = [p for p in self.prices if p > 0]
+        return min(prices) if prices else None
+
+    def any_available(self) -> bool:
+        return any(f & AVAILABLE for f in self.flags)
+
+
+# === Бенчмарк ===
+
+def synthetic_products(count: int) -> Iterator[Dict]:
+    """Товары в формате JSON-каталогов"""
+    rng = random.Random(42)
+    for i in range(count):
+        cpu = rng.choice(["M1 Pro", "M1 Max", "M2 Pro", "M3 Max", "M4 Pro"])
+        ram, ssd = rng.choice([16, 18, 24, 32, 36, 48]), rng.choice([512, 1000, 2000])
+        yield {
+            "name": f"Ноутбук Apple MacBook Pro 16\" {cpu} {ram}GB {ssd}GB серый {i}",
+            "price": rng.randint(120, 450) * 1000,
+            "available": rng.random() > 0.2,
+            "url": f"https://www.ozon.ru/product/macbook-pro-{i}/",
+            "product_id": str(10 ** 8 + i),
+        }
+
+
+def measure(build) -> tuple:
+    """(объект, байт занято, секунд): время - отдельным прогоном без tracemalloc"""
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size, elapsed
+
+
+def bench(count: int):
+    # Класс из модуля, а не из __main__ - его ждёт specs_filter
+    from listing_batch import ListingBatch as Batch
+    from specs_filter import TargetSpecs, extract_specs_from_name, filter_and_rank, resolve_specs
+
+    print("=" * 70)
+    print(f"LISTING BATCH BENCHMARK: {count:,} listings")
+    print("=" * 70)
+    target = TargetSpecs(screen="16", cpu="M1 Pro", ram=32, ssd=512, article="")
+
+    def dicts():
+        # Прежний путь: dict на товар + dict specs, добавленный filter_and_rank
+        products = list(synthetic_products(count))
+        for p in products:
+            p["specs"] = extract_specs_from_name(p["name"]).__dict__
+        return products
+
+    def batch():
+        b = Batch("ozon")
+        for p in synthetic_products(count):
+            b.append(p["name"], p["price"], p["available"], p["url"], p["product_id"])
+        resolve_specs(b)
+        return b
+
+    for label, build in (("list of dicts + specs", dicts), ("ListingBatch", batch)):
+        products, size, elapsed = measure(build)
+        start = time.perf_counter()
+        top = filter_and_rank(products, target, threshold=70, top_n=3)
+        rank = time.perf_counter() - start
+        print(f"  {label:<24} {size / 1_000_000:8.1f} MB  ({size / count:6.0f} B/listing)   "
+              f"build {elapsed:5.2f}s   rank {rank * 1000:7.1f} ms   best={top[0][0]['price'] if top else None}")
+        del products
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args or args[0] != "bench":
+        print(f"Usage: {sys.argv[0]} bench [--count=N]")
+        sys.exit(1)
+
+    count = 100_000
+    for arg in sys.argv[1:]:
+        if arg.startswith("--count="):
+            count = int(arg.split("=")[1])
+
+    bench(count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+OCR Pipeline для RPA-парсеров
+
+Один проход Tesseract на кадр: image_to_data() возвращает слова с
+координатами, результат кэшируется и используется и детектором цен, и
+детектором CAPTCHA (раньше каждый делал свой полный image_to_string).
+
+Подготовка кадра: grayscale, уменьшение, обрезка до объединения
+известных областей (цены в выдаче DNS, центр экрана для CAPTCHA).
+Пачка кадров распознаётся в пуле процессов.
+
+Кадр может быть и массивом BGRX из screen_capture (без PNG на диске):
+обрезка делается срезом массива, в grayscale переводится только область.
+
+Использование:
+    from ocr_pipeline import ocr_frame
+    frame = ocr_frame("/tmp/dns_screenshots/02_results.png")   # или capture.grab()
+    frame.prices(bounds), frame.captcha_keyword()
+
+    python ocr_pipeline.py bench [/tmp/dns_screenshots] [--workers=4]
+
+Требует: pip install pytesseract pillow, apt install tesseract-ocr tesseract-ocr-rus
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import os
+import re
+import sys
+import time
+import hashlib
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from PIL import Image, ImageOps
+
+try:
+    import pytesseract
+    HAS_OCR = True
+except ImportError:
+    HAS_OCR = False
+
+# Массивы BGRX приходят только из screen_capture (mss + numpy)
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from price_bounds import Bounds, bounds_for
+
+
+# === Конфигурация ===
+
+OCR_LANG = "rus+eng"
+
+# Области экрана в долях (left, top, right, bottom)
+PRICE_REGION = (0.15, 0.12, 0.95, 1.0)    # список товаров выдачи DNS
+CAPTCHA_REGION = (0.2, 0.1, 0.8, 0.75)    # окно проверки по центру
+
+# Уменьшение перед OCR (кадр 1920px -> 1440px)
+OCR_SCALE = 0.75
+
+# Кэш кадров процесса
+CACHE_SIZE = 32
+
+# Цены на экране, если для категории ничего не выучено (прежний фильтр 10к - 500к)
+OCR_PRICE_BOUNDS = Bounds(10000, 500000)
+
+CAPTCHA_KEYWORDS = [
+    'captcha', 'капча', 'я не робот', 'i am not a robot',
+    'проверка', 'verification', 'подтвердите'
+]
+
+# "123 456 ₽", "123456 руб", а также числа без знака рубля
+PRICE_WITH_CURRENCY = re.compile(r'(\d{1,3}[\s\xa0]?\d{3}[\s\xa0]?\d{0,3})\s*[₽руб\.]')
+PRICE_BARE = re.compile(r'(\d{2,3}[\s\xa0]\d{3})')
+
+Region = Tuple[float, float, float, float]
+Frame = Union[Image.Image, "np.ndarray"]
+ImageSource = Union[str, Path, Frame]
+
+
+# === Результат OCR ===
+
+@dataclass
+class OcrWord:
+    text: str
+    box: Tuple[int, int, int, int]  # left, top, right, bottom в координатах исходного кадра
+    conf: float
+    line: Tuple[int, int, int]      # block, paragraph, line
+
+
+@dataclass
+class OcrFrame:
+    """Слова кадра с координатами; общий результат для всех детекторов"""
+    size: Tuple[int, int]
+    words: List[OcrWord] = field(default_factory=list)
+
+    def text(self, region: Optional[Region] = None) -> str:
+        """Текст (по строкам), опционально только внутри области"""
+        lines: Dict[Tuple[int, int, int], List[str]] = OrderedDict()
+        for word in self.words_in(region):
+            lines.setdefault(word.line, []).append(word.text)
+        return "\n".join(" ".join(parts) for parts in lines.values())
+
+    def words_in(self, region: Optional[Region] = None) -> List[OcrWord]:
+        if region is None:
+            return self.words
+        left, top, right, bottom = region_box(region, self.size)
+        return [
+            w for w in self.words
+            if left <= (w.box[0] + w.box[2]) / 2 <= right and top <= (w.box[1] + w.box[3]) / 2 <= bottom
+        ]
+
+    def prices(self, bounds: Optional[Bounds] = None, region: Optional[Region] = PRICE_REGION) -> List[int]:
+        """Цены в области (по диапазону категории, иначе OCR_PRICE_BOUNDS)"""
+        bounds = bounds or bounds_for(category="laptops", default=OCR_PRICE_BOUNDS)
+        return find_prices(self.text(region), bounds)
+
+    def captcha_keyword(self, region: Optional[Region] = CAPTCHA_REGION) -> Optional[str]:
+        """Ключевое слово CAPTCHA в области или None"""
+        text = self.text(region).lower()
+        for keyword in CAPTCHA_KEYWORDS:
+            if keyword in text:
+                return keyword
+        return None
+
+
+def find_prices(text: str, bounds: Bounds) -> List[int]:
+    candidates = PRICE_WITH_CURRENCY.findall(text) + PRICE_BARE.findall(text)
+    prices = set()
+    for candidate in candidates:
+        clean = re.sub(r'[\s\xa0]', '', candidate)
+        if clean.isdigit() and int(clean) in bounds:
+            prices.add(int(clean))
+    return sorted(prices)
+
+
+def region_box(region: Region, size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    width, height = size
+    left, top, right, bottom = region
+    return int(left * width), int(top * height), int(right * width), int(bottom * height)
+
+
+def union_region(regions: Sequence[Region]) -> Region:
+    return (
+        min(r[0] for r in regions), min(r[1] for r in regions),
+        max(r[2] for r in regions), max(r[3] for r in regions),
+    )
+
+
+# === OCR ===
+
+def is_array(image) -> bool:
+    """Кадр BGRX из screen_capture (без numpy таких кадров нет)"""
+    return HAS_NUMPY and isinstance(image, np.ndarray)
+
+
+def image_size(image: Frame) -> Tuple[int, int]:
+    if is_array(image):
+        return image.shape[1], image.shape[0]
+    return image.size
+
+
+def bgrx_image(pixels: "np.ndarray") -> Image.Image:
+    """Массив BGRX (H, W, 4) -> PIL RGB (перестановка каналов в декодере PIL)"""
+    height, width = pixels.shape[:2]
+    return Image.frombuffer("RGBX", (width, height), np.ascontiguousarray(pixels), "raw", "BGRX", 0, 1)
+
+
+def preprocess(image: Frame, regions: Sequence[Region],
+               scale: float) -> Tuple[Image.Image, Tuple[int, int]]:
+    """Обрезка по областям + grayscale + уменьшение; возвращает и смещение обрезки"""
+    left, top, right, bottom = region_box(union_region(regions), image_size(image))
+    if is_array(image):
+        cropped = bgrx_image(image[top:bottom, left:right])  # копируется только область
+    else:
+        cropped = image.crop((left, top, right, bottom))
+    gray = ImageOps.grayscale(cropped)
+    if scale != 1.0:
+        gray = gray.resize((max(1, int(gray.width * scale)), max(1, int(gray.height * scale))), Image.LANCZOS)
+    return gray, (left, top)
+
+
+def run_ocr(image: Frame, regions: Sequence[Region] = (PRICE_REGION, CAPTCHA_REGION),
+            scale: float = OCR_SCALE, lang: str = OCR_LANG) -> OcrFrame:
+    """Один проход Tesseract по подготовленному кадру"""
+    prepared, (dx, dy) = preprocess(image, regions, scale)
+    data = pytesseract.image_to_data(prepared, lang=lang, output_type=pytesseract.Output.DICT)
+
+    frame = OcrFrame(size=image_size(image))
+    for i, text in enumerate(data["text"]):
+        text = text.strip()
+        conf = float(data["conf"][i])
+        if not text or conf < 0:
+            continue
+        left = dx + int(data["left"][i] / scale)
+        top = dy + int(data["top"][i] / scale)
+        frame.words.append(OcrWord(
+            text=text,
+            box=(left, top, left + int(data["width"][i] / scale), top + int(data["height"][i] / scale)),
+            conf=conf,
+            line=(data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+        ))
+    return frame
+
+
+_cache: "OrderedDict[str, OcrFrame]" = OrderedDict()
+
+
+def _frame_key(source: ImageSource) -> str:
+    if isinstance(source, Image.Image):
+        return hashlib.sha1(source.tobytes()).hexdigest()
+    if is_array(source):
+        return hashlib.sha1(np.ascontiguousarray(source)).hexdigest()
+    stat = Path(source).stat()
+    return f"{Path(source).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _remember(key: str, frame: OcrFrame):
+    _cache[key] = frame
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def ocr_frame(source: ImageSource) -> OcrFrame:
+    """OCR кадра (путь, PIL Image или массив BGRX) с кэшем: повторный вызов для того же кадра бесплатен"""
+    key = _frame_key(source)
+    frame = _cache.get(key)
+    if frame is not None:
+        _cache.move_to_end(key)
+        return frame
+
+    if isinstance(source, Image.Image) or is_array(source):
+        frame = run_ocr(source)
+    else:
+        with Image.open(source) as image:
+            frame = run_ocr(image)
+
+    _remember(key, frame)
+    return frame
+
+
+# === Пул процессов ===
+
+def _init_worker():
+    # Tesseract сам распараллеливается через OpenMP - в пуле это лишнее
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _ocr_path(path: str) -> OcrFrame:
+    with Image.open(path) as image:
+        return run_ocr(image)
+
+
+def ocr_frames(paths: Sequence[Union[str, Path]], workers: Optional[int] = None) -> List[OcrFrame]:
+    """OCR пачки кадров в пуле процессов (порядок сохраняется)"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) == 1:
+        return [ocr_frame(p) for p in paths]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        frames = list(pool.map(_ocr_path, [str(p) for p in paths]))
+
+    for path, frame in zip(paths, frames):
+        _remember(_frame_key(path), frame)
+    return frames
+
+
+# === Бенчмарк ===
+
+def _legacy_two_pass(path: Path):
+    """Как раньше: два полных image_to_string на кадр"""
+    with Image.open(path) as image:
+        pytesseract.image_to_string(image, lang=OCR_LANG)
+    with Image.open(path) as image:
+        pytesseract.image_to_string(image, lang=OCR_LANG)
+
+
+def bench(directory: Path, workers: int):
+    paths = sorted(p for p in directory.iterdir() if p.suffix.lower() in (".png", ".jpg", ".jpeg"))
+    if not paths:
+        print(f"[!] Нет скриншотов в {directory}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"OCR BENCHMARK: {len(paths)} frames, {workers} workers")
+    print("=" * 60)
+
+    def run(name: str, fn):
+        _cache.clear()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<36} {elapsed:7.2f}s  {len(paths) / elapsed:6.2f} frames/sec")
+
+    run("legacy: 2x full image_to_string", lambda: [_legacy_two_pass(p) for p in paths])
+    run("single pass + ROI", lambda: [(f.prices(), f.captcha_keyword()) for f in map(ocr_frame, paths)])
+    run(f"single pass + ROI, pool({workers})",
+        lambda: [(f.prices(), f.captcha_keyword()) for f in ocr_frames(paths, workers)])
+
+
+def main():
+    if not HAS_OCR:
+        print("Установите: pip install pytesseract && sudo apt install tesseract-ocr tesseract-ocr-rus")
+        sys.exit(1)
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args or args[0] != "bench":
+        print(f"Usage: {sys.argv[0]} bench [screenshots_dir] [--workers=N]")
+        sys.exit(1)
+
+    directory = Path(args[1]) if len(args) > 1 else Path("/tmp/dns_screenshots")
+    workers = os.cpu_count() or 1
+    for arg in sys.argv[1:]:
+        if arg.startswith("--workers="):
+            workers = int(arg.split("=")[1])
+
+    bench(directory, workers)
+
+
+if __name__ == "__main__":
+    main()
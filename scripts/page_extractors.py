@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Page Extractors - извлечение товаров прямо в браузере
+
+page.content() сериализует весь DOM (мегабайты) и гонит его через
+DevTools-канал, после чего Python разбирает его регулярками. Здесь для
+каждого магазина есть JS-экстрактор: page.evaluate() возвращает только
+компактный массив {name, price, available, url, code} и найденные на
+странице ключевые слова page_signals (CAPTCHA, наличие, тип страницы) -
+поиск по outerHTML идёт внутри браузера, наружу уходят только позиции.
+
+page.content() запрашивается только если экстрактор упал или ничего не
+нашёл (и это не CAPTCHA) - тогда работает прежний HTML-парсер вызывающего.
+
+Использование:
+    from page_extractors import extract_page
+    extraction = extract_page(page, "citilink", bounds, fallback=parse_html)
+    extraction.best, extraction.signals.captcha, extraction.report()
+
+    python page_extractors.py bench "MacBook Pro 16"   # content() vs JS по магазинам collect_prices
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import sys
+import json
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+from playwright.sync_api import Page
+
+from price_bounds import Bounds
+from page_signals import Hit, PageSignals, classify, page_matcher, signals_from_hits
+
+
+# === JS ===
+
+# Общая часть: нормализация цены/наличия, добавление товара, название страницы
+_PRELUDE = r"""
+({lo, hi, pattern, words}) => {
+    const items = [];
+    const seen = new Set();
+
+    const text = el => el ? (el.getAttribute('content') || el.textContent || '') : '';
+    const toPrice = value => {
+        if (value === null || value === undefined) return null;
+        const match = String(value).replace(/\s/g, '').match(/^\D*(\d+)/);
+        return match ? parseInt(match[1], 10) : null;
+    };
+    const availability = value => {
+        const state = String(value || '').toLowerCase();
+        if (/outofstock|out_of_stock|soldout|нет в наличии/.test(state)) return false;
+        if (/instock|in_stock|в наличии/.test(state)) return true;
+        return null;
+    };
+    const add = (name, price, available, url, code) => {
+        price = toPrice(price);
+        if (price === null || price < lo || price > hi) return;
+        const key = `${code || url || name}:${price}`;
+        if (seen.has(key)) return;
+        seen.add(key);
+        let href = '';
+        try { href = url ? new URL(url, location.href).href : ''; } catch (e) {}
+        items.push({
+            name: String(name || '').replace(/\s+/g, ' ').trim().slice(0, 200),
+            price: price,
+            available: available === undefined ? null : available,
+            url: href,
+            code: String(code || ''),
+        });
+    };
+"""
+
+# Schema.org microdata: itemprop="price" внутри карточки товара
+_MICRODATA = r"""
+    document.querySelectorAll('[itemprop="price"]').forEach(el => {
+        const scope = el.closest('[itemscope]');
+        const find = selector => scope ? scope.querySelector(selector) : null;
+        const link = find('a[href]');
+        const stock = find('[itemprop="availability"]');
+        add(text(find('[itemprop="name"]')), text(el),
+            availability(stock && (stock.getAttribute('href') || text(stock))),
+            link ? link.getAttribute('href') : location.href,
+            text(find('[itemprop="sku"], [itemprop="productID"]')));
+    });
+"""
+
+# data-meta-price (Citilink и витрины на том же движке)
+_META_PRICE = r"""
+    document.querySelectorAll('[data-meta-price]').forEach(el => {
+        const card = el.closest('[data-meta-product-id]') || el;
+        const link = card.querySelector('a[href*="/product/"]') || card.querySelector('a[href]');
+        add(link ? (link.getAttribute('title') || link.textContent) : '', el.getAttribute('data-meta-price'), true,
+            link ? link.getAttribute('href') : '', card.getAttribute('data-meta-product-id'));
+    });
+"""
+
+# JSON-LD: Product / ItemList / @graph с offers
+_JSON_LD = r"""
+    document.querySelectorAll('script[type="application/ld+json"]').forEach(script => {
+        let data;
+        try { data = JSON.parse(script.textContent); } catch (e) { return; }
+        const visit = node => {
+            if (Array.isArray(node)) { node.forEach(visit); return; }
+            if (!node || typeof node !== 'object') return;
+            ['@graph', 'itemListElement', 'item'].forEach(key => node[key] && visit(node[key]));
+            [].concat(node.offers || []).forEach(offer => add(
+                node.name, offer.price !== undefined ? offer.price : offer.lowPrice, availability(offer.availability),
+                node.url || offer.url || location.href, node.sku || node.productID));
+        };
+        visit(data);
+    });
+"""
+
+# Citilink: товары из __NEXT_DATA__ (как parse_citilink_nextjs)
+_NEXT_DATA = r"""
+    const next = document.getElementById('__NEXT_DATA__');
+    if (next) {
+        try {
+            const props = ((JSON.parse(next.textContent).props || {}).pageProps || {}).effectorValues || {};
+            for (const value of Object.values(props)) {
+                if (value && Array.isArray(value.products)) {
+                    value.products.forEach(item => add(item.name, (item.price || {}).price, !!item.isAvailable,
+                        `/product/${item.slug || ''}/`, item.id));
+                    break;
+                }
+            }
+        } catch (e) {}
+    }
+"""
+
+# Yandex Market: цены сниппетов выдачи
+_YANDEX_MARKET = r"""
+    ['[data-auto="snippet-price-current"]', '[data-baobab-name="price"]',
+     '[data-auto="price-value"]', '[data-zone-name="price"]'].forEach(selector => {
+        document.querySelectorAll(selector).forEach(el => {
+            const card = el.closest('[data-auto="snippet"], [data-zone-name="snippet-card"], article');
+            const title = card && card.querySelector('[data-auto="snippet-title"], h3, [itemprop="name"]');
+            const link = card && (card.querySelector('a[href*="/product"], a[href*="/card/"]') || card.querySelector('a[href]'));
+            add(text(title), el.textContent, true, link ? link.getAttribute('href') : '', '');
+        });
+    });
+"""
+
+# Текстовые цены ("123 456 ₽") видимого текста - если структурных данных нет
+_TEXT_PRICES = r"""
+    if (!items.length && pattern && document.body) {
+        for (const match of document.body.innerText.matchAll(new RegExp(pattern, 'g'))) {
+            add('', match[1], null, location.href, '');
+        }
+    }
+"""
+
+# Название страницы (как extract_product_name) и слова page_signals в outerHTML
+_EPILOGUE = r"""
+    const heading = document.querySelector('h1');
+    const og = document.querySelector('meta[property="og:title"]');
+    const name = text(document.querySelector('[itemprop="name"]')).trim()
+        || (og ? og.getAttribute('content') || '' : '').trim()
+        || document.title.trim().replace(/\s*[|—-]\s*.*$/, '')
+        || (heading ? heading.textContent.trim() : '');
+
+    const markers = {};
+    const html = document.documentElement.outerHTML.toLowerCase();
+    for (const word of words) {
+        let index = html.indexOf(word);
+        if (index < 0) continue;
+        const first = index;
+        let count = 0;
+        while (index >= 0) {
+            count += 1;
+            index = html.indexOf(word, index + word.length);
+        }
+        markers[word] = [first, count];
+    }
+
+    return {items, name, title: document.title, url: location.href, markers};
+}
+"""
+
+# Экстрактор магазина: блоки в порядке приоритета
+STORE_EXTRACTORS: Dict[str, Sequence[str]] = {
+    "generic": (_MICRODATA, _META_PRICE, _JSON_LD, _TEXT_PRICES),
+    "citilink": (_NEXT_DATA, _META_PRICE, _JSON_LD),
+    "yandex_market": (_YANDEX_MARKET, _MICRODATA, _JSON_LD, _TEXT_PRICES),
+}
+
+
+@lru_cache(maxsize=None)
+def extractor_script(store: str) -> str:
+    """JS-функция магазина (магазины без своего экстрактора - generic)"""
+    blocks = STORE_EXTRACTORS.get(store, STORE_EXTRACTORS["generic"])
+    return _PRELUDE + "".join(blocks) + _EPILOGUE
+
+
+# === Результат ===
+
+@dataclass
+class PageItem:
+    name: str
+    price: int
+    available: Optional[bool] = None
+    url: str = ""
+    code: str = ""
+
+
+@dataclass
+class Extraction:
+    """Товары страницы + сигналы + сколько это стоило"""
+    items: List[PageItem]
+    signals: PageSignals
+    source: str             # js, html
+    bytes: int              # передано из браузера
+    elapsed: float          # сек до результата
+    name: str = ""
+    html: Optional[str] = None  # только при fallback на page.content()
+
+    @property
+    def best(self) -> Optional[PageItem]:
+        """Первый товар по приоритету источников экстрактора"""
+        return self.items[0] if self.items else None
+
+    @property
+    def cheapest(self) -> Optional[PageItem]:
+        return min(self.items, key=lambda item: item.price) if self.items else None
+
+    def report(self) -> str:
+        return f"{self.source}: {self.bytes / 1024:.1f} KB, {self.elapsed * 1000:.0f} ms, {len(self.items)} items"
+
+    def details(self) -> dict:
+        """Поля для TestResult.details / JSON-вывода"""
+        return {
+            "extract_source": self.source,
+            "transfer_bytes": self.bytes,
+            "extract_ms": round(self.elapsed * 1000, 1),
+        }
+
+
+def _payload_size(data) -> int:
+    return len(json.dumps(data, ensure_ascii=False).encode())
+
+
+def extract_page(page: Page, store: str, bounds: Bounds,
+                 fallback: Optional[Callable[[str], List[PageItem]]] = None,
+                 extra: Sequence[str] = ()) -> Extraction:
+    """
+    Товары страницы через JS-экстрактор магазина.
+
+    fallback(html) - прежний HTML-парсер, вызывается с page.content() только
+    если экстрактор упал или не нашёл товаров на странице без CAPTCHA.
+    """
+    start = time.perf_counter()
+    matcher = page_matcher(tuple(extra))
+    transferred = 0
+
+    try:
+        data = page.evaluate(extractor_script(store), {
+            "lo": bounds.lo,
+            "hi": bounds.hi,
+            "pattern": bounds.text_pattern().pattern,
+            "words": matcher.words,
+        })
+    except Exception:
+        data = None
+
+    if data:
+        transferred = _payload_size(data)
+        hits = {word: Hit(first, count) for word, (first, count) in data["markers"].items()}
+        title_hits = matcher.scan(data["title"])
+        for word, hit in title_hits.items():
+            hits.setdefault(word, Hit(0, hit.count))
+        signals = signals_from_hits(hits, data["url"], title_hits)
+
+        items = [PageItem(**item) for item in data["items"]]
+        if items or signals.captcha or signals.has("captcha"):
+            return Extraction(items, signals, "js", transferred, time.perf_counter() - start, name=data["name"])
+
+    # Fallback: весь DOM через CDP
+    html = page.content()
+    signals = classify(html, page.url, extra=extra)
+    items = fallback(html) if fallback else []
+    transferred += len(html.encode())
+    return Extraction(items, signals, "html", transferred, time.perf_counter() - start, html=html)
+
+
+# === Бенчмарк ===
+
+def bench(query: str):
+    """content() + Python vs JS-экстрактор для магазинов collect_prices"""
+    from urllib.parse import quote_plus
+    from playwright.sync_api import sync_playwright
+
+    from collect_prices import STORES, USER_AGENTS, extract_price
+    from price_bounds import bounds_for
+    from stealth_bundle import apply_stealth_context
+
+    print("=" * 70)
+    print(f"PAGE EXTRACTION BENCHMARK: {query}")
+    print("=" * 70)
+
+    bounds = bounds_for(query, "laptops")
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=["--no-sandbox", "--disable-setuid-sandbox"])
+        context = browser.new_context(user_agent=USER_AGENTS[0], locale="ru-RU")
+        apply_stealth_context(context)
+
+        for name, config in STORES.items():
+            text = query.lower() if config.get("lowercase") else query
+            url = config["search_url"].format(
+                query=text if config.get("url_type") == "product" else quote_plus(query))
+            page = context.new_page()
+            try:
+                page.goto(url, wait_until="domcontentloaded", timeout=30000)
+                page.wait_for_timeout(3000)
+
+                start = time.perf_counter()
+                html = page.content()
+                price = extract_price(html, bounds)
+                classify(html, page.url)
+                legacy_ms = (time.perf_counter() - start) * 1000
+
+                extraction = extract_page(page, name, bounds)
+                best = extraction.best.price if extraction.best else None
+                print(f"[{name}]")
+                print(f"  content():  {len(html.encode()) / 1024:8.1f} KB  {legacy_ms:7.0f} ms  price={price}")
+                print(f"  extractor:  {extraction.bytes / 1024:8.1f} KB  {extraction.elapsed * 1000:7.0f} ms  "
+                      f"price={best} ({extraction.source}, {len(extraction.items)} items)")
+            except Exception as e:
+                print(f"[{name}] [!] {type(e).__name__}: {str(e)[:60]}")
+            finally:
+                page.close()
+
+        context.close()
+        browser.close()
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] != "bench":
+        print(f'Usage: {sys.argv[0]} bench ["MacBook Pro 16"]')
+        sys.exit(1)
+
+    bench(" ".join(sys.argv[2:]) or "MacBook Pro 16")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Page Signals - классификация страницы за один проход
+
+Детекторы CAPTCHA, наличия и типа страницы раньше каждый сам делал
+html.lower() и по 5-10 проверок `in` по всему документу (а detect_captcha
+в stealth_scraper ещё и дважды вызывал page.content()). Здесь все
+ключевые слова собраны в один автомат Aho-Corasick: документ приводится
+к нижнему регистру один раз, один проход даёт сразу
+
+    captcha       - тип CAPTCHA (reCAPTCHA, hCaptcha, CloudFlare, SmartCaptcha, redirect)
+    availability  - True / False / None
+    page_type     - "product" / "listing" / None
+    challenge     - интерстициал CloudFlare ("Just a moment...")
+
+Автомат - pyahocorasick (pip install pyahocorasick); без него тот же
+интерфейс работает через str.find по каждому слову (медленнее на
+больших словарях, но без зависимостей).
+
+Использование:
+    from page_signals import classify
+    signals = classify(html, url=page.url, title=page.title())
+    if signals.captcha: ...
+
+    python page_signals.py bench [page.html ...] [--repeat=20]
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+
+# === Словари ===
+
+# CAPTCHA по приоритету: слово -> тип
+CAPTCHA_PATTERNS = [
+    ("recaptcha", "reCAPTCHA"),
+    ("grecaptcha", "reCAPTCHA"),
+    ("hcaptcha", "hCaptcha"),
+    ("cf-browser-verification", "CloudFlare"),
+    ("smartcaptcha", "SmartCaptcha"),
+]
+
+# Слабые признаки: упоминание без виджета (скрипты CDN, тексты)
+CAPTCHA_HINTS = [
+    ("cloudflare", "CloudFlare"),
+    ("captcha", "unknown"),
+]
+
+CAPTCHA_URL_PATTERNS = ["captcha", "showcaptcha"]
+
+CHALLENGE_PATTERNS = ["just a moment", "checking your browser"]
+
+# Наличие по приоритету: структурированные данные, затем текст
+AVAILABILITY_PATTERNS = [
+    ("instock", True),
+    ("in_stock", True),
+    ("outofstock", False),
+    ("out_of_stock", False),
+    ("soldout", False),
+    ('isavailable":true', True),
+    ('"available":true', True),
+    ('isavailable":false', False),
+    ('"available":false', False),
+]
+IN_STOCK_TEXT = "в наличии"
+OUT_OF_STOCK_TEXT = ["нет в наличии", "под заказ"]
+PREORDER_PATTERN = "preorder"
+
+# Признаки страницы поиска/каталога (в заголовке или начале документа)
+LISTING_PATTERNS = [
+    "поиск по товарам",
+    "результаты поиска",
+    "search results",
+    "найдено товаров",
+    "показать ещё",
+]
+LISTING_HEAD = 5000
+
+PRODUCT_PATTERNS = [
+    'itemprop="product"',
+    'itemtype="http://schema.org/product"',
+    '"@type":"product"',
+    '"@type": "product"',
+    'class="product-page"',
+    'class="product-card"',
+    'id="product-',
+]
+
+
+def _page_words() -> List[str]:
+    words = [w for w, _ in CAPTCHA_PATTERNS + CAPTCHA_HINTS + AVAILABILITY_PATTERNS]
+    words += CHALLENGE_PATTERNS + [IN_STOCK_TEXT, PREORDER_PATTERN] + OUT_OF_STOCK_TEXT
+    words += LISTING_PATTERNS + PRODUCT_PATTERNS
+    return words
+
+
+# === Автомат ===
+
+@dataclass(frozen=True)
+class Hit:
+    first: int   # позиция первого вхождения (в нижнем регистре)
+    count: int
+
+
+class KeywordMatcher:
+    """Поиск набора слов за один проход (регистр не важен)"""
+
+    def __init__(self, words: Iterable[str]):
+        self.words = sorted({w.lower() for w in words if w})
+        if HAS_AHOCORASICK:
+            self._automaton = ahocorasick.Automaton()
+            for word in self.words:
+                self._automaton.add_word(word, word)
+            self._automaton.make_automaton()
+
+    def scan(self, text: str) -> Dict[str, Hit]:
+        """Найденные слова: слово -> (первое вхождение, число вхождений)"""
+        text = text.lower()
+        if not HAS_AHOCORASICK:
+            return self._scan_find(text)
+
+        first: Dict[str, int] = {}
+        counts: Dict[str, int] = {}
+        for end, word in self._automaton.iter(text):
+            if word not in first:
+                first[word] = end - len(word) + 1
+            counts[word] = counts.get(word, 0) + 1
+        return {word: Hit(first[word], counts[word]) for word in first}
+
+    def _scan_find(self, text: str) -> Dict[str, Hit]:
+        hits = {}
+        for word in self.words:
+            pos = text.find(word)
+            if pos >= 0:
+                hits[word] = Hit(pos, text.count(word))
+        return hits
+
+
+@lru_cache(maxsize=32)
+def page_matcher(extra: Tuple[str, ...] = ()) -> KeywordMatcher:
+    """Общий автомат страницы (+ дополнительные слова, например характеристики товара)"""
+    return KeywordMatcher(_page_words() + list(extra))
+
+
+# === Классификация ===
+
+@dataclass
+class PageSignals:
+    captcha: Optional[str] = None          # тип по явным признакам
+    captcha_hint: Optional[str] = None     # тип по упоминаниям
+    challenge: bool = False
+    availability: Optional[bool] = None
+    preorder: bool = False
+    page_type: Optional[str] = None
+    hits: Dict[str, Hit] = field(default_factory=dict)
+
+    def has(self, word: str) -> bool:
+        return word.lower() in self.hits
+
+    def has_any(self, words: Iterable[str]) -> bool:
+        return any(self.has(w) for w in words)
+
+
+# Последний просканированный документ: детекторы, вызванные подряд для одного
+# и того же html (captcha, наличие, тип страницы), делят один проход
+_last_scan: Tuple = (None, frozenset(), {})
+
+
+def scan_page(html: str, title: str = "", extra: Sequence[str] = ()) -> Tuple[Dict[str, Hit], Dict[str, Hit]]:
+    """Вхождения слов в html и title (html того же объекта не сканируется повторно)"""
+    global _last_scan
+    words = frozenset(w.lower() for w in extra)
+    last_html, last_words, hits = _last_scan
+    if last_html is not html or not words <= last_words:
+        hits = page_matcher(tuple(sorted(words))).scan(html)
+        _last_scan = (html, words, hits)
+
+    title_hits = page_matcher(tuple(sorted(words))).scan(title) if title else {}
+    if title_hits:
+        hits = dict(hits)
+        for word, hit in title_hits.items():
+            hits.setdefault(word, Hit(0, hit.count))
+    return hits, title_hits
+
+
+def classify(html: str, url: str = "", title: str = "", extra: Sequence[str] = ()) -> PageSignals:
+    """Все сигналы страницы за один проход по html (title и url - короткие)"""
+    hits, title_hits = scan_page(html, title, extra)
+    return signals_from_hits(hits, url, title_hits)
+
+
+def signals_from_hits(hits: Dict[str, Hit], url: str = "", title_hits: Optional[Dict[str, Hit]] = None) -> PageSignals:
+    """Сигналы по найденным словам (скан в Python или в браузере, см. page_extractors)"""
+    title_hits = title_hits or {}
+    signals = PageSignals(hits=hits)
+    url = url.lower()
+
+    # CAPTCHA
+    if any(p in url for p in CAPTCHA_URL_PATTERNS):
+        signals.captcha = "redirect"
+    else:
+        signals.captcha = next((kind for word, kind in CAPTCHA_PATTERNS if word in hits), None)
+    signals.captcha_hint = signals.captcha or next((kind for word, kind in CAPTCHA_HINTS if word in hits), None)
+    signals.challenge = any(p in hits for p in CHALLENGE_PATTERNS)
+
+    # Наличие
+    signals.availability = next((value for word, value in AVAILABILITY_PATTERNS if word in hits), None)
+    if signals.availability is None:
+        out_of_stock = hits.get(OUT_OF_STOCK_TEXT[0])
+        in_stock = hits.get(IN_STOCK_TEXT)
+        # "нет в наличии" тоже содержит "в наличии" - считаем только остальные
+        if in_stock and in_stock.count > (out_of_stock.count if out_of_stock else 0):
+            signals.availability = True
+        elif any(p in hits for p in OUT_OF_STOCK_TEXT):
+            signals.availability = False
+    signals.preorder = PREORDER_PATTERN in hits
+
+    # Тип страницы
+    if any(p in title_hits or (p in hits and hits[p].first < LISTING_HEAD) for p in LISTING_PATTERNS):
+        signals.page_type = "listing"
+    elif any(p in hits for p in PRODUCT_PATTERNS):
+        signals.page_type = "product"
+
+    return signals
+
+
+# === Бенчмарк ===
+
+def _legacy_detectors(html: str, url: str, title: str):
+    """Как раньше: отдельный lower() и проверки `in` в каждом детекторе"""
+    html_lower = html.lower()
+    _ = [p in url.lower() for p in CAPTCHA_URL_PATTERNS] + [w in html_lower for w, _ in CAPTCHA_PATTERNS]
+    html_lower = html.lower()
+    _ = [w in html_lower for w, _ in CAPTCHA_PATTERNS + CAPTCHA_HINTS]
+    html_lower = html.lower()
+    _ = [w in html_lower for w, _ in AVAILABILITY_PATTERNS] + [w in html_lower for w in OUT_OF_STOCK_TEXT]
+    html_lower = html.lower()
+    _ = [w in title.lower() or w in html_lower[:LISTING_HEAD] for w in LISTING_PATTERNS]
+    _ = [w in html for w in PRODUCT_PATTERNS]
+    content = (html + " " + title).lower()
+    _ = [w in content for w in CHALLENGE_PATTERNS]
+
+
+def synthetic_page(size_mb: float) -> str:
+    """Большая страница каталога с признаками в конце документа"""
+    rng = random.Random(42)
+    card = ('<div class="catalog-product" data-id="{id}"><a href="/product/{id}/">Ноутбук Apple MacBook '
+            'Pro 16 M{m} Pro {ram}GB/{ssd}GB</a><span class="price">{price} ₽</span>'
+            '<script>window.ga&&ga("send","event")</script></div>\n')
+    parts, total = [], 0
+    while total < size_mb * 1_000_000:
+        part = card.format(id=rng.randint(10 ** 6, 10 ** 7), m=rng.randint(1, 4), ram=rng.choice([16, 32]),
+                           ssd=rng.choice([512, 1024]), price=f"{rng.randint(150, 400)} {rng.randint(100, 999)}")
+        parts.append(part)
+        total += len(part)
+    parts.append('<span class="availability">Есть в наличии</span><script src="/smartcaptcha.js"></script>')
+    return "".join(parts)
+
+
+def bench(pages: List[Tuple[str, str]], repeat: int):
+    print("=" * 70)
+    print(f"PAGE SIGNALS BENCHMARK (automaton: {'pyahocorasick' if HAS_AHOCORASICK else 'str.find'})")
+    print("=" * 70)
+    page_matcher()  # сборка автомата не входит в замер
+
+    for name, html in pages:
+        size = len(html.encode()) / 1_000_000
+        print(f"[*] {name}: {size:.2f} MB")
+        def single_pass():
+            global _last_scan
+            _last_scan = (None, frozenset(), {})
+            classify(html, "", "Каталог")
+
+        for label, fn in (("legacy detectors", lambda: _legacy_detectors(html, "", "Каталог")),
+                          ("classify() single pass", single_pass)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            elapsed = (time.perf_counter() - start) / repeat
+            print(f"  {label:<26} {elapsed * 1000:8.1f} ms   {size / elapsed:7.1f} MB/s")
+        signals = classify(html, "", "Каталог")
+        print(f"  captcha={signals.captcha} availability={signals.availability} page_type={signals.page_type}")
+        print()
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args or args[0] != "bench":
+        print(f"Usage: {sys.argv[0]} bench [page.html ...] [--repeat=N]")
+        sys.exit(1)
+
+    repeat = 20
+    for arg in sys.argv[1:]:
+        if arg.startswith("--repeat="):
+            repeat = int(arg.split("=")[1])
+
+    if len(args) > 1:
+        pages = [(p, Path(p).read_text(encoding="utf-8", errors="replace")) for p in args[1:]]
+    else:
+        pages = [(f"synthetic {mb} MB", synthetic_page(mb)) for mb in (0.5, 2, 8)]
+
+    bench(pages, repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,7 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 
 from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
+from stealth_bundle import apply_stealth_context
 
 
 @dataclass
@@ -45,11 +45,10 @@ def search_citilink(query: str, max_results: int = 10) -> List[Product]:
             timezone_id="Europe/Moscow",
         )
 
-        page = context.new_page()
+        # Применяем stealth (init-скрипт на весь контекст)
+        apply_stealth_context(context)
 
-        # Применяем stealth
-        stealth = Stealth()
-        stealth.apply_stealth_sync(page)
+        page = context.new_page()
 
         # Поиск
         search_url = f"https://www.citilink.ru/search/?text={query.replace(' ', '+')}"
@@ -7,13 +7,19 @@ DNS-Shop HTML Parser
 import sys
 import re
 import json
+import time
+import random
+import resource
+import subprocess
 from pathlib import Path
 
-try:
-    from bs4 import BeautifulSoup
-    HAS_BS4 = True
-except ImportError:
-    HAS_BS4 = False
+from html_backend import BACKENDS, DEFAULT_BACKEND, parse
+from listing_batch import ListingBatch
+
+# Сетка товаров заканчивается перед пагинацией/подвалом - дальше не разбираем.
+# Конец ищется только после начала сетки: pagination-widget.css в <head> не в счёт
+GRID_START = ('catalog-products', 'data-product-price')
+GRID_END = ('pagination-widget', '<footer')
 
 
 def parse_with_regex(html: str) -> list[dict]:
@@ -80,44 +86,57 @@ def parse_with_regex(html: str) -> list[dict]:
     return products
 
 
-def parse_with_bs4(html: str) -> list[dict]:
-    """Парсинг через BeautifulSoup"""
-    soup = BeautifulSoup(html, 'html.parser')
-    products = []
-
-    # Ищем карточки товаров
-    cards = soup.select('[data-id]')
-
-    for card in cards:
-        product = {}
-
-        # ID товара
-        product['id'] = card.get('data-id')
+def select_cards(doc) -> ListingBatch:
+    """Карточки товаров с ценой из разобранного документа"""
+    products = ListingBatch("dns")
 
+    for card in doc.select('[data-id]'):
         # Цена
-        price_attr = card.get('data-product-price')
-        if price_attr:
-            product['price'] = int(price_attr)
+        price_attr = card.attr('data-product-price')
+        price = int(price_attr) if price_attr else 0
+        if price <= 50000:
+            continue
 
         # Название
         title_elem = card.select_one('.catalog-product__name, .product-info__title a')
-        if title_elem:
-            product['name'] = title_elem.get_text(strip=True)
 
         # URL
         link = card.select_one('a[href*="/product/"]')
-        if link:
-            product['url'] = 'https://www.dns-shop.ru' + link.get('href', '')
 
-        if product.get('price') and product.get('price') > 50000:
-            products.append(product)
+        products.append(
+            title_elem.text(strip=True) if title_elem else '',
+            price,
+            url='https://www.dns-shop.ru' + link.attr('href', '') if link else '',
+            product_id=card.attr('data-id'),
+        )
+
+    return products
+
 
-    # Если карточки не найдены, пробуем JSON-LD
+def parse_with_dom(html: str, backend: str = None, partial: bool = True) -> list[dict]:
+    """
+    Парсинг через DOM (html_backend: selectolax / lxml / bs4)
+
+    partial=True - дерево строится только от начала до конца сетки товаров
+    (GRID_START..GRID_END); если там карточек нет, разбирается вся страница
+    """
+    doc = parse(html, backend, stop=GRID_END if partial else (), after=GRID_START)
+    cards = select_cards(doc)
+
+    # Неожиданная разметка: обрезка могла отрезать сетку - повтор по всей странице
+    if not cards and doc.partial:
+        doc = parse(html, backend)
+        cards = select_cards(doc)
+
+    # dict только на выходе: рядом могут лежать сводки каталога (price_low/price_high)
+    products = cards.to_dicts()
+
+    # Если карточки не найдены, пробуем JSON-LD (может быть и после сетки)
     if not products:
-        ld_script = soup.select_one('script[type="application/ld+json"]')
+        ld_script = doc.select_one('script[type="application/ld+json"]')
         if ld_script:
             try:
-                data = json.loads(ld_script.string)
+                data = json.loads(ld_script.text())
                 if 'offers' in data:
                     products.append({
                         'name': data.get('name'),
@@ -131,11 +150,92 @@ def parse_with_bs4(html: str) -> list[dict]:
     return products
 
 
+# === Бенчмарк ===
+
+def synthetic_page(cards: int) -> str:
+    """Страница каталога: шапка, сетка карточек, пагинация и тяжёлый подвал"""
+    rng = random.Random(42)
+    card = ('<div class="catalog-product" data-id="{id}" data-product-price="{price}">'
+            '<div class="catalog-product__image"><img src="/img/{id}.jpg" alt=""></div>'
+            '<a class="catalog-product__name ui-link" href="/product/{id}/noutbuk/"><span>Ноутбук Apple '
+            'MacBook Pro 16 M{m} Pro [RAM {ram} ГБ, SSD {ssd} ГБ]</span></a>'
+            '<div class="product-buy__price">{price} ₽</div></div>\n')
+    filler = '<li><a href="/catalog/{id}/">Раздел {id}</a><p>{text}</p></li>\n'
+    parts = ['<html><head><title>Ноутбуки Apple - DNS</title></head><body><div class="catalog-products">']
+    for _ in range(cards):
+        parts.append(card.format(id=rng.randint(10 ** 6, 10 ** 7), price=rng.randint(150, 400) * 1000,
+                                 m=rng.randint(1, 4), ram=rng.choice([16, 32]), ssd=rng.choice([512, 1024])))
+    parts.append('</div><div class="pagination-widget"></div><footer><ul>')
+    for i in range(cards * 4):
+        parts.append(filler.format(id=i, text="Подробнее о доставке и гарантии " * 4))
+    parts.append('</ul></footer></body></html>')
+    return "".join(parts)
+
+
+def bench_one(html_path: str, backend: str, partial: bool, repeat: int):
+    """Один замер в отдельном процессе: время разбора и прирост пикового RSS"""
+    html = Path(html_path).read_text(encoding='utf-8', errors='ignore')
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for _ in range(repeat):
+        products = parse_with_dom(html, backend, partial)
+    elapsed = (time.perf_counter() - start) / repeat
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"ms": elapsed * 1000, "rss_mb": (rss_peak - rss_before) / 1024, "products": len(products)}))
+
+
+def bench(pages: list[tuple[str, str]], repeat: int):
+    print("=" * 70)
+    print("DNS HTML PARSER BENCHMARK")
+    print("=" * 70)
+
+    # Прежний путь (bs4 целиком), быстрый бэкенд целиком, затем частичный разбор
+    variants = [("bs4", False), (DEFAULT_BACKEND, False)] + [(backend, True) for backend in BACKENDS]
+    for name, path in pages:
+        size = Path(path).stat().st_size / 1_000_000
+        print(f"[*] {name}: {size:.2f} MB")
+        for backend, partial in variants:
+            # Пиковый RSS - на процесс, поэтому каждый вариант в своём процессе
+            proc = subprocess.run(
+                [sys.executable, __file__, path, f"--bench-one={backend}",
+                 f"--repeat={repeat}"] + (["--partial"] if partial else []),
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"  {backend:<12} [!] {proc.stderr.strip()[-100:]}")
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            label = f"{backend}{' (partial)' if partial else ''}"
+            print(f"  {label:<22} {r['ms']:8.1f} ms   peak RSS +{r['rss_mb']:6.1f} MB   products={r['products']}")
+        print()
+
+
 def main():
-    if len(sys.argv) < 2:
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    repeat = 3
+    for arg in sys.argv[1:]:
+        if arg.startswith("--repeat="):
+            repeat = int(arg.split("=")[1])
+        elif arg.startswith("--bench-one="):
+            bench_one(args[0], arg.split("=")[1], "--partial" in sys.argv, repeat)
+            return
+
+    if "--bench" in sys.argv:
+        if args:
+            pages = [(p, p) for p in args]
+        else:
+            pages = []
+            for cards in (200, 2000):
+                path = Path(f"/tmp/dns_bench_{cards}.html")
+                path.write_text(synthetic_page(cards), encoding='utf-8')
+                pages.append((f"synthetic {cards} cards", str(path)))
+        bench(pages, repeat)
+        return
+
+    if not args:
         html_path = Path('/tmp/dns_qute/page.html')
     else:
-        html_path = Path(sys.argv[1])
+        html_path = Path(args[0])
 
     if not html_path.exists():
         print(f"[!] Файл не найден: {html_path}")
@@ -152,11 +252,11 @@ def main():
     print()
 
     # Парсим
-    if HAS_BS4:
-        print("=== Парсинг через BeautifulSoup ===")
-        products = parse_with_bs4(html)
+    if DEFAULT_BACKEND:
+        print(f"=== Парсинг через DOM ({DEFAULT_BACKEND}) ===")
+        products = parse_with_dom(html)
     else:
-        print("=== Парсинг через regex (bs4 не установлен) ===")
+        print("=== Парсинг через regex (selectolax/lxml/bs4 не установлены) ===")
         products = parse_with_regex(html)
 
     if not products:
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Parse Pool - разбор страниц в пуле процессов, отдельно от загрузки
+
+Разбор многомегабайтных страниц (regex по ценам, json.loads __NEXT_DATA__,
+specs из названий, DOM) - чистый CPU. В потоке, который грузит страницы
+или ведёт браузер, он держит GIL, и параллельные загрузки стоят.
+
+ParsePool выносит разбор в процессы:
+    - страница (str/bytes) кладётся в multiprocessing.shared_memory, воркер
+      получает только имя блока и размер - без pickle мегабайтов HTML
+    - submit() сразу возвращает concurrent.futures.Future, планировщик
+      забирает результат через wait(FIRST_COMPLETED) / add_done_callback
+    - back-pressure: не больше max_pending страниц в разборе, submit()
+      блокирует загрузчик, пока разбор не догонит
+
+Функция разбора - на уровне модуля (передаётся в воркер по имени),
+страница - последний аргумент: fn(*args, html).
+
+Воркеры стартуют через forkserver (spawn, где его нет), а не fork:
+submit() зовут из потоков загрузчика, и fork копировал бы чужие
+захваченные блокировки и состояние браузера в дочерний процесс.
+
+Использование:
+    with ParsePool(workers=4) as pool:
+        future = pool.submit(parse_dns_page, html)
+        products = future.result()
+
+    python parse_pool.py bench [--pages=16] [--workers=N]
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import os
+import sys
+import time
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Optional, Union
+
+
+def _attach(name: str) -> SharedMemory:
+    # 3.13+: блок удаляет создатель, трекер воркера о нём знать не должен
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    return SharedMemory(name=name)
+
+
+def _context():
+    """forkserver, где он есть (Linux/BSD), иначе spawn (Windows, по умолчанию на macOS)"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _run(fn: Callable, name: str, size: int, text: bool, args: tuple) -> Any:
+    """Воркер: страница из shared memory -> fn(*args, page)"""
+    shm = _attach(name)
+    view = shm.buf[:size]
+    try:
+        page = str(view, "utf-8", "ignore") if text else bytes(view)
+    finally:
+        view.release()
+        shm.close()
+    return fn(*args, page)
+
+
+class ParsePool:
+    """Пул процессов для разбора страниц с передачей через shared memory"""
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 2
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_context())
+
+        # Статистика: сколько страниц/байт и сколько загрузчик ждал разбор
+        # (submit() зовут из нескольких потоков - счётчики под _lock)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.bytes = 0
+        self.blocked = 0.0
+
+    def submit(self, fn: Callable, page: Union[str, bytes], *args) -> Future:
+        """fn(*args, page) в воркере; блокирует, если в разборе уже max_pending страниц"""
+        start = time.monotonic()
+        self._slots.acquire()
+        waited = time.monotonic() - start
+
+        try:
+            data = page.encode("utf-8") if isinstance(page, str) else page
+            shm = SharedMemory(create=True, size=max(len(data), 1))
+            shm.buf[:len(data)] = data
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.blocked += waited
+            self.submitted += 1
+            self.bytes += len(data)
+        try:
+            future = self._pool.submit(_run, fn, shm.name, len(data), isinstance(page, str), args)
+        except Exception:
+            self._release(shm)
+            raise
+        future.add_done_callback(lambda _: self._release(shm))
+        return future
+
+    def _release(self, shm: SharedMemory):
+        shm.close()
+        shm.unlink()
+        self._slots.release()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# === Бенчмарк ===
+
+def _fetch(delay: float, html: str) -> str:
+    """Имитация загрузки: сеть/браузер (GIL свободен), страница готова"""
+    time.sleep(delay)
+    return html
+
+
+def bench(pages: int, workers: int):
+    from concurrent.futures import ThreadPoolExecutor
+    from parse_dns_prices import parse_with_dom, synthetic_page
+
+    html = synthetic_page(2000)
+    fetch_delay = 0.2
+    print("=" * 70)
+    print(f"PARSE POOL BENCHMARK: {pages} pages x {len(html.encode()) / 1e6:.1f} MB, "
+          f"{workers} fetch threads / parse workers")
+    print("=" * 70)
+
+    # Разбор в потоках загрузки (как сейчас): потоки делят GIL
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as fetchers:
+        results = list(fetchers.map(lambda _: parse_with_dom(_fetch(fetch_delay, html)), range(pages)))
+    inline = time.perf_counter() - start
+    print(f"  {'inline (fetch threads)':<28} {inline:6.2f}s   products={sum(map(len, results))}")
+
+    # Загрузка в потоках, разбор в пуле процессов
+    start = time.perf_counter()
+    with ParsePool(workers=workers) as pool, ThreadPoolExecutor(max_workers=workers) as fetchers:
+        futures = list(fetchers.map(lambda _: pool.submit(parse_with_dom, _fetch(fetch_delay, html)), range(pages)))
+        wait(futures)
+        results = [f.result() for f in futures]
+    pooled = time.perf_counter() - start
+    print(f"  {'ParsePool (processes)':<28} {pooled:6.2f}s   products={sum(map(len, results))}   "
+          f"back-pressure wait {pool.blocked:.2f}s")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args or args[0] != "bench":
+        print(f"Usage: {sys.argv[0]} bench [--pages=N] [--workers=N]")
+        sys.exit(1)
+
+    pages, workers = 16, os.cpu_count() or 1
+    for arg in sys.argv[1:]:
+        if arg.startswith("--pages="):
+            pages = int(arg.split("=")[1])
+        elif arg.startswith("--workers="):
+            workers = int(arg.split("=")[1])
+
+    bench(pages, workers)
+
+
+if __name__ == "__main__":
+    main()
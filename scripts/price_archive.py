@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Price Archive - Columnar Export and Memory-Mapped Reader
+
+Выгружает историю цен (price_history из PostgreSQL, хранилище результатов
+data/results или старые JSON data/prices_*.json, data/test_results_*.json)
+в колоночный архив, разбитый по месяцам и магазинам:
+
+    <root>/month=2026-10/store=dns/db.parquet
+    <root>/month=2026-10/store=citilink/prices_20261019_120000.arrow
+
+Колонки store/product хранятся со словарным кодированием. Чтение идёт
+через memory map (Arrow IPC - без копирования, Parquet - без буферизации
+файла), запросы по товару/магазину/диапазону дат отсекают лишние
+партиции по именам каталогов и фильтруются Arrow compute - без Postgres.
+
+Цены в архиве - в копейках, как в БД.
+
+Использование:
+    python price_archive.py export --db [--since=2026-01-01] [--format=arrow] [--out=data/archive]
+    python price_archive.py export --results [--since=2026-10-01]
+    python price_archive.py export data/prices_*.json data/test_results_*.json
+    python price_archive.py query --store=dns --product-id=42 --from=2026-09-01 --to=2026-10-01
+
+Требует: pip install pyarrow numpy
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import subprocess
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+from result_store import ResultStore, format_ms
+
+
+# === Конфигурация ===
+
+DEFAULT_DATABASE_URL = "postgresql://postgres@192.168.0.10:5432/price_scout"
+DEFAULT_ARCHIVE_DIR = Path(__file__).parent.parent / "data" / "archive"
+DEFAULT_RESULTS_DIR = Path(__file__).parent.parent / "data" / "results"
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Порядок колонок архива
+COLUMNS = ["recorded_at", "product_id", "product", "store", "price", "available"]
+
+
+def archive_schema() -> "pa.Schema":
+    """Схема архива (store/product - словарные колонки)"""
+    return pa.schema([
+        ("recorded_at", pa.timestamp("ms", tz="UTC")),
+        ("product_id", pa.int64()),
+        ("product", pa.dictionary(pa.int32(), pa.string())),
+        ("store", pa.dictionary(pa.int32(), pa.string())),
+        ("price", pa.int64()),
+        ("available", pa.bool_()),
+    ])
+
+
+def store_slug(store: str) -> str:
+    """Имя каталога партиции для магазина"""
+    return re.sub(r'[^a-z0-9]+', '_', store.lower()).strip('_') or "unknown"
+
+
+def month_key(ts: datetime) -> str:
+    return ts.strftime("%Y-%m")
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """'2026-10' / '2026-10-19' / ISO -> aware datetime (UTC)"""
+    if not value:
+        return None
+    if re.fullmatch(r'\d{4}-\d{2}', value):
+        value += "-01"
+    dt = datetime.fromisoformat(value)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+# === Источники ===
+
+def _psql(database_url: str, sql: str, *extra: str) -> bytes:
+    proc = subprocess.run(
+        ["psql", database_url, "-X", "-v", "ON_ERROR_STOP=1", *extra, "-c", sql],
+        capture_output=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"psql: {proc.stderr.decode(errors='replace').strip()}")
+    return proc.stdout
+
+
+def db_months(database_url: str, since: Optional[datetime] = None) -> List[str]:
+    """Месяцы, за которые в price_history есть данные"""
+    where = f"WHERE recorded_at >= '{since.isoformat()}'" if since else ""
+    out = _psql(
+        database_url,
+        f"SELECT DISTINCT to_char(date_trunc('month', recorded_at), 'YYYY-MM') "
+        f"FROM price_history {where} ORDER BY 1",
+        "-A", "-t",
+    )
+    return [line for line in out.decode().splitlines() if line]
+
+
+def read_db_month(database_url: str, month: str) -> "pa.Table":
+    """Один месяц price_history (одна партиция в БД) через COPY ... CSV"""
+    sql = f"""
+        COPY (
+            SELECT (extract(epoch FROM ph.recorded_at) * 1000)::bigint,
+                   ph.product_id, p.name, s.name, ph.price, ph.available
+            FROM price_history ph
+            JOIN products p ON p.id = ph.product_id
+            JOIN stores s ON s.id = ph.store_id
+            WHERE ph.recorded_at >= '{month}-01'::date
+              AND ph.recorded_at < '{month}-01'::date + INTERVAL '1 month'
+            ORDER BY s.name, ph.product_id, ph.recorded_at
+        ) TO STDOUT WITH (FORMAT csv)
+    """
+    raw = _psql(database_url, sql)
+    table = pa_csv.read_csv(
+        io.BytesIO(raw),
+        read_options=pa_csv.ReadOptions(column_names=COLUMNS),
+        convert_options=pa_csv.ConvertOptions(column_types={
+            "recorded_at": pa.int64(),
+            "product_id": pa.int64(),
+            "product": pa.string(),
+            "store": pa.string(),
+            "price": pa.int64(),
+            "available": pa.bool_(),
+        }),
+    )
+    return to_archive_table(table)
+
+
+def rows_from_json(path: Path) -> List[Dict]:
+    """Строки архива из data/prices_*.json или data/test_results_*.json"""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return rows_from_results(data.get("results", []), data.get("timestamp"), data.get("query") or "")
+
+
+def rows_from_store(root: Path, since: Optional[datetime] = None) -> List[Dict]:
+    """Строки архива из хранилища результатов (data/results, result_store.py)"""
+    start = since.replace(day=1, hour=0, minute=0, second=0, microsecond=0) if since else None
+    # У записей test_results нет своего timestamp - время запуска хранится в ts
+    return [row for record in ResultStore(root).range(start)
+            for row in rows_from_results([record], format_ms(record["ts"]), record.get("query") or "")]
+
+
+def rows_from_results(results: List[Dict], default_ts: Optional[str], query: str) -> List[Dict]:
+    """Строки архива из результатов collect_prices / test_scrapers"""
+    rows = []
+    for r in results:
+        if not r.get("price"):
+            continue
+        ts = parse_date(r.get("timestamp") or default_ts) or datetime.now(timezone.utc)
+        details = r.get("details") or {}
+        rows.append({
+            "recorded_at": ts,
+            "product_id": None,
+            "product": details.get("query") or query or r.get("product_name") or "",
+            "store": r["store"],
+            "price": int(r["price"]) * 100,  # рубли -> копейки
+            "available": bool(r.get("available")),
+        })
+    return rows
+
+
+def to_archive_table(table: "pa.Table") -> "pa.Table":
+    """Привести колонки к схеме архива"""
+    schema = archive_schema()
+    columns = []
+    for field in schema:
+        col = table.column(field.name)
+        if field.name == "recorded_at" and pa.types.is_integer(col.type):
+            col = col.cast(pa.timestamp("ms")).cast(field.type)
+        columns.append(col.cast(field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+# === Запись ===
+
+def write_partitions(table: "pa.Table", root: Path, tag: str, fmt: str = "parquet") -> List[Path]:
+    """Разложить таблицу по month=/store= и записать по файлу на партицию
+
+    Файл партиции называется по источнику (tag): повторная выгрузка того
+    же источника перезаписывает его (и удаляет копию в другом формате),
+    другие источники не трогает.
+    """
+    if table.num_rows == 0:
+        return []
+
+    months = pc.strftime(table.column("recorded_at"), format="%Y-%m")
+    stores = table.column("store").cast(pa.string())
+    keys = pc.binary_join_element_wise(months, stores, "\x00")
+
+    written = []
+    for key in pc.unique(keys).to_pylist():
+        month, store = key.split("\x00")
+        part = table.filter(pc.equal(keys, key)).combine_chunks()
+        # Словари - только значения этой партиции
+        part = pa.Table.from_arrays(
+            [pc.dictionary_encode(c.cast(pa.string())) if pa.types.is_dictionary(c.type) else c
+             for c in part.columns],
+            schema=part.schema,
+        )
+
+        directory = root / f"month={month}" / f"store={store_slug(store)}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{tag}{FORMATS[fmt]}"
+        tmp = path.with_suffix(path.suffix + ".tmp")
+
+        if fmt == "arrow":
+            with pa.OSFile(str(tmp), "wb") as sink:
+                with pa.ipc.new_file(sink, part.schema) as writer:
+                    writer.write_table(part)
+        else:
+            pq.write_table(
+                part, tmp,
+                compression="zstd",
+                use_dictionary=["product", "store"],
+                write_statistics=True,
+            )
+        os.replace(tmp, path)
+        # Тот же источник в другом формате - устаревшая копия, иначе строки читаются дважды
+        for suffix in FORMATS.values():
+            if suffix != path.suffix:
+                (directory / f"{tag}{suffix}").unlink(missing_ok=True)
+        written.append(path)
+
+    return written
+
+
+def export_db(database_url: str, root: Path, since: Optional[datetime] = None,
+              fmt: str = "parquet") -> List[Path]:
+    """Выгрузить price_history помесячно (файлы db.<ext>)"""
+    written = []
+    for month in db_months(database_url, since):
+        table = read_db_month(database_url, month)
+        written.extend(write_partitions(table, root, "db", fmt))
+        print(f"  {month}: {table.num_rows} rows")
+    return written
+
+
+def export_results(store_root: Path, root: Path, since: Optional[datetime] = None,
+                   fmt: str = "parquet") -> List[Path]:
+    """Выгрузить хранилище результатов (файлы results.<ext>, с --since - с начала месяца)"""
+    rows = rows_from_store(store_root, since)
+    if not rows:
+        return []
+    table = pa.Table.from_pylist(rows, schema=archive_schema())
+    print(f"  {store_root}: {len(rows)} rows")
+    return write_partitions(table, root, "results", fmt)
+
+
+def export_json(paths: Iterable[Path], root: Path, fmt: str = "parquet") -> List[Path]:
+    """Выгрузить JSON-результаты (файл партиции = имя JSON-файла)"""
+    written = []
+    for path in paths:
+        rows = rows_from_json(path)
+        if not rows:
+            continue
+        table = pa.Table.from_pylist(rows, schema=archive_schema())
+        written.extend(write_partitions(table, root, path.stem, fmt))
+        print(f"  {path.name}: {len(rows)} rows")
+    return written
+
+
+# === Чтение ===
+
+class PriceArchive:
+    """Запросы к архиву через memory map, без Postgres"""
+
+    def __init__(self, root: Path = DEFAULT_ARCHIVE_DIR):
+        self.root = Path(root)
+
+    def files(self, store: Optional[str] = None,
+              start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Path]:
+        """Файлы партиций, пересекающихся с [start, end) и магазином (по файлу на источник)"""
+        first = month_key(start) if start else None
+        slug = store_slug(store) if store else None
+
+        result = []
+        for month_dir in sorted(self.root.glob("month=*")):
+            month = month_dir.name.split("=", 1)[1]
+            if first and month < first:
+                continue
+            if end and parse_date(month) >= end:
+                continue
+            for store_dir in sorted(month_dir.glob("store=*")):
+                if slug and store_dir.name != f"store={slug}":
+                    continue
+                # Источник в двух форматах (архив до удаления копий) - берётся свежий файл
+                latest: Dict[str, Path] = {}
+                for path in store_dir.iterdir():
+                    if path.suffix not in FORMATS.values():
+                        continue
+                    current = latest.get(path.stem)
+                    if current is None or path.stat().st_mtime > current.stat().st_mtime:
+                        latest[path.stem] = path
+                result.extend(sorted(latest.values()))
+        return result
+
+    @staticmethod
+    def read_file(path: Path) -> "pa.Table":
+        if path.suffix == ".arrow":
+            # Буферы таблицы ссылаются прямо на отображённый файл
+            return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        return pq.read_table(path, memory_map=True)
+
+    def query(self, product_id: Optional[int] = None, product: Optional[str] = None,
+              store: Optional[str] = None, start: Optional[datetime] = None,
+              end: Optional[datetime] = None) -> "pa.Table":
+        """История цен по товару / магазину / диапазону [start, end)"""
+        tables = [self.read_file(path) for path in self.files(store, start, end)]
+        if not tables:
+            return archive_schema().empty_table()
+
+        table = pa.concat_tables(tables, promote_options="permissive")
+
+        mask = None
+        conditions = []
+        if product_id is not None:
+            conditions.append(pc.equal(table.column("product_id"), product_id))
+        if product is not None:
+            conditions.append(pc.equal(table.column("product").cast(pa.string()), product))
+        if store is not None:
+            conditions.append(pc.equal(table.column("store").cast(pa.string()), store))
+        if start is not None:
+            conditions.append(pc.greater_equal(table.column("recorded_at"), pa.scalar(start, pa.timestamp("ms", tz="UTC"))))
+        if end is not None:
+            conditions.append(pc.less(table.column("recorded_at"), pa.scalar(end, pa.timestamp("ms", tz="UTC"))))
+        for condition in conditions:
+            mask = condition if mask is None else pc.and_(mask, condition)
+
+        if mask is not None:
+            table = table.filter(mask)
+        return table.sort_by([("recorded_at", "ascending")])
+
+    def series(self, **filters) -> Tuple["np.ndarray", "np.ndarray"]:
+        """(datetime64[ms], цены в копейках) как NumPy-массивы"""
+        table = self.query(**filters)
+        timestamps = table.column("recorded_at").cast(pa.timestamp("ms")).to_numpy()
+        prices = table.column("price").to_numpy()
+        return timestamps, prices
+
+    def summary(self, **filters) -> "pa.Table":
+        """min/max/count цены по магазину и товару"""
+        table = self.query(**filters)
+        table = table.set_column(
+            table.schema.get_field_index("store"), "store", table.column("store").cast(pa.string())
+        ).set_column(
+            table.schema.get_field_index("product"), "product", table.column("product").cast(pa.string())
+        )
+        return table.group_by(["store", "product"]).aggregate([
+            ("price", "min"), ("price", "max"), ("price", "count"),
+        ]).sort_by([("store", "ascending"), ("product", "ascending")])
+
+
+# === CLI ===
+
+def _options(argv: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    positional = [a for a in argv if not a.startswith("--")]
+    options = {}
+    for arg in argv:
+        if arg.startswith("--"):
+            key, _, value = arg[2:].partition("=")
+            options[key] = value or "1"
+    return positional, options
+
+
+def main():
+    if not HAS_ARROW:
+        print("Установите: pip install pyarrow numpy")
+        sys.exit(1)
+
+    positional, options = _options(sys.argv[1:])
+    if not positional or positional[0] not in ("export", "query"):
+        print(f"Usage: {sys.argv[0]} export --db [--since=YYYY-MM-DD] [--format=parquet|arrow] [--out=DIR]")
+        print(f"       {sys.argv[0]} export --results[=DIR] [--since=YYYY-MM-DD] [--format=parquet|arrow] [--out=DIR]")
+        print(f"       {sys.argv[0]} export <results.json>... [--format=parquet|arrow] [--out=DIR]")
+        print(f"       {sys.argv[0]} query [--store=S] [--product-id=N] [--product=NAME] [--from=D] [--to=D] [--out=DIR]")
+        sys.exit(1)
+
+    root = Path(options.get("out", DEFAULT_ARCHIVE_DIR))
+    fmt = options.get("format", "parquet")
+    if fmt not in FORMATS:
+        print(f"[!] Unknown format: {fmt} (parquet, arrow)")
+        sys.exit(1)
+
+    if positional[0] == "export":
+        print(f"[*] Export -> {root} ({fmt})")
+        if "db" in options:
+            database_url = os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL)
+            written = export_db(database_url, root, parse_date(options.get("since")), fmt)
+        elif "results" in options:
+            store_root = DEFAULT_RESULTS_DIR if options["results"] == "1" else Path(options["results"])
+            written = export_results(store_root, root, parse_date(options.get("since")), fmt)
+        else:
+            written = export_json([Path(p) for p in positional[1:]], root, fmt)
+        print(f"[+] Files written: {len(written)}")
+        return
+
+    archive = PriceArchive(root)
+    filters = {
+        "store": options.get("store"),
+        "product": options.get("product"),
+        "product_id": int(options["product-id"]) if "product-id" in options else None,
+        "start": parse_date(options.get("from")),
+        "end": parse_date(options.get("to")),
+    }
+    summary = archive.summary(**filters)
+    if summary.num_rows == 0:
+        print("[-] Нет данных")
+        return
+
+    for row in summary.to_pylist():
+        print(f"{row['store']:<12} {row['product'][:50]:<50} "
+              f"{row['price_min'] // 100:>9,} - {row['price_max'] // 100:>9,} RUB "
+              f"({row['price_count']} points)".replace(",", " "))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Price Bounds Index
+
+Диапазоны правдоподобных цен, выученные из price_history (миграция 009):
+по артикулу товара и по категории. Экстракторы берут диапазон один раз
+при старте и отбрасывают кандидатов сразу - вместо разбросанных по
+скриптам констант 80000..500000, 100000..400000 и т.п., подобранных под
+MacBook Pro.
+
+Индекс хранится в data/price_bounds.json (кэш таблицы price_bounds),
+обновление:
+
+    python price_bounds.py refresh      # refresh_price_bounds() + выгрузка кэша
+    python price_bounds.py show Z14V0008D
+
+Для текстового поиска цен bounds.text_pattern() строит регулярку только
+для чисел подходящей разрядности - на больших страницах findall не
+перебирает тысячи заведомо лишних чисел.
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import os
+import re
+import sys
+import json
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional
+
+
+# === Конфигурация ===
+
+DEFAULT_DATABASE_URL = "postgresql://postgres@192.168.0.10:5432/price_scout"
+BOUNDS_FILE = Path(__file__).parent.parent / "data" / "price_bounds.json"
+
+# Разделитель разрядов в ценах: пробел, NBSP, узкий NBSP
+_SEP = r'[\s\u00a0\u202f]'
+
+
+# === Диапазон ===
+
+@dataclass(frozen=True)
+class Bounds:
+    """Диапазон цены в рублях (включительно)"""
+    lo: int
+    hi: int
+
+    def __contains__(self, price) -> bool:
+        return price is not None and self.lo <= price <= self.hi
+
+    def text_pattern(self) -> "re.Pattern":
+        """Регулярка для текстовых цен ("123 456 ₽") нужной разрядности"""
+        return _text_pattern(len(str(self.lo)), len(str(self.hi)))
+
+
+@lru_cache(maxsize=None)
+def _text_pattern(min_digits: int, max_digits: int) -> "re.Pattern":
+    # Число из n цифр: слитно (249990) или целиком по разрядам - 1-3 старшие
+    # цифры + группы по 3 через разделитель (249 990). Смесь вида "2499 90"
+    # не совпадает; число перед ценой ("Pro 16 249 990 ₽") ей не мешает
+    alternatives = []
+    for n in range(max_digits, min_digits - 1, -1):
+        head, groups = n % 3 or 3, (n - 1) // 3
+        if groups:
+            alternatives.append(rf'\d{{{head}}}' + (_SEP + r'\d{3}') * groups)
+        alternatives.append(rf'\d{{{n}}}')
+    return re.compile(
+        r'(?<!\d)(' + '|'.join(alternatives) + r')(?!\d)[\s\u00a0\u202f]*(?:₽|руб|RUB)'
+    )
+
+
+def parse_text_price(match: str) -> Optional[int]:
+    clean = re.sub(r'[\s\u00a0\u202f]', '', match)
+    return int(clean) if clean.isdigit() else None
+
+
+# Прежний диапазон MacBook - когда для товара ничего не выучено
+DEFAULT_BOUNDS = Bounds(80000, 500000)
+
+
+# === Индекс ===
+
+class PriceBoundsIndex:
+    """Поиск диапазона: артикул -> категория -> DEFAULT_BOUNDS"""
+
+    def __init__(self, articles: Optional[Dict[str, Bounds]] = None,
+                 categories: Optional[Dict[str, Bounds]] = None,
+                 default: Bounds = DEFAULT_BOUNDS):
+        self.articles = articles or {}
+        self.categories = categories or {}
+        self.default = default
+
+    def lookup(self, article: Optional[str] = None, category: Optional[str] = None,
+               default: Optional[Bounds] = None) -> Bounds:
+        if article:
+            bounds = self.articles.get(normalize_article(article))
+            if bounds:
+                return bounds
+        if category:
+            bounds = self.categories.get(category)
+            if bounds:
+                return bounds
+        return default or self.default
+
+    @classmethod
+    def load(cls, path: Path = BOUNDS_FILE) -> "PriceBoundsIndex":
+        """Загрузить кэш (нет файла -> только DEFAULT_BOUNDS)"""
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return cls()
+
+        def section(name: str) -> Dict[str, Bounds]:
+            return {key: Bounds(lo, hi) for key, (lo, hi) in data.get(name, {}).items()}
+
+        return cls(section("articles"), section("categories"))
+
+    def save(self, path: Path = BOUNDS_FILE):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "updated_at": datetime.now().isoformat(),
+            "articles": {k: [b.lo, b.hi] for k, b in sorted(self.articles.items())},
+            "categories": {k: [b.lo, b.hi] for k, b in sorted(self.categories.items())},
+        }
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def from_db(cls, database_url: str) -> "PriceBoundsIndex":
+        """Прочитать таблицу price_bounds (копейки -> рубли)"""
+        proc = subprocess.run(
+            ["psql", database_url, "-X", "-A", "-t", "-F", "\t", "-c",
+             "SELECT scope, key, lo / 100, (hi + 99) / 100 FROM price_bounds"],
+            capture_output=True, text=True, check=False,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"psql: {proc.stderr.strip()}")
+
+        index = cls()
+        for line in proc.stdout.splitlines():
+            scope, key, lo, hi = line.split("\t")
+            target = index.articles if scope == "article" else index.categories
+            target[key] = Bounds(int(lo), int(hi))
+        return index
+
+
+def normalize_article(article: str) -> str:
+    """Как в compute_price_bounds(): только A-Z0-9, верхний регистр"""
+    return re.sub(r'[^A-Za-z0-9]', '', article).upper()
+
+
+@lru_cache(maxsize=1)
+def get_index() -> PriceBoundsIndex:
+    """Индекс процесса (загружается один раз при первом обращении)"""
+    return PriceBoundsIndex.load()
+
+
+def bounds_for(article: Optional[str] = None, category: Optional[str] = None,
+               default: Optional[Bounds] = None) -> Bounds:
+    return get_index().lookup(article, category, default)
+
+
+def refresh(database_url: str, path: Path = BOUNDS_FILE) -> PriceBoundsIndex:
+    """Инкрементальный пересчёт в БД + выгрузка кэша"""
+    proc = subprocess.run(
+        ["psql", database_url, "-X", "-A", "-t", "-c", "SELECT refresh_price_bounds()"],
+        capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"psql: {proc.stderr.strip()}")
+    print(f"[+] Bounds updated: {proc.stdout.strip()}")
+
+    index = PriceBoundsIndex.from_db(database_url)
+    index.save(path)
+    get_index.cache_clear()
+    return index
+
+
+# === CLI ===
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("refresh", "show"):
+        print(f"Usage: {sys.argv[0]} refresh")
+        print(f"       {sys.argv[0]} show [article] [--category=laptops]")
+        sys.exit(1)
+
+    if sys.argv[1] == "refresh":
+        database_url = os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL)
+        index = refresh(database_url)
+        print(f"[+] {len(index.articles)} articles, {len(index.categories)} categories -> {BOUNDS_FILE}")
+        return
+
+    args = [a for a in sys.argv[2:] if not a.startswith("--")]
+    category = next((a.split("=", 1)[1] for a in sys.argv[2:] if a.startswith("--category=")), None)
+    bounds = bounds_for(args[0] if args else None, category)
+    print(f"{bounds.lo:,} - {bounds.hi:,} RUB".replace(",", " "))
+    print(f"Text pattern: {bounds.text_pattern().pattern}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Price Statistics Engine
+
+Скользящая статистика цен по каждой паре товар x магазин: минимум за N
+дней, медиана, p10/p90, волатильность (stddev) и перцентиль текущей цены.
+
+История загружается из архива (price_archive.py) в непрерывные массивы,
+отсортированные по (серия, время) - серия описывается смещениями в общих
+массивах. Все окна считаются для всех серий сразу векторными операциями
+NumPy, без циклов по сериям. Результат кэшируется до появления новых
+строк истории (меняется набор/размер файлов архива).
+
+Использование:
+    python price_stats.py [--archive=DIR] [--windows=7,30,90] [--store=dns]
+
+Требует: pip install pyarrow numpy
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import sys
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from price_archive import HAS_ARROW, DEFAULT_ARCHIVE_DIR, PriceArchive
+
+if HAS_ARROW:
+    import numpy as np
+    import pyarrow as pa
+
+
+# === Конфигурация ===
+
+DEFAULT_WINDOWS = (7, 30, 90)  # дни
+
+MS_PER_DAY = 86_400_000
+
+
+# === Данные ===
+
+@dataclass
+class SeriesBatch:
+    """Все серии истории в общих массивах (CSR-раскладка)
+
+    Серия i занимает [offsets[i], offsets[i + 1]) в timestamps/prices,
+    внутри серии строки упорядочены по времени.
+    """
+    keys: List[Tuple[str, str]]  # (store, product)
+    offsets: "np.ndarray"        # int64, len(keys) + 1
+    timestamps: "np.ndarray"     # int64, ms UTC
+    prices: "np.ndarray"         # int64, копейки
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def series_ids(self) -> "np.ndarray":
+        """Номер серии для каждой строки"""
+        return np.repeat(np.arange(len(self.keys)), np.diff(self.offsets))
+
+    @classmethod
+    def from_table(cls, table: "pa.Table") -> "SeriesBatch":
+        stores = table.column("store").cast(pa.string()).combine_chunks().dictionary_encode()
+        products = table.column("product").cast(pa.string()).combine_chunks().dictionary_encode()
+        timestamps = table.column("recorded_at").cast(pa.int64()).to_numpy()
+        prices = table.column("price").to_numpy()
+
+        # Номер серии: уникальная пара кодов (store, product)
+        store_codes = stores.indices.to_numpy().astype(np.int64)
+        product_codes = products.indices.to_numpy().astype(np.int64)
+        pairs, series = np.unique(store_codes * len(products.dictionary) + product_codes,
+                                  return_inverse=True)
+        series = series.reshape(-1)
+
+        order = np.lexsort((timestamps, series))
+        counts = np.bincount(series, minlength=len(pairs))
+        offsets = np.zeros(len(pairs) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        store_names = stores.dictionary.to_pylist()
+        product_names = products.dictionary.to_pylist()
+        return cls(
+            keys=[(store_names[pair // len(product_names)], product_names[pair % len(product_names)])
+                  for pair in pairs.tolist()],
+            offsets=offsets,
+            timestamps=np.ascontiguousarray(timestamps[order], dtype=np.int64),
+            prices=np.ascontiguousarray(prices[order], dtype=np.int64),
+        )
+
+
+@dataclass
+class WindowStats:
+    """Статистика окна [at - days, at] для всех серий (NaN - нет данных)"""
+    days: int
+    count: "np.ndarray"
+    min: "np.ndarray"
+    max: "np.ndarray"
+    mean: "np.ndarray"
+    median: "np.ndarray"
+    p10: "np.ndarray"
+    p90: "np.ndarray"
+    std: "np.ndarray"
+    percentile: "np.ndarray"  # положение последней цены в окне, 0..100
+
+
+@dataclass
+class PriceStats:
+    keys: List[Tuple[str, str]]
+    at: int                  # конец окон, ms UTC
+    last_price: "np.ndarray"
+    last_at: "np.ndarray"
+    windows: Dict[int, WindowStats]
+
+    def __post_init__(self):
+        self._index = {key: i for i, key in enumerate(self.keys)}
+
+    def index(self, store: str, product: str) -> Optional[int]:
+        return self._index.get((store, product))
+
+    def for_series(self, store: str, product: str) -> Optional[Dict]:
+        """Статистика одной серии (цены в копейках)"""
+        i = self.index(store, product)
+        if i is None:
+            return None
+        result = {
+            "store": store,
+            "product": product,
+            "last_price": int(self.last_price[i]),
+            "windows": {},
+        }
+        for days, w in self.windows.items():
+            result["windows"][days] = {
+                name: (None if np.isnan(value) else float(value))
+                for name, value in (
+                    ("min", w.min[i]), ("max", w.max[i]), ("mean", w.mean[i]),
+                    ("median", w.median[i]), ("p10", w.p10[i]), ("p90", w.p90[i]),
+                    ("std", w.std[i]), ("percentile", w.percentile[i]),
+                )
+            }
+            result["windows"][days]["count"] = int(w.count[i])
+        return result
+
+
+# === Вычисления ===
+
+def _segment_quantile(values: "np.ndarray", starts: "np.ndarray",
+                      counts: "np.ndarray", q: float) -> "np.ndarray":
+    """Квантиль (линейная интерполяция, как np.quantile) каждого сегмента
+
+    values отсортированы внутри сегментов; пустые сегменты -> NaN.
+    """
+    result = np.full(len(counts), np.nan)
+    has = counts > 0
+    pos = starts[has] + q * (counts[has] - 1)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.ceil(pos).astype(np.int64)
+    frac = pos - lo
+    result[has] = values[lo] + (values[hi] - values[lo]) * frac
+    return result
+
+
+def window_stats(batch: SeriesBatch, days: int, at: int,
+                 last_price: "np.ndarray") -> WindowStats:
+    """Статистика окна [at - days, at] для всех серий одним проходом"""
+    n = len(batch)
+    series = batch.series_ids
+    selected = (batch.timestamps >= at - days * MS_PER_DAY) & (batch.timestamps <= at)
+
+    sid = series[selected]
+    raw = batch.prices[selected]
+
+    # Цены, отсортированные внутри каждой серии
+    order = np.lexsort((raw, sid))
+    sid = sid[order]
+    raw = raw[order]
+    prices = raw.astype(np.float64)
+
+    count = np.bincount(sid, minlength=n)
+    starts = np.zeros(n, dtype=np.int64)
+    np.cumsum(count[:-1], out=starts[1:])
+    has = count > 0
+
+    def per_series(values: "np.ndarray") -> "np.ndarray":
+        out = np.full(n, np.nan)
+        out[has] = values[has]
+        return out
+
+    ends = np.maximum(starts + count - 1, 0)
+    safe = np.maximum(count, 1)
+
+    # Два прохода для дисперсии: без потери точности на больших ценах
+    mean = np.bincount(sid, weights=prices, minlength=n) / safe
+    deviation = prices - mean[sid]
+    variance = np.bincount(sid, weights=deviation * deviation, minlength=n) / safe
+
+    # Перцентиль последней цены: (меньше + половина равных) / всего
+    if len(prices):
+        # Ключ (серия, цена) монотонен по отсортированным данным
+        keyed = (sid.astype(np.int64) << 32) + raw
+        target = (np.arange(n, dtype=np.int64) << 32) + last_price.astype(np.int64)
+        below = np.searchsorted(keyed, target, side="left") - starts
+        not_above = np.searchsorted(keyed, target, side="right") - starts
+        percentile = (below + not_above) / 2.0 / safe * 100.0
+        lowest = prices[np.minimum(starts, len(prices) - 1)]
+        highest = prices[np.minimum(ends, len(prices) - 1)]
+    else:
+        percentile = lowest = highest = np.zeros(n)
+
+    return WindowStats(
+        days=days,
+        count=count,
+        min=per_series(lowest),
+        max=per_series(highest),
+        mean=per_series(mean),
+        median=_segment_quantile(prices, starts, count, 0.5),
+        p10=_segment_quantile(prices, starts, count, 0.1),
+        p90=_segment_quantile(prices, starts, count, 0.9),
+        std=per_series(np.sqrt(variance)),
+        percentile=per_series(percentile),
+    )
+
+
+def compute_stats(batch: SeriesBatch, windows: Sequence[int] = DEFAULT_WINDOWS,
+                  at: Optional[int] = None) -> PriceStats:
+    """Статистика всех серий для всех окон
+
+    at - конец окон (ms UTC); по умолчанию последняя точка истории, так
+    что результат зависит только от данных.
+    """
+    if at is None:
+        at = int(batch.timestamps.max()) if len(batch.timestamps) else 0
+
+    last = np.maximum(batch.offsets[1:] - 1, 0)
+    last_price = batch.prices[last].astype(np.float64) if len(batch.prices) else np.zeros(len(batch))
+    last_at = batch.timestamps[last] if len(batch.timestamps) else np.zeros(len(batch), dtype=np.int64)
+
+    return PriceStats(
+        keys=batch.keys,
+        at=at,
+        last_price=last_price,
+        last_at=last_at,
+        windows={days: window_stats(batch, days, at, last_price) for days in windows},
+    )
+
+
+# === Движок с кэшем ===
+
+class PriceStatsEngine:
+    """Статистика поверх архива, пересчёт только при новых строках истории"""
+
+    def __init__(self, archive: PriceArchive, windows: Sequence[int] = DEFAULT_WINDOWS):
+        self.archive = archive
+        self.windows = tuple(windows)
+        self._version = None
+        self._batch: Optional[SeriesBatch] = None
+        self._stats: Optional[PriceStats] = None
+
+    def version(self) -> Tuple:
+        """Состояние архива: новые/перезаписанные файлы меняют версию"""
+        return tuple(
+            (str(path), stat.st_size, stat.st_mtime_ns)
+            for path in self.archive.files()
+            for stat in (path.stat(),)
+        )
+
+    def batch(self) -> SeriesBatch:
+        self._refresh()
+        return self._batch
+
+    def stats(self) -> PriceStats:
+        self._refresh()
+        if self._stats is None:
+            self._stats = compute_stats(self._batch, self.windows)
+        return self._stats
+
+    def _refresh(self):
+        version = self.version()
+        if version != self._version or self._batch is None:
+            self._batch = SeriesBatch.from_table(self.archive.query())
+            self._stats = None
+            self._version = version
+
+
+# === CLI ===
+
+def main():
+    if not HAS_ARROW:
+        print("Установите: pip install pyarrow numpy")
+        sys.exit(1)
+
+    archive_dir = DEFAULT_ARCHIVE_DIR
+    windows = DEFAULT_WINDOWS
+    store = None
+    for arg in sys.argv[1:]:
+        if arg.startswith("--archive="):
+            archive_dir = Path(arg.split("=", 1)[1])
+        elif arg.startswith("--windows="):
+            windows = tuple(int(w) for w in arg.split("=", 1)[1].split(","))
+        elif arg.startswith("--store="):
+            store = arg.split("=", 1)[1]
+
+    engine = PriceStatsEngine(PriceArchive(archive_dir), windows)
+    stats = engine.stats()
+    if not stats.keys:
+        print(f"[-] Архив пуст: {archive_dir}")
+        sys.exit(1)
+
+    days = max(windows)
+    w = stats.windows[days]
+    print(f"{'Store':<12} {'Product':<40} {'Last':>9} {f'Min {days}d':>9} {'Median':>9} {'P10':>9} {'P90':>9} {'Std':>8} {'Pct':>5}")
+    print("-" * 118)
+    for i, (s, product) in enumerate(stats.keys):
+        if store and s != store:
+            continue
+        rub = lambda v: "-" if np.isnan(v) else f"{v / 100:,.0f}".replace(",", " ")
+        print(f"{s:<12} {product[:40]:<40} {rub(stats.last_price[i]):>9} {rub(w.min[i]):>9} "
+              f"{rub(w.median[i]):>9} {rub(w.p10[i]):>9} {rub(w.p90[i]):>9} {rub(w.std[i]):>8} "
+              f"{'-' if np.isnan(w.percentile[i]) else f'{w.percentile[i]:.0f}':>5}")
+
+
+if __name__ == "__main__":
+    main()
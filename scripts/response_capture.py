@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Response Capture - товары из внутренних JSON API маркетплейсов
+
+Ozon, Yandex Market и Citilink рисуют выдачу из XHR/fetch JSON, который
+браузер уже получил. Вместо разбора отрисованного DOM (или view-source)
+здесь ответы ловятся через page.on("response"): по URL-шаблону магазина
+тело декодируется сразу по приходу и приводится к схеме каталога, которую
+читают parse_*_json в test_scrapers.py:
+
+    {"source": "ozon", "products": ListingBatch(name, price, available, url, product_id), ...}
+
+Парсинг может закончиться, как только пришёл ответ с товарами - без
+ожидания отрисовки и скролла.
+
+Использование:
+    capture = ResponseCapture(page, "ozon", bounds)
+    page.goto(url, wait_until="commit")
+    if capture.wait(timeout=20):
+        parsed = parse_ozon_json(capture.catalog(), target=target)
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import re
+import json
+import time
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Pattern
+
+from playwright.sync_api import Page, Response
+
+from price_bounds import Bounds
+from listing_batch import ListingBatch
+
+
+Product = Dict[str, Any]
+
+
+# === Разбор JSON ===
+
+def walk(node: Any) -> Iterator[dict]:
+    """Все словари JSON-дерева (без рекурсии - payload бывает глубоким)"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            yield current
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+
+
+def to_price(value: Any) -> Optional[int]:
+    """Цена из числа, строки ("113 999 ₽") или объекта ({"price": ...} / {"value": ...})"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        match = re.match(r'\D*(\d+)', re.sub(r'\s', '', value))
+        return int(match.group(1)) if match else None
+    if isinstance(value, dict):
+        for key in ("price", "value", "amount", "finalPrice"):
+            if key in value:
+                return to_price(value[key])
+    return None
+
+
+def named_prices(payload: Any) -> Iterator[Product]:
+    """Общий случай: объекты с названием и ценой (Citilink GraphQL, finalPrice Ozon)"""
+    for node in walk(payload):
+        name = node.get("name") or node.get("title")
+        if not isinstance(name, str):
+            continue
+        price = to_price(node.get("finalPrice", node.get("price")))
+        if price is None:
+            continue
+        slug = node.get("slug")
+        yield {
+            "name": name,
+            "price": price,
+            "available": node.get("isAvailable", node.get("available", True)),
+            "url": node.get("url") or (f"/product/{slug}/" if slug else ""),
+            "product_id": str(node.get("id") or node.get("sku") or ""),
+        }
+
+
+def ozon_products(payload: Any) -> Iterator[Product]:
+    """Ozon entrypoint/composer API: widgetStates - JSON-строки виджетов выдачи"""
+    states = payload.get("widgetStates") if isinstance(payload, dict) else None
+    if not states:
+        yield from named_prices(payload)
+        return
+
+    for raw in states.values():
+        try:
+            state = json.loads(raw) if isinstance(raw, str) else raw
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(state, dict):
+            continue
+
+        for item in state.get("items", []):
+            price, name = None, ""
+            for atom in walk(item.get("mainState", [])):
+                if "priceV2" in atom:
+                    prices = atom["priceV2"].get("price", [])
+                    current = next((p for p in prices if p.get("textStyle") == "PRICE"), prices[0] if prices else {})
+                    price = to_price(current.get("text"))
+                text_atom = atom.get("textAtom")
+                if isinstance(text_atom, dict) and (atom.get("id") == "name" or not name):
+                    name = text_atom.get("text", name)
+            if price is None:
+                continue
+            link = (item.get("action") or {}).get("link", "")
+            match = re.search(r'-(\d+)/', link)
+            sku = item.get("sku") or (match.group(1) if match else "")
+            yield {"name": name, "price": price, "available": True, "url": link.split("?")[0], "product_id": str(sku)}
+
+        # Старые версии: finalPrice рядом с названием
+        if not state.get("items"):
+            yield from named_prices(state)
+
+
+def yandex_market_products(payload: Any) -> Iterator[Product]:
+    """Yandex Market resolve API: collections.offer + collections.product"""
+    for node in walk(payload):
+        collections = node.get("collections")
+        if not isinstance(collections, dict) or "offer" not in collections:
+            continue
+
+        models = collections.get("product", {})
+        for offer in collections["offer"].values():
+            price = to_price(offer.get("price"))
+            if price is None:
+                continue
+            product_id = str(offer.get("productId") or offer.get("modelId") or "")
+            titles = offer.get("titles") or models.get(product_id, {}).get("titles") or {}
+            yield {
+                "name": titles.get("raw", ""),
+                "price": price,
+                "available": offer.get("isAvailable", True),
+                "url": f"https://market.yandex.ru/product/{product_id}" if product_id else "",
+                "product_id": product_id,
+            }
+
+
+# === Магазины ===
+
+@dataclass
+class StoreApi:
+    """Внутренний API магазина: какие ответы ловить и как их разобрать"""
+    url: Pattern
+    extract: Callable[[Any], Iterator[Product]]
+    base_url: str = ""
+
+
+STORE_APIS: Dict[str, StoreApi] = {
+    "ozon": StoreApi(
+        url=re.compile(r'ozon\.ru/api/(?:entrypoint|composer)-api\.bx/page/json'),
+        extract=ozon_products,
+        base_url="https://www.ozon.ru",
+    ),
+    "yandex_market": StoreApi(
+        url=re.compile(r'market\.yandex\.ru/api/(?:resolve|search)'),
+        extract=yandex_market_products,
+        base_url="https://market.yandex.ru",
+    ),
+    "citilink": StoreApi(
+        url=re.compile(r'citilink\.ru/graphql'),
+        extract=named_prices,
+        base_url="https://www.citilink.ru",
+    ),
+}
+
+
+# === Перехват ===
+
+class ResponseCapture:
+    """Товары из ответов API магазина по мере их прихода"""
+
+    def __init__(self, page: Page, store: str, bounds: Optional[Bounds] = None):
+        self.page = page
+        self.store = store
+        self.api = STORE_APIS[store]
+        self.bounds = bounds
+        self.products = ListingBatch(store)
+        self.responses = 0
+        self.bytes = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self.first_products_at: Optional[float] = None
+        self._seen = set()
+        page.on("response", self._on_response)
+
+    def _on_response(self, response: Response):
+        if not self.api.url.search(response.url):
+            return
+        try:
+            body = response.body()
+            payload = json.loads(body)
+        except Exception:
+            return  # редирект, пустое тело, не JSON
+
+        self.responses += 1
+        self.bytes += len(body)
+        try:
+            products = list(self.api.extract(payload))
+        except Exception as e:
+            # Неожиданная схема ответа: пропустить его, не роняя обработчик Playwright
+            self.errors += 1
+            print(f"  [!] {self.store}: ответ API не разобран: {type(e).__name__}: {str(e)[:50]}")
+            return
+
+        for product in products:
+            if self.bounds and product["price"] not in self.bounds:
+                continue
+            key = (product["product_id"] or product["url"] or product["name"], product["price"])
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            url = product["url"]
+            if url.startswith("/"):
+                url = self.api.base_url + url
+            self.products.append(product["name"], product["price"], product["available"], url, product["product_id"])
+
+        if self.products and self.first_products_at is None:
+            self.first_products_at = time.monotonic()
+
+    def wait(self, timeout: float, min_products: int = 1) -> bool:
+        """Ждать товары из API (события обрабатываются во время wait_for_timeout)"""
+        deadline = time.monotonic() + timeout
+        while len(self.products) < min_products and time.monotonic() < deadline:
+            self.page.wait_for_timeout(100)
+        return len(self.products) >= min_products
+
+    @property
+    def time_to_products(self) -> Optional[float]:
+        if self.first_products_at is None:
+            return None
+        return self.first_products_at - self.started
+
+    def details(self) -> dict:
+        """Поля для TestResult.details"""
+        ttp = self.time_to_products
+        return {
+            "extract_source": "api",
+            "api_responses": self.responses,
+            "transfer_bytes": self.bytes,
+            "api_errors": self.errors,
+            "time_to_products_ms": round(ttp * 1000, 1) if ttp is not None else None,
+        }
+
+    def catalog(self) -> dict:
+        """Каталог как у JSON-файлов *_scraper.sh (вход parse_*_json), товары - ListingBatch"""
+        return {
+            "source": self.store,
+            "products": self.products,
+            "timestamp": datetime.now().isoformat(),
+            "capture": {"responses": self.responses, "bytes": self.bytes},
+        }
+
+    def close(self):
+        self.page.remove_listener("response", self._on_response)
+
+    def __enter__(self) -> "ResponseCapture":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
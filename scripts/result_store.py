@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""
+Result Store - локальное хранилище результатов запусков без Postgres
+
+Раньше каждый запуск collect_prices.py / test_scrapers.py писал в data/
+отдельный JSON (indent=2), и любой запрос по истории открывал и разбирал
+все файлы подряд. Здесь результаты дописываются в сегменты:
+
+    data/results/00000001.seg   - записи [длина][crc32][JSON] подряд (append-only)
+    data/results/00000001.idx   - индекс записей фиксированной ширины:
+                                  (время, смещение, длина, вид, магазин)
+
+Каждый сегмент упорядочен по времени (запись старше последней открывает
+новый сегмент), поэтому индекс читается через mmap: диапазон времени -
+бинарным поиском, "последние N для магазина" - с конца индекса, и с диска
+читаются только N нужных записей. Сегмент закрывается по размеру
+(MAX_SEGMENT_BYTES), запись идёт в последний. compact() сливает сегменты, отбрасывая старые записи
+(--before) или всё, кроме последних N на магазин (--keep).
+
+Запись одним процессом за раз (flock на data/results/LOCK). Оборванная
+при сбое запись отрезается при следующей записи (recover), индекс
+дописывается по сегменту.
+
+Использование:
+    store = ResultStore()
+    store.append_run("prices", [asdict(r) for r in results], query="MacBook Pro 16")
+    for record in store.last("ozon", 5):
+        print(record["timestamp"], record["price"])
+
+    python result_store.py last <store> [--n=10] [--kind=prices|test_results]
+    python result_store.py range [--from=2026-10-01] [--to=2026-10-19] [--store=S] [--kind=K]
+    python result_store.py dump --run=RUN
+    python result_store.py import data/prices_*.json data/test_results_*.json
+    python result_store.py compact [--before=2026-01-01] [--keep=N]
+    python result_store.py stats
+    python result_store.py bench [--runs=10000]
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import zlib
+import fcntl
+import struct
+import random
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# === Конфигурация ===
+
+DEFAULT_STORE_DIR = Path(__file__).parent.parent / "data" / "results"
+
+MAX_SEGMENT_BYTES = 8 * 1024 * 1024
+
+# Вид запуска -> код в индексе
+KINDS = {"prices": 1, "test_results": 2}
+KIND_NAMES = {code: name for name, code in KINDS.items()}
+
+# Заголовок записи: длина JSON, crc32 JSON
+HEADER = struct.Struct("<II")
+# Запись индекса: время (мс), смещение, длина с заголовком, вид, магазин (до 23 байт)
+ENTRY = struct.Struct("<qIIB23s")
+STORE_BYTES = 23
+
+TS = struct.Struct("<q")
+SPAN = struct.Struct("<qII")
+
+Entry = Tuple[int, int, int, int, bytes]  # ts, offset, length, kind, store
+Location = Tuple[int, int, int, int]      # ts, сегмент, смещение, длина
+
+
+def store_key(store: str) -> bytes:
+    """Магазин в поле индекса (обрезается до 23 байт, запись сверяется при чтении)"""
+    return store.encode("utf-8")[:STORE_BYTES].ljust(STORE_BYTES, b"\0")
+
+
+def to_ms(value: Any) -> int:
+    """datetime / ISO-строка / число мс -> мс от эпохи"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = parse_date(value)
+    if value is None:
+        value = datetime.now()
+    return int(value.timestamp() * 1000)
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """'2026-10' / '2026-10-19' / ISO -> datetime (без зоны - локальное время)"""
+    if not value:
+        return None
+    if re.fullmatch(r'\d{4}-\d{2}', value):
+        value += "-01"
+    return datetime.fromisoformat(value)
+
+
+def format_ms(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000).isoformat(timespec="seconds")
+
+
+# === Индекс сегмента ===
+
+class SegmentIndex:
+    """Индекс сегмента через mmap: записи идут по времени, поиск - бинарный"""
+
+    def __init__(self, idx_path: Path, seg_size: int):
+        self._file = None
+        self._buf: Any = b""
+        size = 0
+        if idx_path.exists():
+            self._file = open(idx_path, "rb")
+            size = os.fstat(self._file.fileno()).st_size
+            if size >= ENTRY.size:
+                self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.count = size // ENTRY.size
+        # Хвост индекса за концом сегмента (оборванная запись) не виден
+        while self.count and self.end_of(self.count - 1) > seg_size:
+            self.count -= 1
+        self.clean = size == self.count * ENTRY.size and self.end == seg_size
+
+    def entry(self, i: int) -> Entry:
+        return ENTRY.unpack_from(self._buf, i * ENTRY.size)
+
+    def ts(self, i: int) -> int:
+        return TS.unpack_from(self._buf, i * ENTRY.size)[0]
+
+    def end_of(self, i: int) -> int:
+        _, offset, length = SPAN.unpack_from(self._buf, i * ENTRY.size)
+        return offset + length
+
+    @property
+    def end(self) -> int:
+        """Конец последней проиндексированной записи в сегменте"""
+        return self.end_of(self.count - 1) if self.count else 0
+
+    def bisect(self, ts: int) -> int:
+        """Первая запись со временем >= ts"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ts(mid) < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __iter__(self) -> Iterator[Entry]:
+        return ENTRY.iter_unpack(self._buf[:self.count * ENTRY.size])
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        if self._file:
+            self._file.close()
+
+    def __enter__(self) -> "SegmentIndex":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# === Хранилище ===
+
+class ResultStore:
+    """Сегментированное append-only хранилище результатов с индексом (магазин, время)"""
+
+    def __init__(self, root: Path = DEFAULT_STORE_DIR, max_segment_bytes: int = MAX_SEGMENT_BYTES):
+        self.root = Path(root)
+        self.max_segment_bytes = max_segment_bytes
+
+    # --- Сегменты ---
+
+    def segments(self) -> List[int]:
+        return sorted(int(p.stem) for p in self.root.glob("*.seg") if p.stem.isdigit())
+
+    def seg_path(self, number: int) -> Path:
+        return self.root / f"{number:08d}.seg"
+
+    def idx_path(self, number: int) -> Path:
+        return self.root / f"{number:08d}.idx"
+
+    def index(self, number: int) -> SegmentIndex:
+        try:
+            seg_size = self.seg_path(number).stat().st_size
+        except FileNotFoundError:
+            seg_size = 0
+        return SegmentIndex(self.idx_path(number), seg_size)
+
+    @contextmanager
+    def _locked(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / "LOCK", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def recover(self, number: int):
+        """Привести сегмент и индекс в согласие после сбоя: отрезать битый хвост, доиндексировать записи"""
+        with self.index(number) as index:
+            if index.clean:
+                return
+            count, end = index.count, index.end
+
+        with open(self.seg_path(number), "r+b") as seg, open(self.idx_path(number), "ab") as idx:
+            idx.truncate(count * ENTRY.size)
+            seg.seek(end)
+            while True:
+                header = seg.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                length, crc = HEADER.unpack(header)
+                payload = seg.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                record = json.loads(payload)
+                idx.write(self._entry(record, end, HEADER.size + length))
+                end += HEADER.size + length
+            seg.truncate(end)
+
+    @staticmethod
+    def _entry(record: Dict, offset: int, length: int) -> bytes:
+        return ENTRY.pack(record["ts"], offset, length, KINDS.get(record.get("kind"), 0),
+                          store_key(record.get("store", "")))
+
+    def _write(self, records: Iterable[Dict], number: Optional[int] = None) -> int:
+        """
+        Дописать записи (под блокировкой). Новый сегмент начинается, когда
+        текущий заполнен или запись старше последней в нём - так каждый
+        сегмент упорядочен по времени и индекс можно искать бинарно.
+        """
+        segments = self.segments()
+        last_ts = None
+        if number is None and segments:
+            number = segments[-1]
+            self.recover(number)
+            with self.index(number) as index:
+                last_ts = index.ts(index.count - 1) if index.count else None
+        elif number is None:
+            number = 1
+
+        count = 0
+        seg = open(self.seg_path(number), "ab")
+        idx = open(self.idx_path(number), "ab")
+        try:
+            for record in records:
+                payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                offset = seg.tell()
+                full = offset + HEADER.size + len(payload) > self.max_segment_bytes
+                if offset and (full or (last_ts is not None and record["ts"] < last_ts)):
+                    seg.close()
+                    idx.close()
+                    number = max(self.segments() + [number]) + 1
+                    seg = open(self.seg_path(number), "ab")
+                    idx = open(self.idx_path(number), "ab")
+                    offset = 0
+                seg.write(HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+                # Сначала данные, потом индекс: индекс не ссылается на недописанное
+                seg.flush()
+                idx.write(self._entry(record, offset, HEADER.size + len(payload)))
+                last_ts = record["ts"]
+                count += 1
+        finally:
+            seg.close()
+            idx.close()
+        return count
+
+    # --- Запись ---
+
+    def append_run(self, kind: str, results: List[Dict], query: str = "",
+                   timestamp: Optional[Any] = None) -> int:
+        """
+        Записать результаты одного запуска (по записи на магазин).
+
+        Returns:
+            run - время запуска в мс (по нему dump --run=)
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown result kind: {kind} ({', '.join(KINDS)})")
+        run = to_ms(timestamp)
+        records = [dict(r, kind=kind, query=query, run=run, ts=run) for r in results]
+        with self._locked():
+            self._write(records)
+        return run
+
+    # --- Чтение ---
+
+    @staticmethod
+    def _decode(raw: bytes) -> Dict:
+        length, crc = HEADER.unpack_from(raw)
+        payload = raw[HEADER.size:HEADER.size + length]
+        if zlib.crc32(payload) != crc:
+            raise ValueError("Result store record is corrupted (crc mismatch)")
+        return json.loads(payload)
+
+    def find(self, store: Optional[str] = None, kind: Optional[str] = None,
+             start: Optional[int] = None, end: Optional[int] = None) -> List[Location]:
+        """Записи индекса по фильтру: (ts, сегмент, смещение, длина), по времени"""
+        key = store_key(store) if store is not None else None
+        code = KINDS[kind] if kind else None
+
+        found = []
+        for number in self.segments():
+            with self.index(number) as index:
+                if not index.count:
+                    continue
+                lo = index.bisect(start) if start is not None else 0
+                hi = index.bisect(end) if end is not None else index.count
+                for i in range(lo, hi):
+                    ts, offset, length, entry_kind, entry_store = index.entry(i)
+                    if key is not None and entry_store != key:
+                        continue
+                    if code is not None and entry_kind != code:
+                        continue
+                    found.append((ts, number, offset, length))
+        found.sort()
+        return found
+
+    def find_last(self, store: str, n: int, kind: Optional[str] = None) -> List[Location]:
+        """n последних записей магазина: индексы читаются с конца, от новых сегментов к старым"""
+        key = store_key(store)
+        code = KINDS[kind] if kind else None
+
+        indexes = [(number, self.index(number)) for number in self.segments()]
+        try:
+            # Сегменты по времени последней записи (импорт старых JSON может дать "старый" новый сегмент)
+            indexes.sort(key=lambda item: item[1].ts(item[1].count - 1) if item[1].count else -1, reverse=True)
+            found: List[Location] = []
+            for number, index in indexes:
+                if not index.count:
+                    continue
+                if len(found) >= n and index.ts(index.count - 1) < found[-n][0]:
+                    break
+                taken = []
+                for i in range(index.count - 1, -1, -1):
+                    ts, offset, length, entry_kind, entry_store = index.entry(i)
+                    if entry_store == key and (code is None or entry_kind == code):
+                        taken.append((ts, number, offset, length))
+                        if len(taken) == n:
+                            break
+                found = sorted(found + taken)[-n:]
+            return found
+        finally:
+            for _, index in indexes:
+                index.close()
+
+    def load(self, found: List[Location], store: Optional[str] = None) -> List[Dict]:
+        """Прочитать записи по индексу (файл сегмента открывается один раз)"""
+        records = []
+        for raw in self._read_raw([f[1:] for f in found]):
+            record = self._decode(raw)
+            # Длинные имена магазинов в индексе обрезаны
+            if store is None or record.get("store") == store:
+                records.append(record)
+        return records
+
+    def last(self, store: str, n: int = 10, kind: Optional[str] = None) -> List[Dict]:
+        """Последние n результатов магазина (от старых к новым)"""
+        return self.load(self.find_last(store, n, kind), store)
+
+    def range(self, start: Optional[Any] = None, end: Optional[Any] = None,
+              store: Optional[str] = None, kind: Optional[str] = None) -> List[Dict]:
+        """Результаты за [start, end)"""
+        found = self.find(store, kind,
+                          to_ms(start) if start is not None else None,
+                          to_ms(end) if end is not None else None)
+        return self.load(found, store)
+
+    def run(self, run: int) -> List[Dict]:
+        """Все записи одного запуска"""
+        return self.range(run, run + 1)
+
+    # --- Обслуживание ---
+
+    def compact(self, before: Optional[Any] = None, keep: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Слить все сегменты в новые, отбросив записи старше before и/или
+        всё, кроме последних keep на (магазин, вид).
+
+        Returns:
+            (записей было, записей осталось)
+        """
+        cutoff = to_ms(before) if before is not None else None
+        with self._locked():
+            old = self.segments()
+            if old:
+                self.recover(old[-1])
+            found = []
+            for number in old:
+                with self.index(number) as index:
+                    found.extend((e[0], number, e[1], e[2], e[3], e[4]) for e in index)
+            found.sort()
+
+            survivors = [f for f in found if cutoff is None or f[0] >= cutoff]
+            if keep is not None:
+                counts: Dict[Tuple[int, bytes], int] = {}
+                kept = []
+                for f in reversed(survivors):
+                    group = (f[4], f[5])
+                    counts[group] = counts.get(group, 0) + 1
+                    if counts[group] <= keep:
+                        kept.append(f)
+                survivors = kept[::-1]
+
+            # Новые сегменты - за последним, старые удаляются после записи
+            first_new = (old[-1] + 1) if old else 1
+            records = (self._decode(raw) for raw in self._read_raw([f[1:4] for f in survivors]))
+            if survivors:
+                self._write(records, first_new)
+            for number in old:
+                self.idx_path(number).unlink(missing_ok=True)
+                self.seg_path(number).unlink(missing_ok=True)
+        return len(found), len(survivors)
+
+    def _read_raw(self, found: List[Tuple[int, int, int]]) -> Iterator[bytes]:
+        handles: Dict[int, Any] = {}
+        try:
+            for number, offset, length in found:
+                if number not in handles:
+                    handles[number] = open(self.seg_path(number), "rb")
+                handles[number].seek(offset)
+                yield handles[number].read(length)
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def stats(self) -> Dict[str, Any]:
+        segments = self.segments()
+        entries = []
+        for number in segments:
+            with self.index(number) as index:
+                entries.extend(index)
+        stores: Dict[str, int] = {}
+        kinds: Dict[str, int] = {}
+        for e in entries:
+            name = e[4].rstrip(b"\0").decode("utf-8", "ignore")
+            stores[name] = stores.get(name, 0) + 1
+            kind = KIND_NAMES.get(e[3], "unknown")
+            kinds[kind] = kinds.get(kind, 0) + 1
+        return {
+            "segments": len(segments),
+            "bytes": sum(self.seg_path(n).stat().st_size for n in segments),
+            "records": len(entries),
+            "runs": len({e[0] for e in entries}),
+            "first": format_ms(min(e[0] for e in entries)) if entries else None,
+            "last": format_ms(max(e[0] for e in entries)) if entries else None,
+            "kinds": kinds,
+            "stores": stores,
+        }
+
+
+# === Импорт JSON-файлов ===
+
+def import_json(store: ResultStore, paths: Iterable[Path]) -> int:
+    """Перенести data/prices_*.json и data/test_results_*.json в хранилище"""
+    total = 0
+    for path in sorted(paths):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        kind = "test_results" if path.name.startswith("test_results") else "prices"
+        store.append_run(kind, data.get("results", []), data.get("query") or "", data.get("timestamp"))
+        total += len(data.get("results", []))
+    return total
+
+
+# === Бенчмарк ===
+
+BENCH_STORES = ["i-ray", "regard", "ozon", "yandex_market", "citilink", "dns",
+                "mvideo", "eldorado", "kns", "aliexpress", "nix", "xcom"]
+
+
+def synthetic_runs(runs: int) -> Iterator[Tuple[str, List[Dict]]]:
+    """runs запусков collect_prices (по результату на магазин), раз в минуту"""
+    rng = random.Random(42)
+    start = datetime(2026, 1, 1).timestamp()
+    for i in range(runs):
+        ts = datetime.fromtimestamp(start + i * 60).isoformat()
+        yield ts, [{
+            "store": store, "price": rng.randint(150, 400) * 1000, "available": True,
+            "product_name": "Apple MacBook Pro 16 M1 Pro 32GB 512GB", "status": "OK",
+            "url": f"https://example.com/{store}/search?q=MacBook+Pro+16", "timestamp": ts,
+            "extract_source": "js", "transfer_bytes": 180000, "extract_ms": 42.0,
+        } for store in BENCH_STORES]
+
+
+def scan_last(directory: Path, store: str, n: int) -> List[Dict]:
+    """Прежний путь: разобрать все prices_*.json и взять последние n"""
+    found = []
+    for path in sorted(directory.glob("prices_*.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        found.extend(r for r in data["results"] if r["store"] == store)
+    return found[-n:]
+
+
+def bench(runs: int):
+    import tempfile
+
+    print("=" * 70)
+    print(f"RESULT STORE BENCHMARK: {runs:,} runs x {len(BENCH_STORES)} stores")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_dir, store = Path(tmp) / "data", ResultStore(Path(tmp) / "results")
+        json_dir.mkdir()
+
+        start = time.perf_counter()
+        for i, (ts, results) in enumerate(synthetic_runs(runs)):
+            with open(json_dir / f"prices_{i:08d}.json", "w", encoding="utf-8") as f:
+                json.dump({"query": "MacBook Pro 16", "timestamp": ts, "results": results}, f,
+                          ensure_ascii=False, indent=2)
+        json_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for ts, results in synthetic_runs(runs):
+            store.append_run("prices", results, "MacBook Pro 16", ts)
+        store_write = time.perf_counter() - start
+
+        json_bytes = sum(p.stat().st_size for p in json_dir.iterdir())
+        store_bytes = sum(p.stat().st_size for p in store.root.iterdir())
+        print(f"  {'write: JSON per run':<28} {json_write / runs * 1000:7.2f} ms/run   {json_bytes / 1e6:7.1f} MB")
+        print(f"  {'write: segments + index':<28} {store_write / runs * 1000:7.2f} ms/run   {store_bytes / 1e6:7.1f} MB")
+
+        start = time.perf_counter()
+        scanned = scan_last(json_dir, "ozon", 10)
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        indexed = store.last("ozon", 10)
+        lookup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        window = store.range("2026-01-02T00:00", "2026-01-02T06:00", store="dns")
+        ranged = time.perf_counter() - start
+
+        assert [r["price"] for r in scanned] == [r["price"] for r in indexed]
+        print(f"  {'last 10 ozon: directory scan':<28} {scan * 1000:9.1f} ms")
+        print(f"  {'last 10 ozon: result store':<28} {lookup * 1000:9.1f} ms   ({scan / lookup:,.0f}x)")
+        print(f"  {'6h range dns: result store':<28} {ranged * 1000:9.1f} ms   records={len(window)}")
+
+
+# === CLI ===
+
+def _options(argv: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    positional = [a for a in argv if not a.startswith("--")]
+    options = {}
+    for arg in argv:
+        if arg.startswith("--"):
+            key, _, value = arg[2:].partition("=")
+            options[key] = value or "1"
+    return positional, options
+
+
+def print_record(record: Dict):
+    price = f"{record['price']:,}".replace(",", " ") if record.get("price") else "-"
+    status = record.get("status", "")
+    print(f"{format_ms(record['ts'])}  {record.get('kind', ''):<12} {record.get('store', ''):<14} "
+          f"{price:>10} RUB  {status:<8} {str(record.get('query', ''))[:30]}")
+
+
+def main():
+    positional, options = _options(sys.argv[1:])
+    commands = ("last", "range", "dump", "import", "compact", "stats", "bench")
+    if not positional or positional[0] not in commands:
+        print(f"Usage: {sys.argv[0]} last <store> [--n=10] [--kind=prices|test_results] [--dir=DIR]")
+        print(f"       {sys.argv[0]} range [--from=D] [--to=D] [--store=S] [--kind=K] [--dir=DIR]")
+        print(f"       {sys.argv[0]} dump --run=RUN [--dir=DIR]")
+        print(f"       {sys.argv[0]} import <results.json>... [--dir=DIR]")
+        print(f"       {sys.argv[0]} compact [--before=D] [--keep=N] [--dir=DIR]")
+        print(f"       {sys.argv[0]} stats [--dir=DIR]")
+        print(f"       {sys.argv[0]} bench [--runs=N]")
+        sys.exit(1)
+
+    command = positional[0]
+    if command == "bench":
+        bench(int(options.get("runs", 10_000)))
+        return
+
+    store = ResultStore(Path(options.get("dir", DEFAULT_STORE_DIR)))
+    kind = options.get("kind")
+    if kind and kind not in KINDS:
+        print(f"[!] Unknown kind: {kind} ({', '.join(KINDS)})")
+        sys.exit(1)
+
+    if command == "last":
+        if len(positional) < 2:
+            print("[!] last: укажите магазин")
+            sys.exit(1)
+        records = store.last(positional[1], int(options.get("n", 10)), kind)
+    elif command == "range":
+        records = store.range(parse_date(options.get("from")), parse_date(options.get("to")),
+                              options.get("store"), kind)
+    elif command == "dump":
+        if "run" not in options:
+            print("[!] dump: укажите --run=RUN")
+            sys.exit(1)
+        records = store.run(int(options["run"]))
+        print(json.dumps({
+            "query": records[0].get("query") if records else None,
+            "timestamp": format_ms(int(options["run"])),
+            "results": [{k: v for k, v in r.items() if k not in ("kind", "query", "run", "ts")}
+                        for r in records],
+        }, ensure_ascii=False, indent=2))
+        return
+    elif command == "import":
+        total = import_json(store, [Path(p) for p in positional[1:]])
+        print(f"[+] Imported: {len(positional) - 1} files, {total} results -> {store.root}")
+        return
+    elif command == "compact":
+        before, kept = store.compact(parse_date(options.get("before")),
+                                     int(options["keep"]) if "keep" in options else None)
+        print(f"[+] Compacted: {before} -> {kept} records, {len(store.segments())} segments")
+        return
+    else:
+        print(json.dumps(store.stats(), ensure_ascii=False, indent=2))
+        return
+
+    if not records:
+        print("[-] Нет данных")
+        return
+    for record in records:
+        print_record(record)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Screen Capture для RPA-парсеров (без временных PNG)
+
+Кадр экрана берётся прямо из памяти и отдаётся OCR/CAPTCHA как NumPy-массив
+(H, W, 4) BGRX без копирования:
+
+  XvfbFramebuffer - mmap файла кадра Xvfb, запущенного с -fbdir
+                    (Xvfb :99 -screen 0 1920x1080x24 -fbdir /tmp/xvfb);
+                    массив - окно в этот файл, Xvfb обновляет его сам
+  XShmCapture     - MIT-SHM (XShmGetImage) в сегмент разделяемой памяти,
+                    работает с любым X-сервером на той же машине
+
+Массив кадра действителен до следующего grab() (XShm перезаписывает
+буфер, fbdir меняется вместе с экраном) - для хранения нужен .copy().
+
+FrameStream выдаёт кадры с фиксированной частотой; wait_until() позволяет
+RPA-сценарию ждать "цены на экране" вместо фиксированных sleep.
+
+Использование:
+    capture = open_capture()           # fbdir -> XShm
+    frame = capture.grab()             # np.ndarray (H, W, 4), view
+    frame = FrameStream(capture, fps=4).wait_until(lambda f: ocr_frame(f).prices(), timeout=15)
+
+    python screen_capture.py [--fps=4] [--seconds=5]   # замер частоты кадров
+
+Требует: pip install numpy
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import os
+import sys
+import mmap
+import time
+import ctypes
+import ctypes.util
+import struct
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple, TypeVar
+
+import numpy as np
+
+
+T = TypeVar("T")
+
+# Заголовок XWD: 25 полей CARD32
+XWD_HEADER = struct.Struct("25I")
+XWD_FILE_VERSION = 7
+XWD_COLOR_SIZE = 12
+
+
+# === Xvfb -fbdir ===
+
+class XvfbFramebuffer:
+    """Кадр Xvfb через mmap файла Xvfb_screenN (формат XWD)"""
+
+    name = "xvfb-fbdir"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = self._parse_header(self._map[:XWD_HEADER.size])
+        (header_size, _, _, depth, width, height, _, _, _, _, _,
+         bits_per_pixel, bytes_per_line, _, _, _, _, _, _, ncolors) = header[:20]
+
+        if bits_per_pixel != 32:
+            raise RuntimeError(f"Unsupported Xvfb depth {depth} ({bits_per_pixel} bpp), use -screen 0 WxHx24")
+
+        offset = header_size + ncolors * XWD_COLOR_SIZE
+        pixels = np.frombuffer(self._map, dtype=np.uint8, count=bytes_per_line * height, offset=offset)
+        self._frame = pixels.reshape(height, bytes_per_line)[:, :width * 4].reshape(height, width, 4)
+        self.size = (width, height)
+
+    @staticmethod
+    def _parse_header(raw: bytes) -> Tuple[int, ...]:
+        # Xvfb пишет заголовок big-endian, на всякий случай проверяем оба
+        for order in (">", "<"):
+            header = struct.unpack(order + "25I", raw)
+            if header[1] == XWD_FILE_VERSION:
+                return header
+        raise RuntimeError("Not an XWD framebuffer file")
+
+    def grab(self) -> np.ndarray:
+        return self._frame
+
+    def close(self):
+        self._frame = None
+        self._file.close()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Кадры ещё используются - mmap закроется с последней ссылкой
+
+
+def find_xvfb_fbdir(display: str) -> Optional[Path]:
+    """Файл кадра Xvfb для дисплея (по аргументам процесса Xvfb)"""
+    number = display.split(":")[-1].split(".")[0]
+    for cmdline in Path("/proc").glob("[0-9]*/cmdline"):
+        try:
+            args = cmdline.read_bytes().split(b"\0")
+        except OSError:
+            continue
+        if not args or not args[0].endswith(b"Xvfb") or f":{number}".encode() not in args:
+            continue
+        if b"-fbdir" in args:
+            fbdir = args[args.index(b"-fbdir") + 1].decode()
+            path = Path(fbdir) / "Xvfb_screen0"
+            if path.exists():
+                return path
+    return None
+
+
+# === MIT-SHM ===
+
+class _XImage(ctypes.Structure):
+    # Только начальные поля XImage (Xlib.h)
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+def _load(name: str) -> ctypes.CDLL:
+    path = ctypes.util.find_library(name)
+    if not path:
+        raise RuntimeError(f"lib{name} not found")
+    return ctypes.CDLL(path)
+
+
+class XShmCapture:
+    """Снимок корневого окна через XShmGetImage в сегмент разделяемой памяти"""
+
+    name = "xshm"
+
+    ZPIXMAP = 2
+    ALL_PLANES = 0xFFFFFFFF
+    IPC_PRIVATE = 0
+    IPC_CREAT = 0o1000
+    IPC_RMID = 0
+
+    def __init__(self, display: Optional[str] = None):
+        x11 = self._x11 = _load("X11")
+        xext = self._xext = _load("Xext")
+        libc = self._libc = _load("c")
+
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x11.XRootWindow.restype = ctypes.c_ulong
+        x11.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x11.XFree.argtypes = [ctypes.c_void_p]
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xext.XShmCreateImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p,
+            ctypes.POINTER(_XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint,
+        ]
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage), ctypes.c_int, ctypes.c_int, ctypes.c_ulong,
+        ]
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+        display_name = (display or os.environ.get("DISPLAY", ":0")).encode()
+        self._display = x11.XOpenDisplay(display_name)
+        if not self._display:
+            raise RuntimeError(f"Cannot open display {display_name.decode()}")
+
+        # Что уже создано - для close() на любом шаге (в том числе при ошибке в __init__)
+        self._info = _XShmSegmentInfo()
+        self._info.shmid = -1
+        self._image = None
+        self._attached = False
+        self._frame = None
+        try:
+            self._setup()
+        except Exception:
+            self.close()
+            raise
+
+    def _setup(self):
+        x11, xext, libc = self._x11, self._xext, self._libc
+        if not xext.XShmQueryExtension(self._display):
+            raise RuntimeError("MIT-SHM extension not available")
+
+        screen = x11.XDefaultScreen(self._display)
+        self._root = x11.XRootWindow(self._display, screen)
+        width = x11.XDisplayWidth(self._display, screen)
+        height = x11.XDisplayHeight(self._display, screen)
+
+        self._image = xext.XShmCreateImage(
+            self._display, x11.XDefaultVisual(self._display, screen), x11.XDefaultDepth(self._display, screen),
+            self.ZPIXMAP, None, ctypes.byref(self._info), width, height,
+        )
+        if not self._image:
+            self._image = None
+            raise RuntimeError("XShmCreateImage failed")
+        image = self._image.contents
+        if image.bits_per_pixel != 32:
+            raise RuntimeError(f"Unsupported depth ({image.bits_per_pixel} bpp)")
+
+        size = image.bytes_per_line * image.height
+        self._info.shmid = libc.shmget(self.IPC_PRIVATE, size, self.IPC_CREAT | 0o600)
+        if self._info.shmid < 0:
+            raise RuntimeError("shmget failed")
+        address = libc.shmat(self._info.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            raise RuntimeError("shmat failed")
+        self._info.shmaddr = address
+        self._info.readOnly = 0
+        image.data = address
+
+        if not xext.XShmAttach(self._display, ctypes.byref(self._info)):
+            raise RuntimeError("XShmAttach failed")
+        self._attached = True
+        x11.XSync(self._display, 0)
+        # Сегмент удалится сам после отсоединения всех процессов
+        self._remove_segment()
+
+        buffer = (ctypes.c_ubyte * size).from_address(address)
+        pixels = np.frombuffer(buffer, dtype=np.uint8)
+        self._frame = pixels.reshape(height, image.bytes_per_line)[:, :width * 4].reshape(height, width, 4)
+        self.size = (width, height)
+
+    def _remove_segment(self):
+        if self._info.shmid >= 0:
+            self._libc.shmctl(self._info.shmid, self.IPC_RMID, None)
+            self._info.shmid = -1
+
+    def grab(self) -> np.ndarray:
+        self._xext.XShmGetImage(self._display, self._root, self._image, 0, 0, self.ALL_PLANES)
+        return self._frame
+
+    def close(self):
+        if not self._display:
+            return
+        self._frame = None
+        if self._attached:
+            self._xext.XShmDetach(self._display, ctypes.byref(self._info))
+            self._x11.XSync(self._display, 0)
+            self._attached = False
+        if self._info.shmaddr:
+            self._libc.shmdt(self._info.shmaddr)
+            self._info.shmaddr = None
+        self._remove_segment()
+        if self._image is not None:
+            self._x11.XFree(ctypes.cast(self._image, ctypes.c_void_p))
+            self._image = None
+        self._x11.XCloseDisplay(self._display)
+        self._display = None
+
+
+def open_capture(display: Optional[str] = None):
+    """Лучший доступный захват: Xvfb -fbdir -> XShm"""
+    display = display or os.environ.get("DISPLAY", ":0")
+    path = os.environ.get("XVFB_FBDIR_FILE") or find_xvfb_fbdir(display)
+    if path:
+        return XvfbFramebuffer(Path(path))
+    return XShmCapture(display)
+
+
+# === Поток кадров ===
+
+class FrameStream:
+    """Кадры с фиксированной частотой (без накопления отставания)"""
+
+    def __init__(self, capture, fps: float = 4.0):
+        self.capture = capture
+        self.interval = 1.0 / fps
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        next_at = time.monotonic()
+        while True:
+            yield self.capture.grab()
+            next_at += self.interval
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_at = time.monotonic()  # не догоняем пропущенные кадры
+
+    def wait_until(self, check: Callable[[np.ndarray], T], timeout: float) -> Optional[T]:
+        """Опрос кадров до истинного результата check(frame) или таймаута"""
+        deadline = time.monotonic() + timeout
+        for frame in self:
+            result = check(frame)
+            if result:
+                return result
+            if time.monotonic() >= deadline:
+                return None
+
+
+def to_image(frame: np.ndarray):
+    """Кадр BGRX -> PIL Image RGB (копия, для сохранения/отладки)"""
+    from PIL import Image
+    height, width = frame.shape[:2]
+    image = Image.frombuffer("RGBX", (width, height), np.ascontiguousarray(frame), "raw", "BGRX", 0, 1)
+    return image.convert("RGB")
+
+
+# === CLI ===
+
+def main():
+    fps = 4.0
+    seconds = 5.0
+    for arg in sys.argv[1:]:
+        if arg.startswith("--fps="):
+            fps = float(arg.split("=")[1])
+        elif arg.startswith("--seconds="):
+            seconds = float(arg.split("=")[1])
+
+    capture = open_capture()
+    print(f"[+] Backend: {capture.name}, {capture.size[0]}x{capture.size[1]}")
+
+    # Сырая скорость захвата
+    start = time.perf_counter()
+    frames = 0
+    while time.perf_counter() - start < 1.0:
+        capture.grab()
+        frames += 1
+    print(f"[+] Grab: {frames / (time.perf_counter() - start):.1f} frames/sec (max)")
+
+    # Поток с фиксированной частотой
+    start = time.perf_counter()
+    frames = 0
+    for frame in FrameStream(capture, fps):
+        frames += 1
+        if time.perf_counter() - start >= seconds:
+            break
+    print(f"[+] Stream: {frames / (time.perf_counter() - start):.2f} frames/sec (target {fps})")
+    print(f"    mean pixel: {frame[:, :, :3].mean():.1f}")
+
+    capture.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Snapshot Diff - что изменилось с прошлого запуска
+
+collect_prices.py и test_scrapers.py каждый запуск пишут полный JSON.
+Здесь каждый снимок индексируется по (магазин, код товара / URL) в dict,
+и разница с предыдущим считается за O(n):
+    added    - новые позиции
+    removed  - пропавшие позиции
+    repriced - изменилась цена
+
+На диск пишется только разница (append-only <stream>.delta.jsonl, одна
+строка на запуск) и раз в checkpoint_every запусков - полный снимок
+(<stream>.checkpoint.json со смещением в delta-логе). Состояние
+восстанавливается как checkpoint + дельты после него, потребители читают
+хвост лога (tail) с нужного номера.
+
+Запись одним процессом за раз (flock на <stream>.lock). Строка, оборванная
+при сбое, при чтении игнорируется, а следующий record() её отрезает.
+
+Использование:
+    log = SnapshotLog(Path("data"), "prices-macbook-pro-16")
+    delta = log.record(rows, meta={"query": "MacBook Pro 16"})
+    print(delta.summary())
+
+    python snapshot_diff.py streams [dir]
+    python snapshot_diff.py tail <stream> [dir] [--since=SEQ]
+    python snapshot_diff.py bench [--count=20000] [--runs=30]
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import fcntl
+import random
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+CHECKPOINT_EVERY = 20
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+Key = Tuple[str, str]
+Row = Dict[str, Any]
+KeyFn = Callable[[Row], Key]
+
+
+def listing_key(row: Row) -> Key:
+    """(магазин, код товара / URL / название)"""
+    ident = (row.get("product_id") or row.get("code") or row.get("url")
+             or row.get("name") or row.get("product_name") or "")
+    return (row.get("store", ""), str(ident))
+
+
+def build_index(rows: Iterable[Row], key: KeyFn = listing_key) -> Dict[Key, Row]:
+    """Хэш-индекс снимка (последняя строка с тем же ключом побеждает)"""
+    return {key(row): row for row in rows}
+
+
+def stream_name(prefix: str, query: str) -> str:
+    """Имя потока для запроса: prices-macbook-pro-16"""
+    slug = re.sub(r'[^\w]+', '-', query.lower()).strip('-')[:60]
+    return f"{prefix}-{slug}" if slug else prefix
+
+
+# === Разница ===
+
+@dataclass
+class Delta:
+    """Разница между двумя снимками"""
+    seq: int = 0
+    timestamp: str = ""
+    meta: Dict[str, Any] = field(default_factory=dict)
+    added: List[Row] = field(default_factory=list)
+    removed: List[Row] = field(default_factory=list)
+    repriced: List[Dict[str, Any]] = field(default_factory=list)  # {"row", "old_price"}
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.repriced)
+
+    def summary(self) -> str:
+        return f"+{len(self.added)} -{len(self.removed)} ~{len(self.repriced)}"
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "timestamp": self.timestamp,
+            "meta": self.meta,
+            "added": self.added,
+            "removed": self.removed,
+            "repriced": self.repriced,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Delta":
+        return cls(**data)
+
+
+def diff(previous: Dict[Key, Row], current: Dict[Key, Row]) -> Delta:
+    """added / removed / repriced за один проход по каждому индексу"""
+    delta = Delta()
+    for key, row in current.items():
+        old = previous.get(key)
+        if old is None:
+            delta.added.append(row)
+        elif old.get("price") != row.get("price"):
+            delta.repriced.append({"row": row, "old_price": old.get("price")})
+    for key, row in previous.items():
+        if key not in current:
+            delta.removed.append(row)
+    return delta
+
+
+def apply(state: Dict[Key, Row], delta: Delta, key: KeyFn = listing_key):
+    """Применить дельту к индексу (восстановление состояния из лога)"""
+    for row in delta.removed:
+        state.pop(key(row), None)
+    for row in delta.added:
+        state[key(row)] = row
+    for change in delta.repriced:
+        state[key(change["row"])] = change["row"]
+
+
+# === Журнал ===
+
+class SnapshotLog:
+    """
+    Журнал снимков одного потока (например, цены по одному запросу).
+
+    Файлы в directory:
+        <stream>.delta.jsonl       - дельта на каждый запуск (append-only)
+        <stream>.checkpoint.json   - полный снимок + seq и смещение в delta-логе
+
+    key - ключ позиции (по умолчанию listing_key), один и тот же для всего потока.
+    """
+
+    def __init__(self, directory: Path, stream: str, checkpoint_every: int = CHECKPOINT_EVERY,
+                 key: KeyFn = listing_key):
+        self.directory = Path(directory)
+        self.stream = stream
+        self.checkpoint_every = checkpoint_every
+        self.key = key
+        self.delta_path = self.directory / f"{stream}.delta.jsonl"
+        self.checkpoint_path = self.directory / f"{stream}.checkpoint.json"
+        self.lock_path = self.directory / f"{stream}.lock"
+
+    @contextmanager
+    def _locked(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _checkpoint(self) -> Tuple[int, int, Dict[Key, Row]]:
+        """(seq, смещение в delta-логе, индекс) последнего полного снимка"""
+        if not self.checkpoint_path.exists():
+            return 0, 0, {}
+        data = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        return data["seq"], data["offset"], build_index(data["rows"], self.key)
+
+    def _deltas_from(self, offset: int) -> Iterator[Tuple[Delta, int]]:
+        """
+        Дельты начиная со смещения: (дельта, смещение после неё).
+        Чтение останавливается на оборванной строке (сбой посреди записи).
+        """
+        if not self.delta_path.exists():
+            return
+        with open(self.delta_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                try:
+                    delta = Delta.from_json(json.loads(line)) if line.strip() else None
+                except (ValueError, TypeError):
+                    return
+                offset += len(line)
+                if delta is not None:
+                    yield delta, offset
+
+    def state(self) -> Tuple[int, int, Dict[Key, Row]]:
+        """Текущее состояние: checkpoint + дельты после него"""
+        seq, offset, index = self._checkpoint()
+        for delta, offset in self._deltas_from(offset):
+            apply(index, delta, self.key)
+            seq = delta.seq
+        return seq, offset, index
+
+    def record(self, rows: Iterable[Row], meta: Optional[Dict[str, Any]] = None) -> Delta:
+        """Записать новый снимок: в лог уходит только разница с предыдущим"""
+        current = build_index(rows, self.key)
+
+        with self._locked():
+            seq, offset, previous = self.state()
+
+            delta = diff(previous, current)
+            delta.seq = seq + 1
+            delta.timestamp = datetime.now().isoformat()
+            delta.meta = meta or {}
+
+            line = (json.dumps(delta.to_json(), ensure_ascii=False) + "\n").encode("utf-8")
+            with open(self.delta_path, "ab") as f:
+                # Оборванный хвост после последней целой дельты - отрезать
+                if f.tell() > offset:
+                    f.truncate(offset)
+                f.write(line)
+
+            if delta.seq % self.checkpoint_every == 0:
+                self._write_checkpoint(delta.seq, offset + len(line), current)
+        return delta
+
+    def _write_checkpoint(self, seq: int, offset: int, index: Dict[Key, Row]):
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "seq": seq,
+            "offset": offset,
+            "timestamp": datetime.now().isoformat(),
+            "rows": list(index.values()),
+        }, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.checkpoint_path)
+
+    def tail(self, since: int = 0) -> Iterator[Delta]:
+        """Дельты с seq > since (для потребителей изменений)"""
+        offset = 0
+        if since and self.checkpoint_path.exists():
+            # Checkpoint помнит смещение - не читаем лог с начала
+            seq, checkpoint_offset, _ = self._checkpoint()
+            if seq <= since:
+                offset = checkpoint_offset
+        for delta, _ in self._deltas_from(offset):
+            if delta.seq > since:
+                yield delta
+
+
+def print_delta(delta: Delta):
+    """Человекочитаемая сводка дельты"""
+    print(f"[*] #{delta.seq} {delta.timestamp[:19]}  {delta.summary()}")
+    for row in delta.added:
+        print(f"    + {row.get('store', '')}: {row.get('price')} {str(row.get('name') or row.get('product_name') or '')[:50]}")
+    for row in delta.removed:
+        print(f"    - {row.get('store', '')}: {row.get('price')} {str(row.get('name') or row.get('product_name') or '')[:50]}")
+    for change in delta.repriced:
+        row = change["row"]
+        print(f"    ~ {row.get('store', '')}: {change['old_price']} -> {row.get('price')}")
+
+
+# === Бенчмарк ===
+
+def synthetic_snapshots(count: int, runs: int, churn: float = 0.02) -> Iterator[List[Row]]:
+    """runs снимков по count позиций; в каждом следующем churn позиций меняют цену/пропадают/появляются"""
+    rng = random.Random(42)
+    rows = {i: {"store": f"store-{i % 12}", "product_id": str(10 ** 8 + i), "price": rng.randint(120, 450) * 1000,
+                "available": True, "name": f"MacBook Pro 16 #{i}"} for i in range(count)}
+    next_id = count
+    for _ in range(runs):
+        yield list(rows.values())
+        for _ in range(int(count * churn)):
+            action, i = rng.random(), rng.choice(list(rows)) if rows else None
+            if action < 0.6 and i is not None:
+                rows[i] = dict(rows[i], price=rows[i]["price"] + rng.choice([-1, 1]) * 1000)
+            elif action < 0.8 and i is not None:
+                del rows[i]
+            else:
+                rows[next_id] = {"store": f"store-{next_id % 12}", "product_id": str(10 ** 8 + next_id),
+                                 "price": rng.randint(120, 450) * 1000, "available": True,
+                                 "name": f"MacBook Pro 16 #{next_id}"}
+                next_id += 1
+
+
+def naive_diff(previous: List[Row], current: List[Row]) -> Tuple[int, int, int]:
+    """Сравнение списков без индекса - поиск каждой позиции перебором"""
+    added = removed = repriced = 0
+    for row in current:
+        old = next((p for p in previous if listing_key(p) == listing_key(row)), None)
+        if old is None:
+            added += 1
+        elif old.get("price") != row.get("price"):
+            repriced += 1
+    for row in previous:
+        if not any(listing_key(c) == listing_key(row) for c in current):
+            removed += 1
+    return added, removed, repriced
+
+
+def bench(count: int, runs: int):
+    import tempfile
+
+    print("=" * 70)
+    print(f"SNAPSHOT DIFF BENCHMARK: {runs} runs x {count:,} listings")
+    print("=" * 70)
+    snapshots = list(synthetic_snapshots(count, runs))
+
+    # Сравнение двух снимков
+    if count <= 5000:
+        start = time.perf_counter()
+        naive = naive_diff(snapshots[0], snapshots[1])
+        print(f"  {'list scan diff':<26} {(time.perf_counter() - start) * 1000:9.1f} ms   +{naive[0]} -{naive[1]} ~{naive[2]}")
+    start = time.perf_counter()
+    delta = diff(build_index(snapshots[0]), build_index(snapshots[1]))
+    print(f"  {'hash index diff':<26} {(time.perf_counter() - start) * 1000:9.1f} ms   {delta.summary()}")
+
+    # Хранение: полный JSON на запуск против дельт + checkpoint
+    with tempfile.TemporaryDirectory() as tmp:
+        full = 0
+        for i, rows in enumerate(snapshots):
+            path = Path(tmp) / f"prices_{i}.json"
+            path.write_text(json.dumps({"results": rows}, ensure_ascii=False, indent=2), encoding="utf-8")
+            full += path.stat().st_size
+
+        log = SnapshotLog(Path(tmp) / "log", "bench")
+        start = time.perf_counter()
+        for rows in snapshots:
+            log.record(rows)
+        elapsed = time.perf_counter() - start
+        stored = sum(p.stat().st_size for p in log.directory.iterdir())
+
+        print(f"  {'full JSON per run':<26} {full / 1e6:9.1f} MB")
+        print(f"  {'delta log + checkpoint':<26} {stored / 1e6:9.1f} MB   record {elapsed / runs * 1000:.1f} ms/run")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args or args[0] not in ("streams", "tail", "bench"):
+        print(f"Usage: {sys.argv[0]} streams [dir]")
+        print(f"       {sys.argv[0]} tail <stream> [dir] [--since=SEQ]")
+        print(f"       {sys.argv[0]} bench [--count=N] [--runs=N]")
+        sys.exit(1)
+
+    if args[0] == "bench":
+        count, runs = 20_000, 30
+        for arg in sys.argv[1:]:
+            if arg.startswith("--count="):
+                count = int(arg.split("=")[1])
+            elif arg.startswith("--runs="):
+                runs = int(arg.split("=")[1])
+        bench(count, runs)
+        return
+
+    if args[0] == "streams":
+        directory = Path(args[1]) if len(args) > 1 else DATA_DIR
+        for path in sorted(directory.glob("*.delta.jsonl")):
+            print(path.name[:-len(".delta.jsonl")])
+        return
+
+    if len(args) < 2:
+        print("[!] tail: укажите поток (python snapshot_diff.py streams)")
+        sys.exit(1)
+
+    since = 0
+    for arg in sys.argv[1:]:
+        if arg.startswith("--since="):
+            since = int(arg.split("=")[1])
+
+    directory = Path(args[2]) if len(args) > 2 else DATA_DIR
+    for delta in SnapshotLog(directory, args[1]).tail(since):
+        print_delta(delta)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,11 @@ Created: 2026-01-03
 """
 
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
 import re
 
+from listing_batch import HAS_SPECS, NO_PRICE, ListingBatch
+
 
 @dataclass
 class ProductSpecs:
@@ -144,19 +146,33 @@ def calculate_match_score(specs: ProductSpecs, target: TargetSpecs) -> float:
         >>> calculate_match_score(specs, target)
         100.0  # M4 Pro >= M4, 24GB >= 16GB, 512GB == 512GB, screen match
     """
+    return match_score(specs.cpu, specs.ram, specs.ssd, specs.screen, specs.article, target)
+
+
+def match_score(
+    cpu: Optional[str],
+    ram: Optional[int],
+    ssd: Optional[int],
+    screen: Optional[str],
+    article: Optional[str],
+    target: TargetSpecs
+) -> float:
+    """
+    calculate_match_score() on plain fields (ListingBatch rows, no ProductSpecs per product).
+    """
     # Perfect match by article number
-    if specs.article and specs.article == target.article:
+    if article and article == target.article:
         return 100.0
 
     score = 0.0
 
     # CPU match (40% weight) - supports minimum generation requirement
-    if specs.cpu and target.cpu:
+    if cpu and target.cpu:
         # Extract generation: "M4 Pro" -> "M4", "M1" -> "M1"
         target_gen = target.cpu.split()[0]  # "M4", "M1", etc.
-        specs_gen = specs.cpu.split()[0] if specs.cpu else None
+        specs_gen = cpu.split()[0] if cpu else None
 
-        if specs.cpu == target.cpu:
+        if cpu == target.cpu:
             # Exact match: M4 Pro == M4 Pro
             score += 40.0
         elif specs_gen == target_gen:
@@ -174,29 +190,39 @@ def calculate_match_score(specs: ProductSpecs, target: TargetSpecs) -> float:
                 pass
 
     # RAM match (30% weight) - supports minimum requirement (>=)
-    if specs.ram and target.ram:
-        if specs.ram >= target.ram:
+    if ram and target.ram:
+        if ram >= target.ram:
             score += 30.0
-        elif specs.ram >= target.ram - 8:  # Within 8GB below target
+        elif ram >= target.ram - 8:  # Within 8GB below target
             score += 15.0
 
     # SSD match (20% weight) - supports minimum requirement (>=)
-    if specs.ssd and target.ssd:
-        if specs.ssd >= target.ssd:
+    if ssd and target.ssd:
+        if ssd >= target.ssd:
             score += 20.0
-        elif specs.ssd >= target.ssd - 256:  # Within 256GB below target
+        elif ssd >= target.ssd - 256:  # Within 256GB below target
             score += 10.0
 
     # Screen match (10% weight)
-    if specs.screen and target.screen:
-        if specs.screen == target.screen:
+    if screen and target.screen:
+        if screen == target.screen:
             score += 10.0
 
     return score
 
 
+def resolve_specs(batch: ListingBatch):
+    """
+    Fill specs of batch rows that have none, extracting them from product names.
+    """
+    for i, name in enumerate(batch.names):
+        if not batch.flags[i] & HAS_SPECS:
+            specs = extract_specs_from_name(name)
+            batch.set_specs(i, specs.cpu, specs.ram, specs.ssd, specs.screen, specs.article)
+
+
 def filter_and_rank(
-    products: List[dict],
+    products: Union[ListingBatch, List[dict]],
     target: TargetSpecs,
     threshold: float = 80.0,
     top_n: int = 3
@@ -205,13 +231,15 @@ def filter_and_rank(
     Filter and rank products by specification match score.
 
     Args:
-        products: List of product dictionaries with 'name' and optional 'specs' fields
+        products: ListingBatch, or list of product dictionaries with 'name' and optional 'specs' fields
         target: Target specifications to match
         threshold: Minimum score to include (0-100)
         top_n: Maximum number of results to return
 
     Returns:
-        List of (product, score) tuples, sorted by score (desc) then price (asc)
+        List of (product, score) tuples, sorted by score (desc) then price (asc).
+        Products are dict rows of the batch, or the original dictionaries
+        (the returned ones get 'specs' filled in if they had none).
 
     Examples:
         >>> products = [
@@ -225,32 +253,32 @@ def filter_and_rank(
         >>> results[0][1]  # Score should be 100.0
         100.0
     """
-    scored = []
-
-    for product in products:
-        # Get or extract specs
-        specs = product.get('specs')
-
-        if not specs:
-            # Fallback: extract specs from product name
-            specs_obj = extract_specs_from_name(product.get('name', ''))
-            product['specs'] = specs_obj.__dict__
-            specs = specs_obj
-        elif isinstance(specs, dict):
-            # Convert dict to ProductSpecs object
-            specs = ProductSpecs(**specs)
+    batch = ListingBatch.from_products(products)
+    resolve_specs(batch)
 
+    scored = []
+    for i in range(len(batch)):
         # Calculate match score
-        score = calculate_match_score(specs, target)
+        score = match_score(batch.cpu[i], batch.ram[i], batch.ssd[i], batch.screen[i], batch.article[i], target)
 
         # Filter by threshold
         if score >= threshold:
-            scored.append((product, score))
+            scored.append((i, score))
 
     # Sort by score (descending), then by price (ascending)
-    scored.sort(key=lambda x: (-x[1], x[0].get('price', 999999)))
-
-    return scored[:top_n]
+    prices = batch.prices
+    scored.sort(key=lambda x: (-x[1], prices[x[0]] if prices[x[0]] != NO_PRICE else 999999))
+
+    if batch is products:
+        return [(batch.row(i), score) for i, score in scored[:top_n]]
+
+    results = []
+    for i, score in scored[:top_n]:
+        product = products[i]
+        if not product.get('specs'):
+            product['specs'] = batch.specs(i)
+        results.append((product, score))
+    return results
 
 
 def format_match_result(product: dict, score: float, target: TargetSpecs) -> str:
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Stealth Init Bundle
+
+playwright-stealth собирает набор evasion-скриптов заново при каждом
+Stealth(...).apply_stealth_sync(page) и вешает его на каждую страницу.
+Здесь скрипт рендерится один раз на конфигурацию, кэшируется на диске
+(ключ - опции + версия playwright-stealth) и подключается на уровне
+BrowserContext: все страницы контекста получают его без повторной сборки.
+
+Использование:
+    from stealth_bundle import apply_stealth_context
+
+    context = browser.new_context(...)
+    apply_stealth_context(context)
+    page = context.new_page()   # уже со stealth
+
+Author: Price Scout Team
+Created: 2026-10-19
+"""
+
+import os
+import json
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from playwright.sync_api import BrowserContext
+
+
+# === Конфигурация ===
+
+# Настройки, которые используют все stealth-скрипты проекта
+RU_STEALTH = {
+    "navigator_languages_override": ("ru-RU", "ru"),
+    "navigator_platform_override": "Win32",
+}
+
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "price_scout" / "stealth"
+
+_APPLIED_ATTR = "_price_scout_stealth_bundle"
+
+# Бандлы процесса: ключ -> скрипт
+_bundles: Dict[str, str] = {}
+
+
+@lru_cache(maxsize=1)
+def _stealth_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("playwright-stealth")
+    except Exception:
+        return "unknown"
+
+
+def bundle_key(options: Optional[dict] = None) -> str:
+    """Ключ кэша: опции Stealth + версия библиотеки"""
+    options = RU_STEALTH if options is None else options
+    raw = json.dumps({"options": options, "version": _stealth_version()}, sort_keys=True, default=list)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def render_bundle(options: Optional[dict] = None) -> str:
+    """Собрать единый init-скрипт через playwright-stealth (медленно)"""
+    from playwright_stealth import Stealth
+    return Stealth(**(RU_STEALTH if options is None else options)).script_payload
+
+
+def load_bundle(options: Optional[dict] = None) -> str:
+    """Init-скрипт для конфигурации: память -> диск -> рендер"""
+    key = bundle_key(options)
+    script = _bundles.get(key)
+    if script is not None:
+        return script
+
+    path = CACHE_DIR / f"{key}.js"
+    try:
+        script = path.read_text(encoding="utf-8")
+    except OSError:
+        script = render_bundle(options)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(script, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass  # Кэш на диске - оптимизация, не требование
+
+    _bundles[key] = script
+    return script
+
+
+def apply_stealth_context(context: BrowserContext, options: Optional[dict] = None) -> BrowserContext:
+    """Подключить stealth-бандл ко всем страницам контекста (один раз)"""
+    if getattr(context, _APPLIED_ATTR, False):
+        return context
+
+    script = load_bundle(options)
+    if script:
+        context.add_init_script(script=script)
+    setattr(context, _APPLIED_ATTR, True)
+    return context
@@ -17,7 +17,14 @@ from dataclasses import dataclass
 from urllib.parse import urlparse
 
 from playwright.sync_api import sync_playwright, Page, BrowserContext
-from playwright_stealth import Stealth
+from stealth_bundle import apply_stealth_context
+
+from price_bounds import Bounds, bounds_for, parse_text_price
+from page_signals import classify
+
+
+# Диапазон цены, если для категории ничего не выучено (прежний фильтр 100к - 400к)
+DEFAULT_PRICE = Bounds(100000, 400000)
 
 
 @dataclass
@@ -76,82 +83,47 @@ def human_mouse_move(page: Page):
 
 
 def detect_captcha(page: Page) -> dict:
-    """Определить тип CAPTCHA на странице"""
-    html = page.content().lower()
-    url = page.url.lower()
+    """Определить тип CAPTCHA на странице (один page.content(), один проход)"""
+    html = page.content()
+    signals = classify(html, page.url)
 
     result = {
-        "detected": False,
-        "type": "none",
+        "detected": signals.captcha_hint is not None,
+        "type": signals.captcha_hint or "none",
         "site_key": None,
     }
 
-    # Проверка URL редиректа на CAPTCHA
-    if "captcha" in url or "showcaptcha" in url:
-        result["detected"] = True
-        result["type"] = "redirect"
-        return result
-
-    # reCAPTCHA
-    if "recaptcha" in html or "grecaptcha" in html:
-        result["detected"] = True
-        result["type"] = "reCAPTCHA"
-
-        # Ищем site_key
-        match = re.search(r'data-sitekey=["\']([^"\']+)["\']', page.content())
+    # Ищем site_key
+    if signals.captcha_hint == "reCAPTCHA":
+        match = re.search(r'data-sitekey=["\']([^"\']+)["\']', html)
         if match:
             result["site_key"] = match.group(1)
-        return result
-
-    # hCaptcha
-    if "hcaptcha" in html:
-        result["detected"] = True
-        result["type"] = "hCaptcha"
-        return result
-
-    # CloudFlare
-    if "cf-browser-verification" in html or "cloudflare" in html:
-        result["detected"] = True
-        result["type"] = "CloudFlare"
-        return result
-
-    # Яндекс SmartCaptcha
-    if "smartcaptcha" in html:
-        result["detected"] = True
-        result["type"] = "SmartCaptcha"
-        return result
-
-    # Общая проверка слова captcha
-    if "captcha" in html:
-        result["detected"] = True
-        result["type"] = "unknown"
 
     return result
 
 
-def extract_price(html: str, min_price: int = 100000, max_price: int = 400000) -> Optional[int]:
-    """Извлечь цену из HTML"""
+def extract_price(html: str, bounds: Optional[Bounds] = None) -> Optional[int]:
+    """Извлечь цену из HTML (bounds по умолчанию - категория laptops, иначе DEFAULT_PRICE)"""
+    bounds = bounds or bounds_for(category="laptops", default=DEFAULT_PRICE)
 
     # Schema.org
     match = re.search(r'itemprop="price"\s+content="(\d+)"', html)
     if match:
         price = int(match.group(1))
-        if min_price < price < max_price:
+        if price in bounds:
             return price
 
     # JSON
     for match in re.findall(r'"price"[:\s]*(\d+)', html):
         price = int(match)
-        if min_price < price < max_price:
+        if price in bounds:
             return price
 
     # Текст
-    for match in re.findall(r'(\d{3}[\s\u00a0]?\d{3})[\s\u00a0]*(?:₽|руб)', html):
-        clean = match.replace(" ", "").replace("\u00a0", "")
-        if clean.isdigit():
-            price = int(clean)
-            if min_price < price < max_price:
-                return price
+    for match in bounds.text_pattern().findall(html):
+        price = parse_text_price(match)
+        if price in bounds:
+            return price
 
     return None
 
@@ -200,15 +172,10 @@ def scrape_with_stealth(url: str, verbose: bool = True) -> ScrapeResult:
 
     with sync_playwright() as p:
         browser, context = create_stealth_context(p)
+        # Применяем stealth патчи (init-скрипт на весь контекст)
+        apply_stealth_context(context)
         page = context.new_page()
 
-        # Применяем stealth патчи
-        stealth = Stealth(
-            navigator_languages_override=("ru-RU", "ru"),
-            navigator_platform_override="Win32",
-        )
-        stealth.apply_stealth_sync(page)
-
         try:
             # Загрузка с имитацией человека
             if verbose:
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Unit tests for dns_catalog module
+
+Run with: python3 test_dns_catalog.py
+Or with pytest: pytest test_dns_catalog.py -v
+"""
+
+import sys
+import time
+
+from dns_catalog import LEGACY_PATTERN, cards_batch, iter_cards, synthetic_catalog
+
+
+def card(uuid: str, code: str, name: str = "", path: str = "") -> str:
+    html = f'<div class="catalog-product" data-product="{uuid}" data-code="{code}">'
+    if name:
+        html += (f'<a class="catalog-product__name ui-link" href="{path or "/product/" + uuid + "/"}">'
+                 f'<span>{name}</span></a>')
+    return html + '<div class="product-buy__price">150 000 ₽</div></div>\n'
+
+
+NAME = '16.2" Ноутбук Apple MacBook Pro M1 Pro серый [3456x2234, Apple M1 Pro, RAM 32 ГБ, SSD 512 ГБ, macOS]'
+
+
+# === Card boundaries ===
+
+def test_cards_in_order():
+    """Every named card is found once, with its own code, href and name"""
+    html = card("aaa", "111", NAME, "/product/aaa/mbp/") + card("bbb", "222", "MacBook Air [RAM 8 ГБ, SSD 256 ГБ]")
+    cards = list(iter_cards(html))
+
+    assert [c.code for c in cards] == ["111", "222"], f"Got {cards}"
+    assert cards[0].uuid == "aaa" and cards[0].path == "/product/aaa/mbp/"
+    assert cards[0].name == '16.2" Ноутбук Apple MacBook Pro M1 Pro серый'
+    assert cards[0].ram == "32" and cards[0].ssd == "512"
+    assert cards[1].url == "https://www.dns-shop.ru/product/bbb/"
+    print("[PASS] test_cards_in_order")
+
+
+def test_card_without_name_keeps_boundary():
+    """A card without a name is skipped and does not take the next card's name"""
+    html = card("aaa", "111") + card("bbb", "222", NAME)
+    cards = list(iter_cards(html))
+
+    assert len(cards) == 1, f"Expected 1 card, got {cards}"
+    assert cards[0].code == "222" and cards[0].uuid == "bbb", "Name must stay with its own card"
+    print("[PASS] test_card_without_name_keeps_boundary")
+
+
+def test_card_without_closing_bracket():
+    """An unterminated card tag is skipped; the next card is still parsed"""
+    broken = '<div data-product="aaa" data-code="111" class="catalog-product"'
+    html = broken + card("bbb", "222", NAME)
+    cards = list(iter_cards(html))
+
+    assert [c.code for c in cards] == ["222"], f"Got {cards}"
+
+    # Broken card at the end of the page
+    assert list(iter_cards(card("bbb", "222", NAME) + broken)) == cards
+    assert list(iter_cards('<div data-product="aaa')) == [], "Unterminated uuid should yield nothing"
+    print("[PASS] test_card_without_closing_bracket")
+
+
+def test_code_only_from_card_tag():
+    """data-code must be in the same tag as data-product"""
+    html = ('<div data-product="aaa"><span data-code="999"></span>'
+            '<a class="catalog-product__name" href="/product/aaa/"><span>MacBook</span></a></div>')
+
+    assert list(iter_cards(html)) == [], "Code outside the card tag should not count"
+    print("[PASS] test_code_only_from_card_tag")
+
+
+def test_matches_legacy_regex():
+    """Scanner finds the same cards as the old DOTALL regex on well-formed pages"""
+    html = synthetic_catalog(200)
+    legacy = [(m.group(2), m.group(3), m.group(4)) for m in LEGACY_PATTERN.finditer(html)]
+    scanned = [(c.code, c.path, c.full_name) for c in iter_cards(html)]
+
+    assert scanned == legacy, "Scanner and regex disagree"
+    print("[PASS] test_matches_legacy_regex")
+
+
+def test_linear_on_unterminated_cards():
+    """Cards without '>' do not make each card scan to the end of the page"""
+    def timed(n: int) -> float:
+        html = "".join(f'<div data-product="u{i}" data-code="{i}"' for i in range(n))
+        start = time.perf_counter()
+        assert sum(1 for _ in iter_cards(html)) == 0
+        return time.perf_counter() - start
+
+    small, large = timed(5000), timed(40000)
+    # 8x input: linear ~8x, quadratic ~64x
+    assert large < small * 24 + 0.05, f"Not linear: {small:.3f}s -> {large:.3f}s"
+    print("[PASS] test_linear_on_unterminated_cards")
+
+
+def test_cards_batch():
+    """cards_batch keeps code as product_id and specs from the name"""
+    batch = cards_batch(card("aaa", "111", NAME) + card("bbb", "222"))
+
+    assert len(batch) == 1
+    row = batch[0]
+    assert row["product_id"] == "111" and "price" not in row
+    assert row["specs"]["ram"] == 32 and row["specs"]["cpu"] == "M1 Pro"
+    print("[PASS] test_cards_batch")
+
+
+def run_all_tests():
+    """Run all tests and report results"""
+    tests = [
+        test_cards_in_order,
+        test_card_without_name_keeps_boundary,
+        test_card_without_closing_bracket,
+        test_code_only_from_card_tag,
+        test_matches_legacy_regex,
+        test_linear_on_unterminated_cards,
+        test_cards_batch,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            print(f"[FAIL] {test_func.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"[ERROR] {test_func.__name__}: {e}")
+            failed += 1
+
+    print(f"\n{'='*60}")
+    print(f"Tests run: {len(tests)}")
+    print(f"Passed: {len(tests) - failed}")
+    print(f"Failed: {failed}")
+    print(f"{'='*60}")
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
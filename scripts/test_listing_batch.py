@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Unit tests for listing_batch module
+
+Run with: python3 test_listing_batch.py
+Or with pytest: pytest test_listing_batch.py -v
+"""
+
+import sys
+
+from price_bounds import Bounds
+from listing_batch import AVAILABLE, AVAILABILITY_KNOWN, HAS_SPECS, NO_PRICE, ListingBatch
+
+
+def sample_batch() -> ListingBatch:
+    batch = ListingBatch("ozon")
+    batch.append("MacBook Pro 16 M1 Pro 16GB 512GB", 156000, available=True, url="https://a", product_id=101,
+                 specs={"cpu": "M1 Pro", "ram": 16, "ssd": 512, "screen": "16", "article": "MK183"})
+    batch.append("MacBook Pro 16 M3 Max 36GB 1TB", 349990, available=False, product_id="102")
+    batch.append("Чехол для MacBook", None)
+    batch.append("MacBook Pro 16 M2 Pro 32GB 1TB", "189990", available=True)
+    return batch
+
+
+# === Append ===
+
+def test_append_columns():
+    """append() fills every column and sets flags only for known fields"""
+    batch = sample_batch()
+
+    assert len(batch) == 4, f"Expected 4 rows, got {len(batch)}"
+    assert batch.store == "ozon"
+    assert list(batch.prices) == [156000, 349990, NO_PRICE, 189990], f"Got {list(batch.prices)}"
+    assert batch.ids[:2] == ["101", "102"], "product_id should be stored as str"
+    assert batch.flags[0] == AVAILABILITY_KNOWN | AVAILABLE | HAS_SPECS, f"Got flags {batch.flags[0]}"
+    assert batch.flags[1] == AVAILABILITY_KNOWN, f"Got flags {batch.flags[1]}"
+    assert batch.flags[2] == 0, "Unknown availability should leave flags empty"
+    assert batch.ram[0] == 16 and batch.ssd[0] == 512 and batch.cpu[0] == "M1 Pro"
+    print("[PASS] test_append_columns")
+
+
+def test_append_string_prices():
+    """Text prices are parsed; an unreadable price is NO_PRICE, never 0"""
+    batch = ListingBatch("dns")
+    for price in ("156 000", "156\u00a0000 ₽", "156000 руб.", "по запросу", "", 0):
+        batch.append("MacBook Pro 16", price)
+
+    assert list(batch.prices) == [156000, 156000, 156000, NO_PRICE, NO_PRICE, 0], f"Got {list(batch.prices)}"
+    assert batch.min_price() == 156000
+    print("[PASS] test_append_string_prices")
+
+
+def test_row_omits_unknown_fields():
+    """row() only outputs fields that were set"""
+    batch = sample_batch()
+
+    assert batch.row(2) == {"name": "Чехол для MacBook"}, f"Got {batch.row(2)}"
+    first = batch.row(0)
+    assert first["price"] == 156000 and first["available"] is True
+    assert first["url"] == "https://a" and first["product_id"] == "101"
+    assert first["specs"]["article"] == "MK183"
+    assert "specs" not in batch.row(1)
+    print("[PASS] test_row_omits_unknown_fields")
+
+
+# === Iteration / indexing ===
+
+def test_iteration_matches_rows():
+    """Iteration yields row dicts in insertion order"""
+    batch = sample_batch()
+
+    rows = list(batch)
+    assert rows == batch.to_dicts(), "Iteration and to_dicts() should agree"
+    assert [r["name"] for r in rows][0] == "MacBook Pro 16 M1 Pro 16GB 512GB"
+    assert len(rows) == len(batch)
+    print("[PASS] test_iteration_matches_rows")
+
+
+def test_indexing():
+    """batch[i] returns the row; negative indices count from the end"""
+    batch = sample_batch()
+
+    assert batch[0] == batch.row(0)
+    assert batch[-1] == batch.row(3), "batch[-1] should be the last row"
+    assert batch[-4] == batch.row(0)
+    for bad in (4, -5):
+        try:
+            batch[bad]
+        except IndexError:
+            pass
+        else:
+            raise AssertionError(f"batch[{bad}] should raise IndexError")
+    print("[PASS] test_indexing")
+
+
+# === Filter / take ===
+
+def test_within_bounds():
+    """within() keeps priced rows inside the range, unpriced rows are dropped"""
+    batch = sample_batch()
+
+    cheap = batch.within(Bounds(100000, 200000))
+    assert isinstance(cheap, ListingBatch) and cheap is not batch
+    assert list(cheap.prices) == [156000, 189990], f"Got {list(cheap.prices)}"
+    assert cheap.store == "ozon"
+    assert cheap[0] == batch[0], "Selected rows should keep all columns"
+    assert len(batch) == 4, "Original batch should not change"
+    print("[PASS] test_within_bounds")
+
+
+def test_filter_predicate():
+    """filter() applies the predicate to row dicts and preserves order"""
+    batch = sample_batch()
+
+    available = batch.filter(lambda row: row.get("available", False))
+    assert [r["price"] for r in available] == [156000, 189990], f"Got {available.to_dicts()}"
+    assert available.any_available()
+
+    none = batch.filter(lambda row: False)
+    assert len(none) == 0 and not none
+    print("[PASS] test_filter_predicate")
+
+
+def test_take():
+    """take(n) returns the first n rows; n beyond length or negative is clamped"""
+    batch = sample_batch()
+
+    assert [r["name"] for r in batch.take(2)] == [batch[0]["name"], batch[1]["name"]]
+    assert len(batch.take(10)) == 4, "take() beyond length should return everything"
+    assert len(batch.take(0)) == 0
+    assert len(batch.take(-1)) == 0
+    print("[PASS] test_take")
+
+
+def test_select_order():
+    """select() follows the given index order"""
+    batch = sample_batch()
+
+    picked = batch.select([3, 0])
+    assert list(picked.prices) == [189990, 156000], f"Got {list(picked.prices)}"
+    assert picked.specs(1) == batch.specs(0)
+    print("[PASS] test_select_order")
+
+
+# === Empty batch ===
+
+def test_empty_batch():
+    """Empty batch is falsy and every accessor degrades gracefully"""
+    batch = ListingBatch()
+
+    assert len(batch) == 0 and not batch
+    assert list(batch) == [] and batch.to_dicts() == []
+    assert batch.min_price() is None
+    assert not batch.any_available()
+    assert len(batch.take(3)) == 0
+    assert len(batch.within(Bounds(1, 10))) == 0
+    assert len(batch.filter(lambda row: True)) == 0
+    try:
+        batch[0]
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("Indexing an empty batch should raise IndexError")
+    print("[PASS] test_empty_batch")
+
+
+def test_min_price_and_from_products():
+    """min_price() skips unknown prices; from_products() accepts dicts or a batch"""
+    batch = ListingBatch.from_products([
+        {"name": "A", "price": 200000, "id": 7},
+        {"name": "B"},
+        {"name": "C", "price": 150000, "code": "C1", "available": True},
+    ], "dns")
+
+    assert batch.min_price() == 150000, f"Got {batch.min_price()}"
+    assert batch.ids == ["7", "", "C1"], f"Got {batch.ids}"
+    assert ListingBatch.from_products(batch) is batch, "A batch should pass through unchanged"
+    print("[PASS] test_min_price_and_from_products")
+
+
+def run_all_tests():
+    """Run all tests and report results"""
+    tests = [
+        test_append_columns,
+        test_append_string_prices,
+        test_row_omits_unknown_fields,
+        test_iteration_matches_rows,
+        test_indexing,
+        test_within_bounds,
+        test_filter_predicate,
+        test_take,
+        test_select_order,
+        test_empty_batch,
+        test_min_price_and_from_products,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            print(f"[FAIL] {test_func.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"[ERROR] {test_func.__name__}: {e}")
+            failed += 1
+
+    print(f"\n{'='*60}")
+    print(f"Tests run: {len(tests)}")
+    print(f"Passed: {len(tests) - failed}")
+    print(f"Failed: {failed}")
+    print(f"{'='*60}")
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -7,7 +7,7 @@ import re
 import time
 import random
 from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
+from stealth_bundle import apply_stealth_context
 
 
 USER_AGENTS = [
@@ -86,14 +86,10 @@ def test_marketplace(name: str, config: dict) -> dict:
                 timezone_id="Europe/Moscow",
             )
 
-            page = context.new_page()
+            # Stealth patches (init-скрипт на весь контекст)
+            apply_stealth_context(context)
 
-            # Stealth patches
-            stealth = Stealth(
-                navigator_languages_override=("ru-RU", "ru"),
-                navigator_platform_override="Win32",
-            )
-            stealth.apply_stealth_sync(page)
+            page = context.new_page()
 
             # Начальная задержка
             random_delay(3, 5)
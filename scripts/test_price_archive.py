@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Unit tests for price_archive module (export -> query round trip)
+
+Requires pyarrow; every test writes to its own temporary directory.
+
+Run with: python3 test_price_archive.py
+Or with pytest: pytest test_price_archive.py -v
+"""
+
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+from datetime import datetime, timezone
+
+from price_archive import PriceArchive, export_json, export_results
+from result_store import ResultStore
+
+
+def tmp_dir() -> Path:
+    return Path(tempfile.mkdtemp(prefix="price_archive_"))
+
+
+def write_json(directory: Path, name: str, results, timestamp: str = "2026-09-15T12:00:00") -> Path:
+    path = directory / name
+    path.write_text(json.dumps({"timestamp": timestamp, "query": "MacBook Pro 16", "results": results}),
+                    encoding="utf-8")
+    return path
+
+
+RESULTS = [
+    {"store": "dns", "price": 150000, "available": True},
+    {"store": "ozon", "price": 149990, "available": False},
+    {"store": "citilink", "price": None},  # без цены - не в архив
+]
+
+
+def test_export_query_round_trip():
+    """Exported rows come back with kopeck prices, partitioned by month/store"""
+    work = tmp_dir()
+    root = work / "archive"
+    written = export_json([write_json(work, "prices_20260915_120000.json", RESULTS)], root)
+
+    assert len(written) == 2, f"Expected dns + ozon partitions, got {written}"
+    assert all("month=2026-09" in str(p) for p in written)
+
+    table = PriceArchive(root).query()
+    rows = sorted(table.to_pylist(), key=lambda r: r["store"])
+    assert [r["store"] for r in rows] == ["dns", "ozon"], f"Got {rows}"
+    assert rows[0]["price"] == 15000000, "Prices are stored in kopecks"
+    assert rows[0]["product"] == "MacBook Pro 16"
+    assert rows[1]["available"] is False
+    print("[PASS] test_export_query_round_trip")
+
+
+def test_query_filters():
+    """store and [start, end) filters prune partitions and rows"""
+    work = tmp_dir()
+    root = work / "archive"
+    export_json([write_json(work, "prices_a.json", RESULTS, "2026-09-15T12:00:00"),
+                 write_json(work, "prices_b.json", RESULTS, "2026-10-02T12:00:00")], root)
+    archive = PriceArchive(root)
+
+    assert archive.query(store="dns").num_rows == 2
+    october = archive.query(start=datetime(2026, 10, 1, tzinfo=timezone.utc))
+    assert october.num_rows == 2, f"Got {october.num_rows}"
+    assert archive.query(end=datetime(2026, 9, 1, tzinfo=timezone.utc)).num_rows == 0
+    assert len(archive.files(store="dns", start=datetime(2026, 10, 1, tzinfo=timezone.utc))) == 1
+    print("[PASS] test_query_filters")
+
+
+def test_reexport_other_format_replaces_file():
+    """Re-exporting a source as arrow removes its parquet copy (no double counting)"""
+    work = tmp_dir()
+    root = work / "archive"
+    source = write_json(work, "prices_x.json", RESULTS[:1])
+
+    export_json([source], root, fmt="parquet")
+    export_json([source], root, fmt="arrow")
+
+    files = PriceArchive(root).files()
+    assert [p.suffix for p in files] == [".arrow"], f"Got {files}"
+    assert PriceArchive(root).query().num_rows == 1
+    print("[PASS] test_reexport_other_format_replaces_file")
+
+
+def test_files_one_per_source():
+    """An archive that already has both formats of a source reads only the newer one"""
+    work = tmp_dir()
+    root = work / "archive"
+    source = write_json(work, "prices_y.json", RESULTS[:1])
+    parquet = export_json([source], root, fmt="parquet")[0]
+    kept = parquet.read_bytes()
+    arrow = export_json([source], root, fmt="arrow")[0]
+    parquet.write_bytes(kept)
+    os.utime(parquet, (1, 1))  # старая копия
+
+    assert PriceArchive(root).files() == [arrow]
+    assert PriceArchive(root).query().num_rows == 1
+    print("[PASS] test_files_one_per_source")
+
+
+def test_export_results_store():
+    """export --results reads the result store with the stored run time"""
+    work = tmp_dir()
+    store = ResultStore(work / "results")
+    store.append_run("test_results", [{"store": "dns", "method": "playwright", "price": 150000}],
+                     query="MacBook Pro 16", timestamp="2026-01-15T10:00:00")
+
+    written = export_results(store.root, work / "archive")
+    assert len(written) == 1 and "month=2026-01" in str(written[0]), f"Got {written}"
+    print("[PASS] test_export_results_store")
+
+
+def run_all_tests():
+    """Run all tests and report results"""
+    tests = [
+        test_export_query_round_trip,
+        test_query_filters,
+        test_reexport_other_format_replaces_file,
+        test_files_one_per_source,
+        test_export_results_store,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            print(f"[FAIL] {test_func.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"[ERROR] {test_func.__name__}: {e}")
+            failed += 1
+
+    print(f"\n{'='*60}")
+    print(f"Tests run: {len(tests)}")
+    print(f"Passed: {len(tests) - failed}")
+    print(f"Failed: {failed}")
+    print(f"{'='*60}")
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Unit tests for price_bounds module
+
+Run with: python3 test_price_bounds.py
+Or with pytest: pytest test_price_bounds.py -v
+"""
+
+import sys
+
+from price_bounds import Bounds, PriceBoundsIndex, parse_text_price
+
+
+LAPTOPS = Bounds(80000, 500000)
+
+
+def text_prices(text: str, bounds: Bounds = LAPTOPS):
+    return [parse_text_price(m) for m in bounds.text_pattern().findall(text)]
+
+
+# === text_pattern ===
+
+def test_grouped_and_plain_prices():
+    """Grouped (space / NBSP / narrow NBSP) and plain prices"""
+    assert text_prices("156 000 ₽") == [156000]
+    assert text_prices("156 000 ₽") == [156000]
+    assert text_prices("156 000 руб.") == [156000]
+    assert text_prices("156000RUB") == [156000]
+    print("[PASS] test_grouped_and_plain_prices")
+
+
+def test_model_number_then_price():
+    """A model number right before the price does not hide it"""
+    assert text_prices("MacBook Pro 16 249 990 ₽") == [249990], text_prices("MacBook Pro 16 249 990 ₽")
+    assert text_prices("Pro 16 249990 ₽") == [249990]
+    assert text_prices("M3 Pro 14 189 990₽") == [189990]
+    assert text_prices("iPhone 15 99 990 ₽", Bounds(10000, 500000)) == [99990]
+    print("[PASS] test_model_number_then_price")
+
+
+def test_glued_numbers_rejected():
+    """Numbers that are not one well-formed price are not matched"""
+    assert text_prices("16249990 ₽") == [], "Glued digits are one 8-digit number"
+    assert text_prices("2499 90 ₽") == [], "Groups must be 3 digits"
+    assert text_prices("24 9990 ₽") == []
+    assert text_prices("Артикул 1234567") == [], "No currency - no price"
+    print("[PASS] test_glued_numbers_rejected")
+
+
+def test_longest_grouping_wins():
+    """A 7-digit price is read whole when the bounds allow 7 digits"""
+    assert text_prices("1 249 990 ₽", Bounds(80000, 2000000)) == [1249990]
+    print("[PASS] test_longest_grouping_wins")
+
+
+# === Index ===
+
+def test_lookup_fallbacks():
+    """article -> category -> caller default -> index default"""
+    index = PriceBoundsIndex(articles={"Z14V0008D": Bounds(150000, 260000)},
+                             categories={"laptops": Bounds(60000, 600000)})
+    caller = Bounds(10000, 500000)
+
+    assert index.lookup("z14v-0008d") == Bounds(150000, 260000)
+    assert index.lookup("unknown", "laptops", caller) == Bounds(60000, 600000)
+    assert index.lookup(None, "phones", caller) == caller, "Caller default before index default"
+    assert PriceBoundsIndex().lookup() == LAPTOPS
+    print("[PASS] test_lookup_fallbacks")
+
+
+def test_caller_defaults():
+    """OCR and stealth extractors keep their own ranges when nothing is learned"""
+    from ocr_pipeline import OCR_PRICE_BOUNDS
+
+    assert OCR_PRICE_BOUNDS == Bounds(10000, 500000)
+    assert 15000 in PriceBoundsIndex().lookup(category="laptops", default=OCR_PRICE_BOUNDS)
+    print("[PASS] test_caller_defaults")
+
+
+def run_all_tests():
+    """Run all tests and report results"""
+    tests = [
+        test_grouped_and_plain_prices,
+        test_model_number_then_price,
+        test_glued_numbers_rejected,
+        test_longest_grouping_wins,
+        test_lookup_fallbacks,
+        test_caller_defaults,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            print(f"[FAIL] {test_func.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"[ERROR] {test_func.__name__}: {e}")
+            failed += 1
+
+    print(f"\n{'='*60}")
+    print(f"Tests run: {len(tests)}")
+    print(f"Passed: {len(tests) - failed}")
+    print(f"Failed: {failed}")
+    print(f"{'='*60}")
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
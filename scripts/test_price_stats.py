@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Unit tests for price_stats module (rolling windows over the price archive)
+
+Requires pyarrow and numpy.
+
+Run with: python3 test_price_stats.py
+Or with pytest: pytest test_price_stats.py -v
+"""
+
+import sys
+import math
+
+import pyarrow as pa
+
+from price_stats import MS_PER_DAY, SeriesBatch, compute_stats, window_stats
+
+AT = 1_790_000_000_000  # конец окон, ms UTC
+
+
+def table(rows):
+    """rows: (store, product, days_before_AT, price)"""
+    return pa.table({
+        "store": pa.array([r[0] for r in rows], pa.string()),
+        "product": pa.array([r[1] for r in rows], pa.string()),
+        "recorded_at": pa.array([AT - int(r[2] * MS_PER_DAY) for r in rows], pa.int64()),
+        "price": pa.array([r[3] for r in rows], pa.int64()),
+    })
+
+
+def test_series_batch_layout():
+    """Rows are grouped per (store, product) and sorted by time inside a series"""
+    batch = SeriesBatch.from_table(table([
+        ("ozon", "mbp", 1, 300),
+        ("dns", "mbp", 5, 100),
+        ("ozon", "mbp", 3, 200),
+        ("dns", "mbp", 2, 150),
+    ]))
+
+    assert sorted(batch.keys) == [("dns", "mbp"), ("ozon", "mbp")], f"Got {batch.keys}"
+    assert batch.offsets.tolist() == [0, 2, 4]
+    for i, key in enumerate(batch.keys):
+        span = slice(batch.offsets[i], batch.offsets[i + 1])
+        assert list(batch.timestamps[span]) == sorted(batch.timestamps[span]), f"{key} not sorted"
+    print("[PASS] test_series_batch_layout")
+
+
+def test_window_membership():
+    """Window is [at - days, at]: both ends inclusive, older rows excluded"""
+    batch = SeriesBatch.from_table(table([
+        ("ozon", "mbp", 7, 100),      # ровно на границе - входит
+        ("ozon", "mbp", 7.001, 50),   # чуть раньше - не входит
+        ("ozon", "mbp", 0, 200),      # ровно at - входит
+    ]))
+    stats = window_stats(batch, 7, AT, batch.prices[[-1]].astype(float))
+
+    assert stats.count.tolist() == [2], f"Got {stats.count}"
+    assert (stats.min[0], stats.max[0], stats.mean[0]) == (100, 200, 150)
+
+    future = window_stats(batch, 7, AT - MS_PER_DAY, batch.prices[[-1]].astype(float))
+    assert future.count.tolist() == [2], "Rows after at are outside the window"
+    assert (future.min[0], future.max[0]) == (50, 100)
+    print("[PASS] test_window_membership")
+
+
+def test_min_max_per_series():
+    """min/max/median are computed per series, windows do not leak between series"""
+    stats = compute_stats(SeriesBatch.from_table(table([
+        ("ozon", "mbp", 40, 90),
+        ("ozon", "mbp", 20, 120),
+        ("ozon", "mbp", 2, 100),
+        ("dns", "mbp", 1, 500),
+        ("dns", "mbp", 0, 400),
+    ])), windows=(7, 30, 90), at=AT)
+
+    ozon = stats.for_series("ozon", "mbp")
+    assert ozon["last_price"] == 100
+    assert (ozon["windows"][7]["min"], ozon["windows"][7]["max"]) == (100, 100)
+    assert (ozon["windows"][30]["min"], ozon["windows"][30]["max"]) == (100, 120)
+    assert (ozon["windows"][90]["min"], ozon["windows"][90]["max"]) == (90, 120)
+    assert ozon["windows"][90]["count"] == 3 and ozon["windows"][90]["median"] == 100
+
+    dns = stats.for_series("dns", "mbp")
+    assert (dns["windows"][7]["min"], dns["windows"][7]["max"]) == (400, 500), f"Got {dns}"
+    assert dns["windows"][7]["percentile"] == 25.0, "Last price is the lower of two"
+    print("[PASS] test_min_max_per_series")
+
+
+def test_empty_window_is_none():
+    """A series with no rows in a window reports count 0 and None statistics"""
+    stats = compute_stats(SeriesBatch.from_table(table([("ozon", "mbp", 60, 100)])),
+                          windows=(7, 90), at=AT)
+    series = stats.for_series("ozon", "mbp")
+
+    assert series["windows"][7]["count"] == 0
+    assert all(series["windows"][7][name] is None for name in ("min", "max", "mean", "median", "std"))
+    assert series["windows"][90]["min"] == 100
+    assert math.isnan(stats.windows[7].min[0])
+    print("[PASS] test_empty_window_is_none")
+
+
+def test_empty_input():
+    """An empty archive gives an empty batch and no series"""
+    batch = SeriesBatch.from_table(table([]))
+    assert len(batch) == 0 and batch.offsets.tolist() == [0]
+
+    stats = compute_stats(batch)
+    assert stats.at == 0 and stats.keys == []
+    assert all(len(w.count) == 0 for w in stats.windows.values())
+    assert stats.for_series("ozon", "mbp") is None, "Unknown series -> None"
+    print("[PASS] test_empty_input")
+
+
+def run_all_tests():
+    """Run all tests and report results"""
+    tests = [
+        test_series_batch_layout,
+        test_window_membership,
+        test_min_max_per_series,
+        test_empty_window_is_none,
+        test_empty_input,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            print(f"[FAIL] {test_func.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"[ERROR] {test_func.__name__}: {e}")
+            failed += 1
+
+    print(f"\n{'='*60}")
+    print(f"Tests run: {len(tests)}")
+    print(f"Passed: {len(tests) - failed}")
+    print(f"Failed: {failed}")
+    print(f"{'='*60}")
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Unit tests for response_capture module and store URL building
+
+Payloads are trimmed copies of recorded API responses (one search page
+per store); no browser or network is needed.
+
+Run with: python3 test_response_capture.py
+Or with pytest: pytest test_response_capture.py -v
+"""
+
+import sys
+import json
+
+from price_bounds import Bounds
+from specs_filter import TargetSpecs
+from response_capture import (
+    ResponseCapture,
+    named_prices,
+    ozon_products,
+    yandex_market_products,
+)
+
+
+# === Recorded payloads ===
+
+OZON_URL = "https://www.ozon.ru/api/entrypoint-api.bx/page/json/v2?url=%2Fsearch%2F%3Ftext%3DMacBook%2BPro%2B16"
+
+OZON_PAYLOAD = {
+    "widgetStates": {
+        "searchResultsV2-226897-default-1": json.dumps({
+            "items": [
+                {
+                    "action": {"link": "/product/apple-macbook-pro-16-m1-pro-32gb-512gb-1234567890/?asb=abc"},
+                    "mainState": [
+                        {"atom": {"priceV2": {"price": [
+                            {"text": "189 990 ₽", "textStyle": "PRICE"},
+                            {"text": "229 990 ₽", "textStyle": "ORIGINAL_PRICE"},
+                        ]}}},
+                        {"id": "name", "atom": {"textAtom": {
+                            "text": "Ноутбук Apple MacBook Pro 16 M1 Pro 32GB 512GB"}}},
+                    ],
+                },
+                {
+                    "sku": 987654321,
+                    "action": {"link": "/product/apple-macbook-pro-16-m3-max-987654321/"},
+                    "mainState": [
+                        {"atom": {"priceV2": {"price": [{"text": "349 990 ₽", "textStyle": "PRICE"}]}}},
+                        {"id": "name", "atom": {"textAtom": {"text": "Apple MacBook Pro 16 M3 Max 36GB 1TB"}}},
+                    ],
+                },
+                {
+                    # Рекламный блок без цены
+                    "action": {"link": "/highlight/apple/"},
+                    "mainState": [{"id": "name", "atom": {"textAtom": {"text": "Apple"}}}],
+                },
+            ],
+        }),
+        "webBreadcrumbs-1": "not json {",
+    },
+}
+
+OZON_LEGACY_PAYLOAD = {
+    "widgetStates": {
+        "tileGridDesktop-1": json.dumps({
+            "products": [{"id": 555, "title": "MacBook Pro 16 M2 Pro 16GB 512GB", "finalPrice": 175000}],
+        }),
+    },
+}
+
+YANDEX_MARKET_URL = "https://market.yandex.ru/api/resolve/?r=search/resolveSearch"
+
+YANDEX_MARKET_PAYLOAD = {
+    "results": [{
+        "data": {
+            "collections": {
+                "offer": {
+                    "o1": {"productId": 1779485012, "price": {"value": "199990", "currency": "RUR"},
+                           "isAvailable": True},
+                    "o2": {"modelId": 1779485013, "price": {"value": "164500"},
+                           "titles": {"raw": "Apple MacBook Pro 16 M1 Pro 16GB 1TB"}},
+                    "o3": {"productId": 1779485014, "price": None},
+                },
+                "product": {
+                    "1779485012": {"titles": {"raw": "Apple MacBook Pro 16 M1 Pro 32GB 512GB"}},
+                },
+            },
+        },
+    }],
+}
+
+CITILINK_URL = "https://www.citilink.ru/graphql/"
+
+CITILINK_PAYLOAD = {
+    "data": {
+        "productsFilter": {
+            "record": {
+                "products": [
+                    {"id": "1608123", "name": "Ноутбук Apple MacBook Pro 16 M1 Pro 32GB 512GB",
+                     "slug": "noutbuk-apple-macbook-pro-16-1608123", "price": {"price": "184 990"},
+                     "isAvailable": True},
+                    {"id": "1608124", "title": "Ноутбук Apple MacBook Pro 16 M1 Max 64GB 2TB",
+                     "url": "https://www.citilink.ru/product/1608124/", "price": 289990, "isAvailable": False},
+                    {"id": "brand", "name": "Apple", "price": True},
+                ],
+            },
+        },
+    },
+}
+
+
+# === Fakes ===
+
+class FakeResponse:
+    def __init__(self, url: str, payload):
+        self.url = url
+        self._body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+
+    def body(self) -> bytes:
+        return self._body
+
+
+class FakePage:
+    """Минимум Page для ResponseCapture: подписка на response и ожидание"""
+
+    def __init__(self):
+        self.listeners = []
+        self.pending = []
+
+    def on(self, event, callback):
+        assert event == "response"
+        self.listeners.append(callback)
+
+    def remove_listener(self, event, callback):
+        self.listeners.remove(callback)
+
+    def deliver(self, response):
+        for callback in list(self.listeners):
+            callback(response)
+
+    def wait_for_timeout(self, ms):
+        # Ответы "приходят" во время ожидания, как в Playwright
+        while self.pending:
+            self.deliver(self.pending.pop(0))
+
+
+# === Store URLs ===
+
+def test_store_url_follows_query():
+    """Search URL changes with the query for every search store"""
+    from test_scrapers import STORES, build_store_url
+
+    search_stores = [s for s in STORES if s.url_type != "product"]
+    assert search_stores, "Expected search stores"
+    for store in search_stores:
+        macbook = build_store_url(store, "MacBook Pro 16")
+        iphone = build_store_url(store, "iPhone 15 Pro")
+        assert macbook != iphone, f"{store.name}: URL does not depend on query ({macbook})"
+        assert "iPhone+15+Pro" in iphone, f"{store.name}: query not encoded in {iphone}"
+    print("[PASS] test_store_url_follows_query")
+
+
+def test_store_url_default_query():
+    """Empty query falls back to DEFAULT_QUERY instead of an empty search"""
+    from test_scrapers import DEFAULT_QUERY, STORES, build_store_url
+
+    ozon = next(s for s in STORES if s.name == "ozon")
+    assert build_store_url(ozon, "") == build_store_url(ozon, DEFAULT_QUERY)
+    print("[PASS] test_store_url_default_query")
+
+
+def test_firefox_target_follows_query():
+    """Firefox scripts get the curated catalog by default and a search URL otherwise"""
+    from test_scrapers import FIREFOX_CATALOGS, STORES, firefox_target
+
+    for store in [s for s in STORES if s.method in FIREFOX_CATALOGS]:
+        assert firefox_target(store, "") == FIREFOX_CATALOGS[store.method][1]
+        target = firefox_target(store, "iPhone 15 Pro")
+        assert target.startswith("http") and "iPhone+15+Pro" in target, f"{store.name}: {target}"
+    print("[PASS] test_firefox_target_follows_query")
+
+
+# === Extractors ===
+
+def test_ozon_products_widget_states():
+    """Ozon widgetStates: current price, name atom, sku from link or item"""
+    products = list(ozon_products(OZON_PAYLOAD))
+
+    assert len(products) == 2, f"Expected 2 products, got {len(products)}"
+    first, second = products
+    assert first["price"] == 189990, f"Expected PRICE text, got {first['price']}"
+    assert first["name"] == "Ноутбук Apple MacBook Pro 16 M1 Pro 32GB 512GB"
+    assert first["product_id"] == "1234567890", f"Expected sku from link, got {first['product_id']}"
+    assert "?" not in first["url"], f"Query string should be dropped: {first['url']}"
+    assert second["product_id"] == "987654321"
+    assert second["price"] == 349990
+    print("[PASS] test_ozon_products_widget_states")
+
+
+def test_ozon_products_legacy():
+    """Older Ozon widgets: finalPrice next to the title"""
+    products = list(ozon_products(OZON_LEGACY_PAYLOAD))
+
+    assert len(products) == 1, f"Expected 1 product, got {len(products)}"
+    assert products[0]["price"] == 175000
+    assert products[0]["product_id"] == "555"
+    print("[PASS] test_ozon_products_legacy")
+
+
+def test_yandex_market_products():
+    """Yandex Market: offers joined with product titles, offers without price skipped"""
+    products = {p["product_id"]: p for p in yandex_market_products(YANDEX_MARKET_PAYLOAD)}
+
+    assert set(products) == {"1779485012", "1779485013"}, f"Unexpected products: {sorted(products)}"
+    assert products["1779485012"]["name"] == "Apple MacBook Pro 16 M1 Pro 32GB 512GB"
+    assert products["1779485012"]["price"] == 199990
+    assert products["1779485013"]["name"] == "Apple MacBook Pro 16 M1 Pro 16GB 1TB"
+    assert products["1779485013"]["url"] == "https://market.yandex.ru/product/1779485013"
+    print("[PASS] test_yandex_market_products")
+
+
+def test_named_prices_citilink():
+    """Citilink GraphQL: name/title + nested or plain price, boolean price ignored"""
+    products = list(named_prices(CITILINK_PAYLOAD))
+
+    assert [p["product_id"] for p in products] == ["1608123", "1608124"], f"Got {products}"
+    assert products[0]["price"] == 184990
+    assert products[0]["url"] == "/product/noutbuk-apple-macbook-pro-16-1608123/"
+    assert products[1]["available"] is False
+    print("[PASS] test_named_prices_citilink")
+
+
+# === ResponseCapture ===
+
+def capture_store(store: str, url: str, payload, bounds=None) -> ResponseCapture:
+    page = FakePage()
+    capture = ResponseCapture(page, store, bounds)
+    page.pending = [
+        FakeResponse("https://example.com/static/app.js", b"console.log(1)"),
+        FakeResponse(url, b"<html>redirect</html>"),
+        FakeResponse(url, payload),
+        FakeResponse(url, payload),  # повтор того же ответа - без дублей
+    ]
+    assert capture.wait(timeout=1), f"{store}: no products captured"
+    return capture
+
+
+def test_capture_ozon():
+    """Ozon capture: JSON responses only, absolute URLs, duplicates dropped"""
+    capture = capture_store("ozon", OZON_URL, OZON_PAYLOAD)
+
+    assert capture.responses == 2, f"Expected 2 JSON responses, got {capture.responses}"
+    assert len(capture.products) == 2, f"Expected 2 unique products, got {len(capture.products)}"
+    assert capture.products.urls[0].startswith("https://www.ozon.ru/product/")
+    assert capture.details()["extract_source"] == "api"
+    print("[PASS] test_capture_ozon")
+
+
+def test_capture_yandex_market():
+    """Yandex Market capture with price bounds"""
+    capture = capture_store("yandex_market", YANDEX_MARKET_URL, YANDEX_MARKET_PAYLOAD, Bounds(180000, 300000))
+
+    assert len(capture.products) == 1, f"Bounds should keep 1 offer, got {len(capture.products)}"
+    assert capture.products.prices[0] == 199990
+    print("[PASS] test_capture_yandex_market")
+
+
+def test_capture_citilink():
+    """Citilink capture: relative slug URL becomes absolute"""
+    capture = capture_store("citilink", CITILINK_URL, CITILINK_PAYLOAD)
+
+    assert len(capture.products) == 2
+    assert capture.products.urls[0] == "https://www.citilink.ru/product/noutbuk-apple-macbook-pro-16-1608123/"
+    print("[PASS] test_capture_citilink")
+
+
+def test_capture_skips_malformed_payload():
+    """A response the extractor cannot handle is skipped; later responses still count"""
+    page = FakePage()
+    capture = ResponseCapture(page, "ozon")
+    broken = {"widgetStates": {"searchResultsV2-1": json.dumps({"items": [
+        "not an item",
+        {"mainState": [{"priceV2": "189 990 ₽"}]},
+    ]})}}
+    page.pending = [FakeResponse(OZON_URL, broken), FakeResponse(OZON_URL, OZON_PAYLOAD)]
+
+    assert capture.wait(timeout=1), "Products after a malformed response should be captured"
+    assert capture.responses == 2 and capture.errors == 1, f"Got {capture.details()}"
+    assert len(capture.products) == 2
+    print("[PASS] test_capture_skips_malformed_payload")
+
+
+def test_capture_catalog_parses():
+    """capture.catalog() is accepted by the Firefox catalog parsers"""
+    from test_scrapers import parse_ozon_json
+
+    capture = capture_store("ozon", OZON_URL, OZON_PAYLOAD)
+    target = TargetSpecs(screen="16", cpu="M1", ram=16, ssd=256, article="")
+    parsed = parse_ozon_json(capture.catalog(), target=target)
+
+    assert parsed and parsed["price"] == 189990, f"Expected M1 Pro listing, got {parsed}"
+    capture.close()
+    print("[PASS] test_capture_catalog_parses")
+
+
+def run_all_tests():
+    """Run all tests and report results"""
+    tests = [
+        test_store_url_follows_query,
+        test_store_url_default_query,
+        test_firefox_target_follows_query,
+        test_ozon_products_widget_states,
+        test_ozon_products_legacy,
+        test_yandex_market_products,
+        test_named_prices_citilink,
+        test_capture_ozon,
+        test_capture_yandex_market,
+        test_capture_citilink,
+        test_capture_skips_malformed_payload,
+        test_capture_catalog_parses,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            print(f"[FAIL] {test_func.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"[ERROR] {test_func.__name__}: {e}")
+            failed += 1
+
+    print(f"\n{'='*60}")
+    print(f"Tests run: {len(tests)}")
+    print(f"Passed: {len(tests) - failed}")
+    print(f"Failed: {failed}")
+    print(f"{'='*60}")
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Unit tests for result_store module
+
+Every test works in its own temporary directory; no data/ files are touched.
+
+Run with: python3 test_result_store.py
+Or with pytest: pytest test_result_store.py -v
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from result_store import HEADER, ResultStore, to_ms
+
+
+def new_store(**kwargs) -> ResultStore:
+    return ResultStore(Path(tempfile.mkdtemp(prefix="result_store_")), **kwargs)
+
+
+def results(*stores: str, price: int = 150000):
+    return [{"store": s, "price": price, "available": True} for s in stores]
+
+
+# === recover ===
+
+def test_recover_torn_tail():
+    """A record cut off by a crash is dropped; the next write continues after the last good one"""
+    store = new_store()
+    store.append_run("prices", results("ozon", "dns"), timestamp="2026-01-15T10:00:00")
+    seg = store.seg_path(store.segments()[-1])
+    good_size = seg.stat().st_size
+
+    # Header promises 100 bytes, only 10 made it to disk
+    with open(seg, "ab") as f:
+        f.write(HEADER.pack(100, 0) + b'{"store":"')
+
+    store.append_run("prices", results("ozon"), timestamp="2026-01-15T11:00:00")
+
+    records = store.range()
+    assert [r["store"] for r in records] == ["ozon", "dns", "ozon"], f"Got {records}"
+    assert seg.stat().st_size > good_size
+    print("[PASS] test_recover_torn_tail")
+
+
+def test_recover_reindexes_unindexed_records():
+    """Records written to the segment but missing from the index are indexed again"""
+    store = new_store()
+    store.append_run("prices", results("ozon", "dns", "citilink"), timestamp="2026-01-15T10:00:00")
+    number = store.segments()[-1]
+    idx = store.idx_path(number)
+
+    # Crash between segment write and index write: last index entry lost
+    data = idx.read_bytes()
+    idx.write_bytes(data[:len(data) // 3])
+    assert not store.index(number).clean
+
+    store.recover(number)
+    with store.index(number) as index:
+        assert index.clean and index.count == 3, f"Expected 3 entries, got {index.count}"
+    assert len(store.range()) == 3
+    print("[PASS] test_recover_reindexes_unindexed_records")
+
+
+def test_recover_bad_crc():
+    """A record with a wrong checksum ends the segment"""
+    store = new_store()
+    store.append_run("prices", results("ozon"), timestamp="2026-01-15T10:00:00")
+    seg = store.seg_path(store.segments()[-1])
+    payload = b'{"store":"dns","ts":1}'
+    with open(seg, "ab") as f:
+        f.write(HEADER.pack(len(payload), 12345) + payload)
+
+    store.recover(store.segments()[-1])
+    assert [r["store"] for r in store.range()] == ["ozon"]
+    print("[PASS] test_recover_bad_crc")
+
+
+# === find_last ===
+
+def test_find_last_across_imported_segments():
+    """An import of older runs opens a new segment; last() still returns the newest records"""
+    store = new_store()
+    store.append_run("prices", results("ozon", price=100), timestamp="2026-03-01T10:00:00")
+    store.append_run("prices", results("ozon", price=200), timestamp="2026-03-02T10:00:00")
+    # Older JSON imported later: goes to a newer segment with older timestamps
+    store.append_run("prices", results("ozon", price=50), timestamp="2026-01-01T10:00:00")
+    store.append_run("prices", results("ozon", price=300), timestamp="2026-03-03T10:00:00")
+
+    assert len(store.segments()) >= 2, "Older run should open a new segment"
+    last = store.last("ozon", 2)
+    assert [r["price"] for r in last] == [200, 300], f"Got {[r['price'] for r in last]}"
+    assert [r["price"] for r in store.last("ozon", 10)] == [50, 100, 200, 300]
+    assert store.last("dns", 5) == []
+    print("[PASS] test_find_last_across_imported_segments")
+
+
+def test_find_last_filters_kind():
+    """kind= separates prices from test_results for the same store"""
+    store = new_store()
+    store.append_run("prices", results("dns", price=1), timestamp="2026-03-01T10:00:00")
+    store.append_run("test_results", results("dns", price=2), timestamp="2026-03-02T10:00:00")
+
+    assert [r["price"] for r in store.last("dns", 5, kind="prices")] == [1]
+    assert [r["price"] for r in store.last("dns", 5, kind="test_results")] == [2]
+    print("[PASS] test_find_last_filters_kind")
+
+
+# === range ===
+
+def test_range_bounds():
+    """range() is [start, end): start inclusive, end exclusive, across segments"""
+    store = new_store(max_segment_bytes=200)
+    stamps = [f"2026-02-{day:02d}T00:00:00" for day in range(1, 6)]
+    for i, ts in enumerate(stamps):
+        store.append_run("prices", results("ozon", price=i), timestamp=ts)
+
+    assert len(store.segments()) > 1, "Small segments should roll over"
+    assert [r["price"] for r in store.range(stamps[1], stamps[3])] == [1, 2]
+    assert [r["price"] for r in store.range(stamps[3])] == [3, 4]
+    assert [r["price"] for r in store.range(None, stamps[1])] == [0]
+    assert store.range("2027-01-01") == []
+    assert [r["price"] for r in store.run(to_ms(stamps[2]))] == [2]
+    print("[PASS] test_range_bounds")
+
+
+# === compact ===
+
+def test_compact_keep():
+    """compact(keep=N) keeps the last N records per (store, kind)"""
+    store = new_store()
+    for day in range(1, 5):
+        store.append_run("prices", results("ozon", "dns", price=day), timestamp=f"2026-02-0{day}T00:00:00")
+    store.append_run("test_results", results("ozon", price=9), timestamp="2026-02-05T00:00:00")
+
+    before, after = store.compact(keep=2)
+    assert (before, after) == (9, 5), f"Got {(before, after)}"
+    assert [r["price"] for r in store.last("ozon", 10, kind="prices")] == [3, 4]
+    assert [r["price"] for r in store.last("dns", 10)] == [3, 4]
+    assert [r["price"] for r in store.last("ozon", 10, kind="test_results")] == [9]
+    print("[PASS] test_compact_keep")
+
+
+def test_compact_before():
+    """compact(before=) drops older records and replaces the old segments"""
+    store = new_store()
+    store.append_run("prices", results("ozon", price=1), timestamp="2025-12-31T00:00:00")
+    store.append_run("prices", results("ozon", price=2), timestamp="2026-01-02T00:00:00")
+    old = store.segments()
+
+    assert store.compact(before="2026-01-01") == (2, 1)
+    assert not set(old) & set(store.segments()), "Old segments should be removed"
+    assert [r["price"] for r in store.range()] == [2]
+
+    assert store.compact(before="2030-01-01") == (1, 0)
+    assert store.range() == [] and store.segments() == []
+    print("[PASS] test_compact_before")
+
+
+# === Export ===
+
+def test_archive_rows_use_run_time():
+    """price_archive export of test_results keeps the stored run time"""
+    from price_archive import rows_from_store
+
+    store = new_store()
+    store.append_run("test_results", [{"store": "dns", "method": "playwright", "price": 150000}],
+                     query="MacBook Pro 16", timestamp="2026-01-15T10:00:00")
+
+    rows = rows_from_store(store.root)
+    assert len(rows) == 1, f"Got {rows}"
+    recorded = rows[0]["recorded_at"]
+    assert (recorded.year, recorded.month, recorded.day) == (2026, 1, 15), f"Got {recorded}"
+    assert rows[0]["product"] == "MacBook Pro 16"
+    print("[PASS] test_archive_rows_use_run_time")
+
+
+def run_all_tests():
+    """Run all tests and report results"""
+    tests = [
+        test_recover_torn_tail,
+        test_recover_reindexes_unindexed_records,
+        test_recover_bad_crc,
+        test_find_last_across_imported_segments,
+        test_find_last_filters_kind,
+        test_range_bounds,
+        test_compact_keep,
+        test_compact_before,
+        test_archive_rows_use_run_time,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            print(f"[FAIL] {test_func.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"[ERROR] {test_func.__name__}: {e}")
+            failed += 1
+
+    print(f"\n{'='*60}")
+    print(f"Tests run: {len(tests)}")
+    print(f"Passed: {len(tests) - failed}")
+    print(f"Failed: {failed}")
+    print(f"{'='*60}")
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())
@@ -21,20 +21,30 @@ import random
 import subprocess
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from dataclasses import dataclass, asdict, field
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple, Union
+from dataclasses import dataclass, asdict, field, replace
+from contextlib import contextmanager
 from urllib.parse import quote_plus
 
 from playwright.sync_api import sync_playwright, Page
-from playwright_stealth import Stealth
+from stealth_bundle import apply_stealth_context
+
+from price_bounds import Bounds, bounds_for, parse_text_price
+from page_signals import classify
+from page_extractors import Extraction, PageItem, extract_page
+from response_capture import STORE_APIS, ResponseCapture, to_price
+from snapshot_diff import SnapshotLog, print_delta, stream_name
+from result_store import ResultStore
 
 # Import specs filtering module
 from specs_filter import TargetSpecs, filter_and_rank
+from listing_batch import ListingBatch
 
 
 # === Конфигурация тестов ===
 
 TEST_ARTICLE = ""  # No specific article - search by specs
+DEFAULT_QUERY = "MacBook Pro 16"  # Поисковый запрос, если --query не задан
 TEST_PRODUCT = "MacBook Pro 16\" M1 (or newer) 16GB+"
 
 # Target specifications for filtering (minimum requirements)
@@ -46,13 +56,17 @@ TARGET_SPECS = TargetSpecs(
     article=""     # No specific article
 )
 
-# Ожидаемый диапазон цен для валидации
-MIN_EXPECTED_PRICE = 80000
-MAX_EXPECTED_PRICE = 300000
+# Ожидаемый диапазон цен для валидации (если в price_bounds ничего не выучено)
+EXPECTED_PRICE = Bounds(80000, 300000)
+PRICE_CATEGORY = "laptops"
+
+# Avito: б/у товары, нижняя граница шире
+AVITO_PRICE_FACTOR = 0.4
 
 # Таймауты
 PAGE_TIMEOUT = 30000
 FIREFOX_TIMEOUT = 90  # Увеличен для Firefox + xvfb-run
+API_TIMEOUT = 20  # Ожидание ответа внутреннего API с товарами (сек)
 
 
 # === Dataclasses ===
@@ -78,7 +92,7 @@ class TestResult:
 class StoreConfig:
     """Конфигурация магазина"""
     name: str
-    method: str  # playwright_direct, playwright_stealth, firefox
+    method: str  # playwright_direct, playwright_stealth, firefox, api_capture
     search_url: str
     parser: str = "generic"  # generic, nextjs, dns_json
     url_type: str = "search"  # search, product
@@ -86,6 +100,7 @@ class StoreConfig:
     delay: int = 0
     validate_price: bool = True
     unstable: bool = False  # Пометка для нестабильных магазинов (rate limiting, CAPTCHA)
+    rate_limit: float = 3.0  # Минимальный интервал между запросами в батче (сек)
 
 
 # === Конфигурация магазинов ===
@@ -117,33 +132,34 @@ STORES: List[StoreConfig] = [
     StoreConfig(
         name="citilink",
         method="citilink_firefox",  # Firefox + xdotool метод (обход rate limiting)
-        search_url="https://www.citilink.ru/search/?text=MacBook+Pro+16",
+        search_url="https://www.citilink.ru/search/?text={query}",
         parser="citilink_json",
         unstable=True,  # Агрессивный rate limiting - тестировать только вручную с интервалом 5+ мин
     ),
     StoreConfig(
         name="dns",
         method="firefox",
-        search_url="https://www.dns-shop.ru/catalog/recipe/b70b01357dbede01/apple-macbook-pro/",
+        search_url="https://www.dns-shop.ru/search/?q={query}",
         parser="dns_json",
     ),
     StoreConfig(
         name="yandex_market",
         method="yandex_market_special",
-        search_url="https://market.yandex.ru/search?text=MacBook+Pro+16",
+        search_url="https://market.yandex.ru/search?text={query}",
         parser="yandex_market",
         delay=5,
+        rate_limit=10.0,
     ),
     StoreConfig(
         name="ozon",
         method="ozon_firefox",
-        search_url="https://www.ozon.ru/search/?text=MacBook+Pro+16&from_global=true",
+        search_url="https://www.ozon.ru/search/?text={query}&from_global=true",
         parser="ozon_json",
     ),
     StoreConfig(
         name="avito",
         method="avito_firefox",
-        search_url="https://www.avito.ru/rossiya/noutbuki?q=MacBook+Pro+16",
+        search_url="https://www.avito.ru/rossiya/noutbuki?q={query}",
         parser="avito_json",
     ),
 ]
@@ -177,54 +193,47 @@ def human_scroll(page: Page):
 
 # === Парсеры ===
 
-def extract_price(html: str) -> Optional[int]:
+def expected_price(query: str = "", target: Optional[TargetSpecs] = None) -> Bounds:
+    """Диапазон цен для запроса: артикул -> категория -> EXPECTED_PRICE"""
+    article = (target.article if target else "") or query
+    return bounds_for(article, PRICE_CATEGORY, EXPECTED_PRICE)
+
+
+def extract_price(html: str, bounds: Bounds = EXPECTED_PRICE) -> Optional[int]:
     """Извлечь цену из HTML"""
 
     # Schema.org
     match = re.search(r'itemprop="price"\s+content="(\d+)"', html)
     if match:
         price = int(match.group(1))
-        if MIN_EXPECTED_PRICE < price < MAX_EXPECTED_PRICE:
+        if price in bounds:
             return price
 
     # data-meta-price (Citilink)
     match = re.search(r'data-meta-price="(\d+)"', html)
     if match:
         price = int(match.group(1))
-        if MIN_EXPECTED_PRICE < price < MAX_EXPECTED_PRICE:
+        if price in bounds:
             return price
 
     # JSON-LD
     for match in re.findall(r'"price"[:\s]*(\d+)', html):
         price = int(match)
-        if MIN_EXPECTED_PRICE < price < MAX_EXPECTED_PRICE:
+        if price in bounds:
             return price
 
     # Text patterns
-    for match in re.findall(r'(\d{2,3}[\s\u00a0]?\d{3})[\s\u00a0]*(?:₽|руб|RUB)', html):
-        clean = match.replace(" ", "").replace("\u00a0", "")
-        if clean.isdigit():
-            price = int(clean)
-            if MIN_EXPECTED_PRICE < price < MAX_EXPECTED_PRICE:
-                return price
+    for match in bounds.text_pattern().findall(html):
+        price = parse_text_price(match)
+        if price in bounds:
+            return price
 
     return None
 
 
 def extract_availability(html: str) -> Optional[bool]:
-    """Извлечь наличие"""
-    html_lower = html.lower()
-
-    if any(x in html_lower for x in ['instock', 'in_stock', '"availability":"instock"', 'isavailable":true']):
-        return True
-    if any(x in html_lower for x in ['outofstock', 'out_of_stock', 'soldout', 'isavailable":false']):
-        return False
-    if 'в наличии' in html_lower:
-        return True
-    if 'нет в наличии' in html_lower:
-        return False
-
-    return None
+    """Извлечь наличие (общий проход page_signals)"""
+    return classify(html).availability
 
 
 def extract_product_name(html: str) -> str:
@@ -307,31 +316,24 @@ def extract_specs_from_name(name: str) -> dict:
     }
 
 
-def parse_avito(html: str) -> Optional[Dict]:
+def parse_avito(html: str, bounds: Bounds = EXPECTED_PRICE) -> Optional[Dict]:
     """Парсинг Avito (Schema.org)"""
-    prices = []
+    products = ListingBatch("avito")
 
     # Schema.org itemProp/itemprop="price" content="..." (case-insensitive)
     for match in re.findall(r'itemprop="price"\s+content="(\d+)"', html, re.IGNORECASE):
-        price = int(match)
-        # Avito: б/у товары, широкий диапазон 30K-400K
-        if 30000 < price < 400000:
-            prices.append(price)
-
-    if prices:
-        # Фильтруем только MacBook Pro 16 цены (от 80K)
-        macbook_prices = [p for p in prices if p >= 80000]
-        if macbook_prices:
-            return {
-                "price": min(macbook_prices),
-                "available": True,
-                "count": len(macbook_prices),
-            }
-        # Fallback: любая цена
+        products.append("", int(match), available=True)
+
+    # Avito: б/у товары, широкий диапазон
+    products = products.within(Bounds(int(bounds.lo * AVITO_PRICE_FACTOR), bounds.hi))
+
+    if products:
+        # Фильтруем только цены из основного диапазона, fallback: любая цена
+        macbook_products = products.within(bounds) or products
         return {
-            "price": min(prices),
+            "price": macbook_products.min_price(),
             "available": True,
-            "count": len(prices),
+            "count": len(macbook_products),
         }
 
     return None
@@ -339,6 +341,7 @@ def parse_avito(html: str) -> Optional[Dict]:
 
 def parse_citilink_nextjs(html: str) -> Optional[Dict]:
     """Парсинг Citilink Next.js"""
+    products = ListingBatch("citilink")
     match = re.search(
         r'<script id="__NEXT_DATA__" type="application/json">(.+?)</script>',
         html
@@ -352,39 +355,53 @@ def parse_citilink_nextjs(html: str) -> Optional[Dict]:
             for key, value in props.items():
                 if isinstance(value, dict) and "products" in value:
                     for item in value["products"][:1]:
-                        return {
-                            "price": item.get("price", {}).get("price", 0),
-                            "available": item.get("isAvailable", False),
-                            "name": item.get("name", ""),
-                        }
+                        products.append(
+                            item.get("name", ""),
+                            to_price(item.get("price")),
+                            available=item.get("isAvailable", False),
+                        )
+                    break
         except json.JSONDecodeError:
             pass
 
     # Fallback
-    prices = re.findall(r'data-meta-price="(\d+)"', html)
-    if prices:
-        return {"price": int(prices[0]), "available": True, "name": ""}
+    if not products:
+        prices = re.findall(r'data-meta-price="(\d+)"', html)
+        if prices:
+            products.append("", int(prices[0]), available=True)
+
+    if products:
+        first = products[0]
+        return {"price": first.get("price", 0), "available": first["available"], "name": first["name"]}
 
     return None
 
 
-def parse_dns_json(json_path: str, filter_specs: bool = True) -> Optional[Dict]:
+def load_catalog(source: Union[str, Dict]) -> Dict:
+    """Каталог из JSON-файла скрипта или уже готовый dict (ResponseCapture.catalog())"""
+    if isinstance(source, dict):
+        return source
+    with open(source, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_dns_json(json_path: Union[str, Dict], filter_specs: bool = True, target: Optional[TargetSpecs] = None) -> Optional[Dict]:
     """
     Парсинг DNS-Shop JSON с фильтрацией по характеристикам
 
     Args:
-        json_path: Path to JSON file
+        json_path: Path to JSON file or catalog dict
         filter_specs: Enable specs filtering (default: True)
+        target: Target specs (default: TARGET_SPECS)
     """
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_catalog(json_path)
 
-        products = data.get("products", [])
+        products = ListingBatch.from_products(data.get("products", []), "dns")
 
         if products and filter_specs:
             # Apply specs filtering
-            filtered = filter_and_rank(products, TARGET_SPECS, threshold=70, top_n=3)
+            filtered = filter_and_rank(products, target or TARGET_SPECS, threshold=70, top_n=3)
 
             if filtered:
                 best_product, best_score = filtered[0]
@@ -417,23 +434,23 @@ def parse_dns_json(json_path: str, filter_specs: bool = True) -> Optional[Dict]:
     return None
 
 
-def parse_avito_json(json_path: str, filter_specs: bool = True) -> Optional[Dict]:
+def parse_avito_json(json_path: Union[str, Dict], filter_specs: bool = True, target: Optional[TargetSpecs] = None) -> Optional[Dict]:
     """
     Парсинг Avito JSON с фильтрацией по характеристикам
 
     Args:
-        json_path: Path to JSON file
+        json_path: Path to JSON file or catalog dict
         filter_specs: Enable specs filtering (default: True)
+        target: Target specs (default: TARGET_SPECS)
     """
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_catalog(json_path)
 
-        products = data.get("products", [])
+        products = ListingBatch.from_products(data.get("products", []), "avito")
 
         if products and filter_specs:
             # Apply specs filtering
-            filtered = filter_and_rank(products, TARGET_SPECS, threshold=70, top_n=3)
+            filtered = filter_and_rank(products, target or TARGET_SPECS, threshold=70, top_n=3)
 
             if filtered:
                 best_product, best_score = filtered[0]
@@ -449,10 +466,10 @@ def parse_avito_json(json_path: str, filter_specs: bool = True) -> Optional[Dict
 
         # Fallback to legacy behavior (MIN price) - no products passed threshold
         if products:
-            prices = [p["price"] for p in products if p.get("price")]
-            if prices:
+            min_price = products.min_price()
+            if min_price:
                 return {
-                    "price": min(prices),
+                    "price": min_price,
                     "available": True,
                     "count": len(products),
                     "match_score": 0,
@@ -466,23 +483,23 @@ def parse_avito_json(json_path: str, filter_specs: bool = True) -> Optional[Dict
     return None
 
 
-def parse_citilink_json(json_path: str, filter_specs: bool = True) -> Optional[Dict]:
+def parse_citilink_json(json_path: Union[str, Dict], filter_specs: bool = True, target: Optional[TargetSpecs] = None) -> Optional[Dict]:
     """
     Парсинг Citilink JSON с фильтрацией по характеристикам
 
     Args:
-        json_path: Path to JSON file
+        json_path: Path to JSON file or catalog dict
         filter_specs: Enable specs filtering (default: True)
+        target: Target specs (default: TARGET_SPECS)
     """
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_catalog(json_path)
 
-        products = data.get("products", [])
+        products = ListingBatch.from_products(data.get("products", []), "citilink")
 
         if products and filter_specs:
             # Apply specs filtering
-            filtered = filter_and_rank(products, TARGET_SPECS, threshold=70, top_n=3)
+            filtered = filter_and_rank(products, target or TARGET_SPECS, threshold=70, top_n=3)
 
             if filtered:
                 best_product, best_score = filtered[0]
@@ -498,12 +515,11 @@ def parse_citilink_json(json_path: str, filter_specs: bool = True) -> Optional[D
 
         # Fallback to legacy behavior (MIN price)
         if products:
-            prices = [p["price"] for p in products if p.get("price") and p["price"] > 0]
-            if prices:
-                available_products = [p for p in products if p.get("available")]
+            min_price = products.min_price()
+            if min_price:
                 return {
-                    "price": min(prices),
-                    "available": len(available_products) > 0,
+                    "price": min_price,
+                    "available": products.any_available(),
                     "count": len(products),
                     "match_score": 0,
                     "matched_products": 0,
@@ -516,23 +532,23 @@ def parse_citilink_json(json_path: str, filter_specs: bool = True) -> Optional[D
     return None
 
 
-def parse_ozon_json(json_path: str, filter_specs: bool = True) -> Optional[Dict]:
+def parse_ozon_json(json_path: Union[str, Dict], filter_specs: bool = True, target: Optional[TargetSpecs] = None) -> Optional[Dict]:
     """
     Парсинг Ozon JSON с фильтрацией по характеристикам
 
     Args:
-        json_path: Path to JSON file
+        json_path: Path to JSON file or catalog dict
         filter_specs: Enable specs filtering (default: True)
+        target: Target specs (default: TARGET_SPECS)
     """
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_catalog(json_path)
 
-        products = data.get("products", [])
+        products = ListingBatch.from_products(data.get("products", []), "ozon")
 
         if products and filter_specs:
             # Apply specs filtering
-            filtered = filter_and_rank(products, TARGET_SPECS, threshold=70, top_n=3)
+            filtered = filter_and_rank(products, target or TARGET_SPECS, threshold=70, top_n=3)
 
             if filtered:
                 best_product, best_score = filtered[0]
@@ -548,10 +564,10 @@ def parse_ozon_json(json_path: str, filter_specs: bool = True) -> Optional[Dict]
 
         # Fallback to legacy behavior (MIN price) - no products passed threshold
         if products:
-            prices = [p["price"] for p in products if p.get("price")]
-            if prices:
+            min_price = products.min_price()
+            if min_price:
                 return {
-                    "price": min(prices),
+                    "price": min_price,
                     "available": True,
                     "count": len(products),
                     "match_score": 0,
@@ -567,411 +583,392 @@ def parse_ozon_json(json_path: str, filter_specs: bool = True) -> Optional[Dict]
 
 # === Тестовые методы ===
 
-def test_playwright_direct(store: StoreConfig, query: str) -> TestResult:
-    """Тест через Playwright (прямой)"""
-    start_time = time.time()
-    result = TestResult(store=store.name, method="playwright_direct", status="ERROR")
+def build_store_url(store: StoreConfig, query: str) -> str:
+    """
+    Сформировать URL поиска/товара для магазина.
 
-    # Формируем URL
+    Пустой запрос (TEST_ARTICLE = "") в поиске заменяется на DEFAULT_QUERY.
+    """
     q = query.lower() if store.lowercase else query
     if store.url_type == "product":
-        url = store.search_url.format(query=q)
+        return store.search_url.format(query=q)
+    return store.search_url.format(query=quote_plus(query or DEFAULT_QUERY))
+
+
+@contextmanager
+def browser_session(stealth: bool = False) -> Iterator[Page]:
+    """
+    Один браузер, контекст и страница на всю сессию магазина.
+
+    Батч переиспользует страницу между товарами: cookies, кэш и
+    пройденные проверки сайта сохраняются.
+    """
+    args = ["--no-sandbox", "--disable-setuid-sandbox"]
+    if stealth:
+        args.append("--disable-blink-features=AutomationControlled")
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=args)
+
+        context = browser.new_context(
+            viewport={"width": 1920, "height": 1080},
+            user_agent=random.choice(USER_AGENTS),
+            locale="ru-RU",
+            timezone_id="Europe/Moscow",
+        )
+
+        if stealth:
+            # Stealth patches (init-скрипт на весь контекст)
+            apply_stealth_context(context)
+
+        page = context.new_page()
+
+        try:
+            yield page
+        finally:
+            context.close()
+            browser.close()
+
+
+def add_name_match(result: TestResult, product_name: str, target: TargetSpecs):
+    """Specs по названию товара для фильтрации (одиночная страница)"""
+    if product_name:
+        specs = extract_specs_from_name(product_name)
+        # Calculate match score
+        from specs_filter import ProductSpecs, calculate_match_score
+        product_specs = ProductSpecs(**specs)
+        match_score = calculate_match_score(product_specs, target)
+
+        result.details["product_name"] = product_name
+        result.details["match_score"] = match_score
+        result.details["specs"] = specs
+        # Set matched/total for display
+        result.details["matched_products"] = 1 if match_score >= 80 else 0
+        result.details["total_products"] = 1
+
+
+def html_items(html: str, store: StoreConfig, bounds: Bounds) -> List[PageItem]:
+    """Разбор page.content() - если JS-экстрактор магазина ничего не нашёл"""
+    if store.parser == "nextjs":
+        parsed = parse_citilink_nextjs(html)
+    elif store.parser == "yandex_market":
+        return parse_yandex_market_html(html, bounds)
     else:
-        url = store.search_url.format(query=quote_plus(query))
+        price = extract_price(html, bounds)
+        parsed = {"price": price, "available": extract_availability(html), "name": extract_product_name(html)}
 
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--no-sandbox", "--disable-setuid-sandbox"]
-            )
+    if not parsed or not parsed["price"]:
+        return []
+    return [PageItem(parsed["name"], parsed["price"], parsed["available"])]
 
-            context = browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent=random.choice(USER_AGENTS),
-                locale="ru-RU",
-                timezone_id="Europe/Moscow",
-            )
 
-            page = context.new_page()
+def parse_yandex_market_html(html: str, bounds: Bounds) -> List[PageItem]:
+    """Yandex Market: цены из JSON и сниппетов в HTML"""
+    # Формат "price":{"value":"287891"}
+    for match in re.findall(r'"price":\s*\{\s*"value"\s*:\s*"?(\d+)"?', html):
+        if int(match) in bounds:
+            return [PageItem("", int(match), True)]
 
-            response = page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT)
-            result.details["http_status"] = response.status
+    # data-auto="snippet-price-current": текстовые цены вида "287 891"
+    for match in re.findall(r'snippet-price-current[^>]*>.*?(\d[\d\s\u00a0\u2006]+\d)', html):
+        clean = re.sub(r'[\s\u00a0\u2006]', '', match)
+        if clean.isdigit() and int(clean) in bounds:
+            return [PageItem("", int(clean), True)]
 
-            if response.status != 200:
-                result.status = "FAIL"
-                result.error = f"HTTP {response.status}"
-                return result
+    return []
 
-            random_delay(2, 3)
-            html = page.content()
 
-            # Проверка CAPTCHA
-            if "captcha" in html.lower():
-                result.status = "FAIL"
-                result.error = "CAPTCHA detected"
-                return result
-
-            # Извлечение данных
-            result.price = extract_price(html)
-            result.available = extract_availability(html)
-
-            # Извлечение названия и specs для фильтрации
-            product_name = extract_product_name(html)
-            if product_name:
-                specs = extract_specs_from_name(product_name)
-                # Calculate match score
-                from specs_filter import ProductSpecs, calculate_match_score
-                product_specs = ProductSpecs(**specs)
-                match_score = calculate_match_score(product_specs, TARGET_SPECS)
-
-                result.details["product_name"] = product_name
-                result.details["match_score"] = match_score
-                result.details["specs"] = specs
-                # Set matched/total for display
-                result.details["matched_products"] = 1 if match_score >= 80 else 0
-                result.details["total_products"] = 1
-
-            if result.price:
-                result.status = "PASS"
-            else:
-                result.status = "FAIL"
-                result.error = "No price found"
+def apply_extraction(result: TestResult, extraction: Extraction, target: TargetSpecs, cheapest: bool = False):
+    """Цена, наличие и specs из результата page_extractors + объём/время извлечения"""
+    result.details.update(extraction.details())
+    item = extraction.cheapest if cheapest else extraction.best
+    if item:
+        result.price = item.price
+        result.available = item.available if item.available is not None else extraction.signals.availability
+    add_name_match(result, extraction.name or (item.name if item else ""), target)
 
-            context.close()
-            browser.close()
 
-    except Exception as e:
-        result.status = "ERROR"
-        result.error = f"{type(e).__name__}: {str(e)[:50]}"
+def scrape_direct_page(page: Page, store: StoreConfig, query: str, target: TargetSpecs, result: TestResult):
+    """Парсинг одной страницы (Playwright Direct)"""
+    url = build_store_url(store, query)
 
-    result.response_time = time.time() - start_time
-    return result
+    response = page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT)
+    result.details["http_status"] = response.status
 
+    if response.status != 200:
+        result.status = "FAIL"
+        result.error = f"HTTP {response.status}"
+        return
 
-def test_playwright_stealth(store: StoreConfig, query: str) -> TestResult:
-    """Тест через Playwright Stealth"""
-    start_time = time.time()
-    result = TestResult(store=store.name, method="playwright_stealth", status="ERROR")
+    random_delay(2, 3)
+    bounds = expected_price(query, target)
+    extraction = extract_page(page, store.name, bounds, fallback=lambda html: html_items(html, store, bounds))
 
-    # Формируем URL
-    q = query.lower() if store.lowercase else query
-    if store.url_type == "product":
-        url = store.search_url.format(query=q)
+    # Проверка CAPTCHA
+    if extraction.signals.has("captcha"):
+        result.status = "FAIL"
+        result.error = "CAPTCHA detected"
+        return
+
+    # Извлечение данных
+    apply_extraction(result, extraction, target)
+
+    if result.price:
+        result.status = "PASS"
     else:
-        url = store.search_url.format(query=quote_plus(query))
+        result.status = "FAIL"
+        result.error = "No price found"
 
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=[
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-blink-features=AutomationControlled",
-                ]
-            )
-
-            context = browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent=random.choice(USER_AGENTS),
-                locale="ru-RU",
-                timezone_id="Europe/Moscow",
-            )
-
-            page = context.new_page()
-
-            # Stealth patches
-            stealth = Stealth(
-                navigator_languages_override=("ru-RU", "ru"),
-                navigator_platform_override="Win32",
-            )
-            stealth.apply_stealth_sync(page)
-
-            # Delay если нужно
-            if store.delay > 0:
-                time.sleep(store.delay)
-
-            response = page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT)
-            result.details["http_status"] = response.status
-
-            if response.status == 429:
-                result.status = "FAIL"
-                result.error = "Rate limited (429)"
-                return result
 
-            if response.status != 200:
-                result.status = "FAIL"
-                result.error = f"HTTP {response.status}"
-                return result
+def scrape_stealth_page(page: Page, store: StoreConfig, query: str, target: TargetSpecs, result: TestResult):
+    """Парсинг одной страницы (Playwright Stealth)"""
+    url = build_store_url(store, query)
 
-            random_delay(2, 4)
-            human_scroll(page)
-            random_delay(1, 2)
-
-            html = page.content()
-
-            # Проверка CAPTCHA (исключаем Avito - там слово captcha в коде)
-            if store.name != "avito":
-                if "captcha" in html.lower() or "showcaptcha" in page.url.lower():
-                    result.status = "FAIL"
-                    result.error = "CAPTCHA detected"
-                    return result
-
-            # Парсинг в зависимости от типа
-            if store.parser == "nextjs":
-                parsed = parse_citilink_nextjs(html)
-                if parsed:
-                    result.price = parsed["price"]
-                    result.available = parsed["available"]
-            elif store.parser == "avito":
-                parsed = parse_avito(html)
-                if parsed:
-                    result.price = parsed["price"]
-                    result.available = parsed["available"]
-                    result.details["count"] = parsed.get("count", 0)
-            else:
-                result.price = extract_price(html)
-                result.available = extract_availability(html)
-
-                # Извлечение названия и specs для фильтрации
-                product_name = extract_product_name(html)
-                if product_name:
-                    specs = extract_specs_from_name(product_name)
-                    # Calculate match score
-                    from specs_filter import ProductSpecs, calculate_match_score
-                    product_specs = ProductSpecs(**specs)
-                    match_score = calculate_match_score(product_specs, TARGET_SPECS)
-
-                    result.details["product_name"] = product_name
-                    result.details["match_score"] = match_score
-                    result.details["specs"] = specs
-                    # Set matched/total for display
-                    result.details["matched_products"] = 1 if match_score >= 80 else 0
-                    result.details["total_products"] = 1
-
-            if result.price:
-                result.status = "PASS"
-            else:
-                result.status = "FAIL"
-                result.error = "No price found"
+    # Delay если нужно
+    if store.delay > 0:
+        time.sleep(store.delay)
 
-            context.close()
-            browser.close()
+    response = page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT)
+    result.details["http_status"] = response.status
 
-    except Exception as e:
-        result.status = "ERROR"
-        result.error = f"{type(e).__name__}: {str(e)[:50]}"
+    if response.status == 429:
+        result.status = "FAIL"
+        result.error = "Rate limited (429)"
+        return
 
-    result.response_time = time.time() - start_time
-    return result
+    if response.status != 200:
+        result.status = "FAIL"
+        result.error = f"HTTP {response.status}"
+        return
 
+    random_delay(2, 4)
+    human_scroll(page)
+    random_delay(1, 2)
 
-def test_citilink_special(store: StoreConfig, query: str) -> TestResult:
-    """Специальный тест для Citilink с увеличенной задержкой и retry при 429"""
-    start_time = time.time()
-    result = TestResult(store=store.name, method="citilink_special", status="ERROR")
+    # Avito: разбор по HTML (широкий диапазон б/у цен), слово captcha есть в коде
+    if store.parser == "avito":
+        parsed = parse_avito(page.content(), expected_price(query, target))
+        if parsed:
+            result.price = parsed["price"]
+            result.available = parsed["available"]
+            result.details["count"] = parsed.get("count", 0)
+    else:
+        bounds = expected_price(query, target)
+        extractor = "citilink" if store.parser == "nextjs" else store.name
+        extraction = extract_page(page, extractor, bounds, fallback=lambda html: html_items(html, store, bounds))
 
-    url = store.search_url  # URL уже полный, без подстановки
-    max_retries = 3
-    retry_delay = 90  # секунд между попытками при 429 (было 30, увеличено до 90)
+        # Проверка CAPTCHA
+        if extraction.signals.has("captcha") or "showcaptcha" in page.url.lower():
+            result.status = "FAIL"
+            result.error = "CAPTCHA detected"
+            return
 
-    for attempt in range(max_retries):
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=[
-                        "--no-sandbox",
-                        "--disable-setuid-sandbox",
-                        "--disable-blink-features=AutomationControlled",
-                    ]
-                )
+        apply_extraction(result, extraction, target)
 
-                context = browser.new_context(
-                    viewport={"width": 1920, "height": 1080},
-                    user_agent=random.choice(USER_AGENTS),
-                    locale="ru-RU",
-                    timezone_id="Europe/Moscow",
-                )
+    if result.price:
+        result.status = "PASS"
+    else:
+        result.status = "FAIL"
+        result.error = "No price found"
 
-                page = context.new_page()
 
-                # Stealth patches
-                stealth = Stealth(
-                    navigator_languages_override=("ru-RU", "ru"),
-                    navigator_platform_override="Win32",
-                )
-                stealth.apply_stealth_sync(page)
-
-                # Начальная задержка перед запросом (увеличивается с каждой попыткой)
-                initial_delay = 10 + (attempt * 10)  # было 3 + (attempt * 5), увеличено
-                random_delay(initial_delay, initial_delay + 5)
-
-                response = page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                result.details["http_status"] = response.status
-                result.details["attempt"] = attempt + 1
-
-                if response.status == 429:
-                    context.close()
-                    browser.close()
-                    if attempt < max_retries - 1:
-                        print(f"    [!] 429 Rate Limited, waiting {retry_delay}s before retry...")
-                        time.sleep(retry_delay)
-                        retry_delay += 60  # Увеличиваем задержку с каждой попыткой (было 15, теперь 60)
-                        continue
-                    else:
-                        result.status = "FAIL"
-                        result.error = f"Rate limited (429) after {max_retries} attempts"
-                        return result
-
-                if response.status != 200:
-                    result.status = "FAIL"
-                    result.error = f"HTTP {response.status}"
-                    context.close()
-                    browser.close()
-                    return result
-
-                # Увеличенная задержка для загрузки контента
-                random_delay(5, 8)
-
-                # Прокрутка для загрузки lazy content
-                human_scroll(page)
-                random_delay(2, 3)
-
-                # Ожидание карточек товаров
-                try:
-                    page.wait_for_selector('[data-meta-price]', timeout=15000)
-                except Exception:
-                    pass  # Продолжаем даже если не нашли
-
-                html = page.content()
-
-                # Проверка CAPTCHA (только реальные блокировки, не упоминания в скриптах)
-                if "showcaptcha" in page.url.lower() or "challenge-platform" in html.lower():
-                    result.status = "FAIL"
-                    result.error = "CAPTCHA detected"
-                    context.close()
-                    browser.close()
-                    return result
-
-                # Извлечение цен через JavaScript
-                try:
-                    prices = page.evaluate("""
-                        () => {
-                            const items = [];
-                            document.querySelectorAll('[data-meta-price]').forEach(el => {
-                                const price = parseInt(el.getAttribute('data-meta-price'));
-                                if (price > 80000 && price < 400000) {
-                                    items.push(price);
-                                }
-                            });
-                            return items;
-                        }
-                    """)
-
-                    if prices:
-                        result.price = min(prices)
-                        result.available = True
-                        result.details["prices_found"] = len(prices)
-                        result.details["price_range"] = f"{min(prices):,} - {max(prices):,}"
-                except Exception:
-                    pass
-
-                # Fallback: regex
-                if not result.price:
-                    for match in re.findall(r'data-meta-price="(\d+)"', html):
-                        p = int(match)
-                        if 80000 < p < 400000:
-                            result.price = p
-                            result.available = True
-                            break
-
-                if result.price:
-                    result.status = "PASS"
-                else:
-                    result.status = "FAIL"
-                    result.error = "No price found"
-
-                context.close()
-                browser.close()
-                break  # Успешная попытка - выходим из цикла
+def scrape_yandex_market_page(page: Page, store: StoreConfig, query: str, target: TargetSpecs, result: TestResult):
+    """Парсинг одной страницы Yandex Market"""
+    url = build_store_url(store, query)
+    bounds = expected_price(query, target)
 
-        except Exception as e:
-            result.status = "ERROR"
-            result.error = f"{type(e).__name__}: {str(e)[:50]}"
+    # Начальная задержка
+    random_delay(3, 5)
+
+    # Ответы resolve API ловятся с первого запроса страницы
+    with ResponseCapture(page, "yandex_market", bounds) as capture:
+        response = page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        result.details["http_status"] = response.status
+
+        if response.status != 200:
+            result.status = "FAIL"
+            result.error = f"HTTP {response.status}"
+            return
+
+        # Товары пришли из API - без ожидания отрисовки и скролла
+        if capture.wait(API_TIMEOUT / 4):
+            result.details.update(capture.details())
+            apply_catalog_result(store, capture.catalog(), target, result, API_CATALOGS[store.name])
+            if result.passed:
+                return
+
+    # Ожидание загрузки контента
+    random_delay(5, 8)
+
+    # Скролл для lazy loading
+    human_scroll(page)
+    random_delay(2, 3)
+
+    # Проверка CAPTCHA
+    if "showcaptcha" in page.url.lower() or "captcha" in page.url.lower():
+        result.status = "FAIL"
+        result.error = "CAPTCHA detected"
+        return
+
+    # Извлечение цен в браузере (page.content() - только fallback)
+    extraction = extract_page(page, "yandex_market", bounds,
+                              fallback=lambda html: html_items(html, store, bounds))
+    apply_extraction(result, extraction, target, cheapest=True)
+
+    if extraction.items:
+        prices = [item.price for item in extraction.items]
+        result.details["prices_found"] = len(prices)
+        result.details["price_range"] = f"{min(prices):,} - {max(prices):,}"
+
+    if result.price:
+        result.status = "PASS"
+    else:
+        result.status = "FAIL"
+        result.error = "No price found"
+
+
+def scrape_citilink_page(page: Page, store: StoreConfig, query: str, target: TargetSpecs, result: TestResult):
+    """Парсинг одной страницы Citilink: увеличенные задержки и retry при 429 на той же странице"""
+    url = build_store_url(store, query)
+    max_retries = 3
+    retry_delay = 90  # секунд между попытками при 429 (было 30, увеличено до 90)
+
+    for attempt in range(max_retries):
+        # Начальная задержка перед запросом (увеличивается с каждой попыткой)
+        initial_delay = 10 + (attempt * 10)  # было 3 + (attempt * 5), увеличено
+        random_delay(initial_delay, initial_delay + 5)
+
+        try:
+            response = page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        except Exception:
             if attempt < max_retries - 1:
                 time.sleep(10)
                 continue
-            break
+            raise
 
-    result.response_time = time.time() - start_time
-    return result
+        result.details["http_status"] = response.status
+        result.details["attempt"] = attempt + 1
 
+        if response.status != 429:
+            break
 
-def test_ozon_firefox(store: StoreConfig, query: str) -> TestResult:
-    """Тест через Firefox + xdotool (Ozon)"""
-    start_time = time.time()
-    result = TestResult(store=store.name, method="ozon_firefox", status="ERROR")
+        if attempt < max_retries - 1:
+            # stdout занят JSON в режиме --json
+            print(f"    [!] 429 Rate Limited, waiting {retry_delay}s before retry...", file=sys.stderr)
+            time.sleep(retry_delay)
+            retry_delay += 60  # Увеличиваем задержку с каждой попыткой (было 15, теперь 60)
+        else:
+            result.status = "FAIL"
+            result.error = f"Rate limited (429) after {max_retries} attempts"
+            return
 
-    script_path = Path(__file__).parent / "ozon_scraper.sh"
-    output_dir = Path("/tmp/ozon_scraper_test")
+    if response.status != 200:
+        result.status = "FAIL"
+        result.error = f"HTTP {response.status}"
+        return
 
-    if not script_path.exists():
-        result.status = "SKIP"
-        result.error = "ozon_scraper.sh not found"
-        return result
+    # Увеличенная задержка для загрузки контента
+    random_delay(5, 8)
+
+    # Прокрутка для загрузки lazy content
+    human_scroll(page)
+    random_delay(2, 3)
 
+    # Ожидание карточек товаров
     try:
-        output_dir.mkdir(parents=True, exist_ok=True)
+        page.wait_for_selector('[data-meta-price]', timeout=15000)
+    except Exception:
+        pass  # Продолжаем даже если не нашли
+
+    # Извлечение в браузере (page.content() - только fallback)
+    bounds = expected_price(query, target)
+    extraction = extract_page(page, "citilink", bounds, extra=("challenge-platform",),
+                              fallback=lambda html: html_items(html, store, bounds))
+    result.details.update(extraction.details())
+
+    # Проверка CAPTCHA (только реальные блокировки, не упоминания в скриптах)
+    if "showcaptcha" in page.url.lower() or extraction.signals.has("challenge-platform"):
+        result.status = "FAIL"
+        result.error = "CAPTCHA detected"
+        return
 
-        import os
-        env = os.environ.copy()
-        env.pop("DISPLAY", None)
-        env.pop("XVFB_RUNNING", None)
+    cheapest = extraction.cheapest
+    if cheapest:
+        prices = [item.price for item in extraction.items]
+        result.price = cheapest.price
+        result.available = cheapest.available if cheapest.available is not None else True
+        result.details["prices_found"] = len(prices)
+        result.details["price_range"] = f"{min(prices):,} - {max(prices):,}"
 
-        proc = subprocess.run(
-            ["bash", str(script_path), "macbook-pro-16", str(output_dir)],
-            capture_output=True,
-            text=True,
-            timeout=FIREFOX_TIMEOUT,
-            env=env
-        )
+    if result.price:
+        result.status = "PASS"
+    else:
+        result.status = "FAIL"
+        result.error = "No price found"
 
-        result.details["returncode"] = proc.returncode
 
-        if proc.returncode != 0:
-            if "Saved:" in proc.stdout or "JSON:" in proc.stdout:
-                pass
-            else:
-                result.status = "FAIL"
-                result.error = f"Script failed: {proc.stderr[:100] if proc.stderr else proc.stdout[:100]}"
-                return result
+# Внутренние JSON API: каталог из ResponseCapture разбирается как JSON Firefox-скриптов
+API_CATALOGS = {
+    "ozon": parse_ozon_json,
+    "citilink": parse_citilink_json,
+    "yandex_market": parse_ozon_json,  # тот же fallback: минимальная цена, в наличии
+}
 
-        json_files = list(output_dir.glob("*.json"))
-        if not json_files:
-            result.status = "FAIL"
-            result.error = "No JSON output"
-            return result
 
-        latest = max(json_files, key=lambda x: x.stat().st_mtime)
-        parsed = parse_ozon_json(str(latest))
+def scrape_api_page(page: Page, store: StoreConfig, query: str, target: TargetSpecs, result: TestResult):
+    """Парсинг по ответам внутреннего API магазина (без ожидания отрисовки и скролла)"""
+    url = build_store_url(store, query)
+    bounds = expected_price(query, target)
 
-        if parsed and parsed.get("price"):
-            result.price = parsed["price"]
-            result.available = parsed.get("available")
-            result.details["products_count"] = parsed.get("count", 0)
-            result.details["match_score"] = parsed.get("match_score", 0)
-            result.details["matched_products"] = parsed.get("matched_products", 0)
-            result.details["total_products"] = parsed.get("total_products", 0)
-            result.status = "PASS"
-        else:
+    with ResponseCapture(page, store.name, bounds) as capture:
+        response = page.goto(url, wait_until="commit", timeout=PAGE_TIMEOUT)
+        result.details["http_status"] = response.status
+
+        if response.status == 429:
             result.status = "FAIL"
-            result.error = "Failed to parse JSON"
+            result.error = "Rate limited (429)"
+            return
 
-    except subprocess.TimeoutExpired:
+        if response.status != 200:
+            result.status = "FAIL"
+            result.error = f"HTTP {response.status}"
+            return
+
+        found = capture.wait(API_TIMEOUT)
+        result.details.update(capture.details())
+
+    if "showcaptcha" in page.url.lower():
         result.status = "FAIL"
-        result.error = f"Timeout ({FIREFOX_TIMEOUT}s)"
+        result.error = "CAPTCHA detected"
+        return
+
+    if not found:
+        result.status = "FAIL"
+        result.error = f"No API products ({capture.responses} responses)"
+        return
+
+    apply_catalog_result(store, capture.catalog(), target, result, API_CATALOGS[store.name])
+
+
+# Методы, которые можно выполнить на одной открытой странице: (функция, stealth)
+PAGE_SCRAPERS = {
+    "playwright_direct": (scrape_direct_page, False),
+    "playwright_stealth": (scrape_stealth_page, True),
+    "yandex_market_special": (scrape_yandex_market_page, True),
+    "citilink_special": (scrape_citilink_page, True),
+    "api_capture": (scrape_api_page, True),
+}
+
+
+def run_page_test(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
+    """Тест одного товара в отдельной браузерной сессии"""
+    scrape_page, stealth = PAGE_SCRAPERS[store.method]
+    start_time = time.time()
+    result = TestResult(store=store.name, method=store.method, status="ERROR")
+
+    try:
+        with browser_session(stealth=stealth) as page:
+            scrape_page(page, store, query, target or TARGET_SPECS, result)
     except Exception as e:
         result.status = "ERROR"
         result.error = f"{type(e).__name__}: {str(e)[:50]}"
@@ -980,96 +977,64 @@ def test_ozon_firefox(store: StoreConfig, query: str) -> TestResult:
     return result
 
 
-def test_avito_firefox(store: StoreConfig, query: str) -> TestResult:
-    """Тест через Firefox + xdotool (Avito)"""
-    start_time = time.time()
-    result = TestResult(store=store.name, method="avito_firefox", status="ERROR")
+def test_playwright_direct(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
+    """Тест через Playwright (прямой)"""
+    return run_page_test(store, query, target)
 
-    script_path = Path(__file__).parent / "avito_scraper.sh"
-    output_dir = Path("/tmp/avito_scraper_test")
 
-    if not script_path.exists():
-        result.status = "SKIP"
-        result.error = "avito_scraper.sh not found"
-        return result
+def test_playwright_stealth(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
+    """Тест через Playwright Stealth"""
+    return run_page_test(store, query, target)
 
-    try:
-        # Создаём директорию
-        output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Получаем текущее окружение и модифицируем
-        import os
-        env = os.environ.copy()
-        # Удаляем DISPLAY чтобы скрипт сам запустил xvfb-run
-        env.pop("DISPLAY", None)
-        env.pop("XVFB_RUNNING", None)
+def test_yandex_market_special(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
+    """Специальный тест для Yandex Market"""
+    return run_page_test(store, query, target)
 
-        # Запускаем скрипт
-        proc = subprocess.run(
-            ["bash", str(script_path), "macbook-pro-16", str(output_dir)],
-            capture_output=True,
-            text=True,
-            timeout=FIREFOX_TIMEOUT,
-            env=env
-        )
 
-        result.details["returncode"] = proc.returncode
+def test_api_capture(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
+    """Тест через перехват ответов внутреннего API"""
+    return run_page_test(store, query, target)
 
-        if proc.returncode != 0:
-            # Проверяем есть ли частичный вывод
-            if "Сохранено:" in proc.stdout or "JSON:" in proc.stdout:
-                pass  # Продолжаем парсить
-            else:
-                result.status = "FAIL"
-                result.error = f"Script failed: {proc.stderr[:100] if proc.stderr else proc.stdout[:100]}"
-                return result
 
-        # Ищем JSON файл
-        json_files = list(output_dir.glob("*.json"))
-        if not json_files:
-            result.status = "FAIL"
-            result.error = "No JSON output"
-            return result
+def test_citilink_special(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
+    """Специальный тест для Citilink с увеличенной задержкой и retry при 429"""
+    return run_page_test(store, query, target)
 
-        # Парсим последний файл
-        latest = max(json_files, key=lambda x: x.stat().st_mtime)
-        parsed = parse_avito_json(str(latest))
 
-        if parsed and parsed.get("price"):
-            result.price = parsed["price"]
-            result.available = parsed.get("available")
-            result.details["products_count"] = parsed.get("count", 0)
-            result.details["match_score"] = parsed.get("match_score", 0)
-            result.details["matched_products"] = parsed.get("matched_products", 0)
-            result.details["total_products"] = parsed.get("total_products", 0)
-            result.status = "PASS"
-        else:
-            result.status = "FAIL"
-            result.error = "Failed to parse JSON"
+# Firefox + xdotool скрипты: (скрипт, каталог для запроса по умолчанию, директория вывода, парсер JSON)
+# Каталог - готовая подборка скрипта; для --query скрипт получает URL поиска магазина
+FIREFOX_CATALOGS = {
+    "firefox": ("dns_scraper.sh", "macbook-pro", "/tmp/dns_scraper_test", parse_dns_json),
+    "ozon_firefox": ("ozon_scraper.sh", "macbook-pro-16", "/tmp/ozon_scraper_test", parse_ozon_json),
+    "avito_firefox": ("avito_scraper.sh", "macbook-pro-16", "/tmp/avito_scraper_test", parse_avito_json),
+    "citilink_firefox": ("citilink_scraper.sh", "macbook-pro", "/tmp/citilink_scraper_test", parse_citilink_json),
+}
 
-    except subprocess.TimeoutExpired:
-        result.status = "FAIL"
-        result.error = f"Timeout ({FIREFOX_TIMEOUT}s)"
-    except Exception as e:
-        result.status = "ERROR"
-        result.error = f"{type(e).__name__}: {str(e)[:50]}"
 
-    result.response_time = time.time() - start_time
-    return result
+def firefox_target(store: StoreConfig, query: str) -> str:
+    """Аргумент Firefox-скрипта: ключ каталога для запроса по умолчанию, иначе URL поиска"""
+    if not query:
+        return FIREFOX_CATALOGS[store.method][1]
+    return build_store_url(store, query)
 
 
-def test_citilink_firefox(store: StoreConfig, query: str) -> TestResult:
-    """Тест через Firefox + xdotool (Citilink)"""
-    start_time = time.time()
-    result = TestResult(store=store.name, method="citilink_firefox", status="ERROR")
+def fetch_firefox_catalog(store: StoreConfig, result: TestResult, query: str = "") -> Optional[Path]:
+    """
+    Запуск Firefox + xdotool скрипта магазина.
 
-    script_path = Path(__file__).parent / "citilink_scraper.sh"
-    output_dir = Path("/tmp/citilink_scraper_test")
+    Returns:
+        Path к JSON каталога или None (статус и ошибка записаны в result)
+    """
+    script_name, _, output_dir, _ = FIREFOX_CATALOGS[store.method]
+    catalog = firefox_target(store, query)
+    script_path = Path(__file__).parent / script_name
+    output_dir = Path(output_dir)
 
     if not script_path.exists():
         result.status = "SKIP"
-        result.error = "citilink_scraper.sh not found"
-        return result
+        result.error = f"{script_name} not found"
+        return None
 
     try:
         # Создаём директорию
@@ -1082,9 +1047,10 @@ def test_citilink_firefox(store: StoreConfig, query: str) -> TestResult:
         env.pop("DISPLAY", None)
         env.pop("XVFB_RUNNING", None)
 
-        # Запускаем скрипт
+        # Запускаем скрипт - он сам запустит xvfb-run
+        started = time.time()
         proc = subprocess.run(
-            ["bash", str(script_path), "macbook-pro", str(output_dir)],
+            ["bash", str(script_path), catalog, str(output_dir)],
             capture_output=True,
             text=True,
             timeout=FIREFOX_TIMEOUT,
@@ -1095,35 +1061,22 @@ def test_citilink_firefox(store: StoreConfig, query: str) -> TestResult:
 
         if proc.returncode != 0:
             # Проверяем есть ли частичный вывод
-            if "Сохранено:" in proc.stdout or "JSON:" in proc.stdout:
+            if any(marker in proc.stdout for marker in ("Сохранено:", "Saved:", "JSON:")):
                 pass  # Продолжаем парсить
             else:
                 result.status = "FAIL"
                 result.error = f"Script failed: {proc.stderr[:100] if proc.stderr else proc.stdout[:100]}"
-                return result
+                return None
 
-        # Ищем JSON файл
-        json_files = list(output_dir.glob("*.json"))
+        # Ищем JSON файл этого запуска (старые файлы - от других запросов)
+        json_files = [f for f in output_dir.glob("*.json") if f.stat().st_mtime >= started - 1]
         if not json_files:
             result.status = "FAIL"
             result.error = "No JSON output"
-            return result
+            return None
 
-        # Парсим последний файл
-        latest = max(json_files, key=lambda x: x.stat().st_mtime)
-        parsed = parse_citilink_json(str(latest))
-
-        if parsed and parsed.get("price"):
-            result.price = parsed["price"]
-            result.available = parsed.get("available")
-            result.details["products_count"] = parsed.get("count", 0)
-            result.details["match_score"] = parsed.get("match_score", 0)
-            result.details["matched_products"] = parsed.get("matched_products", 0)
-            result.details["total_products"] = parsed.get("total_products", 0)
-            result.status = "PASS"
-        else:
-            result.status = "FAIL"
-            result.error = "Failed to parse JSON"
+        # Последний файл
+        return max(json_files, key=lambda x: x.stat().st_mtime)
 
     except subprocess.TimeoutExpired:
         result.status = "FAIL"
@@ -1132,257 +1085,226 @@ def test_citilink_firefox(store: StoreConfig, query: str) -> TestResult:
         result.status = "ERROR"
         result.error = f"{type(e).__name__}: {str(e)[:50]}"
 
-    result.response_time = time.time() - start_time
-    return result
+    return None
 
 
-def test_yandex_market_special(store: StoreConfig, query: str) -> TestResult:
-    """Специальный тест для Yandex Market"""
-    start_time = time.time()
-    result = TestResult(store=store.name, method="yandex_market_special", status="ERROR")
-
-    url = store.search_url
+def apply_catalog_result(
+    store: StoreConfig,
+    catalog: Union[Path, Dict],
+    target: TargetSpecs,
+    result: TestResult,
+    parse_json: Optional[Callable[..., Optional[Dict]]] = None,
+):
+    """Фильтрация каталога (JSON-файл или dict из ResponseCapture) по target specs"""
+    parse_json = parse_json or FIREFOX_CATALOGS[store.method][3]
 
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=[
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-blink-features=AutomationControlled",
-                ]
-            )
-
-            context = browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent=random.choice(USER_AGENTS),
-                locale="ru-RU",
-                timezone_id="Europe/Moscow",
-            )
-
-            page = context.new_page()
-
-            # Stealth patches
-            stealth = Stealth(
-                navigator_languages_override=("ru-RU", "ru"),
-                navigator_platform_override="Win32",
-            )
-            stealth.apply_stealth_sync(page)
-
-            # Начальная задержка
-            random_delay(3, 5)
+        parsed = parse_json(catalog if isinstance(catalog, dict) else str(catalog), target=target)
+    except Exception as e:
+        result.status = "ERROR"
+        result.error = f"{type(e).__name__}: {str(e)[:50]}"
+        return
 
-            response = page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            result.details["http_status"] = response.status
+    if parsed and parsed.get("price"):
+        result.price = parsed["price"]
+        result.available = parsed.get("available")
+        result.details["products_count"] = parsed.get("count", 0)
+        result.details["match_score"] = parsed.get("match_score", 0)
+        result.details["matched_products"] = parsed.get("matched_products", 0)
+        result.details["total_products"] = parsed.get("total_products", 0)
+        result.status = "PASS"
+    else:
+        result.status = "FAIL"
+        result.error = "Failed to parse JSON"
 
-            if response.status != 200:
-                result.status = "FAIL"
-                result.error = f"HTTP {response.status}"
-                return result
 
-            # Ожидание загрузки контента
-            random_delay(5, 8)
+def run_firefox_test(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
+    """Тест через Firefox + xdotool (каталог магазина)"""
+    start_time = time.time()
+    result = TestResult(store=store.name, method=store.method, status="ERROR")
 
-            # Скролл для lazy loading
-            human_scroll(page)
-            random_delay(2, 3)
+    json_path = fetch_firefox_catalog(store, result, query)
+    if json_path:
+        apply_catalog_result(store, json_path, target or TARGET_SPECS, result)
 
-            # Проверка CAPTCHA
-            if "showcaptcha" in page.url.lower() or "captcha" in page.url.lower():
-                result.status = "FAIL"
-                result.error = "CAPTCHA detected"
-                return result
-
-            # Извлечение цен через JavaScript
-            try:
-                prices = page.evaluate("""
-                    () => {
-                        const items = [];
-                        // Попробуем разные селекторы
-                        const selectors = [
-                            '[data-baobab-name="price"]',
-                            '[data-auto="price-value"]',
-                            '[data-zone-name="price"]'
-                        ];
-
-                        for (const selector of selectors) {
-                            document.querySelectorAll(selector).forEach(el => {
-                                const text = el.textContent || '';
-                                // Удаляем все виды пробелов и получаем число
-                                const clean = text.replace(/[^0-9]/g, '');
-                                if (clean) {
-                                    const price = parseInt(clean);
-                                    if (price > 80000 && price < 500000) {
-                                        items.push(price);
-                                    }
-                                }
-                            });
-                        }
-                        return items;
-                    }
-                """)
-
-                if prices:
-                    result.price = min(prices)
-                    result.available = True
-                    result.details["prices_found"] = len(prices)
-                    result.details["price_range"] = f"{min(prices):,} - {max(prices):,}"
-            except Exception:
-                pass
-
-            # Fallback: regex
-            if not result.price:
-                html = page.content()
-                # Ищем цены в JSON - формат "price":{"value":"287891"}
-                for match in re.findall(r'"price":\s*\{\s*"value"\s*:\s*"?(\d+)"?', html):
-                    p = int(match)
-                    if 80000 < p < 500000:
-                        result.price = p
-                        result.available = True
-                        break
-
-                # Fallback 2: data-auto="snippet-price-current"
-                if not result.price:
-                    # Ищем текстовые цены вида "287 891" в span
-                    for match in re.findall(r'snippet-price-current[^>]*>.*?(\d[\d\s\u00a0\u2006]+\d)', html):
-                        clean = re.sub(r'[\s\u00a0\u2006]', '', match)
-                        if clean.isdigit():
-                            p = int(clean)
-                            if 80000 < p < 500000:
-                                result.price = p
-                                result.available = True
-                                break
-
-            # Извлечение названия и specs для Yandex Market
-            if result.price:
-                product_name = extract_product_name(html)
-                if product_name:
-                    specs = extract_specs_from_name(product_name)
-                    from specs_filter import ProductSpecs, calculate_match_score
-                    product_specs = ProductSpecs(**specs)
-                    match_score = calculate_match_score(product_specs, TARGET_SPECS)
-                    result.details["product_name"] = product_name
-                    result.details["match_score"] = match_score
-                    result.details["specs"] = specs
-                    # Set matched/total for display
-                    result.details["matched_products"] = 1 if match_score >= 80 else 0
-                    result.details["total_products"] = 1
-
-                result.status = "PASS"
-            else:
-                result.status = "FAIL"
-                result.error = "No price found"
+    result.response_time = time.time() - start_time
+    return result
 
-            context.close()
-            browser.close()
 
-    except Exception as e:
-        result.status = "ERROR"
-        result.error = f"{type(e).__name__}: {str(e)[:50]}"
+def test_ozon_firefox(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
+    """Тест через Firefox + xdotool (Ozon)"""
+    return run_firefox_test(store, query, target)
+
+
+def test_avito_firefox(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
+    """Тест через Firefox + xdotool (Avito)"""
+    return run_firefox_test(store, query, target)
 
-    result.response_time = time.time() - start_time
-    return result
+
+def test_citilink_firefox(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
+    """Тест через Firefox + xdotool (Citilink)"""
+    return run_firefox_test(store, query, target)
 
 
-def test_firefox(store: StoreConfig, query: str) -> TestResult:
+def test_firefox(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
     """Тест через Firefox + xdotool (DNS-Shop)"""
-    start_time = time.time()
-    result = TestResult(store=store.name, method="firefox", status="ERROR")
+    return run_firefox_test(store, query, target)
 
-    script_path = Path(__file__).parent / "dns_scraper.sh"
-    output_dir = Path("/tmp/dns_scraper_test")
 
-    if not script_path.exists():
-        result.status = "SKIP"
-        result.error = "dns_scraper.sh not found"
-        return result
+# === Батч: несколько товаров за одну сессию магазина ===
 
-    try:
-        # Создаём директорию
-        output_dir.mkdir(parents=True, exist_ok=True)
+@dataclass
+class BatchItem:
+    """Товар для батч-парсинга"""
+    query: str
+    target: TargetSpecs = field(default_factory=lambda: TARGET_SPECS)
 
-        # Получаем текущее окружение и модифицируем
-        import os
-        env = os.environ.copy()
-        # Удаляем DISPLAY чтобы скрипт сам запустил xvfb-run
-        env.pop("DISPLAY", None)
-        env.pop("XVFB_RUNNING", None)
 
-        # Запускаем скрипт - он сам запустит xvfb-run
-        proc = subprocess.run(
-            ["bash", str(script_path), "macbook-pro", str(output_dir)],
-            capture_output=True,
-            text=True,
-            timeout=FIREFOX_TIMEOUT,
-            env=env
-        )
+class RateLimiter:
+    """Минимальный интервал между запросами к одному магазину"""
 
-        result.details["returncode"] = proc.returncode
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._last: Optional[float] = None
 
-        if proc.returncode != 0:
-            # Проверяем есть ли частичный вывод
-            if "Сохранено:" in proc.stdout or "JSON:" in proc.stdout:
-                pass  # Продолжаем парсить
+    def wait(self):
+        if self._last is not None:
+            remaining = self.min_interval - (time.monotonic() - self._last)
+            if remaining > 0:
+                time.sleep(remaining)
+        self._last = time.monotonic()
+
+
+def run_batch(
+    store: StoreConfig,
+    items: List[BatchItem],
+    on_result: Optional[Callable[[TestResult], None]] = None,
+) -> List[TestResult]:
+    """
+    Парсинг нескольких товаров в одной сессии магазина.
+
+    - Playwright: один браузер/контекст/страница на весь батч (тёплые cookies)
+    - Firefox + xdotool: каталог скачивается один раз на URL, фильтруется под каждый товар
+    - Остальные методы: по одному запуску на товар
+
+    Rate limit магазина (store.rate_limit) действует на весь батч.
+
+    Returns:
+        Один TestResult на товар, в порядке items
+    """
+    results: List[TestResult] = []
+    batch_start = time.time()
+    limiter = RateLimiter(store.rate_limit)
+
+    def record(result: TestResult, query: str):
+        result.details["query"] = query
+        result.details["batch_size"] = len(items)
+        result.response_time = time.time() - batch_start
+        results.append(result)
+        if on_result:
+            on_result(result)
+
+    if store.method in FIREFOX_CATALOGS:
+        # Один запуск Firefox на каждый разный каталог/URL поиска
+        fetched: Dict[str, Tuple[TestResult, Optional[Path]]] = {}
+
+        for item in items:
+            key = firefox_target(store, item.query)
+            if key not in fetched:
+                limiter.wait()
+                fetch_result = TestResult(store=store.name, method=store.method, status="ERROR")
+                fetched[key] = (fetch_result, fetch_firefox_catalog(store, fetch_result, item.query))
+            fetch_result, json_path = fetched[key]
+
+            if json_path:
+                result = TestResult(store=store.name, method=store.method, status="ERROR")
+                result.details["returncode"] = fetch_result.details.get("returncode")
+                apply_catalog_result(store, json_path, item.target, result)
             else:
-                result.status = "FAIL"
-                result.error = f"Script failed: {proc.stderr[:100] if proc.stderr else proc.stdout[:100]}"
-                return result
+                result = TestResult(
+                    store=store.name,
+                    method=store.method,
+                    status=fetch_result.status,
+                    error=fetch_result.error,
+                )
+            record(result, item.query)
 
-        # Ищем JSON файл
-        json_files = list(output_dir.glob("*.json"))
-        if not json_files:
-            result.status = "FAIL"
-            result.error = "No JSON output"
-            return result
+    elif store.method in PAGE_SCRAPERS:
+        scrape_page, stealth = PAGE_SCRAPERS[store.method]
+        pending = list(items)
 
-        # Парсим последний файл
-        latest = max(json_files, key=lambda x: x.stat().st_mtime)
-        parsed = parse_dns_json(str(latest))
+        try:
+            with browser_session(stealth=stealth) as page:
+                while pending:
+                    item = pending[0]
+                    limiter.wait()
+
+                    result = TestResult(store=store.name, method=store.method, status="ERROR")
+                    try:
+                        scrape_page(page, store, item.query, item.target, result)
+                    except Exception as e:
+                        result.status = "ERROR"
+                        result.error = f"{type(e).__name__}: {str(e)[:50]}"
+
+                    pending.pop(0)
+                    record(result, item.query)
+        except Exception as e:
+            # Сессия упала - оставшиеся товары получают ERROR
+            for item in pending:
+                record(TestResult(
+                    store=store.name,
+                    method=store.method,
+                    status="ERROR",
+                    error=f"Session failed: {type(e).__name__}: {str(e)[:50]}",
+                ), item.query)
 
-        if parsed and parsed.get("price"):
-            result.price = parsed["price"]
-            result.available = parsed.get("available")
-            result.details["products_count"] = parsed.get("count", 0)
-            result.details["match_score"] = parsed.get("match_score", 0)
-            result.details["matched_products"] = parsed.get("matched_products", 0)
-            result.details["total_products"] = parsed.get("total_products", 0)
-            result.status = "PASS"
-        else:
-            result.status = "FAIL"
-            result.error = "Failed to parse JSON"
+    else:
+        for item in items:
+            limiter.wait()
+            record(run_test(store, item.query, item.target), item.query)
 
-    except subprocess.TimeoutExpired:
-        result.status = "FAIL"
-        result.error = f"Timeout ({FIREFOX_TIMEOUT}s)"
-    except Exception as e:
-        result.status = "ERROR"
-        result.error = f"{type(e).__name__}: {str(e)[:50]}"
+    return results
 
-    result.response_time = time.time() - start_time
-    return result
+
+def load_batch(path: str) -> List[BatchItem]:
+    """
+    Загрузка батча из JSON:
+        [{"query": "MacBook Pro 16", "specs": {"screen": "16", "cpu": "M1", "ram": 16, "ssd": 256}}]
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    return [
+        BatchItem(
+            query=entry.get("query", ""),
+            target=TargetSpecs(**entry["specs"]) if entry.get("specs") else TARGET_SPECS,
+        )
+        for entry in data
+    ]
 
 
 # === Основные функции ===
 
-def run_test(store: StoreConfig, query: str) -> TestResult:
+def run_test(store: StoreConfig, query: str, target: Optional[TargetSpecs] = None) -> TestResult:
     """Запуск теста для магазина"""
     if store.method == "playwright_direct":
-        return test_playwright_direct(store, query)
+        return test_playwright_direct(store, query, target)
     elif store.method == "playwright_stealth":
-        return test_playwright_stealth(store, query)
+        return test_playwright_stealth(store, query, target)
     elif store.method == "citilink_special":
-        return test_citilink_special(store, query)
+        return test_citilink_special(store, query, target)
     elif store.method == "citilink_firefox":
-        return test_citilink_firefox(store, query)
+        return test_citilink_firefox(store, query, target)
     elif store.method == "yandex_market_special":
-        return test_yandex_market_special(store, query)
+        return test_yandex_market_special(store, query, target)
     elif store.method == "ozon_firefox":
-        return test_ozon_firefox(store, query)
+        return test_ozon_firefox(store, query, target)
     elif store.method == "avito_firefox":
-        return test_avito_firefox(store, query)
+        return test_avito_firefox(store, query, target)
     elif store.method == "firefox":
-        return test_firefox(store, query)
+        return test_firefox(store, query, target)
+    elif store.method == "api_capture":
+        return test_api_capture(store, query, target)
     else:
         return TestResult(
             store=store.name,
@@ -1392,10 +1314,28 @@ def run_test(store: StoreConfig, query: str) -> TestResult:
         )
 
 
-def run_all_tests(query: str, skip_firefox: bool = False, skip_unstable: bool = False, store_filter: str = None) -> List[TestResult]:
-    """Запуск всех тестов"""
+def run_all_tests(
+    query: str,
+    skip_firefox: bool = False,
+    skip_unstable: bool = False,
+    store_filter: str = None,
+    on_result: Optional[Callable[[TestResult], None]] = None,
+    quiet: bool = False,
+) -> List[TestResult]:
+    """
+    Запуск всех тестов
+
+    Args:
+        on_result: Called with each result as soon as it is ready (--stream mode)
+        quiet: Suppress progress output (stdout is reserved for JSON)
+    """
     results = []
 
+    def record(result: TestResult):
+        results.append(result)
+        if on_result:
+            on_result(result)
+
     stores = STORES
     if store_filter:
         stores = [s for s in STORES if s.name == store_filter]
@@ -1403,7 +1343,7 @@ def run_all_tests(query: str, skip_firefox: bool = False, skip_unstable: bool =
     for store in stores:
         # Skip Firefox-based methods in quick mode
         if skip_firefox and ("firefox" in store.method or store.method == "firefox"):
-            results.append(TestResult(
+            record(TestResult(
                 store=store.name,
                 method=store.method,
                 status="SKIP",
@@ -1413,7 +1353,7 @@ def run_all_tests(query: str, skip_firefox: bool = False, skip_unstable: bool =
 
         # Skip unstable stores (rate limiting, CAPTCHA)
         if skip_unstable and store.unstable:
-            results.append(TestResult(
+            record(TestResult(
                 store=store.name,
                 method=store.method,
                 status="SKIP",
@@ -1421,17 +1361,19 @@ def run_all_tests(query: str, skip_firefox: bool = False, skip_unstable: bool =
             ))
             continue
 
-        print(f"\n[TEST] {store.name} ({store.method})")
+        if not quiet:
+            print(f"\n[TEST] {store.name} ({store.method})")
         result = run_test(store, query)
-        results.append(result)
+        record(result)
 
         # Статус
-        if result.passed:
-            print(f"  [PASS] {format_price(result.price)}")
-        else:
-            print(f"  [{result.status}] {result.error}")
+        if not quiet:
+            if result.passed:
+                print(f"  [PASS] {format_price(result.price)}")
+            else:
+                print(f"  [{result.status}] {result.error}")
 
-        print(f"  Time: {result.response_time:.1f}s")
+            print(f"  Time: {result.response_time:.1f}s")
 
         # Пауза между тестами
         if store.method != "firefox":
@@ -1490,56 +1432,55 @@ def print_summary(results: List[TestResult]):
     print("=" * 70)
 
 
-def save_results(results: List[TestResult], output_path: Path):
-    """Сохранение результатов"""
-    data = {
-        "timestamp": datetime.now().isoformat(),
-        "query": TEST_ARTICLE,
-        "results": [asdict(r) for r in results],
-        "summary": {
-            "total": len(results),
-            "passed": len([r for r in results if r.status == "PASS"]),
-            "failed": len([r for r in results if r.status == "FAIL"]),
-        }
-    }
+def save_results(results: List[TestResult], output_dir: Path, query: str = TEST_ARTICLE,
+                 store_filter: Optional[str] = None):
+    """Сохранение результатов (data/results - сегменты с индексом по магазину и времени)"""
+    store = ResultStore(output_dir / "results")
+    run = store.append_run("test_results", [asdict(r) for r in results], query=query)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"\nResults saved: {store.root} (run {run})")
 
-    print(f"\nResults saved: {output_path}")
+    # Журнал изменений: одна позиция на пару (магазин, метод). Поток - на запрос и
+    # набор магазинов: запуск с --store= не сравнивается с полным (и наоборот)
+    prefix = f"test_results-{store_filter}" if store_filter else "test_results"
+    log = SnapshotLog(output_dir, stream_name(prefix, query), key=lambda row: (row["store"], row["method"]))
+    delta = log.record(
+        [{"store": r.store, "method": r.method, "price": r.price, "available": r.available,
+          "name": r.details.get("product_name", "")} for r in results if r.price],
+        meta={"query": query},
+    )
+    if delta.seq > 1:
+        print_delta(delta)
+
+
+def result_to_json(result: TestResult) -> Dict[str, Any]:
+    """Convert result to the ScraperResponse shape expected by the Rust bridge"""
+    data = {
+        "store": result.store,
+        "status": result.status,
+        "price": result.price,
+        "count": result.details.get("count"),  # Get count from details if available
+        "time": result.response_time,
+        "error": result.error if result.error else None,
+        "method": result.method,
+    }
+    # Batch mode - which product this result belongs to
+    if "query" in result.details:
+        data["query"] = result.details["query"]
+    return data
 
 
 def output_json(results: List[TestResult], query: str):
     """Output results as JSON for Rust consumption"""
     if len(results) == 1:
         # Single result - output single object
-        result = results[0]
-        output = {
-            "store": result.store,
-            "status": result.status,
-            "price": result.price,
-            "count": result.details.get("count"),  # Get count from details if available
-            "time": result.response_time,
-            "error": result.error if result.error else None,
-            "method": result.method,
-        }
+        output = result_to_json(results[0])
     else:
         # Multiple results - output array
         output = {
             "query": query,
             "timestamp": datetime.now().isoformat(),
-            "results": [
-                {
-                    "store": r.store,
-                    "status": r.status,
-                    "price": r.price,
-                    "count": r.details.get("count"),
-                    "time": r.response_time,
-                    "error": r.error if r.error else None,
-                    "method": r.method,
-                }
-                for r in results
-            ],
+            "results": [result_to_json(r) for r in results],
             "summary": {
                 "total": len(results),
                 "passed": len([r for r in results if r.status == "PASS"]),
@@ -1551,9 +1492,20 @@ def output_json(results: List[TestResult], query: str):
     print(json.dumps(output, ensure_ascii=False, indent=2))
 
 
+def output_json_line(result: TestResult):
+    """
+    Output one result as a single NDJSON line (--stream mode).
+
+    Flushed immediately so the Rust bridge can show fast stores
+    without waiting for the slowest Firefox-based one.
+    """
+    print(json.dumps(result_to_json(result), ensure_ascii=False), flush=True)
+
+
 def main():
     # Check for JSON mode first (suppress all other output)
-    json_mode = "--json" in sys.argv
+    stream_mode = "--stream" in sys.argv
+    json_mode = "--json" in sys.argv or stream_mode
 
     if not json_mode:
         print("=" * 70)
@@ -1568,34 +1520,54 @@ def main():
         print("  python test_scrapers.py --skip-unstable    # Skip unstable stores (Citilink)")
         print("  python test_scrapers.py --store=citilink   # Test only Citilink")
         print("  python test_scrapers.py --json --store=dns # JSON output for Rust bridge")
+        print("  python test_scrapers.py --query=\"iPhone 15 Pro\"  # Search for another product")
+        print("  python test_scrapers.py --stream --quick   # NDJSON, one line per store")
+        print("  python test_scrapers.py --store=dns --batch=items.json  # Many products, one session")
+        print("  python test_scrapers.py --capture --store=ozon  # Products from the store's internal API")
         print("")
         print("Options:")
         print("  --help, -h         Show this help message")
         print("  --quick            Skip Firefox-based tests (faster)")
         print("  --skip-unstable    Skip stores with rate limiting issues")
         print("  --store=NAME       Test only specific store")
+        print("  --query=TEXT       Search query (default: test article)")
         print("  --json             Output results as JSON (for Rust bridge)")
+        print("  --stream           Output one JSON line per store as soon as it is ready")
+        print("  --batch=FILE       Scrape all products from FILE in one store session (needs --store)")
+        print("                     FILE: [{\"query\": \"...\", \"specs\": {\"screen\": \"16\", ...}}]")
+        print(f"  --capture          Intercept internal JSON API responses ({', '.join(STORE_APIS)})")
         print("")
         return
 
-    if not json_mode:
-        print(f"Test article: {TEST_ARTICLE}")
-        print(f"Test product: {TEST_PRODUCT}")
-
     # Аргументы
     skip_firefox = "--quick" in sys.argv
     skip_unstable = "--skip-unstable" in sys.argv
+    api_capture = "--capture" in sys.argv
     store_filter = None
+    batch_file = None
+    query = TEST_ARTICLE
 
     for arg in sys.argv[1:]:
         if arg.startswith("--store="):
             store_filter = arg.split("=")[1]
+        elif arg.startswith("--query="):
+            query = arg.split("=", 1)[1].strip()
+        elif arg.startswith("--batch="):
+            batch_file = arg.split("=", 1)[1]
         elif arg == "--store" and sys.argv.index(arg) + 1 < len(sys.argv):
             store_filter = sys.argv[sys.argv.index(arg) + 1]
 
+    # Магазины с внутренним JSON API - перехват ответов вместо Firefox/DOM
+    if api_capture:
+        STORES[:] = [replace(s, method="api_capture") if s.name in STORE_APIS else s for s in STORES]
+
     if not json_mode:
+        print(f"Test query: {query or '(default search)'}")
+        print(f"Test product: {TEST_PRODUCT}")
         if skip_firefox:
             print("Mode: QUICK (skipping Firefox tests)")
+        if api_capture:
+            print(f"Mode: API CAPTURE ({', '.join(STORE_APIS)})")
         if skip_unstable:
             print("Mode: STABLE-ONLY (skipping unstable stores)")
         if store_filter:
@@ -1603,13 +1575,49 @@ def main():
 
         print(f"Stores to test: {len([s for s in STORES if not store_filter or s.name == store_filter])}")
 
+    # Батч: несколько товаров в одном магазине
+    if batch_file:
+        store = next((s for s in STORES if s.name == store_filter), None)
+        if store is None:
+            print(f"--batch requires --store=NAME (unknown store: {store_filter})", file=sys.stderr)
+            sys.exit(2)
+
+        items = load_batch(batch_file)
+        if not json_mode:
+            print(f"Batch: {len(items)} products, rate limit {store.rate_limit}s")
+
+        results = run_batch(store, items, on_result=output_json_line if stream_mode else None)
+
+        if stream_mode:
+            pass
+        elif json_mode:
+            output_json(results, batch_file)
+        else:
+            for result in results:
+                print(f"  {result.details.get('query', '')[:40]:<40} {result.status:<6} "
+                      f"{format_price(result.price):>12}  {result.error}")
+            print_summary(results)
+
+        passed_count = len([r for r in results if r.status == "PASS"])
+        sys.exit(0 if passed_count == len(results) else 1)
+
     # Запуск тестов
-    results = run_all_tests(TEST_ARTICLE, skip_firefox=skip_firefox, skip_unstable=skip_unstable, store_filter=store_filter)
+    results = run_all_tests(
+        query,
+        skip_firefox=skip_firefox,
+        skip_unstable=skip_unstable,
+        store_filter=store_filter,
+        on_result=output_json_line if stream_mode else None,
+        quiet=json_mode,
+    )
 
     # Output based on mode
-    if json_mode:
+    if stream_mode:
+        # Stream mode - every result has already been printed as a line
+        pass
+    elif json_mode:
         # JSON mode - output only JSON to stdout
-        output_json(results, TEST_ARTICLE)
+        output_json(results, query)
     else:
         # Normal mode - human-readable output
         print_summary(results)
@@ -1617,8 +1625,7 @@ def main():
         # Сохранение
         output_dir = Path(__file__).parent.parent / "data"
         output_dir.mkdir(exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        save_results(results, output_dir / f"test_results_{timestamp}.json")
+        save_results(results, output_dir, query, store_filter)
 
     # Exit code
     passed_count = len([r for r in results if r.status == "PASS"])
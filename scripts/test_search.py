@@ -17,10 +17,10 @@ except ImportError:
     print("Установите: pip install duckduckgo-search")
     sys.exit(1)
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    print("Установите: pip install beautifulsoup4 lxml")
+from html_backend import DEFAULT_BACKEND, parse
+
+if not DEFAULT_BACKEND:
+    print("Установите: pip install selectolax (или beautifulsoup4 lxml)")
     sys.exit(1)
 
 import requests
@@ -123,7 +123,7 @@ def fetch_page(url: str) -> tuple:
 
 def analyze_page(html: str) -> dict:
     """Анализ HTML страницы"""
-    soup = BeautifulSoup(html, "lxml")
+    doc = parse(html)
 
     result = {
         "title": None,
@@ -133,24 +133,25 @@ def analyze_page(html: str) -> dict:
     }
 
     # Title
-    title_tag = soup.find("title")
-    if title_tag:
-        result["title"] = title_tag.text.strip()[:100]
+    title = doc.title()
+    if title:
+        result["title"] = title[:100]
 
     # Проверка на CAPTCHA
     captcha_indicators = ["captcha", "recaptcha", "robot", "проверка"]
-    page_text = soup.get_text().lower()
+    text = doc.text()
+    page_text = text.lower()
     for indicator in captcha_indicators:
         if indicator in page_text:
             result["has_captcha"] = True
             break
 
     # Проверка на страницу товара (Schema.org)
-    if soup.find(itemprop="product") or soup.find(itemtype=re.compile("Product")):
+    if doc.select_one('[itemprop="product"], [itemtype*="Product"]'):
         result["has_product"] = True
 
     # Извлечение цен из HTML
-    result["prices"] = extract_price_from_text(soup.get_text())
+    result["prices"] = extract_price_from_text(text)
 
     return result
 
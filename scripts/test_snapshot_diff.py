@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Unit tests for snapshot_diff module
+
+Run with: python3 test_snapshot_diff.py
+Or with pytest: pytest test_snapshot_diff.py -v
+"""
+
+import sys
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+from snapshot_diff import SnapshotLog, stream_name
+
+
+def rows(**prices):
+    return [{"store": store, "product_id": "1", "price": price} for store, price in prices.items()]
+
+
+def new_log(**kwargs) -> SnapshotLog:
+    return SnapshotLog(Path(tempfile.mkdtemp(prefix="snapshot_diff_")), "test", **kwargs)
+
+
+def test_record_diff():
+    """added / removed / repriced against the previous snapshot"""
+    log = new_log()
+    first = log.record(rows(ozon=100, dns=200))
+    second = log.record(rows(ozon=110, citilink=300))
+
+    assert first.seq == 1 and len(first.added) == 2
+    assert second.seq == 2 and second.summary() == "+1 -1 ~1", f"Got {second.summary()}"
+    assert second.repriced[0]["old_price"] == 100
+    print("[PASS] test_record_diff")
+
+
+def test_torn_tail_is_ignored_and_truncated():
+    """A partial line from a crashed writer does not break state() or record()"""
+    log = new_log()
+    log.record(rows(ozon=100))
+    with open(log.delta_path, "ab") as f:
+        f.write(b'{"seq": 2, "timestamp": "2026-')
+
+    seq, _, state = log.state()
+    assert seq == 1 and len(state) == 1, f"Got seq={seq}, state={state}"
+
+    delta = log.record(rows(ozon=120))
+    assert delta.seq == 2 and delta.summary() == "+0 -0 ~1", f"Got {delta.summary()}"
+    assert [d.seq for d in log.tail()] == [1, 2], "Torn line should be cut off before appending"
+    print("[PASS] test_torn_tail_is_ignored_and_truncated")
+
+
+def test_checkpoint_restore():
+    """State from checkpoint + later deltas equals the last snapshot"""
+    log = new_log(checkpoint_every=2)
+    for price in (100, 110, 120):
+        log.record(rows(ozon=price, dns=price * 2))
+
+    assert log.checkpoint_path.exists()
+    seq, _, state = log.state()
+    assert seq == 3 and sorted(r["price"] for r in state.values()) == [120, 240]
+    assert [d.seq for d in log.tail(since=2)] == [3]
+    print("[PASS] test_checkpoint_restore")
+
+
+def _record_many(directory: str, worker: int, count: int):
+    log = SnapshotLog(Path(directory), "test")
+    for i in range(count):
+        log.record(rows(ozon=worker * 1000 + i))
+
+
+def test_concurrent_writers():
+    """Writers in several processes get consecutive seq numbers and whole lines"""
+    log = new_log()
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_record_many, args=(str(log.directory), w, 10)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+
+    assert [d.seq for d in log.tail()] == list(range(1, 41)), "Deltas interleaved or lost"
+    print("[PASS] test_concurrent_writers")
+
+
+def test_stream_name():
+    """Stream per query slug"""
+    assert stream_name("prices", "MacBook Pro 16") == "prices-macbook-pro-16"
+    assert stream_name("prices", "") == "prices"
+    print("[PASS] test_stream_name")
+
+
+def run_all_tests():
+    """Run all tests and report results"""
+    tests = [
+        test_record_diff,
+        test_torn_tail_is_ignored_and_truncated,
+        test_checkpoint_restore,
+        test_concurrent_writers,
+        test_stream_name,
+    ]
+
+    failed = 0
+    for test_func in tests:
+        try:
+            test_func()
+        except AssertionError as e:
+            print(f"[FAIL] {test_func.__name__}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"[ERROR] {test_func.__name__}: {e}")
+            failed += 1
+
+    print(f"\n{'='*60}")
+    print(f"Tests run: {len(tests)}")
+    print(f"Passed: {len(tests) - failed}")
+    print(f"Failed: {failed}")
+    print(f"{'='*60}")
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_all_tests())